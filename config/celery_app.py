@@ -1,7 +1,8 @@
+import importlib
 import os
 
 from celery import Celery
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
@@ -13,14 +14,100 @@ app = Celery("digital_meal")
 #   should have a `CELERY_` prefix.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+# Modules imported by the workers of a queue before they start their pool
+# processes (see preload_heavy_modules). They are not imported by the task
+# modules, which only import them where they are used.
+PRELOADED_MODULES = {
+    "statistics": [
+        "numpy",
+        "pandas",
+        "mydigitalmeal.statistics.services.tiktok_statistics",
+    ],
+    "reports": ["numpy", "pandas", "bokeh.plotting", "wordcloud"],
+}
+# Queues whose tasks normalize texts with the spaCy model.
+SPACY_MODEL_QUEUES = ["reports"]
+
 
 @setup_logging.connect
 def config_loggers(*args, **kwargs):
-    from logging.config import dictConfig  # noqa: PLC0415
+    from django.conf import settings  # noqa: PLC0415
+
+    from digital_meal.core.logging_utils import configure_logging  # noqa: PLC0415
+
+    configure_logging(settings.LOGGING)
+
 
+def get_queue_profile_name(queue_name: str) -> str | None:
+    """Returns the key of a queue in CELERY_QUEUE_PROFILES (None if there is none)."""
     from django.conf import settings  # noqa: PLC0415
 
-    dictConfig(settings.LOGGING)
+    prefix = f"{settings.CELERY_TASK_DEFAULT_QUEUE}."
+    if not queue_name.startswith(prefix):
+        return None
+    profile_name = queue_name.removeprefix(prefix)
+    if profile_name not in settings.CELERY_QUEUE_PROFILES:
+        return None
+    return profile_name
+
+
+def get_queue_profile(queue_name: str) -> dict | None:
+    """Returns the entry of a queue in CELERY_QUEUE_PROFILES (None if there is none)."""
+    from django.conf import settings  # noqa: PLC0415
+
+    profile_name = get_queue_profile_name(queue_name)
+    if profile_name is None:
+        return None
+    return settings.CELERY_QUEUE_PROFILES[profile_name]
+
+
+@worker_init.connect
+def apply_queue_profile(sender, **kwargs):
+    """Applies the resource profile of the queue a worker consumes.
+
+    Workers consuming a single queue of CELERY_QUEUE_PROFILES (e.g., started
+    with `-Q prod.statistics`) use the concurrency, prefetch multiplier and
+    max tasks per child of that queue. Workers consuming several queues keep
+    their configured values.
+    """
+    queue_names = list(sender.app.amqp.queues.consume_from)
+    if len(queue_names) != 1:
+        return
+
+    profile = get_queue_profile(queue_names[0])
+    if profile is None:
+        return
+
+    sender.concurrency = profile["concurrency"]
+    sender.prefetch_multiplier = profile["prefetch_multiplier"]
+    sender.max_tasks_per_child = profile["max_tasks_per_child"]
+
+
+@worker_init.connect
+def preload_heavy_modules(sender, **kwargs):
+    """Imports the modules needed by the tasks of the consumed queues.
+
+    Runs in the main worker process before the pool processes are forked,
+    so that they share the modules (and the spaCy model) instead of loading
+    them on startup, which Celery limits to worker_proc_alive_timeout, or on
+    their first task. Workers of the portability and housekeeping queues
+    load nothing.
+    """
+    from digital_meal.reports.utils.shared.data import get_nlp_de  # noqa: PLC0415
+
+    profile_names = {
+        get_queue_profile_name(queue_name)
+        for queue_name in sender.app.amqp.queues.consume_from
+    }
+    modules = []
+    for profile_name, profile_modules in PRELOADED_MODULES.items():
+        if profile_name in profile_names:
+            modules.extend(m for m in profile_modules if m not in modules)
+
+    for module in modules:
+        importlib.import_module(module)
+    if profile_names.intersection(SPACY_MODEL_QUEUES):
+        get_nlp_de()
 
 
 # Load task modules from all registered Django app configs.
@@ -2,7 +2,9 @@ import json
 import socket
 from pathlib import Path
 
+from celery.schedules import crontab
 from environs import Env
+from kombu import Queue
 
 env = Env()
 env.read_env()
@@ -66,6 +68,7 @@ MY_DIGITAL_MEAL_APPS = [
 SHARED_APPS = [
     "shared.portability",
     "shared.routing",
+    "shared.projects",
 ]
 
 DDM_APPS = [
@@ -113,6 +116,7 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE = [
+    "digital_meal.core.middleware.ServerTimingMiddleware",
     "shared.routing.middleware.SubdomainRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -125,8 +129,10 @@ MIDDLEWARE = [
     "wagtail.contrib.redirects.middleware.RedirectMiddleware",
     "shared.routing.allauth_integration.middleware.SubdomainAuthMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "digital_meal.core.middleware.ProfilingMiddleware",
     "digital_meal.website.middleware.RestrictDDMMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "mydigitalmeal.studies.middleware.ParticipationTrailMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls.main_conf"
@@ -220,6 +226,9 @@ MDM_URL_PREFIX = env.str("MDM_URL_PREFIX", "my/")
 # ------------------------------------------------------------------------------
 MDM_DDM_TIKTOK_PROJECT_SLUG = env.str("MDM_DDM_TIKTOK_PROJECT_SLUG", "tik-tok")
 MDM_DDM_TIKTOK_WH_BP_NAME = env.str("MDM_DDM_TIKTOK_WH_BP_NAME", "Angesehene Videos")
+MDM_PORTABILITY_SERVER_INGESTION = env.bool("MDM_PORTABILITY_SERVER_INGESTION", False)
+# If True, TikTok data packages are downloaded and processed on the server instead
+# of being passed on to the participant's browser.
 
 # DANGO-ALLAUTH
 # ------------------------------------------------------------------------------
@@ -335,9 +344,90 @@ CELERY_TASK_SOFT_TIME_LIMIT = 5 * 60
 CELERY_TASK_SEND_SENT_EVENT = True
 CELERY_TASK_DEFAULT_QUEUE = env.str("CELERY_TASK_DEFAULT_QUEUE", "prod")
 
+# Tasks are routed to dedicated queues by resource profile. Queue names are
+# prefixed with CELERY_TASK_DEFAULT_QUEUE (e.g., "prod.statistics"). Every
+# queue is consumed by its own worker, which applies the concurrency and
+# prefetch multiplier of its queue (see config.celery_app). Lower priorities
+# are consumed first.
+CELERY_QUEUE_PROFILES = {
+    # CPU-heavy pandas computations; one task per process at a time.
+    "statistics": {
+        "concurrency": 2,
+        "prefetch_multiplier": 1,
+        "max_tasks_per_child": 50,
+        "time_limit": 15 * 60,
+        "soft_time_limit": 10 * 60,
+        "priority": 3,
+    },
+    # Precomputed report sections and wordclouds.
+    "reports": {
+        "concurrency": 2,
+        "prefetch_multiplier": 1,
+        "max_tasks_per_child": 50,
+        "time_limit": 10 * 60,
+        "soft_time_limit": 5 * 60,
+        "priority": 5,
+    },
+    # Requests to the TikTok APIs and downloads of data packages (I/O-bound).
+    "portability": {
+        "concurrency": 8,
+        "prefetch_multiplier": 2,
+        "max_tasks_per_child": 200,
+        "time_limit": 10 * 60,
+        "soft_time_limit": 8 * 60,
+        "priority": 2,
+    },
+    # Short periodic and bookkeeping tasks.
+    "housekeeping": {
+        "concurrency": 2,
+        "prefetch_multiplier": 4,
+        "max_tasks_per_child": 1000,
+        "time_limit": 2 * 60,
+        "soft_time_limit": 60,
+        "priority": 1,
+    },
+}
+CELERY_TASK_QUEUE_NAMES = {
+    "mydigitalmeal.statistics.tasks.compute_tiktok_wh_statistics_from_donation": (
+        "statistics"
+    ),
+    "mydigitalmeal.statistics.tasks.update_cohort_statistics": "housekeeping",
+    "digital_meal.reports.tasks.refresh_example_report_sections": "reports",
+    "digital_meal.reports.tasks.render_word_cloud_in_background": "reports",
+    "mydigitalmeal.datadonation.tasks.ingest_tiktok_data_package": "portability",
+    "shared.portability.tasks.issue_data_request": "portability",
+    "shared.portability.tasks.poll_data_request": "portability",
+    "shared.portability.tasks.poll_due_data_requests": "housekeeping",
+}
+# Workers started without -Q consume all queues.
+CELERY_TASK_QUEUES = [
+    Queue(name, routing_key=name)
+    for name in [
+        CELERY_TASK_DEFAULT_QUEUE,
+        *(f"{CELERY_TASK_DEFAULT_QUEUE}.{queue}" for queue in CELERY_QUEUE_PROFILES),
+    ]
+]
+CELERY_TASK_ROUTES = {
+    task: {
+        "queue": f"{CELERY_TASK_DEFAULT_QUEUE}.{queue}",
+        "priority": CELERY_QUEUE_PROFILES[queue]["priority"],
+    }
+    for task, queue in CELERY_TASK_QUEUE_NAMES.items()
+}
+CELERY_TASK_ANNOTATIONS = {
+    task: {
+        "time_limit": CELERY_QUEUE_PROFILES[queue]["time_limit"],
+        "soft_time_limit": CELERY_QUEUE_PROFILES[queue]["soft_time_limit"],
+    }
+    for task, queue in CELERY_TASK_QUEUE_NAMES.items()
+}
+
 CELERY_WORKER_HIJACK_ROOT_LOGGER = False
 
 CELERY_BROKER_TRANSPORT_OPTIONS = {
+    # Messages of different priorities are kept in separate lists per queue.
+    "priority_steps": list(range(10)),
+    "queue_order_strategy": "priority",
     "socket_keepalive": True,
     "socket_keepalive_options": {
         socket.TCP_KEEPIDLE: 60,
@@ -346,6 +436,29 @@ CELERY_BROKER_TRANSPORT_OPTIONS = {
     },
 }
 
+CELERY_BEAT_SCHEDULE = {
+    "poll-tiktok-data-requests": {
+        "task": "shared.portability.tasks.poll_due_data_requests",
+        "schedule": 10.0,
+    },
+    # Checked hourly, but the sections are only regenerated once per day (or
+    # when a new version is deployed).
+    "refresh-example-report-sections": {
+        "task": "digital_meal.reports.tasks.refresh_example_report_sections",
+        "schedule": crontab(minute=1),
+    },
+}
+
+
+# CACHES
+# ------------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env.str("CACHE_URL", REDIS_URL),
+    }
+}
+
 # DIGITAL MEAL
 # ------------------------------------------------------------------------------
 DAYS_TO_DONATION_DELETION = 180
@@ -364,6 +477,10 @@ TIKTOK_USER_INFO_URL = env.str(
 TIKTOK_CLIENT_KEY = env.str("TIKTOK_CLIENT_KEY")
 TIKTOK_CLIENT_SECRET = env.str("TIKTOK_CLIENT_SECRET")
 TIKTOK_REDIRECT_URL = env.str("TIKTOK_REDIRECT_URL")
+TIKTOK_PORTABILITY_API_CLIENT = env.str(
+    "TIKTOK_PORTABILITY_API_CLIENT",
+    "shared.portability.services.TikTokPortabilityAPIClient",
+)
 
 
 # DDM SETTINGS
@@ -408,6 +525,9 @@ WAGTAIL_VIDEOS_DISABLE_TRANSCODE = True
 LOG_DIR = Path(BASE_DIR) / "logs"
 Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
 
+# Handlers run on a listener thread per process, so that formatting and I/O
+# never block requests (see digital_meal.core.logging_utils.configure_logging).
+LOGGING_CONFIG = "digital_meal.core.logging_utils.configure_logging"
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -458,6 +578,14 @@ LOGGING = {
             "backupCount": 5,
             "formatter": "json",
         },
+        "timing_file": {
+            "level": "INFO",
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": Path(LOG_DIR) / "timing.log",
+            "maxBytes": 1024 * 1024 * 15,
+            "backupCount": 5,
+            "formatter": "json",
+        },
         "error_file": {
             "level": "ERROR",
             "class": "logging.handlers.RotatingFileHandler",
@@ -511,6 +639,11 @@ LOGGING = {
             "propagate": False,
             "level": "INFO",
         },
+        "digital_meal.core.timing": {
+            "handlers": ["timing_file"],
+            "propagate": False,
+            "level": "INFO",
+        },
         "shared.portability": {
             "handlers": ["portability_file", "error_file", "mail_admins", "console"],
             "propagate": False,
@@ -525,6 +658,16 @@ LOGGING = {
 }
 
 
+# PROFILING
+# ------------------------------------------------------------------------------
+# On-demand profiling of requests by staff users (see digital_meal.core.profiling).
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", False)
+PROFILING_DIR = Path(LOG_DIR) / "profiles"
+PROFILING_MAX_PROFILES = env.int("PROFILING_MAX_PROFILES", 20)
+PROFILING_TOKEN_MAX_AGE = 60 * 60  # in seconds
+PROFILING_TOP_N = 50
+
+
 # LOGGING
 # ------------------------------------------------------------------------------
 
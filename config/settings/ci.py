@@ -39,3 +39,9 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 ADMINS = [("Test Admin", "admin@test.com")]
 
 CELERY_TASK_ALWAYS_EAGER = True  # tasks run inline, no worker needed
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
@@ -57,6 +57,15 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 CELERY_TASK_ALWAYS_EAGER = True  # tasks run inline, no worker needed
 
 
+# CACHES
+# ------------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
 # DDM SETTINGS
 # ------------------------------------------------------------------------------
 WEBPACK_LOADER = {
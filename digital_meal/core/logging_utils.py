@@ -1,9 +1,18 @@
+import atexit
+import copy
 import json
 import logging
+import logging.config
+import os
+import queue
+import threading
 from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
 
 from django.http import HttpRequest
 
+logger = logging.getLogger(__name__)
+
 ALLOWED_LOGGING_LEVELS = [
     logging.WARNING,
     logging.INFO,
@@ -11,6 +20,39 @@ ALLOWED_LOGGING_LEVELS = [
     logging.CRITICAL,
 ]
 
+# Attributes set on every LogRecord; all other attributes are extra fields.
+LOG_RECORD_ATTRIBUTES = frozenset(
+    [
+        "name",
+        "msg",
+        "args",
+        "created",
+        "filename",
+        "funcName",
+        "levelname",
+        "levelno",
+        "lineno",
+        "module",
+        "msecs",
+        "message",
+        "pathname",
+        "process",
+        "processName",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+        "asctime",
+    ]
+)
+
+# Maximal number of records waiting to be handled by the listener thread.
+LOG_QUEUE_MAXSIZE = 10_000
+# Longer string values of extra fields (e.g., response_text) are truncated.
+LOG_FIELD_MAX_LENGTH = 2_000
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -27,30 +69,7 @@ class JsonFormatter(logging.Formatter):
 
         # Add extra fields
         for key, value in record.__dict__.items():
-            if key not in [
-                "name",
-                "msg",
-                "args",
-                "created",
-                "filename",
-                "funcName",
-                "levelname",
-                "levelno",
-                "lineno",
-                "module",
-                "msecs",
-                "message",
-                "pathname",
-                "process",
-                "processName",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-                "asctime",
-            ]:
+            if key not in LOG_RECORD_ATTRIBUTES:
                 log_data[key] = value
 
         return json.dumps(log_data)
@@ -110,3 +129,174 @@ def log_requests_exception(
     }
 
     logger.log(level, msg, *args, extra=requests_extra)
+
+
+def truncate_extra_fields(
+    record: logging.LogRecord, max_length: int = LOG_FIELD_MAX_LENGTH
+) -> None:
+    """Truncates string values of extra fields longer than max_length."""
+    for key, value in record.__dict__.items():
+        if key in LOG_RECORD_ATTRIBUTES or not isinstance(value, str):
+            continue
+        if len(value) > max_length:
+            setattr(
+                record,
+                key,
+                f"{value[:max_length]}... [{len(value) - max_length} characters "
+                f"truncated]",
+            )
+
+
+def handle_record(record: logging.LogRecord, handlers: list[logging.Handler]) -> None:
+    """Passes a record to the handlers whose level it reaches."""
+    for handler in handlers:
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+
+class LogQueue:
+    """Bounded queue of log records handled by a listener thread.
+
+    Records are put on the queue by QueuedHandlers together with the handlers
+    they are to be passed to. Formatting and I/O happen on the listener
+    thread, so that logging never blocks the logging thread. If the queue is
+    full, records are dropped and counted; the listener logs a warning with
+    the number of dropped records once the queue accepts records again.
+
+    Each process has its own listener thread: after a fork (e.g., of Celery
+    pool processes), the child starts a new queue and listener.
+
+    Args:
+        maxsize: Maximal number of records waiting on the queue.
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_MAXSIZE) -> None:
+        self.maxsize = maxsize
+        self.n_dropped = 0
+        self._unreported_drops = 0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._listener = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._listener is not None
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._queue = queue.Queue(self.maxsize)
+        self._listener = LogQueueListener(self._queue, self)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Stops the listener after all queued records have been handled."""
+        if not self.is_running:
+            return
+        self._listener.stop()
+        self._listener = None
+
+    def put(self, record: logging.LogRecord, handlers: list[logging.Handler]) -> None:
+        """Puts a record on the queue without blocking (drops it if full).
+
+        Once the listener is stopped (e.g., on exit), records are handled
+        directly.
+        """
+        if not self.is_running:
+            handle_record(record, handlers)
+            return
+        try:
+            self._queue.put_nowait((record, handlers))
+        except queue.Full:
+            with self._lock:
+                self.n_dropped += 1
+                self._unreported_drops += 1
+
+    def report_drops(self) -> None:
+        """Logs the number of records dropped since the last report."""
+        if not self._unreported_drops:
+            return
+        with self._lock:
+            n_dropped, self._unreported_drops = self._unreported_drops, 0
+        logger.warning(
+            "%s log records were dropped because the log queue was full.",
+            n_dropped,
+            extra={"n_dropped": n_dropped, "n_dropped_total": self.n_dropped},
+        )
+
+    def after_fork_in_child(self) -> None:
+        # The listener thread of the parent does not exist in the child.
+        self._lock = threading.Lock()
+        if self.is_running:
+            self._listener = None
+            self.start()
+
+
+class LogQueueListener(QueueListener):
+    """Passes the records of a LogQueue to the handlers they were queued for."""
+
+    def __init__(self, record_queue: queue.Queue, log_queue: LogQueue) -> None:
+        super().__init__(record_queue)
+        self.log_queue = log_queue
+
+    def handle(self, item: tuple[logging.LogRecord, list[logging.Handler]]) -> None:
+        handle_record(*item)
+        self.log_queue.report_drops()
+
+    def enqueue_sentinel(self) -> None:
+        # Blocks (unlike the default) so that stop() works on a full queue.
+        self.queue.put(self._sentinel)
+
+
+class QueuedHandler(QueueHandler):
+    """Hands the records of a logger over to its handlers on a LogQueue.
+
+    The record is copied with its message merged and its extra fields
+    truncated (see truncate_extra_fields). Unlike QueueHandler, exception
+    info is kept, so that the handlers can format the traceback.
+
+    Args:
+        log_queue: The LogQueue the records are put on.
+        handlers: The handlers the records are passed to by the listener.
+    """
+
+    def __init__(self, log_queue: LogQueue, handlers: list[logging.Handler]) -> None:
+        super().__init__(log_queue)
+        self.handlers = handlers
+        # Records no handler would accept are not queued at all.
+        self.setLevel(min(handler.level for handler in handlers))
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merged now, as the arguments may change before the record is handled.
+        record.msg = record.getMessage()
+        record.args = None
+        truncate_extra_fields(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put(record, self.handlers)
+
+
+log_queue = LogQueue()
+os.register_at_fork(after_in_child=log_queue.after_fork_in_child)
+atexit.register(log_queue.stop)
+
+
+def configure_logging(logging_config: dict) -> None:
+    """Configures logging with dictConfig and queues the handlers of all loggers.
+
+    Used as LOGGING_CONFIG and by Celery workers. The handlers of every
+    logger in logging_config are replaced by a QueuedHandler passing the
+    records to them on the listener thread of log_queue.
+    """
+    log_queue.stop()
+    logging.config.dictConfig(logging_config)
+    log_queue.start()
+
+    for name in {"", *logging_config.get("loggers", {})}:
+        configured_logger = logging.getLogger(name)
+        if configured_logger.handlers:
+            configured_logger.handlers = [
+                QueuedHandler(log_queue, configured_logger.handlers)
+            ]
@@ -0,0 +1,127 @@
+import cProfile
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from digital_meal.core.profiling import (
+    is_profiling_requested,
+    new_profile_id,
+    save_profile,
+)
+from digital_meal.core.timing import collect_timings
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the stage timings of a request (see digital_meal.core.timing)
+    and adds them to the response as Server-Timing header.
+
+    The header is only added if at least one stage has been timed and only
+    for staff users (or if DEBUG is set), as it reveals internals of the
+    request; the timings are logged for all requests. Stages that run while
+    a streaming response is consumed are not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_timings(f"{request.method} {request.path}") as timings:
+            response = self.get_response(request)
+            if timings.stages and self.exposes_timings(request):
+                response["Server-Timing"] = timings.as_header()
+        return response
+
+    @staticmethod
+    def exposes_timings(request) -> bool:
+        if settings.DEBUG:
+            return True
+        # Set by the authentication middleware further down the stack.
+        user = getattr(request, "user", None)
+        return user is not None and user.is_staff
+
+
+class ProfilingMiddleware:
+    """
+    Runs requests of staff users carrying a valid profiling token under
+    cProfile and stores the profile (see digital_meal.core.profiling).
+
+    The middleware is only loaded if PROFILING_ENABLED is set. The id of the
+    stored profile is returned in the X-Profile-Id header. For synchronous
+    streaming responses, the profile also covers the consumption of the
+    content and is stored once the content has been consumed.
+
+    Must be placed after the authentication middlewares.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_profiling_requested(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g., a debugger) is already active.
+            logger.warning("Profiling of %s skipped.", request.path, exc_info=True)
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        profile_id = new_profile_id()
+        response["X-Profile-Id"] = profile_id
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.profile_streaming_content(
+                response.streaming_content,
+                profiler,
+                profile_id,
+                request,
+                response.status_code,
+                started,
+            )
+        else:
+            save_profile(
+                profiler,
+                profile_id,
+                request,
+                response.status_code,
+                time.perf_counter() - started,
+            )
+        return response
+
+    def profile_streaming_content(
+        self, content, profiler, profile_id, request, status_code, started
+    ):
+        """Profiles the consumption of the content of a streaming response."""
+        content = iter(content)
+        try:
+            while True:
+                profiler.enable()
+                try:
+                    chunk = next(content)
+                except StopIteration:
+                    break
+                finally:
+                    profiler.disable()
+                yield chunk
+        finally:
+            save_profile(
+                profiler,
+                profile_id,
+                request,
+                status_code,
+                time.perf_counter() - started,
+            )
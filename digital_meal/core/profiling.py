@@ -0,0 +1,309 @@
+"""On-demand profiling of single requests for staff users.
+
+Profiling is enabled per request by a signed token, passed either as query
+parameter (``?_profile=<token>``) or as ``X-Profile`` header. Tokens are bound
+to a staff user and expire after ``PROFILING_TOKEN_MAX_AGE`` seconds; the
+staff dashboard shows a fresh token for the current user.
+
+The request is run under cProfile (see ProfilingMiddleware). For every
+profiled request, the profile store keeps:
+
+- ``<id>.prof``: the raw profile (can be opened with pstats or snakeviz).
+- ``<id>.txt``: the top ``PROFILING_TOP_N`` functions by cumulative time.
+- ``<id>.html``: a self-contained flame graph (icicle layout).
+- ``<id>.json``: metadata of the request.
+
+The store is a ring buffer in ``PROFILING_DIR`` holding at most
+``PROFILING_MAX_PROFILES`` profiles; the oldest profiles are removed first.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import re
+import secrets
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+PROFILING_QUERY_PARAMETER = "_profile"
+PROFILING_HEADER = "HTTP_X_PROFILE"
+PROFILING_SIGNING_SALT = "digital_meal.core.profiling"
+
+PROFILE_ID_PATTERN = re.compile(r"^\d{8}-\d{12}-[0-9a-f]{8}$")
+PROFILE_FILE_SUFFIXES = (".json", ".prof", ".txt", ".html")
+
+# Frames covering less than this share of the total time are not drawn.
+FLAME_GRAPH_MIN_SHARE = 0.005
+FLAME_GRAPH_MAX_DEPTH = 80
+
+
+def get_profiling_token(user) -> str:
+    """Returns a signed token that enables profiling for the given user."""
+    return signing.TimestampSigner(salt=PROFILING_SIGNING_SALT).sign(str(user.pk))
+
+
+def is_profiling_requested(request: HttpRequest) -> bool:
+    """Returns True if the request carries a valid token of a staff user."""
+    token = request.GET.get(PROFILING_QUERY_PARAMETER) or request.META.get(
+        PROFILING_HEADER
+    )
+    if not token:
+        return False
+
+    user = getattr(request, "user", None)
+    if user is None or not user.is_staff:
+        return False
+
+    try:
+        user_pk = signing.TimestampSigner(salt=PROFILING_SIGNING_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        logger.warning("Invalid profiling token for %s.", request.path)
+        return False
+    return user_pk == str(user.pk)
+
+
+def new_profile_id() -> str:
+    """Returns a new, chronologically sortable profile id."""
+    return f"{timezone.now():%Y%m%d-%H%M%S%f}-{secrets.token_hex(4)}"
+
+
+@dataclass
+class ProfileInfo:
+    """Metadata of a stored profile."""
+
+    id: str
+    created: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    n_calls: int
+    user_id: int
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of request profiles.
+
+    Args:
+        directory: Directory the profiles are stored in.
+        max_profiles: Maximal number of profiles kept.
+    """
+
+    def __init__(self, directory: Path, max_profiles: int) -> None:
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def get_path(self, profile_id: str, suffix: str) -> Path | None:
+        """Returns the path of a stored profile file (None if it does not exist)."""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        if suffix not in PROFILE_FILE_SUFFIXES:
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+    def save(self, info: ProfileInfo, stats: pstats.Stats) -> None:
+        """Stores a profile with its top-N table and flame graph."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        base_path = self.directory / info.id
+
+        stats.dump_stats(base_path.with_suffix(".prof"))
+        base_path.with_suffix(".txt").write_text(
+            render_top_table(stats, settings.PROFILING_TOP_N)
+        )
+        base_path.with_suffix(".html").write_text(
+            render_flame_graph(stats, f"{info.method} {info.path}")
+        )
+        # Written last, as the metadata marks the profile as complete.
+        base_path.with_suffix(".json").write_text(json.dumps(asdict(info)))
+        self.prune()
+
+    def list(self) -> list[ProfileInfo]:
+        """Returns the stored profiles, most recent first."""
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(ProfileInfo(**json.loads(path.read_text())))
+            except (OSError, ValueError, TypeError):
+                # Removed by a concurrent prune or incomplete.
+                continue
+        return profiles
+
+    def prune(self) -> None:
+        """Removes the oldest profiles exceeding max_profiles."""
+        profile_ids = sorted(path.stem for path in self.directory.glob("*.json"))
+        for profile_id in profile_ids[: -self.max_profiles or None]:
+            for suffix in PROFILE_FILE_SUFFIXES:
+                (self.directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+
+def get_profile_store() -> ProfileStore:
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
+
+
+def save_profile(
+    profiler: cProfile.Profile,
+    profile_id: str,
+    request: HttpRequest,
+    status_code: int,
+    duration: float,
+) -> None:
+    """Stores the profile of a request in the profile store.
+
+    Errors are logged and not raised, so that profiling never breaks a request.
+    """
+    stats = pstats.Stats(profiler)
+    info = ProfileInfo(
+        id=profile_id,
+        created=timezone.now().isoformat(),
+        method=request.method,
+        # The path without query string, which contains the profiling token.
+        path=request.path,
+        status_code=status_code,
+        duration_ms=round(duration * 1000, 1),
+        n_calls=stats.total_calls,
+        user_id=request.user.pk,
+    )
+    try:
+        get_profile_store().save(info, stats)
+    except OSError:
+        logger.exception("Profile of %s could not be stored.", request.path)
+
+
+def render_top_table(stats: pstats.Stats, n: int) -> str:
+    """Returns the top n functions by cumulative time as text table."""
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(n)
+    return stream.getvalue()
+
+
+def _format_function(function: tuple) -> str:
+    filename, line, name = function
+    if filename == "~":
+        # Built-in functions, e.g. "<method 'join' of 'str' objects>".
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def _iter_flame_graph_nodes(
+    function: tuple,
+    duration: float,
+    parent_duration: float,
+    total: float,
+    callees: dict[tuple, dict[tuple, float]],
+    cumulative: dict[tuple, float],
+    stack: tuple,
+) -> Iterator[str]:
+    """Yields the HTML of a frame and its callees.
+
+    cProfile only records caller-callee pairs, not full stacks. The time a
+    function spent in a callee is therefore split among the stacks the
+    function appears in, proportionally to the function's time in each stack.
+    """
+    label = escape(_format_function(function))
+    yield (
+        f'<div class="frame" style="flex-basis: '
+        f'{duration / parent_duration * 100:.4f}%">'
+        f'<div class="label" title="{label}: {duration * 1000:.1f} ms '
+        f'({duration / total:.1%})">{label}</div><div class="children">'
+    )
+    if len(stack) < FLAME_GRAPH_MAX_DEPTH and cumulative[function] > 0:
+        scale = duration / cumulative[function]
+        children = sorted(
+            callees.get(function, {}).items(), key=lambda item: item[1], reverse=True
+        )
+        for callee, callee_duration in children:
+            # Recursive calls are already included in the caller's time.
+            if callee in stack:
+                continue
+            callee_duration = min(callee_duration * scale, duration)
+            if callee_duration / total < FLAME_GRAPH_MIN_SHARE:
+                continue
+            yield from _iter_flame_graph_nodes(
+                callee,
+                callee_duration,
+                duration,
+                total,
+                callees,
+                cumulative,
+                (*stack, callee),
+            )
+    yield "</div></div>"
+
+
+def render_flame_graph(stats: pstats.Stats, title: str) -> str:
+    """Returns a self-contained HTML flame graph (icicle layout) of a profile.
+
+    The roots are the functions without profiled callers. Every frame is drawn
+    below its caller with a width proportional to its cumulative time.
+    """
+    callees = {}
+    cumulative = {}
+    roots = []
+    for function, (_, _, _, function_cumulative, callers) in stats.stats.items():
+        cumulative[function] = function_cumulative
+        if not callers:
+            roots.append((function, function_cumulative))
+        for caller, (_, _, _, caller_cumulative) in callers.items():
+            callees.setdefault(caller, {})[function] = caller_cumulative
+
+    total = sum(duration for _, duration in roots) or 1.0
+    frames = []
+    for function, duration in sorted(roots, key=lambda item: item[1], reverse=True):
+        if duration / total >= FLAME_GRAPH_MIN_SHARE:
+            frames.extend(
+                _iter_flame_graph_nodes(
+                    function,
+                    duration,
+                    total,
+                    total,
+                    callees,
+                    cumulative,
+                    (function,),
+                )
+            )
+
+    return FLAME_GRAPH_TEMPLATE.format(
+        title=escape(title),
+        total_ms=f"{total * 1000:.1f}",
+        frames="".join(frames),
+    )
+
+
+FLAME_GRAPH_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Profile: {title}</title>
+<style>
+  body {{ font-family: sans-serif; font-size: 12px; margin: 1em; }}
+  .children {{ display: flex; }}
+  .frame {{ flex-shrink: 0; min-width: 0; }}
+  .label {{
+    background: #f4a261; border: 1px solid #fff; padding: 2px 3px;
+    overflow: hidden; white-space: nowrap; text-overflow: ellipsis;
+  }}
+  .frame:hover > .label {{ background: #e76f51; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Total: {total_ms} ms. Hover a frame for its cumulative time.</p>
+<div class="children">{frames}</div>
+</body>
+</html>
+"""
@@ -0,0 +1,39 @@
+"""Streaming responses that are streamed under both WSGI and ASGI.
+
+Under ASGI, Django consumes the synchronous iterator of a
+StreamingHttpResponse with ``sync_to_async(list)``, i.e., it buffers the whole
+response before sending the first chunk. `get_streaming_content` therefore
+wraps the iterator in an asynchronous iterator if the request is served under
+ASGI, which produces each chunk in a separate ``sync_to_async`` call. Under
+WSGI, the iterator is used as it is.
+"""
+
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest
+
+_EXHAUSTED = object()
+
+
+async def iterate_in_thread(content: Iterable) -> AsyncIterator:
+    """Yields the chunks of a synchronous iterable one by one.
+
+    Each chunk is produced in the thread the request's synchronous code runs
+    in (thread_sensitive), so that database connections are shared with the
+    view that created the iterable.
+    """
+    iterator = iter(content)
+    get_next = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await get_next(iterator, _EXHAUSTED)) is not _EXHAUSTED:
+        yield chunk
+
+
+def get_streaming_content(
+    request: HttpRequest, content: Iterable
+) -> Iterator | AsyncIterator:
+    """Returns the content for a StreamingHttpResponse to the given request."""
+    if isinstance(request, ASGIRequest):
+        return iterate_in_thread(content)
+    return content
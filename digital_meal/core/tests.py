@@ -1,11 +1,29 @@
+import json
 import logging
+import tempfile
+import threading
+from pathlib import Path
 from unittest.mock import Mock
 
 import requests
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.sessions.middleware import SessionMiddleware
-from django.test import RequestFactory, TestCase
-
-from digital_meal.core.logging_utils import log_requests_exception, log_security_event
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from digital_meal.core.logging_utils import (
+    LOG_FIELD_MAX_LENGTH,
+    JsonFormatter,
+    LogQueue,
+    QueuedHandler,
+    log_requests_exception,
+    log_security_event,
+)
+from digital_meal.core.middleware import ProfilingMiddleware, ServerTimingMiddleware
+from digital_meal.core.profiling import get_profile_store, get_profiling_token
+from digital_meal.core.timing import collect_timings, timed_stage
 
 
 class TestLogSecurityEvent(TestCase):
@@ -191,3 +209,283 @@ class TestLogRequestsException(TestCase):
         self.assertEqual(extra["user_id"], "user_789")
         self.assertEqual(extra["retry_count"], 3)
         self.assertEqual(extra["url"], self.url)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET, block=None):
+        super().__init__(level)
+        self.records = []
+        self.block = block
+        self.entered = threading.Event()
+
+    def emit(self, record):
+        self.entered.set()
+        if self.block is not None:
+            self.block.wait(timeout=5)
+        self.records.append(record)
+
+
+class TestQueuedLogging(TestCase):
+    def setUp(self):
+        self.log_queue = LogQueue(maxsize=1)
+        self.log_queue.start()
+        self.addCleanup(self.log_queue.stop)
+        self.logger = logging.getLogger("digital_meal.tests.queued")
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, "propagate", True)
+
+    def log_to(self, *handlers):
+        self.logger.handlers = [QueuedHandler(self.log_queue, list(handlers))]
+        self.addCleanup(setattr, self.logger, "handlers", [])
+
+    def test_records_are_handled_by_listener(self):
+        handler = RecordingHandler()
+        self.log_to(handler)
+
+        self.logger.warning("Message %s", "argument")
+        self.log_queue.stop()
+
+        self.assertEqual(len(handler.records), 1)
+        self.assertEqual(handler.records[0].msg, "Message argument")
+        self.assertIsNone(handler.records[0].args)
+
+    def test_handler_levels_are_respected(self):
+        info_handler = RecordingHandler(logging.INFO)
+        error_handler = RecordingHandler(logging.ERROR)
+        self.log_to(info_handler, error_handler)
+
+        self.logger.warning("Warning")
+        self.log_queue.stop()
+
+        self.assertEqual(len(info_handler.records), 1)
+        self.assertEqual(error_handler.records, [])
+
+    def test_exception_info_is_kept(self):
+        handler = RecordingHandler()
+        self.log_to(handler)
+
+        try:
+            raise ValueError("test")  # noqa: TRY301
+        except ValueError:
+            self.logger.exception("Failed")
+        self.log_queue.stop()
+
+        self.assertIs(handler.records[0].exc_info[0], ValueError)
+
+    def test_long_extra_fields_are_truncated(self):
+        handler = RecordingHandler()
+        self.log_to(handler)
+        response_text = "x" * (LOG_FIELD_MAX_LENGTH + 100)
+
+        self.logger.warning(
+            "Message", extra={"response_text": response_text, "url": "/short/"}
+        )
+        self.log_queue.stop()
+
+        record = handler.records[0]
+        self.assertTrue(record.response_text.startswith("x" * LOG_FIELD_MAX_LENGTH))
+        self.assertTrue(record.response_text.endswith("[100 characters truncated]"))
+        self.assertEqual(record.url, "/short/")
+
+    def test_records_are_dropped_if_queue_is_full(self):
+        block = threading.Event()
+        handler = RecordingHandler(block=block)
+        self.log_to(handler)
+
+        self.logger.warning("Handled")
+        handler.entered.wait(timeout=5)
+        self.logger.warning("Queued")
+        self.logger.warning("Dropped")
+        self.assertEqual(self.log_queue.n_dropped, 1)
+
+        with self.assertLogs("digital_meal.core.logging_utils", "WARNING") as logs:
+            block.set()
+            self.log_queue.stop()
+
+        self.assertEqual([r.msg for r in handler.records], ["Handled", "Queued"])
+        self.assertEqual(logs.records[0].n_dropped, 1)
+
+    def test_records_are_handled_directly_after_stop(self):
+        handler = RecordingHandler()
+        self.log_to(handler)
+        self.log_queue.stop()
+
+        self.logger.warning("After stop")
+
+        self.assertEqual(len(handler.records), 1)
+
+
+class TestTimings(TestCase):
+    def test_stages_are_not_timed_without_collector(self):
+        with timed_stage("stage"):
+            pass
+
+        with collect_timings("test") as timings:
+            pass
+        self.assertEqual(timings.stages, {})
+
+    def test_stage_timings_and_queries(self):
+        @timed_stage("decorated")
+        def query_users():
+            return list(get_user_model().objects.all())
+
+        with self.assertLogs("digital_meal.core.timing", "INFO") as logs:
+            with collect_timings("test") as timings:
+                with timed_stage("stage"):
+                    query_users()
+                query_users()
+
+        self.assertEqual(timings.n_queries, 2)
+        self.assertEqual(timings.stages["stage"].n_queries, 1)
+        self.assertEqual(timings.stages["decorated"].n_queries, 2)
+        self.assertEqual(timings.stages["decorated"].n_calls, 2)
+
+        log_data = json.loads(JsonFormatter().format(logs.records[0]))
+        self.assertEqual(log_data["timing_label"], "test")
+        self.assertEqual(log_data["n_queries"], 2)
+        self.assertEqual(set(log_data["stages"]), {"stage", "decorated"})
+
+    def test_server_timing_header(self):
+        def view(request):
+            with timed_stage("decrypt"):
+                get_user_model().objects.exists()
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        request.user = get_user_model()(is_staff=True)
+        with self.assertLogs("digital_meal.core.timing", "INFO"):
+            response = ServerTimingMiddleware(view)(request)
+
+        header = response["Server-Timing"]
+        self.assertRegex(header, r'^decrypt;desc="1 queries";dur=[\d.]+, total;')
+
+    def test_server_timing_header_only_for_staff(self):
+        def view(request):
+            with timed_stage("decrypt"):
+                pass
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        with self.assertLogs("digital_meal.core.timing", "INFO"):
+            response = ServerTimingMiddleware(view)(request)
+        self.assertFalse(response.has_header("Server-Timing"))
+
+        with override_settings(DEBUG=True):
+            response = ServerTimingMiddleware(view)(request)
+        self.assertTrue(response.has_header("Server-Timing"))
+
+    def test_no_server_timing_header_without_stages(self):
+        request = RequestFactory().get("/")
+        response = ServerTimingMiddleware(lambda r: HttpResponse())(request)
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class TestProfiling(TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        settings_override = override_settings(
+            PROFILING_ENABLED=True, PROFILING_DIR=Path(tmp_dir.name)
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff_user = get_user_model().objects.create_user(
+            username="staff", email="staff@mail.com", is_staff=True
+        )
+        self.token = get_profiling_token(self.staff_user)
+
+    def get_request(self, user, **params):
+        request = RequestFactory().get("/report/", params)
+        request.user = user
+        return request
+
+    def view(self, request):
+        return HttpResponse(",".join(str(i) for i in range(100)))
+
+    def test_middleware_not_used_if_disabled(self):
+        with override_settings(PROFILING_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(self.view)
+
+    def test_request_without_token_is_not_profiled(self):
+        request = self.get_request(self.staff_user)
+        response = ProfilingMiddleware(self.view)(request)
+        self.assertFalse(response.has_header("X-Profile-Id"))
+        self.assertEqual(get_profile_store().list(), [])
+
+    def test_token_of_other_user_is_rejected(self):
+        other_user = get_user_model().objects.create_user(
+            username="other", email="other@mail.com", is_staff=True
+        )
+        request = self.get_request(other_user, _profile=self.token)
+        response = ProfilingMiddleware(self.view)(request)
+        self.assertFalse(response.has_header("X-Profile-Id"))
+
+        request = self.get_request(AnonymousUser(), _profile=self.token)
+        response = ProfilingMiddleware(self.view)(request)
+        self.assertFalse(response.has_header("X-Profile-Id"))
+
+    def test_invalid_token_is_rejected(self):
+        request = self.get_request(self.staff_user, _profile="invalid")
+        with self.assertLogs("digital_meal.core.profiling", "WARNING"):
+            response = ProfilingMiddleware(self.view)(request)
+        self.assertFalse(response.has_header("X-Profile-Id"))
+
+    def test_request_is_profiled(self):
+        request = self.get_request(self.staff_user, _profile=self.token)
+        response = ProfilingMiddleware(self.view)(request)
+
+        profile_id = response["X-Profile-Id"]
+        profiles = get_profile_store().list()
+        self.assertEqual([p.id for p in profiles], [profile_id])
+        self.assertEqual(profiles[0].path, "/report/")
+        self.assertEqual(profiles[0].status_code, 200)
+        self.assertEqual(profiles[0].user_id, self.staff_user.pk)
+
+        store = get_profile_store()
+        for suffix in [".prof", ".txt", ".html"]:
+            self.assertIsNotNone(store.get_path(profile_id, suffix))
+        top_table = store.get_path(profile_id, ".txt").read_text()
+        self.assertIn("view", top_table)
+        flame_graph = store.get_path(profile_id, ".html").read_text()
+        self.assertIn("view (tests.py:", flame_graph)
+
+    def test_token_in_header(self):
+        request = self.get_request(self.staff_user)
+        request.META["HTTP_X_PROFILE"] = self.token
+        response = ProfilingMiddleware(self.view)(request)
+        self.assertTrue(response.has_header("X-Profile-Id"))
+
+    def test_streaming_response_is_profiled_when_consumed(self):
+        def view(request):
+            return StreamingHttpResponse(str(i) for i in range(10))
+
+        request = self.get_request(self.staff_user, _profile=self.token)
+        response = ProfilingMiddleware(view)(request)
+        self.assertEqual(get_profile_store().list(), [])
+
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        profiles = get_profile_store().list()
+        self.assertEqual([p.id for p in profiles], [response["X-Profile-Id"]])
+
+    def test_oldest_profiles_are_removed(self):
+        middleware = ProfilingMiddleware(self.view)
+        with override_settings(PROFILING_MAX_PROFILES=2):
+            profile_ids = [
+                middleware(self.get_request(self.staff_user, _profile=self.token))[
+                    "X-Profile-Id"
+                ]
+                for _ in range(3)
+            ]
+
+        store = get_profile_store()
+        self.assertEqual(len(store.list()), 2)
+        self.assertEqual(len(list(store.directory.iterdir())), 8)
+        self.assertIsNone(store.get_path(min(profile_ids), ".prof"))
+
+    def test_profile_paths_are_validated(self):
+        store = get_profile_store()
+        self.assertIsNone(store.get_path("../../settings", ".json"))
+        self.assertIsNone(store.get_path("20250101-120000000000-0123abcd", ".py"))
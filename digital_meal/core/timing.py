@@ -0,0 +1,136 @@
+"""Lightweight timing of the stages of a request or task.
+
+Code on hot paths marks its stages with `timed_stage`, either as context
+manager or as decorator::
+
+    with timed_stage("decrypt"):
+        ...
+
+    @timed_stage("plots")
+    def get_plots(...): ...
+
+The timings (duration and number of database queries per stage) are only
+collected while a collector is active (see `collect_timings`, which is used by
+ServerTimingMiddleware for requests and by Celery tasks). Otherwise,
+`timed_stage` does nothing but a context variable lookup.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageTiming:
+    """Accumulated timing of all runs of a stage."""
+
+    duration: float = 0.0
+    n_queries: int = 0
+    n_calls: int = 0
+
+
+@dataclass
+class Timings:
+    """Collects the stage timings and the database queries of one request/task."""
+
+    label: str
+    started: float = field(default_factory=time.perf_counter)
+    n_queries: int = 0
+    stages: dict[str, StageTiming] = field(default_factory=dict)
+
+    def count_query(self, execute, sql, params, many, context):
+        """Database execute wrapper (see connection.execute_wrapper())."""
+        self.n_queries += 1
+        return execute(sql, params, many, context)
+
+    def add(self, name: str, duration: float, n_queries: int) -> None:
+        stage = self.stages.setdefault(name, StageTiming())
+        stage.duration += duration
+        stage.n_queries += n_queries
+        stage.n_calls += 1
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_header(self) -> str:
+        """Formats the timings as value of a Server-Timing header."""
+        metrics = [
+            f'{name};desc="{stage.n_queries} queries";dur={stage.duration * 1000:.1f}'
+            for name, stage in self.stages.items()
+        ]
+        metrics.append(
+            f'total;desc="{self.n_queries} queries";dur={self.total * 1000:.1f}'
+        )
+        return ", ".join(metrics)
+
+    def as_log_fields(self) -> dict:
+        """Formats the timings as extra fields of a log record."""
+        return {
+            "timing_label": self.label,
+            "duration_ms": round(self.total * 1000, 1),
+            "n_queries": self.n_queries,
+            "stages": {
+                name: {
+                    "duration_ms": round(stage.duration * 1000, 1),
+                    "n_queries": stage.n_queries,
+                    "n_calls": stage.n_calls,
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+
+
+_current_timings: ContextVar[Timings | None] = ContextVar(
+    "current_timings", default=None
+)
+
+
+@contextmanager
+def collect_timings(label: str) -> Iterator[Timings]:
+    """Collects the timings of all stages run in this context.
+
+    The collected timings are logged when the context is left if at least
+    one stage has been timed.
+    """
+    timings = Timings(label=label)
+    token = _current_timings.set(timings)
+    try:
+        with connection.execute_wrapper(timings.count_query):
+            yield timings
+    finally:
+        _current_timings.reset(token)
+        if timings.stages:
+            logger.info(
+                "Timings of %s: %.1f ms",
+                label,
+                timings.total * 1000,
+                extra=timings.as_log_fields(),
+            )
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    """Times a stage of the current request or task (see module docstring).
+
+    Stages with the same name are accumulated. Names are used as Server-Timing
+    metric names and must only contain lowercase letters, digits, '-' and '_'.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    n_queries = timings.n_queries
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started, timings.n_queries - n_queries)
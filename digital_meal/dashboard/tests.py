@@ -1,6 +1,26 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from ddm.datadonation.models import DataDonation, DonationBlueprint, FileUploader
+from ddm.logging.models import ExceptionLogEntry, ExceptionRaisers
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject, ResearchProfile
+from ddm.questionnaire.models import (
+    MultiChoiceQuestion,
+    QuestionItem,
+    QuestionnaireResponse,
+    SingleChoiceQuestion,
+)
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+
+from digital_meal.core.profiling import get_profile_store, get_profiling_token
+from digital_meal.dashboard.views import ParticipationOverviewView
+from digital_meal.tool.models import BaseModule, Classroom
+from shared.projects.registry import project_registry
 
 User = get_user_model()
 
@@ -60,3 +80,231 @@ class DashboardViewTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "dashboard/dashboard.html")
+
+
+class ProfileViewTests(TestCase):
+    """Tests for the request profile views."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        settings_override = override_settings(
+            PROFILING_ENABLED=True, PROFILING_DIR=Path(tmp_dir.name)
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff_user = User.objects.create_user(
+            username="staff_user",
+            email="staff_user@mail.com",
+            password="testpass123",
+            is_staff=True,
+        )
+        self.client.login(email="staff_user@mail.com", password="testpass123")
+
+    def create_profile(self):
+        """Profiles a request to the dashboard and returns the profile id."""
+        token = get_profiling_token(self.staff_user)
+        response = self.client.get(reverse("dashboard"), {"_profile": token})
+        return response["X-Profile-Id"]
+
+    def test_profile_overview_lists_profiles(self):
+        profile_id = self.create_profile()
+        response = self.client.get(reverse("dashboard_profile_overview"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p.id for p in response.context["profiles"]], [profile_id])
+        self.assertContains(
+            response, reverse("dashboard_profile_file", args=[profile_id, "flamegraph"])
+        )
+
+    def test_profile_files(self):
+        profile_id = self.create_profile()
+        for file_type, content_type in [
+            ("flamegraph", "text/html; charset=utf-8"),
+            ("top", "text/plain; charset=utf-8"),
+            ("prof", "application/octet-stream"),
+        ]:
+            with self.subTest(file_type=file_type):
+                url = reverse("dashboard_profile_file", args=[profile_id, file_type])
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], content_type)
+                response.close()
+
+    def test_unknown_profile_file(self):
+        profile_id = self.create_profile()
+        for args in [
+            [profile_id, "json"],
+            ["20250101-120000000000-0123abcd", "top"],
+        ]:
+            with self.subTest(args=args):
+                url = reverse("dashboard_profile_file", args=args)
+                self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(len(get_profile_store().list()), 1)
+
+    def test_non_staff_user_denied(self):
+        User.objects.create_user(
+            username="regular_user",
+            email="regular_user@mail.com",
+            password="testpass123",
+        )
+        self.client.login(email="regular_user@mail.com", password="testpass123")
+        response = self.client.get(reverse("dashboard_profile_overview"))
+        self.assertEqual(response.status_code, 403)
+
+
+class OverviewDataTests(TestCase):
+    """Tests for the figures of the participation and exception overviews."""
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create_user(
+            username="teacher", email="teacher@mail.com", password="testpass123"
+        )
+        cls.staff_user = User.objects.create_user(
+            username="staff_user",
+            email="staff_user@mail.com",
+            password="testpass123",
+            is_staff=True,
+        )
+        cls.project = DonationProject.objects.create(
+            name="Project",
+            slug="project",
+            owner=ResearchProfile.objects.create(user=teacher),
+        )
+        uploader = FileUploader.objects.create(
+            project=cls.project, name="uploader", upload_type="zip file"
+        )
+        cls.blueprint_a, cls.blueprint_b = [
+            DonationBlueprint.objects.create(
+                project=cls.project,
+                name=name,
+                exp_file_format="json",
+                file_uploader=uploader,
+            )
+            for name in ["Blueprint A", "Blueprint B"]
+        ]
+        cls.consent_question = SingleChoiceQuestion.objects.create(
+            project=cls.project,
+            name="DD Consent Question",
+            variable_name="usage_dd_consent",
+        )
+        cls.module = BaseModule.objects.create(
+            name="module", active=True, ddm_project_id=cls.project.url_id
+        )
+        classroom = Classroom.objects.create(
+            owner=teacher,
+            name="class",
+            base_module=cls.module,
+            school_level="primary",
+            school_year=10,
+            subject="languages",
+            instruction_format="regular",
+        )
+
+        now = timezone.now()
+        cls.participants = [
+            Participant.objects.create(
+                project=cls.project,
+                extra_data={"url_param": {"class": class_id}},
+                start_time=now,
+                completed=completed,
+            )
+            for class_id, completed in [
+                (classroom.url_id, True),
+                (classroom.url_id, True),
+                (classroom.url_id, False),
+                ("other-class", True),
+            ]
+        ]
+        p1, p2, p3, p_other = cls.participants
+
+        consent_key = cls.consent_question.get_response_keys()[0]
+        for participant, consent in [(p1, 1), (p2, 0), (p_other, 1)]:
+            QuestionnaireResponse.objects.create(
+                project=cls.project,
+                participant=participant,
+                data={consent_key: consent},
+            )
+
+        for participant, blueprint in [
+            (p1, cls.blueprint_a),
+            (p2, cls.blueprint_a),
+            (p1, cls.blueprint_b),
+            (p_other, cls.blueprint_a),
+        ]:
+            DataDonation.objects.create(
+                project=cls.project,
+                participant=participant,
+                blueprint=blueprint,
+                consent=True,
+                status="success",
+                data=[],
+            )
+
+        for participant, blueprint, exception_type in [
+            (p1, cls.blueprint_a, "PARSING_ERROR"),
+            (p2, cls.blueprint_a, "PARSING_ERROR"),
+            (p3, cls.blueprint_b, "NO_FILE_MATCH"),
+            (p_other, cls.blueprint_a, "PARSING_ERROR"),
+        ]:
+            ExceptionLogEntry.objects.create(
+                project=cls.project,
+                participant=participant,
+                blueprint=blueprint,
+                exception_type=exception_type,
+                message="Error.",
+                raised_by=ExceptionRaisers.CLIENT,
+            )
+
+    def setUp(self):
+        project_registry.clear()
+        self.client.login(email="staff_user@mail.com", password="testpass123")
+
+    def test_participation_overview(self):
+        response = self.client.get(reverse("dashboard_participation_overview"))
+
+        module_info = response.context["participants_by_module"][self.module.name]
+        self.assertEqual(module_info["total"], 3)
+        self.assertEqual(module_info["completed"], 2)
+        self.assertEqual(
+            module_info["blueprints"]["Blueprint A"],
+            {"n_uploaded": 2, "n_donated": 1, "donation_rate": 0.5},
+        )
+        self.assertEqual(
+            module_info["blueprints"]["Blueprint B"],
+            {"n_uploaded": 1, "n_donated": 1, "donation_rate": 1.0},
+        )
+
+    def test_consent_of_question_items(self):
+        question = MultiChoiceQuestion.objects.create(
+            project=self.project, name="Consent Items", variable_name="consent"
+        )
+        item = QuestionItem.objects.create(
+            question=question, index=1, label="Usage data", value=1
+        )
+        participant = self.participants[2]
+        QuestionnaireResponse.objects.create(
+            project=self.project, participant=participant, data={f"item-{item.pk}": 1}
+        )
+
+        with (
+            patch("digital_meal.tool.consent.CONSENT_VARIABLES", ["consent-1"]),
+            patch("digital_meal.dashboard.views.USAGE_CONSENT_VARIABLE", "consent-1"),
+        ):
+            consented = ParticipationOverviewView().get_consent_lookup(
+                self.participants[:3]
+            )
+
+        self.assertEqual(consented, {participant.external_id})
+
+    def test_exception_overview(self):
+        response = self.client.get(reverse("dashboard_exception_overview"))
+
+        module_exceptions = response.context["exceptions_per_module"][self.module.name]
+        blueprint_a = module_exceptions["blueprints"]["Blueprint A"]
+        blueprint_b = module_exceptions["blueprints"]["Blueprint B"]
+        self.assertEqual(blueprint_a["PARSING_ERROR"], 2)
+        self.assertEqual(blueprint_a["NO_FILE_MATCH"], 0)
+        self.assertEqual(blueprint_b["NO_FILE_MATCH"], 1)
+        self.assertEqual(blueprint_b["PARSING_ERROR"], 0)
@@ -24,4 +24,14 @@ urlpatterns = [
         views.ExceptionOverviewView.as_view(),
         name="dashboard_exception_overview",
     ),
+    path(
+        "profile-overview",
+        views.ProfileOverviewView.as_view(),
+        name="dashboard_profile_overview",
+    ),
+    path(
+        "profiles/<str:profile_id>/<str:file_type>",
+        views.ProfileFileView.as_view(),
+        name="dashboard_profile_file",
+    ),
 ]
@@ -1,19 +1,34 @@
 from uuid import UUID
 
-from ddm.apis.serializers import ResponseSerializer
 from ddm.datadonation.models import DataDonation, DonationBlueprint
 from ddm.logging.models import ExceptionLogEntry
 from ddm.participation.models import Participant
 from ddm.projects.models import DonationProject
 from ddm.questionnaire.models import QuestionnaireResponse
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.db.models import Count, Q, QuerySet, Value
 from django.db.models.functions import Concat
+from django.http import FileResponse, Http404
 from django.utils import timezone
+from django.views import View
 from django.views.generic import TemplateView
 
+from digital_meal.core.profiling import (
+    PROFILING_QUERY_PARAMETER,
+    get_profile_store,
+    get_profiling_token,
+)
+from digital_meal.tool.consent import (
+    CONSENT_VALUES,
+    USAGE_CONSENT_VARIABLE,
+    decrypt_response,
+    get_consent_keys,
+    get_consent_responses,
+)
 from digital_meal.tool.models import BaseModule, Classroom, Teacher
+from shared.projects.registry import project_registry
 
 User = get_user_model()
 
@@ -206,11 +221,11 @@ class ParticipationOverviewView(UserPassesTestMixin, TemplateView):
             )
         )
 
+        classroom_ids = set(classrooms.values_list("url_id", flat=True))
         relevant_participants = [
             p
             for p in all_participants
-            if p.extra_data.get("url_param", {}).get("class")
-            in classrooms.values_list("url_id", flat=True)
+            if p.extra_data.get("url_param", {}).get("class") in classroom_ids
         ]
         return relevant_participants
 
@@ -246,16 +261,28 @@ class ParticipationOverviewView(UserPassesTestMixin, TemplateView):
         return result
 
     def get_consent_lookup(self, participants: list[Participant]) -> set:
+        """Returns the external ids of participants who consented to donate.
+
+        Decryptors and consent question keys are resolved once per project.
+        """
+        external_ids = {p.pk: p.external_id for p in participants}
+        project_ids = {p.project_id for p in participants}
+        consent_keys = get_consent_keys(project_ids)
+        decryptors = {pk: project_registry.get(pk=pk).decryptor for pk in project_ids}
+
         relevant_responses = QuestionnaireResponse.objects.filter(
             participant__in=participants
-        )
-        response_data = ResponseSerializer(relevant_responses, many=True).data
+        ).only("pk", "participant_id", "project_id", "data")
 
-        return {
-            response["participant"]
-            for response in response_data
-            if response["response_data"].get("usage_dd_consent") in [1, "1"]
-        }
+        consented = set()
+        for response in relevant_responses:
+            data = decrypt_response(response, decryptors[response.project_id])
+            if not data:
+                continue
+            consent = get_consent_responses(data, consent_keys[response.project_id])
+            if consent.get(USAGE_CONSENT_VARIABLE) in CONSENT_VALUES:
+                consented.add(external_ids[response.participant_id])
+        return consented
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -439,24 +466,27 @@ class ExceptionOverviewView(UserPassesTestMixin, TemplateView):
             # Add blueprint-level exceptions
             blueprints = DonationBlueprint.objects.filter(project=donation_project)
 
+            bp_actual_counts = (
+                ExceptionLogEntry.objects.filter(
+                    exception_type__in=blueprint_exception_types,
+                    participant__in=participants,
+                    blueprint__in=blueprints,
+                )
+                .values("blueprint_id", "exception_type")
+                .annotate(count=Count("participant", distinct=True))
+                .values_list("blueprint_id", "exception_type", "count")
+            )
+            counts_per_blueprint = {}
+            for blueprint_id, exception_type, count in bp_actual_counts:
+                counts_per_blueprint.setdefault(blueprint_id, {})[exception_type] = (
+                    count
+                )
+
             blueprint_exceptions = {}
             for blueprint in blueprints:
                 bp_exception_counts = {exc: 0 for exc in blueprint_exception_types}
-
-                bp_actual_counts = (
-                    ExceptionLogEntry.objects.filter(
-                        exception_type__in=blueprint_exception_types,
-                        participant__in=participants,
-                        blueprint=blueprint,
-                    )
-                    .values("exception_type")
-                    .annotate(count=Count("participant", distinct=True))
-                    .values_list("exception_type", "count")
-                )
-
-                bp_exception_counts.update(bp_actual_counts)
-
-                blueprint_exceptions[blueprint.name] = bp_exception_counts.copy()
+                bp_exception_counts.update(counts_per_blueprint.get(blueprint.pk, {}))
+                blueprint_exceptions[blueprint.name] = bp_exception_counts
 
             exc_per_module[module.name]["blueprints"] = blueprint_exceptions
             exc_per_module[module.name]["id"] = module.pk
@@ -466,3 +496,50 @@ class ExceptionOverviewView(UserPassesTestMixin, TemplateView):
         context["exceptions_per_module"] = exc_per_module
 
         return context
+
+
+class ProfileOverviewView(UserPassesTestMixin, TemplateView):
+    """HTMX endpoint for listing the recently stored request profiles."""
+
+    template_name = "dashboard/partials/profile_overview.html"
+
+    def test_func(self):
+        """Requesting user must pass this test to access view."""
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["profiling_enabled"] = settings.PROFILING_ENABLED
+        context["profiling_parameter"] = PROFILING_QUERY_PARAMETER
+        context["profiling_token"] = get_profiling_token(self.request.user)
+        context["profiles"] = get_profile_store().list()
+        return context
+
+
+class ProfileFileView(UserPassesTestMixin, View):
+    """Returns the flame graph, top-N table or raw profile of a stored profile."""
+
+    file_types = {
+        "flamegraph": (".html", "text/html; charset=utf-8"),
+        "top": (".txt", "text/plain; charset=utf-8"),
+        "prof": (".prof", "application/octet-stream"),
+    }
+
+    def test_func(self):
+        """Requesting user must pass this test to access view."""
+        return self.request.user.is_staff
+
+    def get(self, request, profile_id, file_type):
+        if file_type not in self.file_types:
+            raise Http404
+        suffix, content_type = self.file_types[file_type]
+
+        path = get_profile_store().get_path(profile_id, suffix)
+        if path is None:
+            raise Http404
+        return FileResponse(
+            path.open("rb"),
+            content_type=content_type,
+            as_attachment=file_type == "prof",
+            filename=path.name,
+        )
@@ -0,0 +1,61 @@
+"""Precomputed sections of the example reports.
+
+The example reports are based on synthetic data that only changes with the
+date. Their rendered sections are therefore stored in the shared cache under a
+key containing the current date and the version of the report code, so that
+they are generated once per day (see tasks.refresh_example_report_sections)
+instead of on every request.
+"""
+
+import functools
+import hashlib
+from pathlib import Path
+
+from django.core.cache import cache
+from django.utils import timezone
+
+EXAMPLE_SECTION_KEY = "reports:example:{name}:{date}:{version}"
+EXAMPLE_SECTION_TIMEOUT = 60 * 60 * 48
+
+# URL names of the example report sections served from the cache.
+EXAMPLE_SECTIONS = [
+    "youtube_example_report_wh_sections",
+    "youtube_example_report_sh_sections",
+    "tiktok_example_report_wh_sections",
+    "tiktok_example_report_sh_sections",
+]
+
+REPORT_CODE_DIRS = ["views", "utils", "templates"]
+
+
+@functools.cache
+def get_report_code_version() -> str:
+    """Returns a digest of the code and templates used to render the reports.
+
+    Changes whenever a new version of the report code is deployed, which
+    invalidates all precomputed sections.
+    """
+    digest = hashlib.sha256()
+    base_dir = Path(__file__).resolve().parent
+    for directory in REPORT_CODE_DIRS:
+        for path in sorted((base_dir / directory).rglob("*")):
+            if path.is_file() and path.suffix in (".py", ".html"):
+                digest.update(str(path.relative_to(base_dir)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def get_example_section_key(name: str) -> str:
+    return EXAMPLE_SECTION_KEY.format(
+        name=name,
+        date=timezone.now().date().isoformat(),
+        version=get_report_code_version(),
+    )
+
+
+def get_example_section(name: str) -> str | None:
+    return cache.get(get_example_section_key(name))
+
+
+def set_example_section(name: str, content: str) -> None:
+    cache.set(get_example_section_key(name), content, timeout=EXAMPLE_SECTION_TIMEOUT)
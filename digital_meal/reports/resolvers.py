@@ -0,0 +1,91 @@
+"""Resolves the objects a report is rendered for.
+
+The section views of a report are requested separately (or rendered in one
+request, see ReportSectionsStreamMixin) and all need the same classroom,
+project and participant. The resolver loads them with as few queries as
+possible and memoizes them on the request, so that views rendered within the
+same request share the same instances.
+"""
+
+from dataclasses import dataclass, field
+
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, HttpRequest
+
+from digital_meal.tool.models import Classroom
+from shared.projects.registry import get_registered_project
+
+REQUEST_CACHE_ATTRIBUTE = "_report_contexts"
+
+
+@dataclass
+class ReportContext:
+    """The classroom and project of a report and the participants resolved so far.
+
+    Attributes:
+        classroom: The classroom (with its base module).
+        project: The DonationProject linked to the base module of the classroom.
+        participants: Participants of the project by external_id (None if
+            no participant exists for an external_id).
+    """
+
+    classroom: Classroom
+    project: DonationProject
+    participants: dict[str, Participant | None] = field(default_factory=dict)
+
+    def get_participant(self, external_id: str) -> Participant | None:
+        """Returns the participant of the project with the given external_id."""
+        if external_id not in self.participants:
+            self.participants[external_id] = (
+                Participant.objects.select_related("project")
+                .filter(project=self.project, external_id=external_id)
+                .first()
+            )
+        return self.participants[external_id]
+
+
+def load_report_context(class_id: str) -> ReportContext:
+    """Loads the classroom with its base module and the linked project.
+
+    Classroom and project are not related by a foreign key (the base module
+    holds the project's url_id), so the project pk is annotated on the
+    classroom query and the project itself is taken from the project registry.
+
+    Raises:
+        Http404: If no classroom with the given url_id exists.
+    """
+    project_pk = DonationProject.objects.filter(
+        url_id=OuterRef("base_module__ddm_project_id")
+    ).values("pk")[:1]
+    classroom = (
+        Classroom.objects.select_related("base_module")
+        .annotate(ddm_project_pk=Subquery(project_pk))
+        .filter(url_id=class_id)
+        .first()
+    )
+    if classroom is None:
+        msg = f"No classroom found with url_id {class_id}."
+        raise Http404(msg)
+
+    if classroom.ddm_project_pk is None:
+        msg = f"No project found for classroom {class_id}."
+        raise DonationProject.DoesNotExist(msg)
+
+    return ReportContext(
+        classroom=classroom,
+        project=get_registered_project(pk=classroom.ddm_project_pk),
+    )
+
+
+def get_report_context(request: HttpRequest, class_id: str) -> ReportContext:
+    """Returns the report context of a classroom, memoized on the request."""
+    contexts = getattr(request, REQUEST_CACHE_ATTRIBUTE, None)
+    if contexts is None:
+        contexts = {}
+        setattr(request, REQUEST_CACHE_ATTRIBUTE, contexts)
+
+    if class_id not in contexts:
+        contexts[class_id] = load_report_context(class_id)
+    return contexts[class_id]
@@ -0,0 +1,43 @@
+// Loads all report sections with a single request and swaps each section into
+// its placeholder as soon as it has been received (see
+// ReportSectionsStreamMixin in digital_meal/reports/views/base.py).
+
+// Must match REPORT_SECTION_DELIMITER in digital_meal/reports/views/base.py.
+const REPORT_SECTION_DELIMITER = '<!-- report-section-end -->';
+
+async function loadReportSections(container) {
+  const response = await fetch(container.dataset.sectionsUrl, {
+    headers: {'HX-Request': 'true'},
+    credentials: 'same-origin',
+  });
+  if (!response.ok) {
+    throw new Error('Report sections could not be loaded: ' + response.status);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  while (true) {
+    const {value, done} = await reader.read();
+    if (done) {
+      break;
+    }
+
+    buffer += value;
+    let end = buffer.indexOf(REPORT_SECTION_DELIMITER);
+    while (end !== -1) {
+      // Sections are out-of-band swaps targeting their placeholders.
+      htmx.swap(container, buffer.slice(0, end), {swapStyle: 'none'});
+      buffer = buffer.slice(end + REPORT_SECTION_DELIMITER.length);
+      end = buffer.indexOf(REPORT_SECTION_DELIMITER);
+    }
+  }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  const container = document.getElementById('report-sections');
+  if (container) {
+    loadReportSections(container).catch(function(error) {
+      console.error(error);
+    });
+  }
+});
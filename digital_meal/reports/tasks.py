@@ -0,0 +1,48 @@
+import logging
+
+from celery import shared_task
+
+from digital_meal.reports.examples import get_example_section
+from digital_meal.reports.wordclouds import render_word_cloud
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def refresh_example_report_sections() -> None:
+    """Renders the example report sections that are not cached yet.
+
+    Sections are only regenerated when the date rolls over or a new version
+    of the report code is deployed (see digital_meal.reports.examples);
+    otherwise, the task does nothing.
+    """
+    # The views import this module to schedule wordcloud rendering.
+    from digital_meal.reports.views import tiktok, youtube  # noqa: PLC0415
+
+    section_views = [
+        youtube.WatchHistorySectionsExample,
+        youtube.SearchHistorySectionsExample,
+        tiktok.WatchHistorySectionsExample,
+        tiktok.SearchHistorySectionsExample,
+    ]
+    for view_class in section_views:
+        name = view_class.example_section_name
+        if get_example_section(name) is not None:
+            continue
+
+        try:
+            view_class.render_example_section()
+        except Exception:
+            logger.exception("Failed to render example report section %s.", name)
+        else:
+            logger.info("Refreshed example report section %s.", name)
+
+
+@shared_task(ignore_result=True)
+def render_word_cloud_in_background(frequencies: dict[str, int]) -> None:
+    """Renders and caches the wordcloud of the given term frequencies.
+
+    Class report views serve a placeholder until the wordcloud is cached (see
+    digital_meal.reports.views.base.WordCloudMixin).
+    """
+    render_word_cloud(frequencies)
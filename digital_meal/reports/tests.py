@@ -1,21 +1,57 @@
 import json
-from datetime import datetime
+from datetime import UTC, date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
 from ddm.datadonation.models import DataDonation, DonationBlueprint, FileUploader
+from ddm.encryption.models import Decryption, Encryption
 from ddm.participation.models import Participant
 from ddm.projects.models import DonationProject, ResearchProfile
 from django.contrib.auth import get_user_model
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
 import digital_meal.reports.utils.tiktok.example_data as tiktok_data
 import digital_meal.reports.utils.youtube.example_data as youtube_data
+from digital_meal.reports.examples import EXAMPLE_SECTIONS, get_example_section
+from digital_meal.reports.resolvers import get_report_context
+from digital_meal.reports.tasks import refresh_example_report_sections
+from digital_meal.reports.utils.shared.data import DateRangeIndex
+from digital_meal.reports.views.base import (
+    MAX_EMPTY_PAYLOAD_LENGTH,
+    REPORT_SECTION_DELIMITER,
+    REPORT_TYPES,
+    ReportSectionsStreamMixin,
+    WordCloudMixin,
+    get_encrypted_payload_length,
+)
+from digital_meal.reports.wordclouds import (
+    get_word_cloud,
+    get_word_cloud_digest,
+    mark_word_cloud_pending,
+)
 from digital_meal.tool.models import BaseModule, Classroom
+from shared.projects.registry import project_registry
 
 User = get_user_model()
 
 
+def read_streamed_sections(response) -> dict[str, str]:
+    """Returns the content of the sections streamed by a
+    ReportSectionsStreamMixin view by placeholder id.
+    """
+    content = b"".join(response.streaming_content).decode()
+    sections = {}
+    for chunk in content.split(REPORT_SECTION_DELIMITER)[:-1]:
+        element_id = chunk.split('id="', 1)[1].split('"', 1)[0]
+        sections[element_id] = chunk
+    return sections
+
+
 class TestReportsGeneralFunctionality(TestCase):
     """Tests for general report functionality.
 
@@ -160,6 +196,51 @@ class TestReportsGeneralFunctionality(TestCase):
             response, "reports/components/report_section_unavailable_class.html"
         )
 
+    def test_report_context_is_memoized_on_request(self):
+        request = RequestFactory().get("/")
+        project_registry.get(pk=self.project.pk)
+        with self.assertNumQueries(1):
+            context = get_report_context(request, self.classroom_regular.url_id)
+            self.assertEqual(context.classroom.base_module, self.module)
+        self.assertEqual(context.project, self.project)
+
+        with self.assertNumQueries(0):
+            self.assertIs(
+                get_report_context(request, self.classroom_regular.url_id), context
+            )
+
+        with self.assertRaises(Http404):
+            get_report_context(request, "unknown")
+
+    def test_reference_interval_is_only_set_once(self):
+        participant = Participant.objects.create(
+            project=self.project,
+            extra_data={"url_param": {"class": self.classroom_regular.url_id}},
+            start_time=timezone.now(),
+        )
+        DataDonation.objects.create(
+            project=self.project,
+            participant=participant,
+            blueprint=self.blueprint,
+            consent=True,
+            data=[],
+            status="success",
+            time_submitted=datetime(2025, 4, 4, tzinfo=UTC),
+        )
+        stale_classroom = Classroom.objects.get(pk=self.classroom_regular.pk)
+
+        start_date, end_date = self.classroom_regular.get_reference_interval()
+        self.assertEqual(start_date.date(), date(2025, 3, 1))
+        self.assertEqual(end_date.date(), date(2025, 3, 31))
+
+        # A concurrent request must not overwrite the stored end date.
+        Classroom.objects.filter(pk=self.classroom_regular.pk).update(
+            report_ref_end_date=datetime(2025, 1, 31, tzinfo=UTC)
+        )
+        start_date, end_date = stale_classroom.get_reference_interval()
+        self.assertEqual(start_date.date(), date(2025, 1, 1))
+        self.assertEqual(end_date.date(), date(2025, 1, 31))
+
 
 class TestYouTubeReports(TestCase):
     """Tests YouTube reports.
@@ -251,6 +332,10 @@ class TestYouTubeReports(TestCase):
 
         cls.htmx_headers = {"HTTP_HX-Request": "true"}
 
+    def setUp(self):
+        # Example report sections are served from the cache once rendered.
+        cache.clear()
+
     def test_individual_report(self):
         # Create donation
         participant = Participant.objects.create(
@@ -411,6 +496,157 @@ class TestYouTubeReports(TestCase):
         for template in required_templates:
             self.assertTemplateUsed(response, template)
 
+    def test_classroom_report_skips_decryption_without_enough_data(self):
+        for i in range(5):
+            participant = Participant.objects.create(
+                project=self.project,
+                extra_data={"url_param": {"class": self.classroom.url_id}},
+                start_time=timezone.now(),
+            )
+            DataDonation.objects.create(
+                project=self.project,
+                participant=participant,
+                blueprint=self.watched_videos_bp,
+                consent=True,
+                data=[] if i == 0 else self.watch_history_data["data"],
+                status="success",
+            )
+
+        self.client.login(**self.base_creds)
+        report_url_wh = reverse(
+            "youtube_class_report_wh_sections", kwargs={"url_id": self.classroom.url_id}
+        )
+        with patch.object(
+            Decryption, "decrypt", autospec=True, side_effect=Decryption.decrypt
+        ) as decrypt:
+            response = self.client.get(report_url_wh, **self.htmx_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(decrypt.call_count, 0)
+
+    def test_classroom_report_sections_are_streamed(self):
+        for _ in range(5):
+            participant = Participant.objects.create(
+                project=self.project,
+                extra_data={"url_param": {"class": self.classroom.url_id}},
+                start_time=timezone.now(),
+            )
+            for blueprint, data in [
+                (self.watched_videos_bp, self.watch_history_data["data"]),
+                (self.searches_bp, self.search_data["data"]),
+                (self.subscriptions_bp, self.subscription_data),
+            ]:
+                DataDonation.objects.create(
+                    project=self.project,
+                    participant=participant,
+                    blueprint=blueprint,
+                    consent=True,
+                    data=data,
+                    status="success",
+                )
+
+        self.client.login(**self.base_creds)
+        url = reverse(
+            "youtube_class_report_sections", kwargs={"url_id": self.classroom.url_id}
+        )
+        project_registry.clear()
+
+        with patch(
+            "shared.projects.registry.Decryption", wraps=Decryption
+        ) as decryption:
+            response = self.client.get(url, **self.htmx_headers)
+            sections = read_streamed_sections(response)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(decryption.call_count, 1)
+        self.assertEqual(
+            list(sections),
+            [
+                "watch-history-partials",
+                "search-history-partials",
+                "subscriptions-partials",
+            ],
+        )
+        for content in sections.values():
+            self.assertIn("loaded-report-part", content)
+
+    def test_individual_report_sections_are_streamed(self):
+        participant = Participant.objects.create(
+            project=self.project,
+            extra_data={"url_param": {"class": self.classroom.url_id}},
+            start_time=timezone.now(),
+            end_time=timezone.now(),
+        )
+        DataDonation.objects.create(
+            project=self.project,
+            participant=participant,
+            blueprint=self.watched_videos_bp,
+            consent=True,
+            data=self.watch_history_data["data"],
+            status="success",
+        )
+        url = reverse(
+            "youtube_individual_report_sections",
+            kwargs={
+                "url_id": self.classroom.url_id,
+                "participant_id": participant.external_id,
+            },
+        )
+
+        response = self.client.get(url, **self.htmx_headers)
+        sections = read_streamed_sections(response)
+
+        self.assertEqual(
+            list(sections), ["watch-history-partials", "search-history-partials"]
+        )
+        self.assertIn("loaded-report-part", sections["watch-history-partials"])
+
+    def get_individual_sections_url(self) -> str:
+        participant = Participant.objects.create(
+            project=self.project,
+            extra_data={"url_param": {"class": self.classroom.url_id}},
+            start_time=timezone.now(),
+            end_time=timezone.now(),
+        )
+        DataDonation.objects.create(
+            project=self.project,
+            participant=participant,
+            blueprint=self.watched_videos_bp,
+            consent=True,
+            data=self.watch_history_data["data"],
+            status="success",
+        )
+        return reverse(
+            "youtube_individual_report_sections",
+            kwargs={
+                "url_id": self.classroom.url_id,
+                "participant_id": participant.external_id,
+            },
+        )
+
+    def test_failed_report_section_shows_error(self):
+        url = self.get_individual_sections_url()
+
+        with patch.object(
+            ReportSectionsStreamMixin, "render_section", side_effect=ValueError
+        ):
+            response = self.client.get(url, **self.htmx_headers)
+            sections = read_streamed_sections(response)
+
+        self.assertEqual(response["X-Accel-Buffering"], "no")
+        for content in sections.values():
+            self.assertIn("konnte leider nicht geladen werden", content)
+
+    async def test_report_sections_are_streamed_under_asgi(self):
+        url = await sync_to_async(self.get_individual_sections_url)()
+
+        response = await self.async_client.get(url, headers={"HX-Request": "true"})
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk.decode() async for chunk in response]
+        self.assertEqual(len(chunks), 2)
+        self.assertIn("loaded-report-part", chunks[0])
+
     def test_youtube_example_report_wh_sections(self):
         url = reverse("youtube_example_report_wh_sections")
         response = self.client.get(url, **self.htmx_headers)
@@ -521,6 +757,10 @@ class TestTikTokReports(TestCase):
 
         cls.htmx_headers = {"HTTP_HX-Request": "true"}
 
+    def setUp(self):
+        # Example report sections are served from the cache once rendered.
+        cache.clear()
+
     def test_individual_report(self):
         # Create donation
         participant = Participant.objects.create(
@@ -674,6 +914,122 @@ class TestTikTokReports(TestCase):
             self.assertTemplateUsed(response, template)
 
 
+class TestSyntheticHistories(SimpleTestCase):
+    def test_same_seed_produces_same_history(self):
+        for generator in [
+            youtube_data.generate_synthetic_watch_history,
+            youtube_data.generate_synthetic_search_history,
+            tiktok_data.generate_synthetic_watch_history,
+            tiktok_data.generate_synthetic_search_history,
+        ]:
+            history = generator(datetime(2024, 1, 31).date(), days=30, seed=1)
+            other = generator(datetime(2024, 1, 31).date(), days=30, seed=1)
+            self.assertEqual(history["data"], other["data"])
+
+    def test_watch_history_dates(self):
+        history = tiktok_data.generate_synthetic_watch_history(
+            datetime(2024, 1, 31).date(), days=30, seed=1
+        )["data"]
+
+        dates = [datetime.fromisoformat(e["(D|d)ate"]) for e in history[:-5]]
+        self.assertEqual(dates[0].date(), datetime(2024, 1, 31).date())
+        self.assertEqual(dates[-1].date(), datetime(2024, 1, 2).date())
+        # Most recent day first, chronological order within each day.
+        for previous, current in zip(dates, dates[1:], strict=False):
+            if previous.date() == current.date():
+                self.assertLessEqual(previous, current)
+            else:
+                self.assertGreater(previous.date(), current.date())
+
+
+class TestEmptyPayloadLength(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.encryption = Encryption(secret="secret", salt="salt")
+
+    def get_payload_length(self, value) -> int:
+        return len(self.encryption.encrypt(value))
+
+    def test_empty_values_count_as_empty(self):
+        for value in [[], {}, None, False, ""]:
+            with self.subTest(value=value):
+                self.assertLessEqual(
+                    self.get_payload_length(value), MAX_EMPTY_PAYLOAD_LENGTH
+                )
+
+    def test_boundary(self):
+        # JSON values of up to 6 characters cannot be told apart from empty
+        # ones by the payload length.
+        self.assertEqual(get_encrypted_payload_length(6), MAX_EMPTY_PAYLOAD_LENGTH)
+        self.assertLessEqual(self.get_payload_length([1, 2]), MAX_EMPTY_PAYLOAD_LENGTH)
+        self.assertGreater(self.get_payload_length([1, 23]), MAX_EMPTY_PAYLOAD_LENGTH)
+        self.assertGreater(
+            self.get_payload_length([{"a": 1}]), MAX_EMPTY_PAYLOAD_LENGTH
+        )
+
+
+class TestExampleReportCache(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_refresh_renders_all_sections(self):
+        refresh_example_report_sections()
+
+        for name in EXAMPLE_SECTIONS:
+            self.assertIsNotNone(get_example_section(name))
+
+    def test_section_is_served_from_cache(self):
+        url = reverse("tiktok_example_report_sh_sections")
+        response = self.client.get(url)
+        self.assertTemplateUsed(
+            response, "reports/tiktok/_search_history_report_individual.html"
+        )
+
+        with self.assertTemplateNotUsed(
+            "reports/tiktok/_search_history_report_individual.html"
+        ):
+            cached_response = self.client.get(url)
+        self.assertEqual(cached_response.content, response.content)
+
+
+class TestWordCloudCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.words = ["katze", "katze", "hund"]
+        self.digest = get_word_cloud_digest({"katze": 2, "hund": 1})
+        self.url = reverse("report_wordcloud", kwargs={"digest": self.digest})
+
+    def get_word_cloud(self, report_type):
+        mixin = WordCloudMixin()
+        mixin.report_type = report_type
+        return mixin.get_word_cloud(self.words)
+
+    def test_individual_word_cloud_is_cached(self):
+        svg = self.get_word_cloud(REPORT_TYPES["INDIVIDUAL"])
+        self.assertIn("<svg", svg)
+        self.assertEqual(get_word_cloud(self.digest), svg)
+
+    def test_class_word_cloud_is_rendered_in_background(self):
+        placeholder = self.get_word_cloud(REPORT_TYPES["CLASS"])
+        self.assertIn(self.url, placeholder)
+
+        # Tasks are executed eagerly in tests.
+        response = self.client.get(self.url)
+        self.assertIn(b"<svg", response.content)
+
+    def test_pending_word_cloud_serves_placeholder(self):
+        mark_word_cloud_pending(self.digest)
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(
+            response, "reports/components/wordcloud_placeholder.html"
+        )
+
+    def test_unknown_word_cloud(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.content, b"")
+
+
 @override_settings(ALLOWED_REPORT_DOMAINS=["test.dev"])
 class TestSendReportLinkEmail(TestCase):
     @classmethod
@@ -706,3 +1062,43 @@ class TestSendReportLinkEmail(TestCase):
         )
         response = self.client.post(self.url, payload, content_type="application/json")
         self.assertEqual(response.status_code, 403)
+
+
+class TestDateRangeIndex(SimpleTestCase):
+    def setUp(self):
+        self.entries = [
+            {"time": "2024-01-03T10:00:00Z", "id": "c"},
+            {"time": "invalid", "id": "x"},
+            {"id": "y"},
+            {"time": "2024-01-01T10:00:00Z", "id": "a"},
+            {"time": "2024-01-02T00:00:00Z", "id": "b"},
+        ]
+        self.index = DateRangeIndex(self.entries)
+
+    def test_entries_without_valid_date_are_not_indexed(self):
+        self.assertEqual(len(self.index), 3)
+
+    def test_range_bounds_are_inclusive(self):
+        date_min = datetime(2024, 1, 1, 10, tzinfo=UTC)
+        date_max = datetime(2024, 1, 2, tzinfo=UTC)
+        self.assertEqual(self.index.count(date_min, date_max), 2)
+        self.assertEqual(
+            self.index.get_entries(date_min, date_max),
+            [self.entries[3], self.entries[4]],
+        )
+
+    def test_get_values(self):
+        values = self.index.get_values("id", datetime(2024, 1, 1), datetime(2024, 2, 1))
+        self.assertEqual(list(values), ["a", "b", "c"])
+
+    def test_empty_range(self):
+        date_min, date_max = datetime(2024, 2, 1), datetime(2024, 1, 1)
+        self.assertEqual(self.index.count(date_min, date_max), 0)
+        self.assertEqual(DateRangeIndex([]).count(datetime(2024, 1, 1)), 0)
+
+    def test_naive_dates_use_timezone_of_range(self):
+        index = DateRangeIndex([{"time": "2024-01-01 10:00:00"}])
+        tz = dt_timezone(timedelta(hours=2))
+        date = datetime(2024, 1, 1, 10, tzinfo=tz)
+        self.assertEqual(index.count(date, date), 1)
+        self.assertEqual(index.count(date.astimezone(UTC), date.astimezone(UTC)), 0)
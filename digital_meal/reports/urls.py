@@ -3,11 +3,12 @@ from django.urls import path
 import digital_meal.reports.views.tiktok as tiktok_views
 import digital_meal.reports.views.youtube as youtube_views
 
-from .views.base import ReportExpired, SendReportLink
+from .views.base import ReportExpired, SendReportLink, WordCloudView
 
 urlpatterns = [
     path("report-expired", ReportExpired.as_view(), name="report_expired"),
     path("send-report-link", SendReportLink.as_view(), name="send_report_link"),
+    path("wordcloud/<str:digest>", WordCloudView.as_view(), name="report_wordcloud"),
 ]
 
 youtube_report_views = [
@@ -27,6 +28,17 @@ youtube_report_views = [
         youtube_views.YouTubeExampleReport.as_view(),
         name="youtube_example_report",
     ),
+    # Full Report Section Views
+    path(
+        "youtube/class/<slug:url_id>/individual/<slug:participant_id>/sections",
+        youtube_views.ReportSectionsIndividual.as_view(),
+        name="youtube_individual_report_sections",
+    ),
+    path(
+        "youtube/class/<slug:url_id>/sections",
+        youtube_views.ReportSectionsClass.as_view(),
+        name="youtube_class_report_sections",
+    ),
     # Watch History Section Views
     path(
         "youtube/class/<slug:url_id>/individual/<slug:participant_id>/watch-history-sections",
@@ -84,6 +96,17 @@ tiktok_report_views = [
         tiktok_views.TikTokExampleReport.as_view(),
         name="tiktok_example_report",
     ),
+    # Full Report Section Views
+    path(
+        "tiktok/class/<slug:url_id>/individual/<slug:participant_id>/sections",
+        tiktok_views.ReportSectionsIndividual.as_view(),
+        name="tiktok_individual_report_sections",
+    ),
+    path(
+        "tiktok/class/<slug:url_id>/sections",
+        tiktok_views.ReportSectionsClass.as_view(),
+        name="tiktok_class_report_sections",
+    ),
     # Watch History Section Views
     path(
         "tiktok/class/<slug:url_id>/individual/<slug:participant_id>/watch-history-sections",
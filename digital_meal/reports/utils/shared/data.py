@@ -1,15 +1,122 @@
+from __future__ import annotations
+
+import functools
 from datetime import UTC, datetime, timedelta
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
-import pandas as pd
-import spacy
+import numpy as np
 from ddm.datadonation.models import DataDonation, DonationBlueprint
 from ddm.datadonation.serializers import DonationSerializer
-from ddm.encryption.models import Decryption
 from ddm.participation.models import Participant
 from ddm.projects.models import DonationProject
 from django.db.models import Prefetch
-from spacy import Language
+
+from shared.projects.registry import get_project_decryptor
+
+if TYPE_CHECKING:
+    from spacy import Language
+
+
+class DateRangeIndex:
+    """Time index over a list of entries for repeated date range queries.
+
+    The dates of the entries are parsed once and stored as a sorted array of
+    int64 timestamps (nanoseconds) together with the permutation back to the
+    entries. Range queries are then answered with a binary search instead of
+    re-parsing and filtering the whole list.
+
+    Naive dates are interpreted in the timezone of the queried date range
+    (as in make_tz_aware(), UTC if the range itself is naive). Entries without
+    a parsable date are not indexed.
+
+    Args:
+        entries: List of entries to be indexed.
+        date_key: The identifier used to look up the date field
+            in the entries.
+    """
+
+    def __init__(self, entries: list[dict], date_key: str = "time"):
+        import pandas as pd  # noqa: PLC0415
+
+        self.entries = entries
+        self.date_key = date_key
+        self._values = {}
+
+        dates = pd.to_datetime(
+            pd.Series([e.get(date_key) for e in entries], dtype=object),
+            errors="coerce",
+        )
+        self.naive = dates.dt.tz is None
+        if not self.naive:
+            dates = dates.dt.tz_convert(UTC).dt.tz_localize(None)
+
+        valid = dates.notna().to_numpy()
+        timestamps = dates[valid].dt.as_unit("ns").to_numpy().astype(np.int64)
+        order = np.argsort(timestamps, kind="stable")
+        self.timestamps = timestamps[order]
+        self.positions = np.flatnonzero(valid)[order]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _to_timestamp(self, date: datetime, tz) -> int:
+        import pandas as pd  # noqa: PLC0415
+
+        date = make_tz_aware(date).astimezone(tz if self.naive else UTC)
+        return pd.Timestamp(date.replace(tzinfo=None)).as_unit("ns").value
+
+    def get_range(self, date_min: datetime, date_max: datetime | None = None) -> slice:
+        """
+        Get the slice of the sorted index holding the entries recorded in the
+        given date range (bounds included).
+
+        Args:
+            date_min: Entries with min this date are included.
+            date_max: Entries with max this date are included. Defaults to now.
+
+        Returns:
+            slice: Slice into self.timestamps and self.positions.
+        """
+        date_min = make_tz_aware(date_min)
+        if not date_max:
+            date_max = datetime.now()
+
+        tz = date_min.tzinfo
+        start = np.searchsorted(
+            self.timestamps, self._to_timestamp(date_min, tz), side="left"
+        )
+        stop = np.searchsorted(
+            self.timestamps, self._to_timestamp(date_max, tz), side="right"
+        )
+        return slice(start, max(start, stop))
+
+    def count(self, date_min: datetime, date_max: datetime | None = None) -> int:
+        """Get the number of entries recorded in the given date range."""
+        date_range = self.get_range(date_min, date_max)
+        return date_range.stop - date_range.start
+
+    def get_entries(
+        self, date_min: datetime, date_max: datetime | None = None
+    ) -> list[dict]:
+        """Get the entries recorded in the given date range in chronological order."""
+        return [
+            self.entries[i] for i in self.positions[self.get_range(date_min, date_max)]
+        ]
+
+    def get_values(
+        self, key: str, date_min: datetime, date_max: datetime | None = None
+    ) -> np.ndarray:
+        """
+        Get the value stored under key (None if missing) of all entries recorded
+        in the given date range in chronological order.
+
+        The values are collected once per key and then only sliced.
+        """
+        if key not in self._values:
+            self._values[key] = np.array(
+                [self.entries[i].get(key) for i in self.positions], dtype=object
+            )
+        return self._values[key][self.get_range(date_min, date_max)]
 
 
 def get_entries_in_date_range(
@@ -22,6 +129,8 @@ def get_entries_in_date_range(
     Filter a series to only keep entries recorded in the given date range.
     date_key is used to look up the date field in the entries.
 
+    To query the same entries repeatedly, use a DateRangeIndex directly.
+
     Args:
         entries: List of entries to be filtered.
         date_min: Entries with min this date are kept in the list.
@@ -32,29 +141,7 @@ def get_entries_in_date_range(
     Returns:
         list[dict]: The list of entries with dates in the date range.
     """
-    date_min = make_tz_aware(date_min)
-
-    if not date_max:
-        date_max = datetime.now()
-    date_max = make_tz_aware(date_max)
-
-    # Convert to dataframe for optimized vectorized parsing and filtering
-    df = pd.DataFrame(entries)
-    if date_key not in df.columns:
-        return []
-
-    df[date_key] = pd.to_datetime(df[date_key], errors="coerce")
-    df = df.dropna(subset=[date_key])
-
-    # Ensure that dates are timezone aware.
-    tz = date_min.tzinfo
-    if df[date_key].dt.tz is None:
-        df[date_key] = df[date_key].dt.tz_localize(tz)
-    else:
-        df[date_key] = df[date_key].dt.tz_convert(tz)
-
-    mask = (df[date_key] >= date_min) & (df[date_key] <= date_max)
-    return df[mask].to_dict("records")
+    return DateRangeIndex(entries, date_key).get_entries(date_min, date_max)
 
 
 def make_tz_aware(
@@ -139,6 +226,8 @@ def get_summary_counts_per_date(
     Returns:
         dict: Dictionary containing summary counts per date ({'date': count})
     """
+    import pandas as pd  # noqa: PLC0415
+
     all_dates = []
     person_date_indices = []
 
@@ -166,7 +255,12 @@ def get_summary_counts_per_date(
     return counts
 
 
-nlp_de = spacy.load("de_core_news_sm", disable=["parser", "ner"])
+@functools.cache
+def get_nlp_de() -> Language:
+    """Returns the German spaCy model, loaded once per process on first use."""
+    import spacy  # noqa: PLC0415
+
+    return spacy.load("de_core_news_sm", disable=["parser", "ner"])
 
 
 def normalize_texts(texts: list[str]) -> list[str]:
@@ -194,7 +288,7 @@ def normalize_texts(texts: list[str]) -> list[str]:
 
     results = []
     if valid_texts:
-        results += normalize_batch(valid_texts, nlp_de)
+        results += normalize_batch(valid_texts, get_nlp_de())
     return results
 
 
@@ -254,10 +348,10 @@ def get_donations(
             "datadonation_set",
             queryset=DataDonation.objects.filter(
                 participant__in=participants, status="success"
-            ),
+            ).select_related("project", "participant"),
         )
     )
-    decryptor = Decryption(project.secret, project.get_salt())
+    decryptor = get_project_decryptor(project)
 
     donations = {}
     for blueprint in blueprints:
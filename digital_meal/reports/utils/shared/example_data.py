@@ -1,78 +1,162 @@
-import datetime
-import random
-from datetime import time
+from datetime import date
 
 import numpy as np
 
+ALPHANUMERIC = np.array(
+    list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+)
 
-def generate_hourly_shares(weekend: bool = False) -> dict:  # noqa: FBT002
+# Beta distribution parameters of the hourly activity shares for the different
+# periods of the day.
+HOURLY_SHARE_PARAMS = {
+    "weekday": {
+        "night": (2, 8),  # 00:00 - 05:59 Low viewing activity
+        "morning": (6, 4),  # 06:00 - 08:59 Morning commute
+        "afternoon": (3, 6),  # 09:00 - 16:59 Lower activity due to work/school
+        "evening_commute": (8, 3),  # 17:00 - 18:59 Evening commute
+        "evening": (10, 2),  # 19:00 - 22:59 Peak viewing hours
+        "late_night": (4, 5),  # 23:00 - 23:59
+    },
+    "weekend": {
+        "night": (6, 8),  # 00:00 - 05:59 Low viewing activity
+        "morning": (2, 4),  # 06:00 - 08:59
+        "afternoon": (7, 2),  # 09:00 - 16:59
+        "evening_commute": (7, 3),  # 17:00 - 18:59
+        "evening": (10, 2),  # 19:00 - 22:59
+        "late_night": (5, 5),  # 23:00 - 23:59
+    },
+}
+
+HOUR_PERIODS = (
+    ["night"] * 6
+    + ["morning"] * 3
+    + ["afternoon"] * 8
+    + ["evening_commute"] * 2
+    + ["evening"] * 4
+    + ["late_night"]
+)
+
+
+def get_rng(seed: int | None = None) -> np.random.Generator:
+    """Get a random generator. The same seed always produces the same data."""
+    return np.random.default_rng(seed)
+
+
+def get_hourly_share_params(weekend: bool) -> np.ndarray:  # noqa: FBT001
+    """Get the beta parameters for every hour of the day as a (24, 2) array."""
+    params = HOURLY_SHARE_PARAMS["weekend" if weekend else "weekday"]
+    return np.array([params[period] for period in HOUR_PERIODS], dtype=float)
+
+
+def generate_hourly_shares(weekend: np.ndarray, rng: np.random.Generator) -> np.ndarray:
     """Generate hourly shares.
 
-    Generates a dictionary with 24-hour time slots and their respective random
-    share values, based on different probability distributions for different
-    times of the day.
+    Draws a random share for every hour of every day, based on different
+    probability distributions for different times of the day.
 
     Args:
-        weekend: If True, generate shares that are more evenly spread over a day.
+        weekend: Boolean array holding for every day whether it is on a weekend
+            (shares are then more evenly spread over the day).
+        rng: The random generator.
 
     Returns:
-        dict: A dictionary mapping each hour (0-23) to a random share within
-            its assigned range.
+        np.ndarray: A (days, 24) array of shares normalized to sum up to 1
+            for every day.
     """
-    # Define custom share ranges for different periods of the day
-    if not weekend:
-        beta_ranges = {
-            "night": (2, 8),  # 00:00 - 05:59 Low viewing activity
-            "morning": (6, 4),  # 06:00 - 08:59 Morning commute
-            "afternoon": (3, 6),  # 09:00 - 16:59 Lower activity due to work/school
-            "evening_commute": (8, 3),  # 17:00 - 18:59 Evening commute
-            "evening": (10, 2),  # 19:00 - 22:59 Peak viewing hours
-            "late_night": (4, 5),  # 23:00 - 23:59
-        }
-    elif weekend:
-        beta_ranges = {
-            "night": (6, 8),  # 00:00 - 05:59 Low viewing activity
-            "morning": (2, 4),  # 06:00 - 08:59
-            "afternoon": (7, 2),  # 09:00 - 16:59
-            "evening_commute": (7, 3),  # 17:00 - 18:59
-            "evening": (10, 2),  # 19:00 - 22:59
-            "late_night": (5, 5),  # 23:00 - 23:59
-        }
-
-    # Assign share ranges based on the hour of the day
-    hourly_shares = {}
-    for hour in range(24):
-        if 0 <= hour < 6:
-            hourly_shares[hour] = np.random.beta(*beta_ranges["night"])
-        elif 6 <= hour < 9:
-            hourly_shares[hour] = np.random.beta(*beta_ranges["morning"])
-        elif 9 <= hour < 17:
-            hourly_shares[hour] = np.random.beta(*beta_ranges["afternoon"])
-        elif 17 <= hour < 19:
-            hourly_shares[hour] = np.random.beta(*beta_ranges["evening_commute"])
-        elif 19 <= hour < 23:
-            hourly_shares[hour] = np.random.beta(*beta_ranges["evening"])
-        else:
-            hourly_shares[hour] = np.random.beta(*beta_ranges["late_night"])
-
-    return hourly_shares
-
-
-def random_time_in_range(
-    hour_start: int, min_start: int, hour_end: int, min_end: int
-) -> datetime.time:
-    """Generate a random time object between the given range."""
-    return time(
-        hour=random.randint(hour_start, hour_end),  # noqa: S311
-        minute=random.randint(min_start, min_end),  # noqa: S311
-        second=random.randint(0, 59),  # noqa: S311
+    params = np.where(
+        weekend[:, None, None],
+        get_hourly_share_params(weekend=True),
+        get_hourly_share_params(weekend=False),
     )
+    shares = rng.beta(params[..., 0], params[..., 1])
+    return shares / shares.sum(axis=1, keepdims=True)
 
 
-def random_string(length: int) -> str:
-    """Generate a random alphanumeric string."""
-    return "".join(
-        random.choices(  # noqa: S311
-            "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789", k=length
-        )
+def get_days(latest_date: date, days: int) -> np.ndarray:
+    """Get the dates from latest_date going back the given number of days."""
+    return np.datetime64(latest_date, "D") - np.arange(days)
+
+
+def generate_activity_timestamps(
+    latest_date: date,
+    days: int,
+    lam_weekday: float,
+    lam_weekend: float,
+    rng: np.random.Generator,
+    min_per_day: int = 5,
+) -> np.ndarray:
+    """Generate the timestamps of an activity following a daily rhythm.
+
+    The number of activities per day is drawn from a poisson distribution and
+    distributed over the hours of the day according to generate_hourly_shares.
+
+    Args:
+        latest_date: The most recent day.
+        days: Number of days to go back.
+        lam_weekday: Mean number of activities on weekdays.
+        lam_weekend: Mean number of activities on weekends.
+        rng: The random generator.
+        min_per_day: Minimal number of activities per day.
+
+    Returns:
+        np.ndarray: datetime64[s] timestamps, most recent day first and in
+            chronological order within each day.
+    """
+    dates = get_days(latest_date, days)
+    weekend = ((dates.astype(np.int64) + 3) % 7) >= 5  # 1970-01-01 was a Thursday
+    per_day = np.maximum(
+        min_per_day, rng.poisson(np.where(weekend, lam_weekend, lam_weekday))
     )
+
+    # Assign activities to the hours based on the share weights.
+    shares = generate_hourly_shares(weekend, rng)
+    noise = rng.uniform(0.9, 1.1, size=shares.shape)  # Add slight randomness
+    per_hour = (per_day[:, None] * shares * noise).astype(np.int64).ravel()
+
+    hour_starts = (
+        dates[:, None].astype("datetime64[s]")
+        + np.arange(24) * np.timedelta64(3600, "s")
+    ).ravel()
+    timestamps = np.repeat(hour_starts, per_hour) + rng.integers(
+        0, 3600, size=per_hour.sum()
+    ).astype("timedelta64[s]")
+    day_index = np.repeat(np.arange(days), per_hour.reshape(days, 24).sum(axis=1))
+    return timestamps[np.lexsort((timestamps, day_index))]
+
+
+def generate_uniform_timestamps(
+    latest_date: date,
+    days: int,
+    max_per_day: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Generate 0 to max_per_day timestamps per day, uniformly spread over the day.
+
+    Returns:
+        np.ndarray: datetime64[s] timestamps, most recent day first and in
+            chronological order within each day.
+    """
+    per_day = rng.integers(0, max_per_day + 1, size=days)
+    day_index = np.repeat(np.arange(days), per_day)
+    timestamps = get_days(latest_date, days)[day_index].astype(
+        "datetime64[s]"
+    ) + rng.integers(0, 24 * 3600, size=len(day_index)).astype("timedelta64[s]")
+    return timestamps[np.lexsort((timestamps, day_index))]
+
+
+def format_timestamps(timestamps: np.ndarray) -> list[str]:
+    """Format timestamps as ISO strings (as datetime.isoformat())."""
+    return np.datetime_as_string(timestamps, unit="s").tolist()
+
+
+def random_strings(n: int, length: int, rng: np.random.Generator) -> list[str]:
+    """Generate n random alphanumeric strings."""
+    if length == 0:
+        return [""] * n
+    chars = ALPHANUMERIC[rng.integers(0, len(ALPHANUMERIC), size=(n, length))]
+    return chars.view(f"<U{length}").ravel().tolist()
+
+
+def random_choices(options: list[str], n: int, rng: np.random.Generator) -> list[str]:
+    """Draw n elements from options (with replacement)."""
+    return np.asarray(options)[rng.integers(0, len(options), size=n)].tolist()
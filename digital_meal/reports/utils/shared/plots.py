@@ -1,16 +1,14 @@
+from __future__ import annotations
+
 from collections import Counter
 from datetime import datetime, timedelta
-
-import pandas as pd
-from bokeh.embed import components
-from bokeh.layouts import column
-from bokeh.models import BasicTicker, PrintfTickFormatter, RangeTool
-from bokeh.plotting import figure
-from bokeh.transform import linear_cmap
-from wordcloud import WordCloud
+from typing import TYPE_CHECKING
 
 from digital_meal.website.constants import COLOR_PALETTES, COLORS
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 days_de = [
     "Montag",
     "Dienstag",
@@ -62,6 +60,11 @@ def get_timeseries_plot(
         dict: Dictionary containing bokeh script and bokeh plot
             ({'script': script, 'div': div}).
     """
+    from bokeh.embed import components  # noqa: PLC0415
+    from bokeh.layouts import column  # noqa: PLC0415
+    from bokeh.models import RangeTool  # noqa: PLC0415
+    from bokeh.plotting import figure  # noqa: PLC0415
+
     date_keys = date_series.keys()
     x_values = date_keys.to_list()
     y_values = date_series.values.tolist()
@@ -155,6 +158,12 @@ def get_timeseries_plot(
 
 
 def get_weekday_use_plot(data: list[datetime]) -> dict:
+    import pandas as pd  # noqa: PLC0415
+    from bokeh.embed import components  # noqa: PLC0415
+    from bokeh.models import BasicTicker, PrintfTickFormatter  # noqa: PLC0415
+    from bokeh.plotting import figure  # noqa: PLC0415
+    from bokeh.transform import linear_cmap  # noqa: PLC0415
+
     dates = pd.Series(data).dt.day_name()
 
     value_counts = dates.value_counts()
@@ -241,6 +250,12 @@ def get_weekday_use_plot(data: list[datetime]) -> dict:
 
 
 def get_day_usetime_plot(data: list[datetime]) -> dict:
+    import pandas as pd  # noqa: PLC0415
+    from bokeh.embed import components  # noqa: PLC0415
+    from bokeh.models import BasicTicker, PrintfTickFormatter  # noqa: PLC0415
+    from bokeh.plotting import figure  # noqa: PLC0415
+    from bokeh.transform import linear_cmap  # noqa: PLC0415
+
     # Prepare data.
     date_series = pd.Series(data)
     df = pd.DataFrame(
@@ -321,6 +336,10 @@ def get_day_usetime_plot(data: list[datetime]) -> dict:
 
 
 def get_searches_plot(search_term_list: list) -> dict | None:
+    import pandas as pd  # noqa: PLC0415
+    from bokeh.embed import components  # noqa: PLC0415
+    from bokeh.plotting import figure  # noqa: PLC0415
+
     search_terms = pd.Series(search_term_list)
     search_term_counts = search_terms.value_counts()
 
@@ -383,17 +402,20 @@ def get_searches_plot(search_term_list: list) -> dict | None:
     return {"script": script, "div": div}
 
 
-def create_word_cloud(words: list[str]) -> str:
+def create_word_cloud(words: list[str] | dict[str, int]) -> str:
     """
     Creates a wordcloud from a given list of words.
 
     Args:
-        words (list[str]): A list of words to be included in the wordcloud.
+        words (list[str] | dict[str, int]): A list of words to be included in
+            the wordcloud or a mapping of the words to their frequencies.
 
     Returns:
         str: The wordcloud as svg to include in html.
     """
 
+    from wordcloud import WordCloud  # noqa: PLC0415
+
     def get_word_color(
         word, font_size, position, orientation, random_state=None, **kwargs
     ):
@@ -1,9 +1,10 @@
 import datetime
 from typing import TypedDict
 
-import pandas as pd
 import requests
 
+from shared.portability.http import http_client
+
 
 class WatchHistoryData(TypedDict):
     videos: list[dict]
@@ -38,6 +39,8 @@ def extract_watch_history_data(
     Returns:
         dict: A tiktok.WatchHistoryData object
     """
+    import pandas as pd  # noqa: PLC0415
+
     videos_combined = []
     video_ids_combined = []
     video_dates_combined = []
@@ -174,20 +177,17 @@ def get_watch_date(watch_entry: dict) -> str | None:
     return date_str
 
 
-def get_video_metadata(video_id: str, session: requests.Session | None = None) -> dict:
+def get_video_metadata(video_id: str) -> dict:
     """Get TikTok video metadata from official embed API."""
-    if session is None:
-        session = requests.Session()
-
     url = (
         f"https://www.tiktok.com/oembed?url=https://www.tiktok.com/@/video/{video_id}/"
     )
 
     try:
-        response = session.get(url)
+        response = http_client.get(url, endpoint="tiktok.oembed")
         response.raise_for_status()
         data = response.json()
-    except:  # noqa: E722 TODO
+    except (requests.exceptions.RequestException, ValueError):
         data = {}
     thumbnail = data.get("thumbnail_url", None)
     channel = data.get("author_name", None)
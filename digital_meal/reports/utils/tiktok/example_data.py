@@ -1,77 +1,53 @@
-import random
 from datetime import date, timedelta
 
 import numpy as np
 from django.utils import timezone
 
 from digital_meal.reports.utils.shared.example_data import (
-    generate_hourly_shares,
-    random_string,
-    random_time_in_range,
+    format_timestamps,
+    generate_activity_timestamps,
+    generate_uniform_timestamps,
+    get_rng,
+    random_choices,
+    random_strings,
 )
 
 
-def generate_synthetic_watch_history(start_date: date, days: int = 500) -> dict:
+def generate_synthetic_watch_history(
+    start_date: date, days: int = 500, seed: int | None = None
+) -> dict:
     """Generate a synthetic TikTok watch history dataset.
 
     Args:
         start_date: The end date for the dataset (most recent day).
         days: Number of days to go back.
+        seed: Seed of the random generator. The same seed always produces
+            the same history.
 
     Returns:
         dict: A dictionary mimicking the YouTube watch history JSON format.
     """
-
-    history_data = []
-    current_date = start_date
-
-    for _ in range(days):
-        if current_date.weekday() < 5:  # Weekdays (Mon-Fri)
-            num_entries = max(5, np.random.poisson(lam=100))
-            hourly_shares = generate_hourly_shares()
-
-        else:
-            num_entries = max(5, np.random.poisson(lam=250))
-            hourly_shares = generate_hourly_shares(weekend=True)
-
-        # Normalize hourly shares so they sum up to 1 for weighted sampling
-        total_share = sum(hourly_shares.values())
-        normalized_shares = {
-            hour: share / total_share for hour, share in hourly_shares.items()
+    rng = get_rng(seed)
+    timestamps = generate_activity_timestamps(
+        start_date, days, lam_weekday=100, lam_weekend=250, rng=rng
+    )
+    n = len(timestamps)
+
+    history_data = [
+        {
+            "(D|d)ate": time,
+            "(L|l)ink": f"https://www.tiktok.com/@/video/{video_id}/",
         }
-
-        # Assign videos across the 24 hours based on share weights
-        viewing_times = []
-        for hour, share_weight in normalized_shares.items():
-            num_videos_this_hour = max(
-                0,
-                int(num_entries * share_weight * random.uniform(0.9, 1.1)),  # noqa: S311
-            )  # Add slight randomness
-            viewing_times.extend(
-                [
-                    random_time_in_range(hour, 0, hour, 59)
-                    for _ in range(num_videos_this_hour)
-                ]
-            )
-
-        # Generate entries for the day
-        for watch_time in sorted(viewing_times):
-            watch_datetime = timezone.datetime.combine(current_date, watch_time)
-
-            entry = {
-                "(D|d)ate": watch_datetime.isoformat(),
-                "(L|l)ink": f"https://www.tiktok.com/@/video/{random_string(19)}/",
-            }
-
-            history_data.append(entry)
-
-        # Move to the previous day
-        current_date -= timedelta(days=1)
+        for time, video_id in zip(
+            format_timestamps(timestamps), random_strings(n, 19, rng), strict=True
+        )
+    ]
 
     # Add favorite video
+    first_date = start_date - timedelta(days=days)
     for _ in range(5):
         entry = {
-            "(D|d)ate": current_date.isoformat(),
+            "(D|d)ate": first_date.isoformat(),
             "(L|l)ink": "https://www.tiktok.com/@/video/7486877232867101974/",
         }
         history_data.append(entry)
@@ -84,36 +60,32 @@ def generate_synthetic_watch_history(start_date: date, days: int = 500) -> dict:
     }
 
 
-def generate_synthetic_search_history(latest_date: date, days: int = 500) -> dict:
+def generate_synthetic_search_history(
+    latest_date: date, days: int = 500, seed: int | None = None
+) -> dict:
     """Generate a synthetic TikTok search history dataset.
 
     Args:
         latest_date: The end date for the dataset (most recent day).
         days: Number of days to go back.
+        seed: Seed of the random generator. The same seed always produces
+            the same history.
 
     Returns:
         A dictionary mimicking the TikTok search history JSON format. Contains
         the following fields: "SearchTerm", "Date".
     """
-    history_data = []
-    current_date = latest_date
-
-    for _ in range(days):
-        n_searches = random.randint(0, 5)  # noqa: S311
-        search_times = [random_time_in_range(0, 0, 23, 59) for _ in range(n_searches)]
-
-        # Generate entries for the day
-        for search_time in sorted(search_times):
-            search_datetime = timezone.datetime.combine(current_date, search_time)
-            entry = {
-                "SearchTerm": generate_random_search_term(),
-                "(D|d)ate": search_datetime.isoformat(),
-            }
-
-            history_data.append(entry)
-
-        # Move to the previous day
-        current_date -= timedelta(days=1)
+    rng = get_rng(seed)
+    timestamps = generate_uniform_timestamps(latest_date, days, max_per_day=5, rng=rng)
+
+    history_data = [
+        {"SearchTerm": term, "(D|d)ate": time}
+        for term, time in zip(
+            generate_random_search_terms(len(timestamps), rng),
+            format_timestamps(timestamps),
+            strict=True,
+        )
+    ]
 
     return {
         "time_submitted": timezone.now().isoformat() + "Z",
@@ -123,11 +95,11 @@ def generate_synthetic_search_history(latest_date: date, days: int = 500) -> dic
     }
 
 
-def generate_random_search_term() -> str:
-    """Generate a random search term.
+def generate_random_search_terms(n: int, rng: np.random.Generator) -> list[str]:
+    """Generate random search terms.
 
     Returns:
-        str: A random search term.
+        list[str]: n random search terms.
     """
     prefixes = [
         "Tech",
@@ -152,4 +124,11 @@ def generate_random_search_term() -> str:
         "Vision",
         "Channel",
     ]
-    return f"{random.choice(prefixes)} {random.choice(suffixes)}"  # noqa: S311
+    return [
+        f"{prefix} {suffix}"
+        for prefix, suffix in zip(
+            random_choices(prefixes, n, rng),
+            random_choices(suffixes, n, rng),
+            strict=True,
+        )
+    ]
@@ -3,8 +3,6 @@ import random
 import re
 from typing import TypedDict
 
-import pandas as pd
-
 
 def get_video_ids(watch_history: list[dict]) -> list[str]:
     """
@@ -35,6 +33,8 @@ def get_date_list(watch_history: list[dict]) -> list[datetime.datetime]:
     Returns:
         list[dict]: A list of dates as datetime objects extracted from the 'time' key.
     """
+    import pandas as pd  # noqa: PLC0415
+
     dates_str = [d["time"] for d in watch_history if "time" in d]
     if not dates_str:
         return []
@@ -118,6 +118,8 @@ def convert_date_strings_to_datetime(
     Returns:
         list[datetime.datetime]: List of datetime objects.
     """
+    import pandas as pd  # noqa: PLC0415
+
     return pd.to_datetime(date_strings, errors="coerce").dropna().tolist()
 
 
@@ -496,6 +498,8 @@ def get_most_watched_video(watch_history: list[dict]) -> dict:
         dict: A dict of form:
             {'id': <id of fav video>, 'n_watched': <times video occurred>}
     """
+    import pandas as pd  # noqa: PLC0415
+
     video_ids = pd.Series(get_video_ids(watch_history))
     # TODO: Make sure, the chosen favorite video is still available,
     #  i.e. has not been deleted.
@@ -547,6 +551,8 @@ def get_search_term_frequency(
         dict: A list of dictionaries representing a search term frequency,
             each containing the keys 'term' and 'count'.
     """
+    import pandas as pd  # noqa: PLC0415
+
     search_terms = pd.Series([t["title"] for t in search_history])
     term_counts = search_terms.value_counts()
 
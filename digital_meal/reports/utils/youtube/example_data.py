@@ -1,93 +1,75 @@
-import random
 from datetime import date, timedelta
 
 import numpy as np
 from django.utils import timezone
 
 from digital_meal.reports.utils.shared.example_data import (
-    generate_hourly_shares,
-    random_string,
-    random_time_in_range,
+    format_timestamps,
+    generate_activity_timestamps,
+    generate_uniform_timestamps,
+    get_rng,
+    random_choices,
+    random_strings,
 )
 
 
-def generate_synthetic_watch_history(latest_date: date, days: int = 500) -> dict:
+def generate_synthetic_watch_history(
+    latest_date: date, days: int = 500, seed: int | None = None
+) -> dict:
     """
     Generate a synthetic YouTube watch history dataset.
 
     Args:
         latest_date: The end date for the dataset (most recent day).
         days: Number of days to go back.
+        seed: Seed of the random generator. The same seed always produces
+            the same history.
 
     Returns:
         A dictionary mimicking the YouTube watch history JSON format. Contains
         the following fields: "time_submitted", "consent", "status", "data".
     """
-
-    history_data = []
-    current_date = latest_date
+    rng = get_rng(seed)
+    timestamps = generate_activity_timestamps(
+        latest_date, days, lam_weekday=25, lam_weekend=40, rng=rng
+    )
+    n = len(timestamps)
 
     estimated_videos = days * 20  # Assume 20 videos max per day for estimation
     title_pool = generate_repeating_titles(
-        num_titles=estimated_videos, repeat_fraction=0.01
+        num_titles=estimated_videos, repeat_fraction=0.01, rng=rng
     )
+    titles = np.asarray(title_pool)[np.arange(n) % len(title_pool)].tolist()
 
-    title_index = 0  # Track the title pool usage
-
-    for _ in range(days):
-        if current_date.weekday() < 5:  # Weekdays (Mon-Fri)
-            num_entries = max(5, np.random.poisson(lam=25))
-            hourly_shares = generate_hourly_shares()
-
-        else:
-            num_entries = max(5, np.random.poisson(lam=40))
-            hourly_shares = generate_hourly_shares(weekend=True)
-
-        # Normalize hourly shares so they sum up to 1 for weighted sampling
-        total_share = sum(hourly_shares.values())
-        normalized_shares = {
-            hour: share / total_share for hour, share in hourly_shares.items()
+    history_data = [
+        {
+            "title": title,
+            "titleUrl": f"https://www.youtube.com/watch?v={video_id}",
+            "time": time,
+            "subtitles": [
+                {
+                    "name": channel_name,
+                    "url": f"https://www.youtube.com/channel/{channel_id}",
+                }
+            ],
         }
-
-        # Assign videos across the 24 hours based on share weights
-        viewing_times = []
-        for hour, share_weight in normalized_shares.items():
-            num_videos_this_hour = max(
-                0,
-                int(num_entries * share_weight * random.uniform(0.9, 1.1)),  # noqa: S311
-            )  # Add slight randomness
-            viewing_times += [
-                random_time_in_range(hour, 0, hour, 59)
-                for _ in range(num_videos_this_hour)
-            ]
-
-        # Generate entries for the day
-        for watch_time in sorted(viewing_times):
-            watch_datetime = timezone.datetime.combine(current_date, watch_time)
-
-            entry = {
-                "title": title_pool[title_index % len(title_pool)],
-                "titleUrl": f"https://www.youtube.com/watch?v={random_string(11)}",
-                "time": watch_datetime.isoformat(),
-                "subtitles": [
-                    {
-                        "name": generate_random_channel_name(),
-                        "url": f"https://www.youtube.com/channel/{random_string(20)}",
-                    }
-                ],
-            }
-
-            history_data.append(entry)
-
-        # Move to the previous day
-        current_date -= timedelta(days=1)
+        for title, video_id, time, channel_name, channel_id in zip(
+            titles,
+            random_strings(n, 11, rng),
+            format_timestamps(timestamps),
+            generate_random_channel_names(n, rng),
+            random_strings(n, 20, rng),
+            strict=True,
+        )
+    ]
 
     # Add favorite video
+    first_date = latest_date - timedelta(days=days)
     for _ in range(5):
         entry = {
             "title": "Discover the University of Zurich in 100 seconds",
             "titleUrl": "https://www.youtube.com/watch?v=_kFexLYRGrA",
-            "time": current_date.isoformat(),
+            "time": first_date.isoformat(),
             "subtitles": [
                 {"name": "UZH", "url": "https://www.youtube.com/channel/@uzhch"}
             ],
@@ -102,38 +84,39 @@ def generate_synthetic_watch_history(latest_date: date, days: int = 500) -> dict
     }
 
 
-def generate_synthetic_search_history(latest_date: date, days: int = 500) -> dict:
+def generate_synthetic_search_history(
+    latest_date: date, days: int = 500, seed: int | None = None
+) -> dict:
     """Generate a synthetic YouTube search history dataset.
 
     Args:
         latest_date (datetime.datetime): The end date for the dataset (most recent day).
         days (int): Number of days to go back.
+        seed (int): Seed of the random generator. The same seed always produces
+            the same history.
 
     Returns:
         A dictionary mimicking the YouTube search history JSON format. Contains
         the following fields: "time_submitted", "consent", "status", "data".
     """
-    history_data = []
-    current_date = latest_date
-
-    for _ in range(days):
-        n_searches = random.randint(0, 5)  # noqa: S311
-        search_times = [random_time_in_range(0, 0, 23, 59) for _ in range(n_searches)]
-
-        # Generate entries for the day
-        for search_time in sorted(search_times):
-            search_datetime = timezone.datetime.combine(current_date, search_time)
-            entry = {
-                "title": generate_random_channel_name(),
-                "titleUrl": f"https://www.youtube.com/watch?v={random_string(11)}",
-                "time": search_datetime.isoformat(),
-                "activityControls": ["YouTube-Suchverlauf"],
-            }
-
-            history_data.append(entry)
-
-        # Move to the previous day
-        current_date -= timedelta(days=1)
+    rng = get_rng(seed)
+    timestamps = generate_uniform_timestamps(latest_date, days, max_per_day=5, rng=rng)
+    n = len(timestamps)
+
+    history_data = [
+        {
+            "title": title,
+            "titleUrl": f"https://www.youtube.com/watch?v={video_id}",
+            "time": time,
+            "activityControls": ["YouTube-Suchverlauf"],
+        }
+        for title, video_id, time in zip(
+            generate_random_channel_names(n, rng),
+            random_strings(n, 11, rng),
+            format_timestamps(timestamps),
+            strict=True,
+        )
+    ]
 
     return {
         "time_submitted": timezone.now().isoformat() + "Z",
@@ -144,7 +127,9 @@ def generate_synthetic_search_history(latest_date: date, days: int = 500) -> dic
 
 
 def generate_repeating_titles(
-    num_titles: int = 10000, repeat_fraction: float = 0.01
+    num_titles: int = 10000,
+    repeat_fraction: float = 0.01,
+    rng: np.random.Generator | None = None,
 ) -> list:
     """
     Generate a mix of unique and repeating video titles.
@@ -153,27 +138,27 @@ def generate_repeating_titles(
         num_titles (int): Number of titles to generate.
         repeat_fraction (float): Fraction of titles that should be reused
             (e.g., 0.01 = 1% repeating).
+        rng (np.random.Generator): The random generator.
 
     Returns:
         list: A list of generated titles with some repetition.
     """
-    unique_titles = [
-        generate_random_title() for _ in range(int(num_titles * (1 - repeat_fraction)))
-    ]
-    repeated_titles = random.choices(  # noqa: S311
-        unique_titles, k=int(num_titles * repeat_fraction)
+    rng = rng or get_rng()
+    unique_titles = generate_random_titles(int(num_titles * (1 - repeat_fraction)), rng)
+    repeated_titles = random_choices(
+        unique_titles, int(num_titles * repeat_fraction), rng
     )  # Choose some titles to repeat
-    all_titles = unique_titles + repeated_titles
-    random.shuffle(all_titles)  # Mix them randomly
-    return all_titles
+    all_titles = np.array(unique_titles + repeated_titles)
+    rng.shuffle(all_titles)  # Mix them randomly
+    return all_titles.tolist()
 
 
-def generate_random_title() -> str:
+def generate_random_titles(n: int, rng: np.random.Generator) -> list[str]:
     """
-    Generate a random video title using a mix of words and numbers.
+    Generate random video titles using a mix of words and numbers.
 
     Returns:
-        str: A random video title.
+        list[str]: n random video titles.
     """
     words = [
         "Epic",
@@ -189,15 +174,23 @@ def generate_random_title() -> str:
         "Worst",
         "Insane",
     ]
-    return f"{random.choice(words)} {random_string(5)} {random.randint(1, 1000)}"  # noqa: S311
+    return [
+        f"{word} {string} {number}"
+        for word, string, number in zip(
+            random_choices(words, n, rng),
+            random_strings(n, 5, rng),
+            rng.integers(1, 1001, size=n).tolist(),
+            strict=True,
+        )
+    ]
 
 
-def generate_random_channel_name() -> str:
+def generate_random_channel_names(n: int, rng: np.random.Generator) -> list[str]:
     """
-    Generate a random YouTube channel name.
+    Generate random YouTube channel names.
 
     Returns:
-        str: A random YouTube channel name.
+        list[str]: n random YouTube channel names.
     """
     prefixes = [
         "Tech",
@@ -222,4 +215,11 @@ def generate_random_channel_name() -> str:
         "Vision",
         "Channel",
     ]
-    return f"{random.choice(prefixes)} {random.choice(suffixes)}"  # noqa: S311
+    return [
+        f"{prefix} {suffix}"
+        for prefix, suffix in zip(
+            random_choices(prefixes, n, rng),
+            random_choices(suffixes, n, rng),
+            strict=True,
+        )
+    ]
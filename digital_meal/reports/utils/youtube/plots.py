@@ -1,9 +1,5 @@
 import math
 
-import pandas as pd
-from bokeh.embed import components
-from bokeh.plotting import figure
-
 from digital_meal.website.constants import COLORS
 
 
@@ -11,6 +7,10 @@ def _create_channel_plot(
     channel_list: list[str], n_channels: int, y_label: str
 ) -> dict:
     """Helper function to create channel plots with consistent styling."""
+    import pandas as pd  # noqa: PLC0415
+    from bokeh.embed import components  # noqa: PLC0415
+    from bokeh.plotting import figure  # noqa: PLC0415
+
     channels = pd.Series(channel_list)
     value_counts = channels.value_counts()
 
@@ -1,28 +1,50 @@
+import base64
 import json
 import logging
+from collections.abc import Iterator
 from datetime import timedelta
 from smtplib import SMTPException
 from urllib.parse import urlparse
 
 from ddm.datadonation.models import DataDonation, DonationBlueprint
 from ddm.datadonation.serializers import DonationSerializer
-from ddm.encryption.models import Decryption
 from ddm.participation.models import Participant
 from ddm.projects.models import DonationProject
 from django.conf import settings
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.mail import EmailMultiAlternatives
 from django.core.validators import validate_email
-from django.db.models import Prefetch, QuerySet
-from django.http import Http404, HttpResponseNotAllowed, JsonResponse
-from django.shortcuts import get_object_or_404, redirect
+from django.db.models import Count, Prefetch, QuerySet
+from django.db.models.functions import Length
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import redirect
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views import View
 from django.views.generic import DetailView, ListView, TemplateView
 
+from digital_meal.core.streaming import get_streaming_content
+from digital_meal.core.timing import timed_stage
+from digital_meal.reports.examples import get_example_section, set_example_section
+from digital_meal.reports.resolvers import ReportContext, get_report_context
+from digital_meal.reports.tasks import render_word_cloud_in_background
+from digital_meal.reports.wordclouds import (
+    get_word_cloud,
+    get_word_cloud_digest,
+    get_word_frequencies,
+    is_word_cloud_pending,
+    mark_word_cloud_pending,
+    render_word_cloud,
+)
 from digital_meal.tool.models import Classroom
+from shared.projects.registry import get_project_decryptor
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +54,28 @@ REPORT_TYPES = {
     "EXAMPLE": "example",
 }
 
+# Separates the sections streamed by ReportSectionsStreamMixin.
+REPORT_SECTION_DELIMITER = "<!-- report-section-end -->"
+
+# Minimal number of non-empty donations per blueprint to show a class report.
+MIN_N_CLASS_DONATIONS = 5
+
+# Encrypted donations are stored as base64 encoded encrypted session key
+# (RSA 2048), nonce, tag and encrypted JSON (see ddm.encryption.models).
+ENCRYPTED_PAYLOAD_OVERHEAD = 256 + 16 + 16
+
+
+def get_encrypted_payload_length(json_length: int) -> int:
+    """Returns the length of the stored payload of a JSON value."""
+    return len(base64.encodebytes(bytes(ENCRYPTED_PAYLOAD_OVERHEAD + json_length)))
+
+
+# Empty JSON values ("[]", "{}", "null", "false", ...) have at most 5
+# characters. Base64 encodes groups of 3 bytes, so the payloads of values with
+# up to 6 characters are equally long and count as empty. Donations are lists
+# of records; the shortest non-empty one ('[{"a": 1}]') has 10 characters.
+MAX_EMPTY_PAYLOAD_LENGTH = get_encrypted_payload_length(len("false"))
+
 
 class Report:
     """Base class for all reports.
@@ -70,14 +114,17 @@ class Report:
         """Get the class ID from the URL."""
         return self.kwargs.get("url_id")
 
+    def get_report_context(self) -> ReportContext:
+        """Get the classroom and project (memoized on the request)."""
+        return get_report_context(self.request, self.get_class_id())
+
     def register_classroom(self):
         """Register classroom object."""
-        self.classroom = get_object_or_404(Classroom, url_id=self.get_class_id())
+        self.classroom = self.get_report_context().classroom
 
     def register_project(self):
         """Register project object."""
-        project_id = self.classroom.base_module.ddm_project_id
-        self.project = DonationProject.objects.get(url_id=project_id)
+        self.project = self.get_report_context().project
 
 
 class IndividualReport(Report, DetailView):
@@ -144,7 +191,7 @@ class IndividualReport(Report, DetailView):
 
     def get_object(self, queryset=None) -> Participant:
         participant_id = self.kwargs.get("participant_id")
-        participant = Participant.objects.filter(external_id=participant_id).first()
+        participant = self.get_report_context().get_participant(participant_id)
         if not participant:
             logger.info(
                 "Individual report not rendered: requested for "
@@ -235,6 +282,35 @@ class ExampleReport(TemplateView):
         return context
 
 
+class CachedExampleSectionMixin:
+    """Serves a rendered example report section from the cache.
+
+    - Inheriting views must declare an 'example_section_name' variable
+        (the URL name of the section, see digital_meal.reports.examples).
+    - Sections that are not yet cached for the current day are rendered
+        and stored. The section does not depend on the request, so it can
+        also be rendered outside of one (see render_example_section()).
+    """
+
+    example_section_name: str = None
+
+    def get(self, request, *args, **kwargs):
+        content = get_example_section(self.example_section_name)
+        if content is None:
+            content = self.render_example_section()
+        return HttpResponse(content)
+
+    @classmethod
+    def render_example_section(cls) -> str:
+        """Renders the section from the synthetic example data and stores it."""
+        view = cls()
+        view.args = ()
+        view.kwargs = {}
+        content = render_to_string(view.template_name, view.get_context_data())
+        set_example_section(cls.example_section_name, content)
+        return content
+
+
 class ClassReport(Report, ListView):
     """Base class for Class reports.
 
@@ -258,7 +334,7 @@ class ClassReport(Report, ListView):
             redirect_url = reverse_lazy("account_login")
             return redirect(redirect_url + f"?next={request.path}")
 
-        if request.user != self.classroom.owner and not request.user.is_superuser:
+        if request.user.pk != self.classroom.owner_id and not request.user.is_superuser:
             logger.warning(
                 "Unauthorized request: Class report requested by authenticated "
                 "user that is not classroom owner."
@@ -294,7 +370,7 @@ class ClassReport(Report, ListView):
 
     def get_queryset(self):
         return Participant.objects.filter(
-            project__url_id=self.project.url_id,
+            project=self.project,
             extra_data__url_param__class=self.classroom.url_id,
         )
 
@@ -329,13 +405,15 @@ class GetDonationsMixin:
     donations: dict = None
 
     def get_context_data(self, **kwargs):
-        self.donations = self.add_donations()
+        if self.donations is None:
+            self.donations = self.add_donations()
         return super().get_context_data(**kwargs)
 
     def add_donations(self) -> dict:
         participants = self.get_participants_for_donation_query()
-        donations = self.get_donations_from_db(participants)
-        clean_donations = self.clean_donations_from_db(donations)
+        with timed_stage("decrypt"):
+            donations = self.get_donations_from_db(participants)
+            clean_donations = self.clean_donations_from_db(donations)
         return clean_donations
 
     def get_participants_for_donation_query(self) -> list[Participant]:
@@ -367,13 +445,23 @@ class GetDonationsMixin:
         ).prefetch_related(
             Prefetch(
                 "datadonation_set",
-                queryset=DataDonation.objects.filter(
-                    participant__in=participants, status="success"
-                ),
+                queryset=self.get_donation_queryset(participants),
             )
         )
         return blueprints
 
+    def get_donation_queryset(
+        self, participants: list[Participant]
+    ) -> QuerySet[DataDonation]:
+        """Returns the successful donations of the provided participants.
+
+        DonationSerializer reads the project and participant of every
+        donation, so they are loaded with the donations.
+        """
+        return DataDonation.objects.filter(
+            participant__in=participants, status="success"
+        ).select_related("project", "participant")
+
 
 class GetDonationsIndividualMixin(GetDonationsMixin):
     """Extends the GetDonationsMixin for the use with individual data."""
@@ -398,7 +486,7 @@ class GetDonationsIndividualMixin(GetDonationsMixin):
             dict: With the blueprint names as keys, holding the respective
                 decrypted donation information.
         """
-        decryptor = Decryption(self.project.secret, self.project.get_salt())
+        decryptor = get_project_decryptor(self.project)
 
         donations = {}
         for blueprint in blueprints:
@@ -428,10 +516,34 @@ class GetDonationsClassMixin(GetDonationsMixin):
 
         return list(participants)
 
+    def get_donation_queryset(
+        self, participants: list[Participant]
+    ) -> QuerySet[DataDonation]:
+        """Returns the non-empty donations of blueprints that have enough of them.
+
+        The eligibility of a blueprint is decided in the database based on the
+        payload length, so that donations of blueprints that will not be shown
+        are neither loaded nor decrypted.
+        """
+        donations = (
+            super()
+            .get_donation_queryset(participants)
+            .alias(payload_length=Length("data"))
+            .filter(payload_length__gt=MAX_EMPTY_PAYLOAD_LENGTH)
+        )
+        eligible_blueprints = (
+            donations.values("blueprint_id")
+            .annotate(n_donations=Count("pk"))
+            .filter(n_donations__gte=MIN_N_CLASS_DONATIONS)
+            .values("blueprint_id")
+        )
+        return donations.filter(blueprint_id__in=eligible_blueprints)
+
     def clean_donations_from_db(self, blueprints: QuerySet[DonationBlueprint]) -> dict:
         """Decrypts blueprint donations and stores them in a result dict.
 
-        Does not return donations if less than five participants have participated.
+        Does not return donations if less than five participants have donated
+        non-empty data.
 
         Args:
             blueprints: The donation blueprints for which to retrieve donations.
@@ -440,15 +552,13 @@ class GetDonationsClassMixin(GetDonationsMixin):
             dict: With the blueprint names as keys, holding the respective
                 decrypted donation information.
         """
-        decryptor = Decryption(self.project.secret, self.project.get_salt())
+        decryptor = get_project_decryptor(self.project)
 
         clean_donations = {}
         for blueprint in blueprints:
             blueprint_donations = blueprint.datadonation_set.all()
 
-            min_n_donations = 5
-
-            if len(blueprint_donations) >= min_n_donations:
+            if len(blueprint_donations) >= MIN_N_CLASS_DONATIONS:
                 clean_donations[blueprint.name] = DonationSerializer(
                     blueprint_donations, many=True, decryptor=decryptor
                 ).data
@@ -458,7 +568,7 @@ class GetDonationsClassMixin(GetDonationsMixin):
                     if donation.get("data"):
                         n_available += 1
 
-                if n_available < min_n_donations:
+                if n_available < MIN_N_CLASS_DONATIONS:
                     clean_donations[blueprint.name] = None
 
             else:
@@ -467,6 +577,92 @@ class GetDonationsClassMixin(GetDonationsMixin):
         return clean_donations
 
 
+class ReportSectionsStreamMixin:
+    """Renders all sections of a report in one request and streams them.
+
+    - Inheriting views must declare a 'section_views' variable (a list of
+        (placeholder element id, section view class) tuples).
+    - Inheriting views must also inherit from GetDonationsClassMixin and
+        ClassReport or from GetDonationsIndividualMixin and IndividualReport.
+    - The donations needed by all sections are retrieved and decrypted once;
+        the section views then render their templates from the shared
+        classroom, project, participant(s) and donations.
+    - Each section is sent as soon as it has been rendered, as an htmx
+        out-of-band swap into its placeholder followed by
+        REPORT_SECTION_DELIMITER (see reports/js/report-stream.js). Sections
+        that fail to render are replaced by section_error_template.
+    - The sections are streamed under both WSGI and ASGI (see
+        core/streaming.py) and reverse proxies are asked not to buffer them.
+    """
+
+    section_views: list[tuple[str, type]] = []
+    shared_attributes = [
+        "request",
+        "args",
+        "kwargs",
+        "classroom",
+        "project",
+        "object",
+        "object_list",
+        "expiration_date",
+        "donations",
+    ]
+    section_error_template = "reports/components/report_section_error.html"
+
+    @property
+    def blueprint_names(self) -> list[str]:
+        names = []
+        for _, view_class in self.section_views:
+            names.extend(n for n in view_class.blueprint_names if n not in names)
+        return names
+
+    def render_to_response(self, context, **response_kwargs):
+        response = StreamingHttpResponse(
+            get_streaming_content(self.request, self.stream_sections()),
+            content_type="text/html; charset=utf-8",
+        )
+        # Otherwise nginx holds the sections back until the response is complete.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def get_section_view(self, view_class: type) -> View:
+        """Initializes a section view with the state of this view."""
+        section_view = view_class()
+        for attribute in self.shared_attributes:
+            if hasattr(self, attribute):
+                setattr(section_view, attribute, getattr(self, attribute))
+        return section_view
+
+    def render_section(self, view_class: type) -> str:
+        section_view = self.get_section_view(view_class)
+        context_kwargs = {}
+        if hasattr(self, "object"):
+            context_kwargs["object"] = self.object
+        context = section_view.get_context_data(**context_kwargs)
+        return render_to_string(
+            section_view.template_name, context, request=self.request
+        )
+
+    def stream_sections(self) -> Iterator[str]:
+        for element_id, view_class in self.section_views:
+            try:
+                content = self.render_section(view_class)
+            except Exception:
+                logger.exception(
+                    "%s [%s]: could not render section %s",
+                    type(self).__name__,
+                    self.report_type,
+                    view_class.__name__,
+                )
+                content = render_to_string(
+                    self.section_error_template, request=self.request
+                )
+            yield (
+                f'<div id="{element_id}" hx-swap-oob="innerHTML">{content}</div>'
+                f"{REPORT_SECTION_DELIMITER}"
+            )
+
+
 class BlueprintReportMixin:
     """Base mixin to use blueprint donations for partial report.
 
@@ -478,7 +674,10 @@ class BlueprintReportMixin:
     def get_blueprint_donation_data(self, blueprint_name: str):
         """Load and clean blueprint donation data."""
         bp_donation_data = self.load_blueprint_donation_data(blueprint_name)
-        clean_bp_donation_data = self.clean_blueprint_donation_data(bp_donation_data)
+        with timed_stage("extract"):
+            clean_bp_donation_data = self.clean_blueprint_donation_data(
+                bp_donation_data
+            )
         return clean_bp_donation_data
 
     def load_blueprint_donation_data(self, blueprint_name: str) -> list[list]:
@@ -535,6 +734,74 @@ class BlueprintReportMixin:
         return
 
 
+class WordCloudMixin:
+    """Adds the rendering of (cached) search term wordclouds.
+
+    For class reports, wordclouds that are not yet cached are rendered by a
+    Celery task. In the meantime, a placeholder is served that polls
+    WordCloudView until the wordcloud is available.
+    """
+
+    report_type: str
+
+    @timed_stage("wordcloud")
+    def get_word_cloud(self, words: list[str]) -> str:
+        """Get the wordcloud for the given words as svg (or a placeholder).
+
+        Args:
+            words: The words to be included in the wordcloud.
+
+        Raises:
+            ValueError: If there are no words.
+
+        Returns:
+            str: Html to include in the report.
+        """
+        frequencies = get_word_frequencies(words)
+        if not frequencies:
+            msg = "Cannot create a wordcloud without words."
+            raise ValueError(msg)
+
+        if self.report_type != REPORT_TYPES["CLASS"]:
+            return render_word_cloud(frequencies)
+
+        digest = get_word_cloud_digest(frequencies)
+        svg = get_word_cloud(digest)
+        if svg is not None:
+            return svg
+
+        if mark_word_cloud_pending(digest):
+            render_word_cloud_in_background.delay(frequencies)
+        return render_to_string(
+            "reports/components/wordcloud_placeholder.html", {"digest": digest}
+        )
+
+
+class WordCloudView(View):
+    """Serves a cached wordcloud.
+
+    Returns the placeholder again while the wordcloud is still being rendered
+    and an empty response if it is neither cached nor being rendered.
+    """
+
+    def get(self, request, *args, **kwargs):
+        digest = self.kwargs.get("digest")
+        svg = get_word_cloud(digest)
+        if svg is not None:
+            return HttpResponse(svg)
+
+        if is_word_cloud_pending(digest):
+            return HttpResponse(
+                render_to_string(
+                    "reports/components/wordcloud_placeholder.html",
+                    {"digest": digest},
+                )
+            )
+
+        logger.warning("Wordcloud %s is neither cached nor being rendered.", digest)
+        return HttpResponse("")
+
+
 class SendReportLink(View):
     """Sends the link to the open report to a given e-mail address."""
 
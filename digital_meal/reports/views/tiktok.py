@@ -1,13 +1,11 @@
 import logging
-import time
 from collections import Counter
 from datetime import datetime, timedelta
 
-import pandas as pd
-import requests
 from django.utils import timezone
 
 import digital_meal.reports.views.base as base_views
+from digital_meal.core.timing import timed_stage
 from digital_meal.reports.utils.shared import (
     data as shared_data_utils,
 )
@@ -142,6 +140,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return context
 
     @staticmethod
+    @timed_stage("stats")
     def get_overall_statistics(
         video_ids: list[str],
         date_list: list[datetime],
@@ -178,6 +177,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         }
 
     @staticmethod
+    @timed_stage("stats")
     def get_interval_statistics(
         watch_history: list[dict],
         reference_interval: tuple[datetime, datetime],
@@ -197,23 +197,22 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         interval_max = reference_interval[1]
         interval_length = (interval_max - interval_min).days
 
-        wh_interval = shared_data_utils.get_entries_in_date_range(
-            watch_history, interval_min, interval_max, "(D|d)ate"
-        )
-        wh_interval_ids = [e["id"] for e in wh_interval]
+        wh_index = shared_data_utils.DateRangeIndex(watch_history, "(D|d)ate")
+        wh_interval_ids = wh_index.get_values("id", interval_min, interval_max)
 
         interval_statistics = {
             "date_min": interval_min,
             "date_max": interval_max,
-            "n_videos": len(wh_interval),
+            "n_videos": len(wh_interval_ids),
             "n_videos_unique": len(set(wh_interval_ids)),
-            "n_videos_mean": len(wh_interval) / n_donations,
+            "n_videos_mean": len(wh_interval_ids) / n_donations,
             "n_videos_per_interval": len(wh_interval_ids) / interval_length,
         }
 
         return interval_statistics
 
     @staticmethod
+    @timed_stage("plots")
     def get_timeseries_plots(
         date_list: list[list[datetime]], min_date: datetime, max_date: datetime
     ):
@@ -230,6 +229,8 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
             dict: With a key for each plot type 'days', 'weeks', 'months', 'years',
                 each holding a {'div': _, 'script': _} value.
         """
+        import pandas as pd  # noqa: PLC0415
+
         dates_days = shared_data_utils.get_summary_counts_per_date(
             date_list, "d", "mean"
         )
@@ -266,27 +267,29 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         }
 
     @staticmethod
+    @timed_stage("stats")
     def get_favorite_videos(video_ids: list[str], top_n: int = 10) -> list[dict]:
         """Get the top n videos that were watched most often."""
+        import pandas as pd  # noqa: PLC0415
+
         most_popular_videos = pd.Series(video_ids).value_counts()[:top_n]
 
-        with requests.Session() as session:
-            top_videos = []
-            for key, value in most_popular_videos.items():
-                metadata = get_video_metadata(key, session)
-                time.sleep(0.1)
-                top_videos.append(
-                    {
-                        "id": key,
-                        "count": value,
-                        "thumbnail": metadata["thumbnail"],
-                        "channel": metadata["channel"],
-                    }
-                )
+        top_videos = []
+        for key, value in most_popular_videos.items():
+            metadata = get_video_metadata(key)
+            top_videos.append(
+                {
+                    "id": key,
+                    "count": value,
+                    "thumbnail": metadata["thumbnail"],
+                    "channel": metadata["channel"],
+                }
+            )
 
         return top_videos
 
     @staticmethod
+    @timed_stage("plots")
     def get_heatmap_plots(date_list: list[datetime]) -> dict:
         """Add watch history heatmap plots to the context."""
         return {
@@ -321,11 +324,15 @@ class WatchHistorySectionsIndividual(
 
 
 class WatchHistorySectionsExample(
-    WatchHistorySectionsMixin, base_views.GetDonationsMixin, base_views.ExampleReport
+    base_views.CachedExampleSectionMixin,
+    WatchHistorySectionsMixin,
+    base_views.GetDonationsMixin,
+    base_views.ExampleReport,
 ):
     """Renders sections for example report."""
 
     template_name = "reports/tiktok/_watch_history_report_individual.html"
+    example_section_name = "tiktok_example_report_wh_sections"
 
     def add_donations(self) -> None:
         """Overwrites original function, bc example data is not retrieved from db."""
@@ -338,12 +345,16 @@ class WatchHistorySectionsExample(
             list: A dictionary mimicking the TikTok watch history JSON format.
         """
         start_date = timezone.now().date() - timedelta(days=5)
-        synthetic_data = generate_synthetic_watch_history(start_date)
+        synthetic_data = generate_synthetic_watch_history(
+            start_date, seed=start_date.toordinal()
+        )
         return [synthetic_data["data"]]
 
 
 # SEARCH HISTORY REPORT SECTIONS
-class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
+class SearchHistorySectionsMixin(
+    base_views.WordCloudMixin, base_views.BlueprintReportMixin
+):
     """Adds the data needed to render the search history report sections.
 
     Must be used together with either GetDonationClassMixin or
@@ -398,16 +409,15 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
 
         try:
             terms_for_plot = self.get_terms_for_wordcloud()
-            context["search_wordcloud"] = shared_plot_utils.create_word_cloud(
-                terms_for_plot
-            )
+            context["search_wordcloud"] = self.get_word_cloud(terms_for_plot)
         except (TypeError, ValueError, ZeroDivisionError) as e:
-            self.log_error("shared_plot_utils.create_word_cloud", e)
+            self.log_error("get_word_cloud", e)
             pass
 
         return context
 
     @staticmethod
+    @timed_stage("stats")
     def get_search_history_statistics(  # TODO: Check if should move to shared view
         search_history: list[dict],
         reference_interval: tuple[datetime, datetime],
@@ -427,9 +437,9 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
             dict: search history statistics.
         """
 
-        sh_interval = shared_data_utils.get_entries_in_date_range(
-            search_history, reference_interval[0], reference_interval[1], "(D|d)ate"
-        )
+        n_searches_interval = shared_data_utils.DateRangeIndex(
+            search_history, "(D|d)ate"
+        ).count(reference_interval[0], reference_interval[1])
 
         return {
             # Statistics overall.
@@ -438,10 +448,11 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
             # Statistics interval
             "date_min": reference_interval[0],
             "date_max": reference_interval[1],
-            "n_searches_interval": len(sh_interval),
-            "n_searches_mean_interval": len(sh_interval) / n_donations,
+            "n_searches_interval": n_searches_interval,
+            "n_searches_mean_interval": n_searches_interval / n_donations,
         }
 
+    @timed_stage("nlp")
     def get_terms_for_wordcloud(
         self,
     ) -> list[str]:  # TODO: Check if this can be moved to shared view
@@ -498,11 +509,15 @@ class SearchHistorySectionsIndividual(
 
 
 class SearchHistorySectionsExample(
-    SearchHistorySectionsMixin, base_views.GetDonationsMixin, base_views.ExampleReport
+    base_views.CachedExampleSectionMixin,
+    SearchHistorySectionsMixin,
+    base_views.GetDonationsMixin,
+    base_views.ExampleReport,
 ):
     """Renders sections for example report."""
 
     template_name = "reports/tiktok/_search_history_report_individual.html"
+    example_section_name = "tiktok_example_report_sh_sections"
 
     def add_donations(self) -> None:
         """Overwrites original function, bc. example data is not retrieved from db."""
@@ -515,5 +530,34 @@ class SearchHistorySectionsExample(
             list: A dictionary mimicking the TikTok watch history JSON format.
         """
         start_date = timezone.now().date() - timedelta(days=5)
-        synthetic_data = generate_synthetic_search_history(start_date)
+        synthetic_data = generate_synthetic_search_history(
+            start_date, seed=start_date.toordinal()
+        )
         return [synthetic_data["data"]]
+
+
+# FULL REPORT SECTIONS
+class ReportSectionsClass(
+    base_views.ReportSectionsStreamMixin,
+    base_views.GetDonationsClassMixin,
+    base_views.ClassReport,
+):
+    """Streams all sections of the class report."""
+
+    section_views = [
+        ("watch-history-partials", WatchHistorySectionsClass),
+        ("search-history-partials", SearchHistorySectionsClass),
+    ]
+
+
+class ReportSectionsIndividual(
+    base_views.ReportSectionsStreamMixin,
+    base_views.GetDonationsIndividualMixin,
+    base_views.IndividualReport,
+):
+    """Streams all sections of the individual report."""
+
+    section_views = [
+        ("watch-history-partials", WatchHistorySectionsIndividual),
+        ("search-history-partials", SearchHistorySectionsIndividual),
+    ]
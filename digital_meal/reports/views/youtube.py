@@ -2,10 +2,10 @@ import logging
 from collections import Counter
 from datetime import datetime, timedelta
 
-import pandas as pd
 from django.utils import timezone
 
 import digital_meal.reports.views.base as base_views
+from digital_meal.core.timing import timed_stage
 from digital_meal.reports.utils.shared import (
     data as shared_data_utils,
 )
@@ -141,9 +141,10 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
             pass
 
         try:
-            context["channel_plot"] = plot_utils.get_channel_plot(
-                self.wh_data["channels"]
-            )
+            with timed_stage("plots"):
+                context["channel_plot"] = plot_utils.get_channel_plot(
+                    self.wh_data["channels"]
+                )
         except (TypeError, ValueError, ZeroDivisionError) as e:
             self.log_error("get_channel_plot", e)
             pass
@@ -157,6 +158,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return context
 
     @staticmethod
+    @timed_stage("stats")
     def get_overall_statistics(
         watch_history: list[dict],
         video_ids: list[str],
@@ -197,6 +199,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return statistics
 
     @staticmethod
+    @timed_stage("stats")
     def get_interval_statistics(
         watch_history: list[dict],
         reference_interval: tuple[datetime, datetime],
@@ -216,9 +219,8 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         interval_max = reference_interval[1]
 
         interval_length = (interval_max - interval_min).days
-        wh_interval = shared_data_utils.get_entries_in_date_range(
-            watch_history, interval_min, interval_max
-        )
+        wh_index = shared_data_utils.DateRangeIndex(watch_history)
+        wh_interval = wh_index.get_entries(interval_min, interval_max)
         wh_interval_ids = data_utils.get_video_ids(wh_interval)
 
         interval_statistics = {
@@ -233,6 +235,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return interval_statistics
 
     @staticmethod
+    @timed_stage("stats")
     def get_favorite_videos(
         watch_history: list[dict],
         video_ids: list[str],
@@ -248,6 +251,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         Returns:
             list: Containing information on the n top videos.
         """
+        import pandas as pd  # noqa: PLC0415
 
         video_titles = data_utils.get_video_title_dict(watch_history)
         most_popular_videos = pd.Series(video_ids).value_counts()[:top_n]
@@ -264,6 +268,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return top_videos
 
     @staticmethod
+    @timed_stage("plots")
     def get_timeseries_plots(
         date_list: list[list[datetime]], min_date: datetime, max_date: datetime
     ) -> dict:
@@ -281,6 +286,8 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
                 each holding a {'div': _, 'script': _} value.
         """
 
+        import pandas as pd  # noqa: PLC0415
+
         # Plot with daily bins.
         dates_days = shared_data_utils.get_summary_counts_per_date(
             date_list, "d", "mean"
@@ -323,6 +330,7 @@ class WatchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return dates_plots
 
     @staticmethod
+    @timed_stage("plots")
     def get_heatmap_plots(date_list: list[datetime]) -> dict:
         """Generate watch history heatmap plots for mean hours and per weekday.
 
@@ -360,6 +368,7 @@ class WatchHistorySectionsClassMixin(WatchHistorySectionsMixin):
         return context
 
     @staticmethod
+    @timed_stage("stats")
     def get_most_watched_channels(channel_lists: list[list[str]]) -> dict:
         """Get information on the most watched channels.
 
@@ -374,6 +383,8 @@ class WatchHistorySectionsClassMixin(WatchHistorySectionsMixin):
             dict: Most watched channels information, including 'n_unique',
                 'n_multiple', 'share_multiple', and 'channel_list_top_10'.
         """
+        import pandas as pd  # noqa: PLC0415
+
         # Prepare data.
         combined_channel_history = []
         channel_sets = []
@@ -436,11 +447,15 @@ class WatchHistorySectionsIndividual(
 
 
 class WatchHistorySectionsExample(
-    WatchHistorySectionsMixin, base_views.GetDonationsMixin, base_views.ExampleReport
+    base_views.CachedExampleSectionMixin,
+    WatchHistorySectionsMixin,
+    base_views.GetDonationsMixin,
+    base_views.ExampleReport,
 ):
     """Renders sections for example report."""
 
     template_name = "reports/youtube/_watch_history_report_individual.html"
+    example_section_name = "youtube_example_report_wh_sections"
 
     def add_donations(self) -> None:
         """Overwrites original function, bc. example data is not retrieved from db."""
@@ -453,12 +468,16 @@ class WatchHistorySectionsExample(
             list: A dictionary mimicking the YouTube watch history JSON format.
         """
         start_date = timezone.now().date() - timedelta(days=5)
-        synthetic_data = generate_synthetic_watch_history(start_date)
+        synthetic_data = generate_synthetic_watch_history(
+            start_date, seed=start_date.toordinal()
+        )
         return [synthetic_data["data"]]
 
 
 # SEARCH HISTORY REPORT SECTIONS
-class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
+class SearchHistorySectionsMixin(
+    base_views.WordCloudMixin, base_views.BlueprintReportMixin
+):
     """Adds the data needed to render the search history report sections.
 
     Must be used together with either GetDonationClassMixin or
@@ -513,15 +532,14 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
 
         try:
             terms_for_plot = self.get_terms_for_wordcloud()
-            context["search_wordcloud"] = shared_plot_utils.create_word_cloud(
-                terms_for_plot
-            )
+            context["search_wordcloud"] = self.get_word_cloud(terms_for_plot)
         except (TypeError, ValueError, ZeroDivisionError) as e:
-            self.log_error("shared_plot_utils.create_word_cloud", e)
+            self.log_error("get_word_cloud", e)
             pass
 
         return context
 
+    @timed_stage("nlp")
     def get_terms_for_wordcloud(self) -> list[str]:
         """Get normalized search terms.
 
@@ -555,6 +573,7 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
         return terms_for_plot
 
     @staticmethod
+    @timed_stage("stats")
     def get_search_history_statistics(
         search_history: list[dict],
         reference_interval: tuple[datetime, datetime],
@@ -574,8 +593,8 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
             dict: search history statistics.
         """
 
-        sh_interval = shared_data_utils.get_entries_in_date_range(
-            search_history, reference_interval[0], reference_interval[1]
+        n_searches_interval = shared_data_utils.DateRangeIndex(search_history).count(
+            reference_interval[0], reference_interval[1]
         )
 
         return {
@@ -585,8 +604,8 @@ class SearchHistorySectionsMixin(base_views.BlueprintReportMixin):
             # Statistics interval
             "date_min": reference_interval[0],
             "date_max": reference_interval[1],
-            "n_searches_interval": len(sh_interval),
-            "n_searches_mean_interval": len(sh_interval) / n_donations,
+            "n_searches_interval": n_searches_interval,
+            "n_searches_mean_interval": n_searches_interval / n_donations,
         }
 
 
@@ -611,11 +630,15 @@ class SearchHistorySectionsIndividual(
 
 
 class SearchHistorySectionsExample(
-    SearchHistorySectionsMixin, base_views.GetDonationsMixin, base_views.ExampleReport
+    base_views.CachedExampleSectionMixin,
+    SearchHistorySectionsMixin,
+    base_views.GetDonationsMixin,
+    base_views.ExampleReport,
 ):
     """Renders sections for example report."""
 
     template_name = "reports/youtube/_search_history_report_individual.html"
+    example_section_name = "youtube_example_report_sh_sections"
 
     def add_donations(self) -> None:
         """Overwrites original function, bc. example data is not retrieved from db."""
@@ -628,7 +651,9 @@ class SearchHistorySectionsExample(
             list: A dictionary mimicking the YouTube watch history JSON format.
         """
         start_date = timezone.now().date() - timedelta(days=5)
-        synthetic_data = generate_synthetic_search_history(start_date)
+        synthetic_data = generate_synthetic_search_history(
+            start_date, seed=start_date.toordinal()
+        )
         return [synthetic_data["data"]]
 
 
@@ -671,6 +696,7 @@ class SubscriptionSectionMixin(base_views.BlueprintReportMixin):
 
         return context
 
+    @timed_stage("stats")
     def get_sub_data(self):
         """Get subscription information.
 
@@ -715,3 +741,31 @@ class SubscriptionSectionsClass(
     """Renders sections for individual report."""
 
     template_name = "reports/youtube/_subscriptions_report_class.html"
+
+
+# FULL REPORT SECTIONS
+class ReportSectionsClass(
+    base_views.ReportSectionsStreamMixin,
+    base_views.GetDonationsClassMixin,
+    base_views.ClassReport,
+):
+    """Streams all sections of the class report."""
+
+    section_views = [
+        ("watch-history-partials", WatchHistorySectionsClass),
+        ("search-history-partials", SearchHistorySectionsClass),
+        ("subscriptions-partials", SubscriptionSectionsClass),
+    ]
+
+
+class ReportSectionsIndividual(
+    base_views.ReportSectionsStreamMixin,
+    base_views.GetDonationsIndividualMixin,
+    base_views.IndividualReport,
+):
+    """Streams all sections of the individual report."""
+
+    section_views = [
+        ("watch-history-partials", WatchHistorySectionsIndividual),
+        ("search-history-partials", SearchHistorySectionsIndividual),
+    ]
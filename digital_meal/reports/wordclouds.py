@@ -0,0 +1,65 @@
+"""Cache for rendered search term wordclouds.
+
+Laying out a wordcloud is among the slowest parts of rendering a report. The
+rendered SVGs are therefore stored in the shared cache under a digest of the
+term frequencies they show, so that a wordcloud is only laid out again when
+the underlying search terms change.
+"""
+
+import hashlib
+import json
+from collections import Counter
+
+from django.core.cache import cache
+
+from digital_meal.reports.utils.shared.plots import create_word_cloud
+
+WORD_CLOUD_KEY = "reports:wordcloud:{digest}"
+WORD_CLOUD_TIMEOUT = 60 * 60 * 24 * 7
+
+WORD_CLOUD_PENDING_KEY = "reports:wordcloud-pending:{digest}"
+WORD_CLOUD_PENDING_TIMEOUT = 5 * 60
+
+
+def get_word_frequencies(words: list[str]) -> dict[str, int]:
+    return dict(Counter(words))
+
+
+def get_word_cloud_digest(frequencies: dict[str, int]) -> str:
+    """Returns a digest identifying the wordcloud of the given term frequencies."""
+    serialized = json.dumps(frequencies, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def get_word_cloud(digest: str) -> str | None:
+    return cache.get(WORD_CLOUD_KEY.format(digest=digest))
+
+
+def render_word_cloud(frequencies: dict[str, int]) -> str:
+    """Returns the wordcloud of the given term frequencies as svg.
+
+    The wordcloud is only rendered if it is not already cached.
+    """
+    digest = get_word_cloud_digest(frequencies)
+    svg = get_word_cloud(digest)
+    if svg is None:
+        svg = create_word_cloud(frequencies)
+        cache.set(WORD_CLOUD_KEY.format(digest=digest), svg, timeout=WORD_CLOUD_TIMEOUT)
+    return svg
+
+
+def mark_word_cloud_pending(digest: str) -> bool:
+    """Returns True if no task is rendering the wordcloud yet.
+
+    Prevents concurrent requests for the same report from each scheduling
+    their own rendering task.
+    """
+    return cache.add(
+        WORD_CLOUD_PENDING_KEY.format(digest=digest),
+        True,  # noqa: FBT003
+        timeout=WORD_CLOUD_PENDING_TIMEOUT,
+    )
+
+
+def is_word_cloud_pending(digest: str) -> bool:
+    return cache.get(WORD_CLOUD_PENDING_KEY.format(digest=digest), False)
@@ -1,4 +1,8 @@
+from ddm.participation.models import Participant
 from django.contrib import admin
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, Subquery
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
 
 from .models import BaseModule, Classroom, SubModule, Teacher, User
 
@@ -77,10 +81,60 @@ class ClassroomAdmin(admin.ModelAdmin):
     ]
     list_filter = ["base_module", "owner", "date_created"]
 
+    @staticmethod
+    def _participant_stat(aggregate, output_field=None):
+        """Subquery aggregating the participants of the outer classroom."""
+        participants = (
+            Participant.objects.alias(class_id=KT("extra_data__url_param__class"))
+            .filter(
+                project__url_id=OuterRef("base_module__ddm_project_id"),
+                class_id=OuterRef("url_id"),
+            )
+            .order_by()
+            .values("project")
+            .annotate(value=aggregate)
+            .values("value")
+        )
+        return Subquery(participants, output_field=output_field)
+
+    def get_queryset(self, request):
+        """Annotates the participation stats to avoid queries per row."""
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("owner", "base_module")
+            .annotate(
+                stat_n_started=Coalesce(
+                    self._participant_stat(Count("pk"), IntegerField()), 0
+                ),
+                stat_n_finished=Coalesce(
+                    self._participant_stat(
+                        Count("pk", filter=Q(completed=True)), IntegerField()
+                    ),
+                    0,
+                ),
+                stat_last_started=self._participant_stat(Max("start_time")),
+                stat_last_completed=self._participant_stat(Max("end_time")),
+            )
+        )
+
     def _get_cached_stats(self, obj):
         """Cache stats on the object to avoid multiple calls."""
         if not hasattr(obj, "_cached_participation_stats"):
-            obj._cached_participation_stats = obj.get_participation_stats()
+            if hasattr(obj, "stat_n_started") and obj.base_module is not None:
+                n_started = obj.stat_n_started
+                n_finished = obj.stat_n_finished
+                obj._cached_participation_stats = {
+                    "n_started": n_started,
+                    "n_finished": n_finished,
+                    "completion_rate": round(n_finished / n_started, 1)
+                    if n_started
+                    else 0,
+                    "last_started": obj.stat_last_started,
+                    "last_completed": obj.stat_last_completed,
+                }
+            else:
+                obj._cached_participation_stats = obj.get_participation_stats()
         return obj._cached_participation_stats
 
     @admin.display(description="Started Participations")
@@ -0,0 +1,86 @@
+"""Helpers to read the donation consent from questionnaire responses.
+
+The consent of a participant is asked in the questionnaire and therefore only
+available in the encrypted response data. The helpers resolve the response
+keys of the consent questions once per project instead of once per response
+(as ResponseSerializer.get_response_data() does).
+"""
+
+import json
+
+from ddm.apis.serializers import ResponseSerializer, is_flat_dict
+from ddm.encryption.models import Decryption
+from ddm.questionnaire.models import (
+    QuestionBase,
+    QuestionItem,
+    QuestionnaireResponse,
+)
+
+USAGE_CONSENT_VARIABLE = "usage_dd_consent"
+QUEST_CONSENT_VARIABLE = "quest_dd_consent"
+CONSENT_VARIABLES = [USAGE_CONSENT_VARIABLE, QUEST_CONSENT_VARIABLE]
+CONSENT_VALUES = [1, "1"]
+
+
+def get_consent_keys(project_ids: set[int]) -> dict[int, dict[str, str]]:
+    """
+    Collects the keys under which the consent variables are stored in the
+    questionnaire responses of the given projects.
+
+    As in ResponseSerializer.get_response_data(), both question keys
+    ("question-<pk>") and item keys ("item-<pk>", with the variable name
+    "<question variable name>-<item value>") are resolved.
+
+    Returns:
+        A dictionary as {<project.pk>: {<response key>: <variable name>}}.
+    """
+    consent_keys = {project_id: {} for project_id in project_ids}
+    questions = QuestionBase.objects.non_polymorphic().filter(
+        project_id__in=project_ids, variable_name__in=CONSENT_VARIABLES
+    )
+    for pk, project_id, variable_name in questions.values_list(
+        "pk", "project_id", "variable_name"
+    ):
+        consent_keys[project_id][f"question-{pk}"] = variable_name
+
+    items = QuestionItem.objects.filter(question__project_id__in=project_ids)
+    for pk, project_id, question_variable_name, value in items.values_list(
+        "pk", "question__project_id", "question__variable_name", "value"
+    ):
+        variable_name = f"{question_variable_name}-{value}"
+        if variable_name in CONSENT_VARIABLES:
+            consent_keys[project_id][f"item-{pk}"] = variable_name
+    return consent_keys
+
+
+def get_consent_responses(data: dict, consent_keys: dict[str, str]) -> dict:
+    """
+    Extracts the responses to the consent variables from decrypted response
+    data (see ResponseSerializer.get_response_data()).
+
+    Returns:
+        A dictionary as {<variable name>: <response>}.
+    """
+    if not is_flat_dict(data):
+        # Responses saved in the old structure (DDM <= v2.0.2).
+        responses = ResponseSerializer().legacy_get_response_data(data)
+        return {v: responses[v] for v in CONSENT_VARIABLES if v in responses}
+
+    return {
+        variable_name: data[key]
+        for key, variable_name in consent_keys.items()
+        if key in data
+    }
+
+
+def decrypt_response(
+    response: QuestionnaireResponse, decryptor: Decryption
+) -> dict | None:
+    """Returns the decrypted data of a response or None if it cannot be decrypted."""
+    try:
+        data = response.get_decrypted_data(None, None, decryptor)
+    except ValueError:
+        return None
+    if isinstance(data, str):
+        data = json.loads(data)
+    return data
@@ -1,62 +1,215 @@
 import logging
-from datetime import timedelta
+from collections import defaultdict
+from datetime import datetime, timedelta
 
-from ddm.apis.serializers import ResponseSerializer
 from ddm.datadonation.models import DataDonation
+from ddm.encryption.models import Decryption
 from ddm.logging.models import ExceptionLogEntry, ExceptionRaisers
 from ddm.participation.models import Participant
 from ddm.projects.models import DonationProject
 from ddm.questionnaire.models import QuestionnaireResponse
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from digital_meal.tool.consent import (
+    CONSENT_VALUES,
+    QUEST_CONSENT_VARIABLE,
+    USAGE_CONSENT_VARIABLE,
+    decrypt_response,
+    get_consent_keys,
+    get_consent_responses,
+)
+from digital_meal.tool.models import ParticipantCleaningWatermark
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 500
+
+
+def new_project_stats() -> dict:
+    return {
+        "n_checked": 0,
+        "n_skipped": 0,
+        "n_donations_deleted": 0,
+        "n_responses_deleted": 0,
+        "n_miss_usage_consent_var": 0,
+        "n_miss_quest_consent_var": 0,
+    }
 
-def delete_donations(participant: Participant, project: DonationProject) -> None:
+
+def get_overdue_participants(
+    cutoff: datetime,
+    after: tuple[datetime, int] | None,
+    chunk_size: int,
+) -> list[tuple[int, datetime, int, str]]:
     """
-    Deletes all donations by the provided participant.
+    Returns the next chunk of participants that have started participation
+    before the cutoff.
 
     Args:
-        participant: A Participant instance for which the donation should be deleted.
-        project: A DonationProject instance to which the donation to be deleted belongs.
+        cutoff: Participants who started after this datetime are excluded.
+        after: (start_time, pk) of the last participant of the previous
+            chunk; only participants ordered after it are returned.
+        chunk_size: Maximal number of participants returned.
 
     Returns:
-        None
+        A list of (pk, start_time, project_id, external_id) tuples ordered
+        by (start_time, pk).
     """
-    donations = DataDonation.objects.filter(participant=participant, project=project)
-    donations.delete()
-    return
+    participants = Participant.objects.filter(start_time__lte=cutoff)
+    if after is not None:
+        start_time, pk = after
+        participants = participants.filter(
+            Q(start_time__gt=start_time) | Q(start_time=start_time, pk__gt=pk)
+        )
+    return list(
+        participants.order_by("start_time", "pk").values_list(
+            "pk", "start_time", "project_id", "external_id"
+        )[:chunk_size]
+    )
 
 
-def delete_response(participant: Participant, project: DonationProject) -> None:
+class ParticipantCleaner:
     """
+    Evaluates the consent of a chunk of participants at once and deletes the
+    donations and questionnaire responses of those who did not consent.
 
-    Args:
-        participant: A Participant instance for which the response should be deleted.
-        project: A DonationProject instance to which the response to be deleted belongs.
+    Decryptors and consent keys are created once per project and reused
+    across chunks (deriving a decryptor is expensive).
 
-    Returns:
-        None
+    Args:
+        dry_run: If True, the data to be deleted is only counted.
     """
-    responses = QuestionnaireResponse.objects.filter(
-        participant=participant, project=project
-    )
-    responses.delete()
-    return
+
+    def __init__(self, *, dry_run: bool = False) -> None:
+        self.dry_run = dry_run
+        self.stats = defaultdict(new_project_stats)
+        self.decryptors: dict[int, Decryption] = {}
+        self.consent_keys: dict[int, dict[str, str]] = {}
+
+    def load_projects(self, project_ids: set[int]) -> None:
+        new_ids = project_ids - self.decryptors.keys()
+        if not new_ids:
+            return
+
+        for project in DonationProject.objects.filter(pk__in=new_ids):
+            self.decryptors[project.pk] = Decryption(
+                project.secret_key, project.get_salt()
+            )
+        self.consent_keys.update(get_consent_keys(new_ids))
+
+    def get_responses(self, participant_ids: list[int]) -> dict[int, list]:
+        responses = defaultdict(list)
+        queryset = QuestionnaireResponse.objects.filter(
+            participant_id__in=participant_ids
+        ).only("pk", "participant_id", "project_id", "data")
+        for response in queryset:
+            responses[response.participant_id].append(response)
+        return responses
+
+    def decrypt(self, response: QuestionnaireResponse) -> dict | None:
+        return decrypt_response(response, self.decryptors[response.project_id])
+
+    def get_consent(
+        self, responses: list[QuestionnaireResponse], external_id: str
+    ) -> dict | None:
+        """
+        Returns the responses of a participant to the consent variables or
+        None if the participant cannot be checked.
+        """
+        if len(responses) != 1:
+            if responses:
+                logger.warning(
+                    "Clean Participant Command: "
+                    "Found more than one response for participant: %s",
+                    external_id,
+                )
+            return None
+
+        response = responses[0]
+        data = self.decrypt(response)
+        if not data:
+            logger.warning(
+                "Clean Participant Command: "
+                "Encountered response with no response_data for participant: %s",
+                external_id,
+            )
+            return None
+
+        return get_consent_responses(data, self.consent_keys[response.project_id])
+
+    def clean_chunk(self, participants: list[tuple[int, datetime, int, str]]) -> None:
+        """
+        Checks the consent of all participants in a chunk and deletes the
+        data of those who did not consent (set-based, one query per model).
+        """
+        self.load_projects({p[2] for p in participants})
+        responses = self.get_responses([p[0] for p in participants])
+
+        revoke_donations = set()
+        revoke_responses = set()
+        for participant_id, _, project_id, external_id in participants:
+            stats = self.stats[project_id]
+            consent = self.get_consent(responses.get(participant_id, []), external_id)
+            if consent is None:
+                stats["n_skipped"] += 1
+                continue
+
+            stats["n_checked"] += 1
+
+            # Check consent for usage data donation.
+            usage_dd_consent = consent.get(USAGE_CONSENT_VARIABLE)
+            if usage_dd_consent is None:
+                stats["n_miss_usage_consent_var"] += 1
+                logger.warning(
+                    "Clean Participant Command: "
+                    'Encountered response with missing "usage_dd_consent" variable '
+                    "for participant: %s",
+                    external_id,
+                )
+            elif usage_dd_consent not in CONSENT_VALUES:
+                revoke_donations.add(participant_id)
+                stats["n_donations_deleted"] += 1
+
+            # Check consent for questionnaire response donation.
+            quest_consent = consent.get(QUEST_CONSENT_VARIABLE)
+            if quest_consent is None:
+                stats["n_miss_quest_consent_var"] += 1
+                logger.warning(
+                    "Clean Participant Command: "
+                    'Encountered response with missing "quest_dd_consent" variable '
+                    "for participant: %s",
+                    external_id,
+                )
+            elif quest_consent not in CONSENT_VALUES:
+                revoke_responses.add(participant_id)
+                stats["n_responses_deleted"] += 1
+
+        if self.dry_run:
+            return
+
+        if revoke_donations:
+            DataDonation.objects.filter(participant__in=revoke_donations).delete()
+        if revoke_responses:
+            QuestionnaireResponse.objects.filter(
+                participant__in=revoke_responses
+            ).delete()
 
 
 def create_job_logs(cleaning_stats: dict) -> None:
     """
-    Tries to create a log in the DDM project
+    Tries to create a log in the DDM project.
 
     Fails silently.
 
     Args:
         cleaning_stats: A dictionary holding the cleaning statistics as:
             {'<project.pk>: {
-                'project': <project>,
+                'n_checked': 0,
+                'n_skipped': 0,
                 'n_donations_deleted': 0,
                 'n_responses_deleted': 0,
                 'n_miss_usage_consent_var': 0,
@@ -66,55 +219,38 @@ def create_job_logs(cleaning_stats: dict) -> None:
     Returns:
         None
     """
-    for _project_pk, stats in cleaning_stats.items():
-        message = (
-            f"Checked {stats['n_checked']} participants.\n"
-            f"{stats['n_donations_deleted']} donations deleted due to missing consent.\n"  # noqa: E501
-            f"{stats['n_responses_deleted']} questionnaire responses deleted due to missing consent.\n"  # noqa: E501
-            f"{stats['n_miss_usage_consent_var']} cases missing the usage data consent variable.\n"  # noqa: E501
-            f"{stats['n_miss_quest_consent_var']} cases missing the questionnaire consent variable."  # noqa: E501
-        )
-
+    for project_pk, stats in cleaning_stats.items():
         try:
             ExceptionLogEntry.objects.create(
                 date=timezone.now(),
-                project=stats.project,
+                project_id=project_pk,
                 uploader=None,
                 blueprint=None,
                 raised_by=ExceptionRaisers.SERVER,
                 exception_type="CRONJOB PARTICIPANT CLEANING",
-                message=message,
+                message=format_stats(stats),
+            )
+        except Exception:
+            logger.exception(
+                "Clean Participant Command: Could not create log for project %s",
+                project_pk,
             )
-        except:  # noqa: E722, S110  TODO
-            pass
     return
 
 
-def initialize_cleaning_stats() -> dict:
-    """
-    Initializes a dictionary to record cleaning statistics. Creates an
-    entry for every project that currently exists.
+def format_stats(stats: dict) -> str:
+    return (
+        f"Checked {stats['n_checked']} participants ({stats['n_skipped']} skipped).\n"
+        f"{stats['n_donations_deleted']} donations deleted due to missing consent.\n"
+        f"{stats['n_responses_deleted']} questionnaire responses deleted due to "
+        f"missing consent.\n"
+        f"{stats['n_miss_usage_consent_var']} cases missing the usage data "
+        f"consent variable.\n"
+        f"{stats['n_miss_quest_consent_var']} cases missing the questionnaire "
+        f"consent variable."
+    )
+
 
-    Returns:
-        A dictionary holding the cleaning statistics as.
-    """
-    cleaning_stats = {}
-    projects = DonationProject.objects.all()
-    for project in projects:
-        cleaning_stats[project.pk] = {
-            "project": project.pk,
-            "n_checked": 0,
-            "n_donations_deleted": 0,
-            "n_responses_deleted": 0,
-            "n_miss_usage_consent_var": 0,
-            "n_miss_quest_consent_var": 0,
-        }
-    return cleaning_stats
-
-
-# TODO: Test again thoroughly
-# TODO: Differentiate between donations and responses.
-# TODO: Handle test cases (delete 30 days after participation).
 class Command(BaseCommand):
     """
     Deletes donations of participants that have started participation over x days
@@ -122,7 +258,13 @@ class Command(BaseCommand):
     consent to donating their data for academic research.
 
     It is expected that explicit consent is recorded in the questionnaire in
-    a variable called "dd_consent" that equals 1 if consent is given.
+    a variable called "usage_dd_consent" (donations) and "quest_dd_consent"
+    (questionnaire responses) that equals 1 if consent is given.
+
+    All overdue participants are processed in chunks, ordered by their
+    start_time. After every chunk, the position of the last checked
+    participant is stored (see ParticipantCleaningWatermark), so that the
+    next run continues from there and missed or interrupted runs catch up.
 
     This function is intended to be called daily as a cron job.
     """
@@ -132,67 +274,52 @@ class Command(BaseCommand):
         "over x days ago and not provided explicit consent to store their data."
     )
 
-    def handle(self, *args, **options):
-        ref_datetime = timezone.now() - timedelta(
-            days=settings.DAYS_TO_DONATION_DELETION
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be deleted without deleting anything.",
         )
-        participants_to_check = Participant.objects.filter(
-            start_time__date=ref_datetime.date(),
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of participants processed per chunk.",
+        )
+        parser.add_argument(
+            "--ignore-watermark",
+            action="store_true",
+            help="Check all overdue participants, including already checked ones.",
         )
-        cleaning_stats = initialize_cleaning_stats()
-
-        for participant in participants_to_check:
-            responses = QuestionnaireResponse.objects.filter(participant=participant)
-
-            if len(responses) > 1:
-                logger.warning(
-                    "Clean Participant Command: "
-                    "Found more than one response for participant: %s",
-                    participant.external_id,
-                )
-                continue
-
-            response = responses.first()
-            serialized_response = ResponseSerializer(response).data
-
-            response_data = serialized_response.get("response_data")
-            if not response_data:
-                logger.warning(
-                    "Clean Participant Command: "
-                    "Encountered response with no response_data for participant: %s",
-                    participant.external_id,
-                )
-                continue
-
-            project = response.project
-            cleaning_stats[project.pk]["n_checked"] += 1
-
-            # Check consent for usage data donation.
-            usage_dd_consent = response_data.get("usage_dd_consent")
-            if usage_dd_consent is None:
-                cleaning_stats[project.pk]["n_miss_usage_consent_var"] += 1
-                logger.warning(
-                    "Clean Participant Command: "
-                    'Encountered response with missing "usage_dd_consent" variable '
-                    "for participant: %s",
-                    participant.external_id,
-                )
-            elif usage_dd_consent not in [1, "1"]:
-                delete_donations(participant, project)
-                cleaning_stats[project.pk]["n_donations_deleted"] += 1
 
-            # Check consent for questionnaire response donation.
-            quest_consent = response_data.get("quest_dd_consent")
-            if quest_consent is None:
-                logger.warning(
-                    "Clean Participant Command: "
-                    'Encountered response with missing "quest_dd_consent" variable '
-                    "for participant: %s",
-                    participant.external_id,
-                )
-            elif quest_consent not in [1, "1"]:
-                delete_response(participant, project)
-                cleaning_stats[project.pk]["n_responses_deleted"] += 1
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        cutoff = timezone.now() - timedelta(days=settings.DAYS_TO_DONATION_DELETION)
+
+        watermark = ParticipantCleaningWatermark.get()
+        position = None
+        if watermark.last_start_time and not options["ignore_watermark"]:
+            position = (watermark.last_start_time, watermark.last_participant_id)
+
+        cleaner = ParticipantCleaner(dry_run=dry_run)
+        while participants := get_overdue_participants(
+            cutoff, position, options["chunk_size"]
+        ):
+            last_pk, last_start_time, _, _ = participants[-1]
+            with transaction.atomic():
+                cleaner.clean_chunk(participants)
+                if not dry_run:
+                    watermark.last_start_time = last_start_time
+                    watermark.last_participant_id = last_pk
+                    watermark.save()
+            position = (last_start_time, last_pk)
+
+        for project_pk, stats in cleaner.stats.items():
+            self.stdout.write(f"Project {project_pk}:\n{format_stats(stats)}")
+
+        if dry_run:
+            self.stdout.write("Dry run: nothing has been deleted.")
+            return
 
         # Create project logs in ddm.
-        create_job_logs(cleaning_stats)
+        create_job_logs(cleaner.stats)
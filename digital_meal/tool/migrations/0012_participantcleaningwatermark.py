@@ -0,0 +1,25 @@
+# Generated by Django 5.2.14 on 2026-10-19 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tool', '0011_classroom_is_test_participation_class'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantCleaningWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_start_time', models.DateTimeField(null=True)),
+                ('last_participant_id', models.IntegerField(null=True)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Participant Cleaning Watermark',
+            },
+        ),
+    ]
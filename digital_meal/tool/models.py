@@ -9,7 +9,7 @@ from ddm.projects.models import DonationProject
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Max
+from django.db.models import Max, Min
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -312,25 +312,18 @@ class Classroom(models.Model):
         }
         return result
 
-    def get_donation_dates(self) -> list:
+    def get_first_donation_date(self) -> datetime | None:
         """
-        Get list of donation dates for current classroom.
+        Get the submission date of the first donation for current classroom.
 
         Returns:
-            list: List of donation dates if any donations exist,
-                empty list otherwise.
+            datetime | None: The earliest submission date if any donations
+                exist, None otherwise.
         """
-
-        project = self.get_related_donation_project()
-        dates = DataDonation.objects.filter(
-            project=project, participant__extra_data__url_param__class=self.url_id
-        )
-
-        if dates.exists():
-            return dates.values_list("time_submitted", flat=True)
-
-        else:
-            return []
+        return DataDonation.objects.filter(
+            project__url_id=self.base_module.ddm_project_id,
+            participant__extra_data__url_param__class=self.url_id,
+        ).aggregate(first_submitted=Min("time_submitted"))["first_submitted"]
 
     @staticmethod
     def get_previous_month(date: datetime) -> (datetime, datetime):
@@ -381,17 +374,22 @@ class Classroom(models.Model):
             start_date = self.report_ref_end_date.replace(day=1)
             return start_date, self.report_ref_end_date
 
-        donation_dates = self.get_donation_dates()
-        if not donation_dates:
+        date_min = self.get_first_donation_date()
+        if date_min is None:
             return None, None
 
-        # Get interval dates
-        date_min = min(donation_dates)
-        start_date, end_date = self.get_previous_month(date_min)
-
-        self.report_ref_end_date = end_date
-        self.save()
+        # Only set the reference end date if it has not been set in the
+        # meantime (e.g., by a concurrent report section request).
+        _, end_date = self.get_previous_month(date_min)
+        updated = Classroom.objects.filter(
+            pk=self.pk, report_ref_end_date__isnull=True
+        ).update(report_ref_end_date=end_date)
+        if updated:
+            self.report_ref_end_date = end_date
+        else:
+            self.refresh_from_db(fields=["report_ref_end_date"])
 
+        start_date = self.report_ref_end_date.replace(day=1)
         return start_date, self.report_ref_end_date
 
 
@@ -503,3 +501,35 @@ class SubModule(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class ParticipantCleaningWatermark(models.Model):
+    """
+    Position up to which participants have been checked by the
+    clean_participants management command.
+
+    Participants are checked in the order of (start_time, id). The watermark
+    holds the last checked participant, so that an interrupted or missed run
+    is resumed by the next run and participants are not checked twice.
+
+    Attributes:
+        last_start_time (datetime): start_time of the last checked participant.
+        last_participant_id (int): ID of the last checked participant.
+        date_updated (datetime): Date when the watermark was last moved.
+    """
+
+    last_start_time = models.DateTimeField(null=True)
+    last_participant_id = models.IntegerField(null=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Participant Cleaning Watermark"
+
+    def __str__(self):
+        return f"{self.last_start_time} (participant {self.last_participant_id})"
+
+    @classmethod
+    def get(cls) -> "ParticipantCleaningWatermark":
+        """Returns the watermark (there is only ever one)."""
+        watermark, _ = cls.objects.get_or_create(pk=1)
+        return watermark
@@ -1,11 +1,19 @@
 from datetime import timedelta
+from io import StringIO
 from unittest.mock import MagicMock, patch
 
-from ddm.datadonation.models import DataDonation
+from ddm.datadonation.models import DataDonation, DonationBlueprint, FileUploader
+from ddm.logging.models import ExceptionLogEntry
 from ddm.participation.models import Participant
 from ddm.projects.models import DonationProject, ResearchProfile
-from ddm.questionnaire.models import QuestionnaireResponse, SingleChoiceQuestion
+from ddm.questionnaire.models import (
+    MultiChoiceQuestion,
+    QuestionItem,
+    QuestionnaireResponse,
+    SingleChoiceQuestion,
+)
 from django.conf import settings
+from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.sessions.middleware import SessionMiddleware
@@ -14,8 +22,15 @@ from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
+from digital_meal.tool.admin import ClassroomAdmin
+from digital_meal.tool.consent import get_consent_keys
 from digital_meal.tool.forms import SimpleSignupForm
-from digital_meal.tool.models import BaseModule, Classroom, Teacher
+from digital_meal.tool.models import (
+    BaseModule,
+    Classroom,
+    ParticipantCleaningWatermark,
+    Teacher,
+)
 
 User = get_user_model()
 
@@ -129,6 +144,117 @@ class TestViews(TestCase):
 
 
 @override_settings(DAYS_TO_DONATION_DELETION=180)
+class TestClassroomParticipationStats(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username="admin", password="123", email="admin@mail.com"
+        )
+        cls.project = DonationProject.objects.create(
+            name="Project",
+            slug="project",
+            owner=ResearchProfile.objects.create(user=cls.user),
+        )
+        uploader = FileUploader.objects.create(
+            project=cls.project, name="uploader", upload_type="zip file"
+        )
+        cls.blueprint_a, cls.blueprint_b = [
+            DonationBlueprint.objects.create(
+                project=cls.project,
+                name=name,
+                exp_file_format="json",
+                file_uploader=uploader,
+            )
+            for name in ["Blueprint A", "Blueprint B"]
+        ]
+        base_module = BaseModule.objects.create(
+            name="module",
+            active=True,
+            ddm_project_id=cls.project.url_id,
+            report_prefix="tiktok",
+        )
+        cls.classroom, cls.empty_classroom = [
+            Classroom.objects.create(
+                owner=cls.user,
+                name=name,
+                base_module=base_module,
+                school_level="primary",
+                school_year=10,
+                subject="languages",
+                instruction_format="regular",
+            )
+            for name in ["class", "empty class"]
+        ]
+
+        now = timezone.now()
+        participants = [
+            Participant.objects.create(
+                project=cls.project,
+                extra_data={"url_param": {"class": class_id}},
+                start_time=now - timedelta(hours=hours),
+                end_time=now - timedelta(hours=hours) if completed else None,
+                completed=completed,
+            )
+            for class_id, hours, completed in [
+                (cls.classroom.url_id, 3, True),
+                (cls.classroom.url_id, 2, True),
+                (cls.classroom.url_id, 1, False),
+                ("other-class", 0, True),
+            ]
+        ]
+        donations = [
+            (participants[0], cls.blueprint_a, "success"),
+            (participants[1], cls.blueprint_a, "success"),
+            (participants[0], cls.blueprint_b, "success"),
+            (participants[2], cls.blueprint_b, "failed"),
+            (participants[3], cls.blueprint_b, "success"),
+        ]
+        for i, (participant, blueprint, status) in enumerate(donations):
+            DataDonation.objects.create(
+                project=cls.project,
+                participant=participant,
+                blueprint=blueprint,
+                consent=True,
+                status=status,
+                data=[],
+                time_submitted=now - timedelta(minutes=i),
+            )
+
+    def test_admin_stats_match_model_stats(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        model_admin = ClassroomAdmin(Classroom, admin.site)
+
+        for classroom in model_admin.get_queryset(request):
+            self.assertEqual(
+                model_admin._get_cached_stats(classroom),
+                classroom.get_participation_stats(),
+            )
+
+    def test_class_detail_overview(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("class_detail", kwargs={"url_id": self.classroom.url_id})
+        )
+
+        self.assertEqual(response.context["n_finished"], 2)
+        self.assertEqual(response.context["n_not_finished"], 1)
+        self.assertEqual(
+            response.context["n_donations"], {"Blueprint A": 2, "Blueprint B": 1}
+        )
+        self.assertEqual(len(response.context["donation_dates"]), 3)
+
+    def test_class_detail_overview_without_participants(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("class_detail", kwargs={"url_id": self.empty_classroom.url_id})
+        )
+
+        self.assertNotIn("n_donations", response.context)
+
+
 class TestCleanParticipantsManagementCommand(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -289,13 +415,36 @@ class TestCleanParticipantsManagementCommand(TestCase):
         )
         n_responses_before = QuestionnaireResponse.objects.all().count()
         n_donations_before = DataDonation.objects.all().count()
-        call_command("clean_participants")
+        with self.assertLogs(
+            "digital_meal.tool.management.commands.clean_participants", "WARNING"
+        ) as logs:
+            call_command("clean_participants")
         n_responses_after = QuestionnaireResponse.objects.all().count()
         n_donations_after = DataDonation.objects.all().count()
         self.assertEqual(n_responses_before, 1)
         self.assertEqual(n_responses_after, 1)
         self.assertEqual(n_donations_before, 1)
         self.assertEqual(n_donations_after, 1)
+        self.assertEqual(len(logs.records), 2)
+
+    def test_consent_keys_of_question_items(self):
+        question = MultiChoiceQuestion.objects.create(
+            project=self.project, name="Consent Items", variable_name="consent"
+        )
+        item = QuestionItem.objects.create(
+            question=question, index=1, label="Usage data", value=1
+        )
+        QuestionItem.objects.create(question=question, index=2, label="Other", value=2)
+
+        with patch(
+            "digital_meal.tool.consent.CONSENT_VARIABLES",
+            ["consent-1", "quest_dd_consent"],
+        ):
+            consent_keys = get_consent_keys({self.project.pk})[self.project.pk]
+
+        self.assertEqual(consent_keys[f"item-{item.pk}"], "consent-1")
+        self.assertEqual(list(consent_keys.values()).count("consent-1"), 1)
+        self.assertIn("quest_dd_consent", consent_keys.values())
 
     def test_clean_participants_not_expired_with_consent(self):
         QuestionnaireResponse.objects.create(
@@ -363,6 +512,58 @@ class TestCleanParticipantsManagementCommand(TestCase):
         self.assertEqual(n_donations_before, 1)
         self.assertEqual(n_donations_after, 1)
 
+    def create_expired_participant(self, days_overdue: int, data: dict) -> Participant:
+        start_time = self.expired_date - timedelta(days=days_overdue)
+        participant = Participant.objects.create(
+            project=self.project, start_time=start_time, end_time=start_time
+        )
+        QuestionnaireResponse.objects.create(
+            project=self.project, participant=participant, data=data
+        )
+        DataDonation.objects.create(
+            project=self.project, participant=participant, data=[], status=""
+        )
+        return participant
+
+    def test_clean_participants_catches_up_missed_runs(self):
+        participant = self.create_expired_participant(10, self.data_no_consent)
+        call_command("clean_participants", stdout=StringIO())
+        self.assertFalse(
+            QuestionnaireResponse.objects.filter(participant=participant).exists()
+        )
+        self.assertFalse(DataDonation.objects.filter(participant=participant).exists())
+
+    def test_clean_participants_dry_run(self):
+        participant = self.create_expired_participant(1, self.data_no_consent)
+        stdout = StringIO()
+        call_command("clean_participants", "--dry-run", stdout=stdout)
+        self.assertIn("1 donations deleted", stdout.getvalue())
+        self.assertTrue(DataDonation.objects.filter(participant=participant).exists())
+        self.assertIsNone(ParticipantCleaningWatermark.get().last_start_time)
+
+    def test_clean_participants_watermark(self):
+        self.create_expired_participant(2, self.data_consent)
+        self.create_expired_participant(1, self.data_consent)
+        call_command("clean_participants", "--chunk-size=1", stdout=StringIO())
+
+        watermark = ParticipantCleaningWatermark.get()
+        self.assertEqual(watermark.last_participant_id, self.expired_participant.pk)
+
+        # Participants behind the watermark are not checked again.
+        stdout = StringIO()
+        call_command("clean_participants", stdout=stdout)
+        self.assertEqual(stdout.getvalue(), "")
+
+        stdout = StringIO()
+        call_command("clean_participants", "--ignore-watermark", stdout=stdout)
+        self.assertIn("Checked 2 participants (1 skipped)", stdout.getvalue())
+
+    def test_clean_participants_creates_project_log(self):
+        self.create_expired_participant(1, self.data_mixed_consent_a)
+        call_command("clean_participants", stdout=StringIO())
+        log = ExceptionLogEntry.objects.get(project=self.project)
+        self.assertIn("1 questionnaire responses deleted", log.message)
+
 
 class TestSimpleSignupForm(TestCase):
     def setUp(self):
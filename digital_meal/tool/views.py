@@ -1,6 +1,9 @@
-from ddm.datadonation.models import DonationBlueprint
+from collections import Counter
+
+from ddm.datadonation.models import DataDonation, DonationBlueprint
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import NoReverseMatch, reverse, reverse_lazy
@@ -24,7 +27,7 @@ class OwnershipRequiredMixin:
 
         classroom = get_object_or_404(Classroom, url_id=classroom_id)
 
-        if classroom.owner == request.user or request.user.is_superuser:
+        if classroom.owner_id == request.user.pk or request.user.is_superuser:
             return super().dispatch(request, *args, **kwargs)
 
         raise PermissionDenied()
@@ -133,6 +136,18 @@ class ClassroomDetail(OwnershipRequiredMixin, LoginRequiredMixin, DetailView):
         context["example_report_url"] = self.get_example_report_url()
         return context
 
+    def get_object(self, queryset=None):
+        """Loads the classroom once (dispatch() and get() both need it)."""
+        if getattr(self, "object", None) is None:
+            if queryset is None:
+                queryset = (
+                    self.get_queryset()
+                    .select_related("base_module")
+                    .prefetch_related("sub_modules")
+                )
+            self.object = super().get_object(queryset)
+        return self.object
+
     def get_overview_data(self):
         """
         Returns a dictionary holding information on how many participants
@@ -140,35 +155,44 @@ class ClassroomDetail(OwnershipRequiredMixin, LoginRequiredMixin, DetailView):
         """
         participants = self.object.get_classroom_participants()
 
-        if not participants.exists():
+        # Compute basic participation statistics.
+        counts = participants.aggregate(
+            n_started=Count("pk"),
+            n_finished=Count("pk", filter=Q(completed=True)),
+        )
+        n_started = counts["n_started"]
+        n_finished = counts["n_finished"]
+        if not n_started:
             return {}
 
-        # Compute basic participation statistics.
-        participant_ids = participants.values_list("id", flat=True)
-        n_started = len(participants)
-        n_finished = len(participants.filter(completed=True))
+        # Compute donation statistics (one query for all blueprints).
+        blueprints = list(
+            DonationBlueprint.objects.filter(
+                project__url_id=self.object.base_module.ddm_project_id
+            )
+        )
+        donations = DataDonation.objects.filter(
+            blueprint__in=blueprints,
+            participant__in=participants,
+            status="success",
+        ).values_list("blueprint_id", "time_submitted")
+
+        donations_per_blueprint = Counter()
+        donation_dates = set()
+        for blueprint_id, time_submitted in donations:
+            donations_per_blueprint[blueprint_id] += 1
+            donation_dates.add(time_submitted)
 
-        # Compute donation statistics.
-        donation_project = self.object.get_related_donation_project()
         n_donations = {}
-        donation_dates = []
-        blueprints = DonationBlueprint.objects.filter(project=donation_project)
         for blueprint in blueprints:
-            blueprint_donations = blueprint.datadonation_set.filter(
-                participant__pk__in=participant_ids, status="success"
-            ).defer("data")
-
-            n_donations[blueprint.name] = len(blueprint_donations)
-            donation_dates.extend(
-                blueprint_donations.values_list("time_submitted", flat=True)
-            )
+            n_donations[blueprint.name] = donations_per_blueprint[blueprint.pk]
 
         data = {
             "n_donations": n_donations,
             "n_not_finished": (n_started - n_finished),
             "n_finished": n_finished,
             "donation_dates": [
-                d.strftime("%Y-%m-%dT%H:%M:%S.%fZ") for d in list(set(donation_dates))
+                d.strftime("%Y-%m-%dT%H:%M:%S.%fZ") for d in donation_dates
             ],
         }
         return data
@@ -0,0 +1,295 @@
+"""Server-side extraction of blueprint data from a data download package.
+
+Mirrors the extraction performed by the DDM uploader in the participant's browser
+(file matching, extraction root, expected fields and processing rules), so that
+donations ingested on the server are equivalent to donations uploaded through
+the uploader.
+"""
+
+import csv
+import io
+import json
+import logging
+import re
+import zipfile
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+
+from ddm.datadonation.models import DonationBlueprint
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionStatus(StrEnum):
+    SUCCESS = "success"
+    FAILED = "failed"
+    NO_DATA = "no data extracted"
+
+
+def get_matching_files(zip_file: zipfile.ZipFile, regex_path: str) -> list[str]:
+    """Returns the names of all files in zip_file matching regex_path."""
+    pattern = re.compile(regex_path or "")
+    return [
+        info.filename
+        for info in zip_file.infolist()
+        if not info.is_dir() and pattern.search(info.filename)
+    ]
+
+
+def get_nested_value(data, path: str):
+    """Returns the value located at a dotted path (e.g. "a.b[0].c") in data."""
+    if not isinstance(data, dict | list):
+        return None
+
+    keys = re.sub(r"\[(\w+)]", r".\1", path).lstrip(".").split(".")
+    value = data
+    for key in keys:
+        if isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        elif isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def load_entries(file: io.BufferedIOBase, blueprint: DonationBlueprint) -> list:
+    """Parses a (zip-)file object and returns the entries to extract data from.
+
+    Raises:
+        ValueError: If the file cannot be parsed.
+    """
+    text_file = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace")
+
+    if blueprint.exp_file_format == DonationBlueprint.FileFormats.JSON_FORMAT:
+        data = json.load(text_file)
+        if blueprint.json_extraction_root:
+            data = get_nested_value(data, blueprint.json_extraction_root)
+        if data is None:
+            msg = f"Extraction root {blueprint.json_extraction_root} not found."
+            raise ValueError(msg)
+        return data if isinstance(data, list) else [data]
+
+    if blueprint.exp_file_format == DonationBlueprint.FileFormats.CSV_FORMAT:
+        if blueprint.csv_delimiter:
+            reader = csv.DictReader(text_file, delimiter=blueprint.csv_delimiter)
+        else:
+            sample = text_file.read(4096)
+            text_file.seek(0)
+            dialect = csv.Sniffer().sniff(sample)
+            reader = csv.DictReader(text_file, dialect=dialect)
+        return [row for row in reader if any(row.values())]
+
+    msg = f"Unsupported blueprint format: {blueprint.exp_file_format}"
+    raise ValueError(msg)
+
+
+def _to_string(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _to_python_replacement(replacement: str) -> str:
+    """Translates JavaScript group references ($1) to Python syntax."""
+    return re.sub(r"\$(\d+)", r"\\g<\1>", replacement or "")
+
+
+def _parse_date(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_numeric(value) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int | float):
+        return True
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _compare(value, reference, operator: Callable) -> bool:
+    """Compares two values as dates or numbers; other values do not match."""
+    value_date = _parse_date(_to_string(value))
+    reference_date = _parse_date(_to_string(reference))
+    try:
+        if value_date and reference_date:
+            return operator(value_date, reference_date)
+        if _is_numeric(value) and _is_numeric(reference):
+            return operator(float(value), float(reference))
+    except TypeError:
+        # E.g., comparison of naive and aware datetimes.
+        return False
+    return False
+
+
+ROW_FILTERS = {
+    "==": lambda v, r: _to_string(v) == _to_string(r),
+    "!=": lambda v, r: _to_string(v) != _to_string(r),
+    "<=": lambda v, r: _compare(v, r, lambda a, b: a <= b),
+    ">=": lambda v, r: _compare(v, r, lambda a, b: a >= b),
+    "<": lambda v, r: _compare(v, r, lambda a, b: a < b),
+    ">": lambda v, r: _compare(v, r, lambda a, b: a > b),
+}
+
+
+def map_rule_fields(entry: dict, rules: list[dict]) -> dict[str, str]:
+    """Maps the field of every rule to the matching key in entry."""
+    key_map = {}
+    for rule in rules:
+        if rule["regex_field"]:
+            try:
+                pattern = re.compile(rule["field"])
+            except re.error:
+                continue
+            matches = [key for key in entry if pattern.search(key)]
+        else:
+            matches = [key for key in entry if key == rule["field"]]
+
+        if matches:
+            key_map[rule["field"]] = matches[0]
+    return key_map
+
+
+def apply_rules(entry: dict, rules: list[dict]) -> dict | None:
+    """Applies the processing rules to entry.
+
+    Returns:
+        dict | None: The extracted fields or None if the entry is filtered out
+            or no field is extracted.
+    """
+    key_map = map_rule_fields(entry, rules)
+
+    result = {}
+    for rule in rules:
+        key = key_map.get(rule["field"])
+        if key is None:
+            continue
+
+        operator = rule["comparison_operator"]
+        value = entry[key]
+        if not operator:
+            result[rule["field"]] = value
+
+        elif operator in ROW_FILTERS:
+            if ROW_FILTERS[operator](value, rule["comparison_value"]):
+                return None
+
+        elif operator in ["regex-delete-match", "regex-replace-match"]:
+            # result is keyed by the rule field, which differs from the
+            # entry key for regex fields.
+            if rule["field"] in result:
+                value = _replace_match(value, rule)
+                result[rule["field"]] = value
+                entry[key] = value
+
+        elif operator == "regex-delete-row" and _matches(value, rule):
+            return None
+
+    return result or None
+
+
+def _replace_match(value, rule: dict):
+    if rule["comparison_operator"] == "regex-delete-match":
+        replacement = ""
+    else:
+        replacement = _to_python_replacement(rule["replacement_value"])
+
+    try:
+        return re.sub(rule["comparison_value"], replacement, _to_string(value))
+    except re.error:
+        return value
+
+
+def _matches(value, rule: dict) -> bool:
+    try:
+        return bool(re.search(rule["comparison_value"], _to_string(value)))
+    except re.error:
+        return False
+
+
+def has_expected_fields(entry: dict, expected_fields: list[str], regex: bool) -> bool:
+    for field in expected_fields:
+        if regex:
+            pattern = re.compile(field)
+            if not any(pattern.search(key) for key in entry):
+                return False
+        elif field not in entry:
+            return False
+    return True
+
+
+def extract_entries(entries: Iterable, config: dict) -> list[dict]:
+    extracted = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        if not has_expected_fields(
+            entry, config["expected_fields"], config["exp_fields_regex_matching"]
+        ):
+            continue
+
+        result = apply_rules(entry, config["extraction_rules"])
+        if result:
+            extracted.append(result)
+    return extracted
+
+
+def extract_blueprint_data(
+    zip_file: zipfile.ZipFile, blueprint: DonationBlueprint
+) -> dict:
+    """Extracts the data described by blueprint from a data download package.
+
+    Only the files matching the blueprint's path are decompressed; each of
+    them is read directly from the (spooled) zip file.
+
+    Args:
+        zip_file: The data download package.
+        blueprint: The blueprint describing the data to extract.
+
+    Returns:
+        dict: Donation data in the format sent by the DDM uploader (without
+            consent information): {"extractedData": [...], "status": ...}.
+    """
+    config = blueprint.get_config()
+    if not config["extraction_rules"]:
+        logger.warning("Blueprint %s has no extraction rules.", blueprint.pk)
+        return {"extractedData": [], "status": ExtractionStatus.FAILED}
+
+    try:
+        file_names = get_matching_files(zip_file, config["regex_path"])
+    except re.error as e:
+        logger.warning("Invalid regex path for blueprint %s: %s", blueprint.pk, e)
+        return {"extractedData": [], "status": ExtractionStatus.FAILED}
+
+    if not file_names:
+        logger.info("No file matches the path of blueprint %s.", blueprint.pk)
+        return {"extractedData": [], "status": ExtractionStatus.NO_DATA}
+
+    extracted_data = []
+    for file_name in file_names:
+        try:
+            with zip_file.open(file_name) as file:
+                extracted_data += extract_entries(load_entries(file, blueprint), config)
+        except (ValueError, csv.Error, re.error, zipfile.BadZipFile) as e:
+            logger.warning(
+                "Failed to process %s for blueprint %s: %s", file_name, blueprint.pk, e
+            )
+            return {"extractedData": [], "status": ExtractionStatus.FAILED}
+
+    status = ExtractionStatus.SUCCESS if extracted_data else ExtractionStatus.NO_DATA
+    return {"extractedData": extracted_data, "status": status}
@@ -0,0 +1,223 @@
+"""Server-side ingestion of TikTok data download packages.
+
+Instead of passing the data package on to the participant's browser (where the
+DDM uploader extracts the data and posts it back to the server), the package is
+downloaded from TikTok into a spooled temporary file on the server, the
+blueprint data is extracted and the donation is processed directly.
+
+The participant's browser only polls the progress which is shared via the cache.
+"""
+
+import logging
+import tempfile
+import zipfile
+from dataclasses import asdict, dataclass
+from enum import StrEnum
+
+import requests
+from celery import group
+from ddm.datadonation.models import DonationBlueprint
+from ddm.logging.utils import log_server_exception
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject
+from django.core.cache import cache
+from django.db import transaction
+
+from mydigitalmeal.datadonation.constants import TIKTOK_WATCH_HISTORY_BP_NAME
+from mydigitalmeal.datadonation.extraction import extract_blueprint_data
+from mydigitalmeal.datadonation.services import (
+    get_statistics_computation_jobs,
+    validate_received_data,
+)
+from mydigitalmeal.profiles.models import MDMProfile
+from mydigitalmeal.statistics.models import StatisticsRequest
+from shared.portability.exceptions import TokenRefreshError
+from shared.portability.models import TikTokAccessToken, TikTokDataRequest
+from shared.portability.services import (
+    TikTokDataRequestPoller,
+    get_portability_api_client_class,
+)
+
+logger = logging.getLogger(__name__)
+
+INGESTION_PROGRESS_KEY = "datadonation:ingestion:{participant_id}"
+INGESTION_PROGRESS_TIMEOUT = 60 * 60
+
+
+class IngestionStage(StrEnum):
+    QUEUED = "queued"
+    DOWNLOADING = "downloading"
+    EXTRACTING = "extracting"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class IngestionProgress:
+    stage: IngestionStage = IngestionStage.QUEUED
+    statistics_request_id: str | None = None
+
+    def __post_init__(self):
+        if isinstance(self.stage, str):
+            self.stage = IngestionStage(self.stage)
+
+    def is_finished(self) -> bool:
+        return self.stage in [IngestionStage.DONE, IngestionStage.FAILED]
+
+
+def get_ingestion_progress(participant_id: int) -> IngestionProgress | None:
+    progress = cache.get(INGESTION_PROGRESS_KEY.format(participant_id=participant_id))
+    return IngestionProgress(**progress) if progress else None
+
+
+def set_ingestion_progress(participant_id: int, progress: IngestionProgress) -> None:
+    cache.set(
+        INGESTION_PROGRESS_KEY.format(participant_id=participant_id),
+        asdict(progress),
+        timeout=INGESTION_PROGRESS_TIMEOUT,
+    )
+
+
+def delete_ingestion_progress(participant_id: int) -> None:
+    cache.delete(INGESTION_PROGRESS_KEY.format(participant_id=participant_id))
+
+
+class IngestionError(Exception):
+    pass
+
+
+class TikTokExportIngestion:
+    """Downloads, extracts and processes a TikTok data download package.
+
+    Args:
+        data_request: The TikTokDataRequest whose data is ingested.
+        project: The DDM project the donation belongs to.
+        participant: The DDM participant donating the data.
+        profile: The MDM profile of the participant.
+        consented_blueprint_ids: IDs of the blueprints the participant
+            agreed to donate.
+    """
+
+    # Packages up to this size are kept in memory, larger ones are spooled to disk.
+    SPOOL_MAX_SIZE = 20 * 1024 * 1024
+
+    def __init__(
+        self,
+        data_request: TikTokDataRequest,
+        project: DonationProject,
+        participant: Participant,
+        profile: MDMProfile,
+        consented_blueprint_ids: list[int],
+    ):
+        self.data_request = data_request
+        self.project = project
+        self.participant = participant
+        self.profile = profile
+        self.consented_blueprint_ids = set(consented_blueprint_ids)
+
+    def set_stage(self, stage: IngestionStage, **kwargs) -> IngestionProgress:
+        progress = IngestionProgress(stage=stage, **kwargs)
+        set_ingestion_progress(self.participant.pk, progress)
+        return progress
+
+    def run(self) -> IngestionProgress:
+        """Runs the ingestion and returns the final progress state."""
+        blueprints = list(
+            DonationBlueprint.objects.filter(project=self.project).prefetch_related(
+                "processingrule_set"
+            )
+        )
+
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as file:
+                self.set_stage(IngestionStage.DOWNLOADING)
+                self.download(file)
+
+                self.set_stage(IngestionStage.EXTRACTING)
+                donations = self.extract(file, blueprints)
+        except IngestionError as e:
+            log_server_exception(self.project, f"Server-side ingestion failed: {e}")
+            return self.set_stage(IngestionStage.FAILED)
+
+        self.set_stage(IngestionStage.PROCESSING)
+        statistics_request = self.process(donations)
+
+        logger.info(
+            "Ingested TikTok data package for participant %s (data request %s).",
+            self.participant.pk,
+            self.data_request.request_id,
+        )
+        return self.set_stage(
+            IngestionStage.DONE,
+            statistics_request_id=str(statistics_request.public_id),
+        )
+
+    def download(self, file) -> None:
+        try:
+            access_token = TikTokDataRequestPoller.get_access_token(
+                self.data_request.open_id
+            )
+        except (TikTokAccessToken.DoesNotExist, TokenRefreshError) as e:
+            msg = f"No valid access token for data request: {e}"
+            raise IngestionError(msg) from e
+
+        api_client = get_portability_api_client_class()(access_token)
+        try:
+            api_client.download_requested_data(self.data_request, file)
+        except requests.exceptions.RequestException as e:
+            msg = f"Download of data request {self.data_request.request_id} failed."
+            raise IngestionError(msg) from e
+        file.seek(0)
+
+    def extract(self, file, blueprints: list[DonationBlueprint]) -> dict:
+        if not zipfile.is_zipfile(file):
+            msg = "Downloaded data package is not a zip file."
+            raise IngestionError(msg)
+
+        file.seek(0)
+        with zipfile.ZipFile(file, "r") as zip_file:
+            return {
+                blueprint: extract_blueprint_data(zip_file, blueprint)
+                for blueprint in blueprints
+            }
+
+    def process(self, donations: dict) -> StatisticsRequest:
+        """Stores the donations and schedules the statistics computation.
+
+        Returns:
+            StatisticsRequest: The statistics request of the interval scope (the
+                one referenced in the userflow session).
+        """
+        with transaction.atomic():
+            for blueprint, blueprint_data in donations.items():
+                consent = blueprint.pk in self.consented_blueprint_ids
+                blueprint_data["consent"] = consent
+                if not consent:
+                    blueprint_data["extractedData"] = []
+
+                if blueprint.name == TIKTOK_WATCH_HISTORY_BP_NAME:
+                    validate_received_data(blueprint, blueprint_data, self.participant)
+
+                blueprint.process_donation(blueprint_data, self.participant)
+
+            statistics_request_interval = StatisticsRequest.objects.create(
+                profile=self.profile, participant=self.participant
+            )
+            statistics_request_full = StatisticsRequest.objects.create(
+                profile=self.profile, participant=self.participant
+            )
+            job = group(
+                *get_statistics_computation_jobs(
+                    statistics_request_full,
+                    statistics_request_interval,
+                    ddm_project_id=self.project.pk,
+                )
+            )
+            transaction.on_commit(job.delay)
+
+            # Complete the donation step (see DataDonationView.set_step_completed).
+            self.participant.current_step += 1
+            self.participant.save(update_fields=["current_step"])
+
+        return statistics_request_interval
@@ -0,0 +1,76 @@
+import logging
+
+from celery.canvas import Signature
+from ddm.datadonation.models import DonationBlueprint
+from ddm.participation.models import Participant
+
+from mydigitalmeal.statistics.models import StatisticsRequest, StatisticsScope
+from mydigitalmeal.statistics.tasks import compute_tiktok_wh_statistics_from_donation
+
+logger = logging.getLogger(__name__)
+
+
+def validate_received_data(
+    wh_blueprint: DonationBlueprint, wh_data: dict, participant: Participant
+) -> bool:
+    if not validate_watch_history_data(wh_blueprint, wh_data, participant):
+        return False
+
+    if not validate_donation_consent(wh_data.get("consent"), participant):
+        return False
+
+    return validate_donation_status(wh_data.get("status"), participant)
+
+
+def validate_watch_history_data(
+    wh_blueprint: DonationBlueprint, wh_data: dict, participant: Participant
+) -> bool:
+    if not wh_data:
+        return False
+    if not wh_blueprint.validate_donation(wh_data):
+        msg = f"Received invalid watch history donation (participant: {participant.pk})"
+        logger.error(msg)
+        return False
+    return True
+
+
+def validate_donation_consent(consent_value: bool, participant: Participant) -> bool:
+    if not consent_value:
+        msg = (
+            "Received donation without consent (None) for watch history data "
+            f"(participant: {participant.pk}"
+        )
+        logger.info(msg)
+        return False
+    return True
+
+
+def validate_donation_status(status_value: str, participant: Participant) -> bool:
+    if status_value in ["failed", "pending", "no data extracted"]:
+        msg = (
+            f"Received invalid donation with status: {status_value} "
+            f"(participant: {participant.pk})"
+        )
+        logger.info(msg)
+        return False
+    return True
+
+
+def get_statistics_computation_jobs(
+    statistics_request_full: StatisticsRequest,
+    statistics_request_interval: StatisticsRequest,
+    ddm_project_id: int,
+) -> list[Signature]:
+    """Returns the task signatures computing the statistics for a donation."""
+    return [
+        compute_tiktok_wh_statistics_from_donation.s(
+            statistics_request_id=statistics_request_full.pk,
+            statistics_scope=StatisticsScope.FULL,
+            ddm_project_id=ddm_project_id,
+        ),
+        compute_tiktok_wh_statistics_from_donation.s(
+            statistics_request_id=statistics_request_interval.pk,
+            statistics_scope=StatisticsScope.INTERVAL,
+            ddm_project_id=ddm_project_id,
+        ),
+    ]
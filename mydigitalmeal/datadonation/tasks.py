@@ -0,0 +1,65 @@
+import logging
+
+from celery import shared_task
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject
+
+from mydigitalmeal.datadonation.ingestion import (
+    IngestionProgress,
+    IngestionStage,
+    TikTokExportIngestion,
+    set_ingestion_progress,
+)
+from mydigitalmeal.profiles.models import MDMProfile
+from shared.portability.models import TikTokDataRequest
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def ingest_tiktok_data_package(
+    data_request_id: int,
+    ddm_project_id: int,
+    participant_id: int,
+    profile_id: int,
+    consented_blueprint_ids: list[int],
+) -> None:
+    """Downloads a TikTok data package and processes the donation on the server.
+
+    Progress is reported through the cache (see
+    mydigitalmeal.datadonation.ingestion.get_ingestion_progress).
+
+    Args:
+        data_request_id: The pk of the TikTokDataRequest to ingest.
+        ddm_project_id: The pk of the DDM project.
+        participant_id: The pk of the DDM participant.
+        profile_id: The pk of the participant's MDM profile.
+        consented_blueprint_ids: IDs of the blueprints the participant agreed
+            to donate.
+    """
+    try:
+        data_request = TikTokDataRequest.objects.get(pk=data_request_id)
+        project = DonationProject.objects.get(pk=ddm_project_id)
+        participant = Participant.objects.get(pk=participant_id, project=project)
+        profile = MDMProfile.objects.get(pk=profile_id)
+    except (
+        TikTokDataRequest.DoesNotExist,
+        DonationProject.DoesNotExist,
+        Participant.DoesNotExist,
+        MDMProfile.DoesNotExist,
+    ):
+        logger.exception("Cannot ingest data package.")
+        set_ingestion_progress(
+            participant_id, IngestionProgress(stage=IngestionStage.FAILED)
+        )
+        return
+
+    try:
+        TikTokExportIngestion(
+            data_request, project, participant, profile, consented_blueprint_ids
+        ).run()
+    except Exception:
+        set_ingestion_progress(
+            participant_id, IngestionProgress(stage=IngestionStage.FAILED)
+        )
+        raise
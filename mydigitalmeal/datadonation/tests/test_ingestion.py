@@ -0,0 +1,245 @@
+import io
+import zipfile
+from datetime import timedelta
+
+from ddm.datadonation.models import (
+    DataDonation,
+    DonationBlueprint,
+    FileUploader,
+    ProcessingRule,
+)
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject, ResearchProfile
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from mydigitalmeal.datadonation.constants import (
+    TIKTOK_PROJECT_SLUG,
+    TIKTOK_WATCH_HISTORY_BP_NAME,
+)
+from mydigitalmeal.datadonation.extraction import (
+    ExtractionStatus,
+    apply_rules,
+    extract_blueprint_data,
+)
+from mydigitalmeal.datadonation.ingestion import (
+    IngestionStage,
+    get_ingestion_progress,
+)
+from mydigitalmeal.datadonation.tasks import ingest_tiktok_data_package
+from mydigitalmeal.profiles.models import MDMProfile
+from mydigitalmeal.statistics.models import StatisticsRequest
+from shared.portability.models import TikTokAccessToken, TikTokDataRequest
+from shared.portability.tests.utils import StubPortabilityAPIClient
+from shared.portability.views import TikTokDataDownloadMockView
+
+User = get_user_model()
+
+
+def get_rule(field, operator=None, value="", replacement="", *, regex_field=False):
+    return {
+        "field": field,
+        "regex_field": regex_field,
+        "comparison_operator": operator,
+        "comparison_value": value,
+        "replacement_value": replacement,
+    }
+
+
+class TestApplyRules(TestCase):
+    def test_keeps_fields(self):
+        entry = {"Date": "2024-01-15", "Link": "a", "Other": "b"}
+        rules = [get_rule("Date"), get_rule("Link")]
+        self.assertEqual(apply_rules(entry, rules), {"Date": "2024-01-15", "Link": "a"})
+
+    def test_row_filter_removes_entry(self):
+        entry = {"Date": "2024-01-15", "Link": "a"}
+        rules = [get_rule("Link"), get_rule("Link", "==", "a")]
+        self.assertIsNone(apply_rules(entry, rules))
+
+    def test_date_comparison(self):
+        entry = {"Date": "2024-01-15 10:00:00", "Link": "a"}
+        rules = [get_rule("Link"), get_rule("Date", "<", "2024-02-01 00:00:00")]
+        self.assertIsNone(apply_rules(entry, rules))
+
+        rules = [get_rule("Link"), get_rule("Date", ">", "2024-02-01 00:00:00")]
+        self.assertEqual(apply_rules(entry, rules), {"Link": "a"})
+
+    def test_regex_replace_match(self):
+        entry = {"Link": "https://www.tiktokv.com/share/video/123/"}
+        rules = [
+            get_rule("Link"),
+            get_rule("Link", "regex-replace-match", r"^.*/video/(\d+)/$", "$1"),
+        ]
+        self.assertEqual(apply_rules(entry, rules), {"Link": "123"})
+
+    def test_regex_delete_match_on_regex_field(self):
+        entry = {"UserName": "someone", "Link": "a"}
+        rules = [
+            get_rule("Link"),
+            get_rule("^User", regex_field=True),
+            get_rule("^User", "regex-delete-match", ".+", regex_field=True),
+        ]
+        self.assertEqual(apply_rules(entry, rules), {"Link": "a", "^User": ""})
+
+    def test_regex_delete_row(self):
+        entry = {"Link": "https://www.tiktokv.com/share/video/123/"}
+        rules = [get_rule("Link"), get_rule("Link", "regex-delete-row", "video")]
+        self.assertIsNone(apply_rules(entry, rules))
+
+
+class IngestionTestMixin:
+    def create_project(self):
+        owner = User.objects.create_user(
+            email="owner@mail.com", username="owner", password="testpass"
+        )
+        self.project = DonationProject.objects.create(
+            owner=ResearchProfile.objects.create(user=owner),
+            slug=TIKTOK_PROJECT_SLUG,
+        )
+        uploader = FileUploader.objects.create(project=self.project)
+        self.blueprint = DonationBlueprint.objects.create(
+            project=self.project,
+            file_uploader=uploader,
+            name=TIKTOK_WATCH_HISTORY_BP_NAME,
+            exp_file_format=DonationBlueprint.FileFormats.JSON_FORMAT,
+            expected_fields='"Date", "Link"',
+            json_extraction_root="Your Activity.Watch History.VideoList",
+            regex_path="user_data_tiktok.json",
+        )
+        for i, field in enumerate(["Date", "Link"]):
+            ProcessingRule.objects.create(
+                blueprint=self.blueprint,
+                name=field,
+                field=field,
+                execution_order=i,
+            )
+
+    def get_mock_zip(self):
+        return zipfile.ZipFile(TikTokDataDownloadMockView()._create_mock_zip())
+
+
+class TestExtractBlueprintData(IngestionTestMixin, TestCase):
+    def setUp(self):
+        self.create_project()
+
+    def test_extracts_watch_history(self):
+        result = extract_blueprint_data(self.get_mock_zip(), self.blueprint)
+
+        self.assertEqual(result["status"], ExtractionStatus.SUCCESS)
+        self.assertTrue(result["extractedData"])
+        self.assertEqual(set(result["extractedData"][0]), {"Date", "Link"})
+
+    def test_no_matching_file(self):
+        self.blueprint.regex_path = "does_not_exist.json"
+        self.blueprint.save()
+
+        result = extract_blueprint_data(self.get_mock_zip(), self.blueprint)
+        self.assertEqual(result["status"], ExtractionStatus.NO_DATA)
+
+    def test_invalid_file(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_file:
+            zip_file.writestr("user_data_tiktok.json", "{invalid")
+
+        result = extract_blueprint_data(zipfile.ZipFile(buffer), self.blueprint)
+        self.assertEqual(result["status"], ExtractionStatus.FAILED)
+
+    def test_csv_file(self):
+        self.blueprint.exp_file_format = DonationBlueprint.FileFormats.CSV_FORMAT
+        self.blueprint.regex_path = "watch_history.csv"
+        self.blueprint.save()
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_file:
+            zip_file.writestr("watch_history.csv", "Date;Link\n2024-01-15;a\n")
+
+        result = extract_blueprint_data(zipfile.ZipFile(buffer), self.blueprint)
+        self.assertEqual(result["extractedData"], [{"Date": "2024-01-15", "Link": "a"}])
+
+
+@override_settings(
+    TIKTOK_PORTABILITY_API_CLIENT=(
+        "shared.portability.tests.utils.StubPortabilityAPIClient"
+    )
+)
+class TestIngestTikTokDataPackage(IngestionTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        StubPortabilityAPIClient.reset()
+        self.create_project()
+
+        user = User.objects.create_user(
+            email="test@mail.com", username="testuser", password="testpass"
+        )
+        self.profile = MDMProfile.objects.create(user=user)
+        self.participant = Participant.objects.create(
+            project=self.project, start_time=timezone.now(), current_step=1
+        )
+
+        open_id = "test-open-id"
+        TikTokAccessToken.objects.create(
+            open_id=open_id,
+            token="test-token",
+            token_expiration_date=timezone.now() + timedelta(hours=1),
+            refresh_token="refresh_token",
+            refresh_token_expiration_date=timezone.now() + timedelta(hours=1),
+            token_type="bearer",
+        )
+        self.data_request = TikTokDataRequest.objects.create(
+            open_id=open_id,
+            request_id=StubPortabilityAPIClient.request_id,
+            status=TikTokDataRequest.State.READY,
+        )
+
+    def ingest(self, consented_blueprint_ids):
+        ingest_tiktok_data_package(
+            self.data_request.pk,
+            self.project.pk,
+            self.participant.pk,
+            self.profile.pk,
+            consented_blueprint_ids,
+        )
+        return get_ingestion_progress(self.participant.pk)
+
+    def test_ingestion_creates_donation(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            progress = self.ingest([self.blueprint.pk])
+
+        self.assertEqual(progress.stage, IngestionStage.DONE)
+        self.assertEqual(len(callbacks), 1)
+
+        donation = DataDonation.objects.get(participant=self.participant)
+        self.assertTrue(donation.consent)
+        self.assertEqual(donation.status, ExtractionStatus.SUCCESS)
+
+        self.assertEqual(StatisticsRequest.objects.count(), 2)
+        statistics_request = StatisticsRequest.objects.get(
+            public_id=progress.statistics_request_id
+        )
+        self.assertEqual(statistics_request.participant, self.participant)
+
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.current_step, 2)
+
+        self.data_request.refresh_from_db()
+        self.assertTrue(self.data_request.download_succeeded)
+
+    def test_ingestion_without_consent_discards_data(self):
+        self.ingest([])
+
+        donation = DataDonation.objects.get(participant=self.participant)
+        self.assertFalse(donation.consent)
+        data = donation.get_decrypted_data(self.project.secret, self.project.get_salt())
+        self.assertEqual(data, [])
+
+    def test_failed_download(self):
+        StubPortabilityAPIClient.fail_download = True
+
+        progress = self.ingest([self.blueprint.pk])
+
+        self.assertEqual(progress.stage, IngestionStage.FAILED)
+        self.assertFalse(DataDonation.objects.exists())
+        self.assertFalse(StatisticsRequest.objects.exists())
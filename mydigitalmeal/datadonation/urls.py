@@ -35,4 +35,14 @@ urlpatterns = [
         port_views.PortabilityReviewView.as_view(),
         name="port_tt_review_data",
     ),
+    path(
+        "connect/ingest/",
+        port_views.PortabilityIngestView.as_view(),
+        name="port_tt_ingest_data",
+    ),
+    path(
+        "connect/ingest/progress/",
+        port_views.PortabilityIngestProgressView.as_view(),
+        name="port_tt_ingest_progress",
+    ),
 ]
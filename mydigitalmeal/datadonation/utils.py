@@ -6,6 +6,7 @@ from mydigitalmeal.datadonation.constants import (
     TIKTOK_PROJECT_SLUG,
     TIKTOK_WATCH_HISTORY_BP_NAME,
 )
+from shared.projects.registry import get_project_decryptor, get_registered_project
 
 
 def get_tiktok_project() -> DonationProject:
@@ -28,7 +29,7 @@ def get_tiktok_wh_data(participant: Participant, ddm_project_id: int | None):
     if not ddm_project_id:
         ddm_project = get_tiktok_project()
     else:
-        ddm_project = DonationProject.objects.get(pk=ddm_project_id)
+        ddm_project = get_registered_project(pk=ddm_project_id)
     blueprint = get_tiktok_wh_bp(ddm_project_id)
 
     donated_data = DataDonation.objects.get(
@@ -39,4 +40,8 @@ def get_tiktok_wh_data(participant: Participant, ddm_project_id: int | None):
 
     # TODO: Implement status check here once this has been better implemented in DDM
 
-    return donated_data.get_decrypted_data(ddm_project.secret, ddm_project.get_salt())
+    return donated_data.get_decrypted_data(
+        ddm_project.secret,
+        ddm_project.get_salt(),
+        decryptor=get_project_decryptor(ddm_project),
+    )
@@ -19,10 +19,13 @@ from mydigitalmeal.datadonation.constants import (
     TIKTOK_PROJECT_SLUG,
     TIKTOK_WATCH_HISTORY_BP_NAME,
 )
+from mydigitalmeal.datadonation.services import (
+    get_statistics_computation_jobs,
+    validate_received_data,
+)
 from mydigitalmeal.profiles.mixins import LoginAndProfileRequiredMixin
 from mydigitalmeal.profiles.models import MDMProfile
-from mydigitalmeal.statistics.models import StatisticsRequest, StatisticsScope
-from mydigitalmeal.statistics.tasks import compute_tiktok_wh_statistics_from_donation
+from mydigitalmeal.statistics.models import StatisticsRequest
 from mydigitalmeal.userflow.constants import URLShortcut
 from mydigitalmeal.userflow.sessions import AddUserflowSessionMixin
 
@@ -176,16 +179,11 @@ class BaseDonationViewDDM(AddUserflowSessionMixin, DataDonationView):
         )
 
         job = group(
-            compute_tiktok_wh_statistics_from_donation.s(
-                statistics_request_id=statistics_request_full.pk,
-                statistics_scope=StatisticsScope.FULL,
-                ddm_project_id=self.object.pk,
-            ),
-            compute_tiktok_wh_statistics_from_donation.s(
-                statistics_request_id=statistics_request_interval.pk,
-                statistics_scope=StatisticsScope.INTERVAL,
+            *get_statistics_computation_jobs(
+                statistics_request_full,
+                statistics_request_interval,
                 ddm_project_id=self.object.pk,
-            ),
+            )
         )
         transaction.on_commit(job.delay)
 
@@ -203,47 +201,7 @@ class BaseDonationViewDDM(AddUserflowSessionMixin, DataDonationView):
         )
 
     def validate_received_data(self, wh_blueprint, wh_data) -> bool:
-        if not self.validate_watch_history_data(wh_blueprint, wh_data):
-            return False
-
-        if not self.validate_donation_consent(wh_data.get("consent")):
-            return False
-
-        return self.validate_donation_status(wh_data.get("status"))
-
-    def validate_watch_history_data(
-        self, wh_blueprint: DonationBlueprint, wh_data: dict
-    ) -> bool:
-        if not wh_data:
-            return False
-        if not wh_blueprint.validate_donation(wh_data):
-            msg = (
-                "Received invalid watch history donation "
-                f"(participant: {self.participant.pk})"
-            )
-            logger.error(msg)
-            return False
-        return True
-
-    def validate_donation_consent(self, consent_value: bool) -> bool:
-        if not consent_value:
-            msg = (
-                "Received donation without consent (None) for watch history data "
-                f"(participant: {self.participant.pk}"
-            )
-            logger.info(msg)
-            return False
-        return True
-
-    def validate_donation_status(self, status_value: str) -> bool:
-        if status_value in ["failed", "pending", "no data extracted"]:
-            msg = (
-                f"Received invalid donation with status: {status_value} "
-                f"(participant: {self.participant.pk})"
-            )
-            logger.info(msg)
-            return False
-        return True
+        return validate_received_data(wh_blueprint, wh_data, self.participant)
 
 
 class DonationViewDDM(LoginAndProfileRequiredMixin, BaseDonationViewDDM):
@@ -1,11 +1,28 @@
-from django.http import HttpResponseRedirect
+from uuid import UUID
+
+from ddm.datadonation.models import DonationBlueprint
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseRedirect
+from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.views.generic import TemplateView
 
+from mydigitalmeal.datadonation.ingestion import (
+    IngestionProgress,
+    IngestionStage,
+    delete_ingestion_progress,
+    get_ingestion_progress,
+    set_ingestion_progress,
+)
+from mydigitalmeal.datadonation.tasks import ingest_tiktok_data_package
 from mydigitalmeal.datadonation.views.ddm import DonationViewDDM
 from mydigitalmeal.profiles.mixins import LoginAndProfileRequiredMixin
+from mydigitalmeal.profiles.models import MDMProfile
+from mydigitalmeal.userflow.constants import URLShortcut
 from mydigitalmeal.userflow.sessions import AddUserflowSessionMixin
 from shared.portability import views as port_views
+from shared.portability.models import TikTokDataRequest
 
 
 class PortabilityEntryView(LoginAndProfileRequiredMixin, port_views.TikTokAuthView):
@@ -56,6 +73,15 @@ class CheckDownloadAvailabilityView(port_views.TikTokCheckDownloadAvailabilityVi
         "datadonation/portability/await_partials/_data_download_expired_msg.html"
     )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if settings.MDM_PORTABILITY_SERVER_INGESTION:
+            review_url = reverse("mdm:userflow:datadonation:port_tt_ingest_data")
+        else:
+            review_url = reverse("mdm:userflow:datadonation:port_tt_review_data")
+        context["review_url"] = review_url
+        return context
+
 
 class PortabilityReviewView(
     port_views.AuthenticationRequiredMixin,
@@ -83,6 +109,102 @@ class PortabilityReviewView(
         return context
 
 
+class PortabilityIngestView(
+    port_views.AuthenticationRequiredMixin,
+    port_views.ActiveAccessTokenRequiredMixin,
+    port_views.PortabilitySessionMixin,
+    DonationViewDDM,
+):
+    """Server-side alternative to PortabilityReviewView.
+
+    Asks the participant for their consent and then downloads and processes the
+    TikTok data package on the server (see mydigitalmeal.datadonation.ingestion).
+    The browser only polls the progress of the ingestion.
+    """
+
+    template_name = "datadonation/portability/tiktok_ingest.html"
+    template_progress = "datadonation/portability/ingest_partials/_progress.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["blueprints"] = DonationBlueprint.objects.filter(project=self.object)
+        context["progress"] = get_ingestion_progress(self.participant.pk)
+        return context
+
+    def get_data_request(self) -> TikTokDataRequest | None:
+        return TikTokDataRequest.objects.filter(
+            open_id=self.port_session.get_tiktok_open_id(),
+            status=TikTokDataRequest.State.READY,
+            download_succeeded=False,
+        ).first()
+
+    def post(self, request, *args, **kwargs):
+        # Account for 'page back' action in browser
+        if self.steps[self.current_step] != self.step_name:
+            return redirect(self.steps[self.current_step])
+
+        progress = get_ingestion_progress(self.participant.pk)
+        if progress and not progress.is_finished():
+            return render(request, self.template_progress, {"progress": progress})
+
+        data_request = self.get_data_request()
+        if not data_request:
+            return HttpResponseRedirect(
+                reverse("mdm:userflow:datadonation:port_tt_await_data")
+            )
+
+        consented_blueprint_ids = [
+            int(pk) for pk in request.POST.getlist("consent") if pk.isdigit()
+        ]
+        profile = MDMProfile.objects.get(user=request.user)
+
+        progress = IngestionProgress()
+        set_ingestion_progress(self.participant.pk, progress)
+        transaction.on_commit(
+            lambda: ingest_tiktok_data_package.delay(
+                data_request_id=data_request.pk,
+                ddm_project_id=self.object.pk,
+                participant_id=self.participant.pk,
+                profile_id=profile.pk,
+                consented_blueprint_ids=consented_blueprint_ids,
+            )
+        )
+        return render(request, self.template_progress, {"progress": progress})
+
+
+class PortabilityIngestProgressView(PortabilityIngestView):
+    """Returns the progress of the server-side ingestion as an HTMX partial."""
+
+    def get(self, request, *args, **kwargs):
+        progress = get_ingestion_progress(self.participant.pk)
+        if progress is None:
+            return self.htmx_redirect(
+                reverse("mdm:userflow:datadonation:port_tt_ingest_data")
+            )
+
+        if progress.stage == IngestionStage.DONE:
+            self.userflow_session.update(
+                statistics_requested=True,
+                request_id=UUID(progress.statistics_request_id),
+            )
+            delete_ingestion_progress(self.participant.pk)
+            return self.htmx_redirect(reverse(URLShortcut.QUESTIONNAIRE))
+
+        if progress.stage == IngestionStage.FAILED:
+            delete_ingestion_progress(self.participant.pk)
+
+        return render(request, self.template_progress, {"progress": progress})
+
+    def post(self, request, *args, **kwargs):
+        return HttpResponse(status=405)
+
+    @staticmethod
+    def htmx_redirect(url: str) -> HttpResponse:
+        response = HttpResponse()
+        response["HX-Redirect"] = url
+        return response
+
+
 class PortabilityAbortedView(LoginAndProfileRequiredMixin, TemplateView):
     """Displayed to users who abort the portability flow.
 
@@ -0,0 +1,369 @@
+"""Report context derived from TikTok watch history statistics.
+
+TikTokWatchHistoryStatistics never change once they are saved. The context
+derived from them to render the report is therefore computed once, right after
+the statistics are saved, and stored in the statistics row and the cache.
+Views then only have to look it up (see get_report_context()).
+
+Only scalar values are stored. The activity images are rendered from the
+statistics with the stored colour set and taken from the activity image cache
+(see get_activity_image_svgs()). The oEmbed metadata of the top video is
+looked up by the views (asynchronously) and added to the stored context once
+it is available; contexts without it are only cached briefly.
+"""
+
+import json
+import logging
+import random
+
+import numpy as np
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.safestring import mark_safe
+
+from mydigitalmeal.reports.plots.activity_image import (
+    ActivityImageVariant,
+    get_activity_image_svgs,
+)
+from mydigitalmeal.statistics.models import TikTokWatchHistoryStatistics
+
+logger = logging.getLogger(__name__)
+
+REPORT_CONTEXT_KEY = "reports:tiktok-statistics-context:{statistics_id}"
+REPORT_CONTEXT_TIMEOUT = 60 * 60 * 24
+# Contexts without top video metadata (not looked up yet or the oEmbed lookup
+# failed) are not stored permanently, so that the lookup is retried later.
+INCOMPLETE_REPORT_CONTEXT_TIMEOUT = 5 * 60
+
+USAGE_IMAGE_VARIANTS = {
+    "usage_img": ActivityImageVariant.ANIMATED,
+    "usage_img_static": ActivityImageVariant.STATIC,
+    "usage_img_highlighted": ActivityImageVariant.HIGHLIGHTED_ANIMATED,
+    "usage_img_highlighted_static": ActivityImageVariant.HIGHLIGHTED_STATIC,
+}
+
+
+class StatisticsReportContextBuilder:
+    """Derives the report context from TikTok watch history statistics.
+
+    Args:
+        statistics: The statistics to derive the context from.
+        top_video_metadata: The oEmbed metadata of the top video. The top
+            video thumbnail and channel are left empty if not provided.
+    """
+
+    def __init__(
+        self,
+        statistics: TikTokWatchHistoryStatistics,
+        top_video_metadata: dict | None = None,
+    ):
+        self.statistics = statistics
+        self.top_video_metadata = top_video_metadata
+
+    def build(self) -> dict:
+        context = {}
+        context |= self.get_video_viewed_stats()
+        context |= self.get_daily_routine_stats()
+        context |= self.get_usage_session_scrolling()
+        context |= self.get_top_video()
+        context |= self.get_peak_day()
+        context |= self.get_usage_session_general()
+
+        # Check if none of the individual sections have data to show. Happens
+        # when the donated watch history has entries, but none of them fall
+        # within the INTERVAL scope's date range (default: last 30 days).
+        context["no_activity_in_report_period"] = not any(
+            context[flag]
+            for flag in (
+                "video_viewed_stats_available",
+                "daily_routine_available",
+                "usage_session_scrolling_available",
+                "top_video_available",
+                "peak_day_available",
+                "usage_session_general_available",
+            )
+        )
+        return context
+
+    def not_all_stats_none(self, d: dict) -> bool:
+        return any(s is not None for s in d.values())
+
+    def get_video_viewed_stats(self) -> dict:
+        stats = {
+            "videos_total": self.statistics.total_videos,
+            "videos_per_day": self.statistics.videos_per_day,
+        }
+        stats.update({"video_viewed_stats_available": self.not_all_stats_none(stats)})
+        return stats
+
+    def get_daily_routine_stats(self) -> dict:
+        hour_start = self.statistics.peak_hour
+        hour_start = 0 if hour_start == 24 else hour_start  # noqa: PLR2004
+        hour_end = hour_start + 1 if hour_start is not None else None
+
+        stats = {
+            "routine_start_hour": hour_start,
+            "routine_end_hour": hour_end,
+        }
+        stats.update({"daily_routine_available": self.not_all_stats_none(stats)})
+        return stats
+
+    def get_usage_session_scrolling(self) -> dict:
+        stats = {
+            "scroll_threshold_pct": self.statistics.scroll_threshold_pct,
+            "scroll_threshold_sec": self.statistics.scroll_threshold_sec,
+        }
+        stats.update(
+            {"usage_session_scrolling_available": self.not_all_stats_none(stats)}
+        )
+        return stats
+
+    def get_top_video(self) -> dict:
+        video_metadata = self.top_video_metadata or {}
+        # TODO: Fallback when video does not exist;
+        #  currently, this report part will just be skipped
+        stats = {
+            "top_video_thumbnail_url": video_metadata.get("thumbnail"),
+            "top_video_channel": video_metadata.get("channel"),
+            "top_video_seen_count": self.statistics.top_video_seen_count,
+            "top_video_last_seen_date": self.statistics.top_video_last_seen_date,
+        }
+
+        stats.update({"top_video_available": self.not_all_stats_none(stats)})
+        return stats
+
+    def get_peak_day(self) -> dict:
+        def generate_guess_options(correct: int, n_options: int = 3) -> dict[int, bool]:
+            options = {
+                correct: True,
+            }
+
+            # Prepare options depending on correct value
+            if correct == 1:
+                options[0] = False
+                multiplier_min = 2
+                multiplier_max = 10
+
+            elif correct < 10:  # noqa: PLR2004
+                multiplier_min = 0.3
+                multiplier_max = 6
+
+            else:
+                multiplier_min = 0.5
+                multiplier_max = 1.5
+
+            # Generate options for larger correct number
+            base_value = correct if correct > 0 else 1
+            while (
+                len(options) < n_options and len(options) <= base_value * multiplier_max
+            ):
+                multiplier = random.uniform(multiplier_min, multiplier_max)  # noqa: S311
+                guess = round(base_value * multiplier)
+                if guess not in options and guess > 0:
+                    options[guess] = False
+
+            return dict(sorted(options.items(), key=lambda item: item[0]))
+
+        video_count = self.statistics.peak_day_video_count
+        stats = {
+            "peak_day_date": self.statistics.peak_day_date,
+            "peak_day_video_count": video_count,
+        }
+
+        stats_available = self.not_all_stats_none(stats)
+
+        if stats_available and video_count is not None:
+            peak_guesses = generate_guess_options(video_count)
+        else:
+            peak_guesses = None
+
+        stats.update(
+            {
+                "peak_day_available": self.not_all_stats_none(stats),
+                "peak_guesses": peak_guesses,
+            }
+        )
+        return stats
+
+    def get_usage_session_general(self) -> dict:
+        usage_session_total_seconds = self.statistics.avg_session_duration_seconds
+        if usage_session_total_seconds:
+            session_hours, remainder = divmod(usage_session_total_seconds, 3600)
+            session_minutes, session_seconds = divmod(remainder, 60)
+
+            session_minutes = int(session_minutes)
+            session_hours = int(session_hours)
+        else:
+            session_hours, session_minutes, session_seconds = None, None, None
+
+        stats: dict[any] = {
+            "usage_session_n_days": self.statistics.total_days_with_activity,
+            "usage_session_seconds": session_seconds,
+            "usage_session_minutes": session_minutes,
+            "usage_session_hours": session_hours,
+            "usage_session_videos_mean": self.statistics.avg_videos_per_session,
+        }
+
+        stats.update(
+            {"usage_session_general_available": self.not_all_stats_none(stats)}
+        )
+
+        activity_matrix = self.statistics.date_hour_activity_matrix
+        if activity_matrix is not None and activity_matrix.size:
+            # The images are added by add_activity_images().
+            stats["usage_img_color_set"] = random.choice(list(range(1, 7)))  # noqa: S311
+
+        return stats
+
+
+class ReportContextEncoder(DjangoJSONEncoder):
+    """Also encodes numpy scalars.
+
+    Statistics that have just been computed hold numpy scalars until they are
+    reloaded from the database.
+    """
+
+    def default(self, o):
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+
+def serialize_report_context(context: dict) -> dict:
+    """Converts a report context to a JSON-serializable dict."""
+    serialized = json.loads(json.dumps(context, cls=ReportContextEncoder))
+    if context.get("peak_guesses") is not None:
+        # JSON object keys are strings.
+        serialized["peak_guesses"] = list(context["peak_guesses"].items())
+    return serialized
+
+
+def deserialize_report_context(data: dict) -> dict:
+    """Reverts serialize_report_context()."""
+    context = dict(data)
+    if context.get("peak_day_date"):
+        context["peak_day_date"] = parse_date(context["peak_day_date"])
+    if context.get("top_video_last_seen_date"):
+        context["top_video_last_seen_date"] = parse_datetime(
+            context["top_video_last_seen_date"]
+        )
+    if context.get("peak_guesses") is not None:
+        context["peak_guesses"] = dict(context["peak_guesses"])
+    return context
+
+
+def add_activity_images(
+    statistics: TikTokWatchHistoryStatistics, context: dict
+) -> dict:
+    """Returns the report context with the activity images of the statistics."""
+    color_set = context.get("usage_img_color_set")
+    if color_set is None:
+        return context
+
+    usage_imgs = get_activity_image_svgs(
+        statistics.public_id, statistics.date_hour_activity_matrix, color_set=color_set
+    )
+    return context | {
+        key: mark_safe(usage_imgs[variant])  # noqa: S308
+        for key, variant in USAGE_IMAGE_VARIANTS.items()
+    }
+
+
+def get_report_context_key(statistics: TikTokWatchHistoryStatistics) -> str:
+    return REPORT_CONTEXT_KEY.format(statistics_id=statistics.public_id)
+
+
+def is_complete(statistics: TikTokWatchHistoryStatistics, context: dict) -> bool:
+    """Returns True if the context holds the top video metadata (if needed)."""
+    return bool(context["top_video_thumbnail_url"]) or not statistics.top_video_id
+
+
+def has_report_context(statistics: TikTokWatchHistoryStatistics) -> bool:
+    """Returns True if a complete report context of the statistics is stored."""
+    if statistics.report_context is not None:
+        return True
+    context = cache.get(get_report_context_key(statistics))
+    return context is not None and is_complete(statistics, context)
+
+
+def store_report_context(
+    statistics: TikTokWatchHistoryStatistics,
+    top_video_metadata: dict | None = None,
+) -> dict:
+    """Computes the report context of the statistics and stores it.
+
+    Args:
+        statistics: The statistics to derive the context from.
+        top_video_metadata: The oEmbed metadata of the top video. If not
+            provided, the context is only cached briefly.
+
+    Returns:
+        dict: The report context (without activity images).
+    """
+    context = StatisticsReportContextBuilder(statistics, top_video_metadata).build()
+    save_report_context(statistics, context)
+    return context
+
+
+def add_top_video_metadata(
+    statistics: TikTokWatchHistoryStatistics,
+    context: dict,
+    top_video_metadata: dict,
+) -> dict:
+    """Adds the top video metadata to a stored report context and stores it."""
+    builder = StatisticsReportContextBuilder(statistics, top_video_metadata)
+    context = context | builder.get_top_video()
+    save_report_context(statistics, context)
+    return context
+
+
+def save_report_context(
+    statistics: TikTokWatchHistoryStatistics, context: dict
+) -> None:
+    """Stores a complete context in the statistics row and caches it."""
+    complete = is_complete(statistics, context)
+    if complete:
+        statistics.report_context = serialize_report_context(context)
+        TikTokWatchHistoryStatistics.objects.filter(pk=statistics.pk).update(
+            report_context=statistics.report_context
+        )
+    else:
+        logger.info(
+            "Report context of statistics %s is incomplete (top video metadata "
+            "not available).",
+            statistics.public_id,
+        )
+
+    timeout = REPORT_CONTEXT_TIMEOUT if complete else INCOMPLETE_REPORT_CONTEXT_TIMEOUT
+    cache.set(get_report_context_key(statistics), context, timeout=timeout)
+
+
+def get_report_context(
+    statistics: TikTokWatchHistoryStatistics,
+    top_video_metadata: dict | None = None,
+) -> dict:
+    """Returns the report context of the statistics.
+
+    Looks the context up in the cache and the statistics row and only
+    computes it if it has not been stored yet.
+
+    Args:
+        statistics: The statistics to derive the context from.
+        top_video_metadata: The oEmbed metadata of the top video. Only used
+            if the stored context does not hold it yet.
+
+    Returns:
+        dict: The report context with the activity images.
+    """
+    key = get_report_context_key(statistics)
+    context = cache.get(key)
+    if context is None and statistics.report_context is not None:
+        context = deserialize_report_context(statistics.report_context)
+        cache.set(key, context, timeout=REPORT_CONTEXT_TIMEOUT)
+
+    if context is None:
+        context = store_report_context(statistics, top_video_metadata)
+    elif top_video_metadata is not None and not is_complete(statistics, context):
+        context = add_top_video_metadata(statistics, context, top_video_metadata)
+    return add_activity_images(statistics, context)
@@ -1,5 +1,8 @@
 import random
-import xml.etree.ElementTree as ET
+from enum import StrEnum
+
+import numpy as np
+from django.core.cache import cache
 
 _CELL_W = 13
 _CELL_H = 16
@@ -9,6 +12,9 @@ _ANIM_BASE_DELAY = 0.6
 _ANIM_DAY_STEP = 0.04
 _ANIM_HOUR_STEP = 0.005
 
+ACTIVITY_IMAGE_KEY = "reports:activity-image:{statistics_id}:{color_set}"
+ACTIVITY_IMAGE_TIMEOUT = 60 * 60 * 24
+
 _GRADIENT_SETS = [
     ["#89F8C3", "#FFE2A5", "#FF9BBA"],
     ["#FF9BBA", "#FFE2A5", "#89F8C3"],
@@ -35,67 +41,67 @@ def _anim_begin(day_idx: int, hour_idx: int, *, base: float = 0.0) -> str:
     return f"{delay}s"
 
 
-def _add_fade(
-    parent: ET.Element,
-    *,
-    from_: str | int,
-    to: str | int,
-    begin: str,
-) -> None:
-    ET.SubElement(
-        parent,
-        "animate",
-        {
-            "attributeName": "opacity",
-            "from": str(from_),
-            "to": str(to),
-            "dur": "0.1s",
-            "begin": begin,
-            "fill": "freeze",
-        },
+def _fade(*, from_: str | int, to: str | int, begin: str) -> str:
+    return (
+        f'<animate attributeName="opacity" from="{from_}" to="{to}" dur="0.1s" '
+        f'begin="{begin}" fill="freeze" />'
+    )
+
+
+def _gradient(grad_id: str, stops: list[str]) -> str:
+    stop_elements = "".join(
+        f'<stop offset="{offset}" stop-color="{color}" />'
+        for offset, color in zip(("0%", "65%", "100%"), stops, strict=False)
     )
+    return (
+        f'<linearGradient id="{grad_id}" x1="0" y1="0" x2="1" y2="0.6">'
+        f"{stop_elements}</linearGradient>"
+    )
+
 
+class ActivityImageVariant(StrEnum):
+    ANIMATED = "animated"
+    STATIC = "static"
+    HIGHLIGHTED_ANIMATED = "highlighted_animated"
+    HIGHLIGHTED_STATIC = "highlighted_static"
 
-def generate_activity_image_svg(  # noqa: C901
-    activity_data: list[list[int]],
+    @classmethod
+    def get(cls, *, highlight_days: bool, animated: bool) -> "ActivityImageVariant":
+        if highlight_days:
+            return cls.HIGHLIGHTED_ANIMATED if animated else cls.HIGHLIGHTED_STATIC
+        return cls.ANIMATED if animated else cls.STATIC
+
+
+def generate_activity_image_svgs(
+    activity_data: np.ndarray | list[list[int]],
     *,
-    highlight_days: bool = False,
-    animated: bool = True,
     color_set: int | None = None,
-) -> str:
+) -> dict[ActivityImageVariant, str]:
     """
-    Generate an SVG image of activity data.
+    Generate all variants of the SVG image of activity data in a single pass.
+
+    The activity matrix is only walked once; every cell is formatted once and
+    the resulting fragments are shared between the variants.
 
     Args:
-        activity_data: A list of 30 rows (days), each with 24 values (hours).
-            1 = activity (black), 0 = no activity (white).
-        highlight_days: If True, colors the day rows with activity.
-        animated: If True, adds animations.
+        activity_data: An array of 30 rows (days), each with 24 values
+            (hours). Values > 0 = activity (black), 0 = no activity (white).
         color_set: Which color set to use. None picks one at random.
 
     Returns:
-        SVG string.
+        dict: The SVG string of every ActivityImageVariant.
     """
-    days = len(activity_data)
-    hours = len(activity_data[0])
+    V = ActivityImageVariant  # noqa: N806
+
+    active = np.asarray(activity_data) > 0
+    days, hours = active.shape
 
     grid_w = hours * _CELL_W
     grid_h = days * _CELL_H
     total_w = grid_w + 2 * _PADDING + 2 * _BORDER
     total_h = grid_h + 2 * _PADDING + 2 * _BORDER
-
-    svg = ET.Element(
-        "svg",
-        {
-            "xmlns": "http://www.w3.org/2000/svg",
-            "width": "100%",
-            "height": "50vh",
-            "viewBox": f"0 0 {total_w} {total_h}",
-            "shape-rendering": "crispEdges",
-        },
-    )
-
-    defs = ET.SubElement(svg, "defs")
+    grid_x = _PADDING + _BORDER
+    grid_y = _PADDING + _BORDER
 
     idx = (
         color_set % len(_GRADIENT_SETS)
@@ -104,110 +110,122 @@ def generate_activity_image_svg(  # noqa: C901
     )
     gradient_colors = _GRADIENT_SETS[idx]
 
-    def _add_gradient(grad_id: str, stops: list[str]) -> None:
-        grad = ET.SubElement(
-            defs,
-            "linearGradient",
-            {"id": grad_id, "x1": "0", "y1": "0", "x2": "1", "y2": "0.6"},
-        )
-        for offset, color in zip(("0%", "65%", "100%"), stops, strict=False):
-            ET.SubElement(grad, "stop", {"offset": offset, "stop-color": color})
-
-    _add_gradient("cellGradient", gradient_colors)
-    _add_gradient("borderGradient", list(reversed(gradient_colors)))
-
-    grid_x = _PADDING + _BORDER
-    grid_y = _PADDING + _BORDER
-
-    ET.SubElement(
-        svg,
-        "rect",
-        {
-            "x": "0",
-            "y": "0",
-            "width": str(total_w),
-            "height": str(total_h),
-            "fill": "url(#cellGradient)",
-        },
-    )
-    ET.SubElement(
-        svg,
-        "rect",
-        {
-            "x": str(grid_x),
-            "y": str(grid_y),
-            "width": str(grid_w),
-            "height": str(grid_h),
-            "fill": "url(#borderGradient)" if highlight_days else "white",
-        },
+    head = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" height="50vh" '
+        f'viewBox="0 0 {total_w} {total_h}" shape-rendering="crispEdges">'
+        f"<defs>{_gradient('cellGradient', gradient_colors)}"
+        f"{_gradient('borderGradient', list(reversed(gradient_colors)))}</defs>"
+        f'<rect x="0" y="0" width="{total_w}" height="{total_h}" '
+        f'fill="url(#cellGradient)" />'
     )
-
-    # Pass 1: active (black) cells
-    for day_idx, day_row in enumerate(activity_data[:days]):
-        for hour_idx, activity in enumerate(day_row[:hours]):
-            if activity <= 0:
-                continue
-
-            x = grid_x + hour_idx * _CELL_W
-            y = grid_y + day_idx * _CELL_H
+    grid = f'<rect x="{grid_x}" y="{grid_y}" width="{grid_w}" height="{grid_h}" '
+    heads = {
+        V.ANIMATED: f'{head}{grid}fill="white" />',
+        V.STATIC: f'{head}{grid}fill="white" />',
+        V.HIGHLIGHTED_ANIMATED: f'{head}{grid}fill="url(#borderGradient)" />',
+        V.HIGHLIGHTED_STATIC: f'{head}{grid}fill="url(#borderGradient)" />',
+    }
+
+    # Active (black) cells are drawn first, inactive (white) cells on top.
+    black = []  # Same for all variants except ANIMATED
+    black_animated = []
+    white = []  # Same for all variants except the highlighted ones
+    white_highlighted_animated = []
+    white_highlighted_static = []
+
+    days_with_activity = active.any(axis=1).tolist()
+    for day_idx, day_row in enumerate(active.tolist()):
+        row_has_activity = days_with_activity[day_idx]
+        y = grid_y + day_idx * _CELL_H
+
+        for hour_idx, activity in enumerate(day_row):
             w, h = _cell_size(hour_idx, day_idx, hours, days)
-            show_immediately = not animated or highlight_days
-
-            rect = ET.SubElement(
-                svg,
-                "rect",
-                {
-                    "x": str(x),
-                    "y": str(y),
-                    "width": str(w),
-                    "height": str(h),
-                    "fill": "black",
-                    "opacity": "1" if show_immediately else "0",
-                },
+            rect = (
+                f'<rect x="{grid_x + hour_idx * _CELL_W}" y="{y}" '
+                f'width="{w}" height="{h}" '
             )
 
-            if not show_immediately:
-                _add_fade(
-                    rect,
+            if activity:
+                black.append(f'{rect}fill="black" opacity="1" />')
+                fade = _fade(
                     from_=0,
                     to=1,
                     begin=_anim_begin(day_idx, hour_idx, base=_ANIM_BASE_DELAY),
                 )
+                black_animated.append(f'{rect}fill="black" opacity="0">{fade}</rect>')
+                continue
 
-    # Pass 2: inactive (white) cells on top
-    for day_idx, day_row in enumerate(activity_data[:days]):
-        row_has_activity = any(v > 0 for v in day_row)
-        color_inactive = highlight_days and row_has_activity
+            cell = f'{rect}fill="white" />'
+            white.append(cell)
+            if row_has_activity:
+                fade = _fade(from_=1, to=0, begin=_anim_begin(day_idx, hour_idx))
+                white_highlighted_animated.append(f'{rect}fill="white">{fade}</rect>')
+            else:
+                white_highlighted_animated.append(cell)
+                white_highlighted_static.append(cell)
+
+    black = "".join(black)
+    white = "".join(white)
+    bodies = {
+        V.ANIMATED: "".join(black_animated) + white,
+        V.STATIC: black + white,
+        V.HIGHLIGHTED_ANIMATED: black + "".join(white_highlighted_animated),
+        V.HIGHLIGHTED_STATIC: black + "".join(white_highlighted_static),
+    }
+    return {variant: f"{heads[variant]}{bodies[variant]}</svg>" for variant in V}
+
+
+def get_activity_image_svgs(
+    statistics_id: str,
+    activity_data: np.ndarray | list[list[int]],
+    *,
+    color_set: int,
+) -> dict[ActivityImageVariant, str]:
+    """
+    Get all variants of the SVG image of activity data from the cache.
 
-        for hour_idx, activity in enumerate(day_row[:hours]):
-            if activity > 0:
-                continue
+    The images are only generated if they are not cached yet for the given
+    statistics and color set.
 
-            if row_has_activity and color_inactive and not animated:
-                continue
+    Args:
+        statistics_id: The public ID of the statistics the activity data
+            belongs to.
+        activity_data: See generate_activity_image_svgs().
+        color_set: Which color set to use.
 
-            x = grid_x + hour_idx * _CELL_W
-            y = grid_y + day_idx * _CELL_H
-            w, h = _cell_size(hour_idx, day_idx, hours, days)
+    Returns:
+        dict: The SVG string of every ActivityImageVariant.
+    """
+    key = ACTIVITY_IMAGE_KEY.format(statistics_id=statistics_id, color_set=color_set)
+    svgs = cache.get(key)
+    if svgs is None:
+        svgs = generate_activity_image_svgs(activity_data, color_set=color_set)
+        cache.set(key, svgs, timeout=ACTIVITY_IMAGE_TIMEOUT)
+    return svgs
 
-            rect = ET.SubElement(
-                svg,
-                "rect",
-                {
-                    "x": str(x),
-                    "y": str(y),
-                    "width": str(w),
-                    "height": str(h),
-                    "fill": "white",
-                },
-            )
 
-            if color_inactive and animated:
-                _add_fade(
-                    rect,
-                    from_=1,
-                    to=0,
-                    begin=_anim_begin(day_idx, hour_idx),
-                )
+def generate_activity_image_svg(
+    activity_data: np.ndarray | list[list[int]],
+    *,
+    highlight_days: bool = False,
+    animated: bool = True,
+    color_set: int | None = None,
+) -> str:
+    """
+    Generate an SVG image of activity data.
 
-    return ET.tostring(svg, encoding="unicode", xml_declaration=False)
+    To render several variants of the same image, use
+    generate_activity_image_svgs().
+
+    Args:
+        activity_data: An array of 30 rows (days), each with 24 values
+            (hours). Values > 0 = activity (black), 0 = no activity (white).
+        highlight_days: If True, colors the day rows with activity.
+        animated: If True, adds animations.
+        color_set: Which color set to use. None picks one at random.
+
+    Returns:
+        SVG string.
+    """
+    variant = ActivityImageVariant.get(highlight_days=highlight_days, animated=animated)
+    return generate_activity_image_svgs(activity_data, color_set=color_set)[variant]
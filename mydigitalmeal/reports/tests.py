@@ -1,5 +1,147 @@
-from django.test import TestCase
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from mydigitalmeal.reports.context import (
+    get_report_context,
+    has_report_context,
+    store_report_context,
+)
+from mydigitalmeal.reports.plots.activity_image import (
+    ActivityImageVariant,
+    generate_activity_image_svg,
+    generate_activity_image_svgs,
+    get_activity_image_svgs,
+)
+from mydigitalmeal.statistics.models import (
+    StatisticsScope,
+    TikTokWatchHistoryStatistics,
+)
 
 
 class TikTokViewTests(TestCase):
     """Tests for TikTok report views."""
+
+
+class ActivityImageTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.activity = [[0] * 24 for _ in range(30)]
+        self.activity[0][5] = 1
+        self.activity[3][20] = 1
+
+    def test_variants(self):
+        svgs = generate_activity_image_svgs(self.activity, color_set=1)
+
+        self.assertEqual(set(svgs), set(ActivityImageVariant))
+        self.assertEqual(svgs[ActivityImageVariant.STATIC].count('fill="black"'), 2)
+        self.assertNotIn("<animate", svgs[ActivityImageVariant.STATIC])
+        self.assertEqual(svgs[ActivityImageVariant.ANIMATED].count("<animate"), 2)
+        # Inactive cells of both active days fade out.
+        self.assertEqual(
+            svgs[ActivityImageVariant.HIGHLIGHTED_ANIMATED].count("<animate"), 46
+        )
+        # Inactive cells of active days are not drawn.
+        self.assertEqual(
+            svgs[ActivityImageVariant.HIGHLIGHTED_STATIC].count('fill="white"'),
+            28 * 24,
+        )
+
+    def test_single_variant(self):
+        svg = generate_activity_image_svg(
+            self.activity, highlight_days=True, animated=False, color_set=1
+        )
+        svgs = generate_activity_image_svgs(self.activity, color_set=1)
+        self.assertEqual(svg, svgs[ActivityImageVariant.HIGHLIGHTED_STATIC])
+
+    def test_images_are_cached(self):
+        svgs = get_activity_image_svgs("stats-id", self.activity, color_set=1)
+
+        other_activity = [[1] * 24 for _ in range(30)]
+        cached = get_activity_image_svgs("stats-id", other_activity, color_set=1)
+        self.assertEqual(cached, svgs)
+
+        other_colors = get_activity_image_svgs("stats-id", self.activity, color_set=2)
+        self.assertNotEqual(other_colors, svgs)
+
+
+class ReportContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        activity = [[0] * 24 for _ in range(30)]
+        activity[0][5] = 1
+        self.stats = TikTokWatchHistoryStatistics.objects.create(
+            scope=StatisticsScope.INTERVAL,
+            total_videos=10,
+            videos_per_day=2.5,
+            peak_day_date=date(2025, 3, 1),
+            peak_day_video_count=7,
+            top_video_id="123",
+            top_video_seen_count=3,
+            date_hour_activity_matrix=activity,
+        )
+        self.metadata = {"thumbnail": "https://example.com/t.jpg", "channel": "c"}
+
+    def test_context_is_stored(self):
+        context = store_report_context(self.stats, self.metadata)
+
+        self.stats.refresh_from_db()
+        self.assertTrue(has_report_context(self.stats))
+        self.assertEqual(context["top_video_thumbnail_url"], self.metadata["thumbnail"])
+
+        # The stored context is used instead of recomputing it.
+        cache.clear()
+        stored = get_report_context(self.stats)
+        self.assertEqual({key: stored[key] for key in context}, context)
+        self.assertEqual(stored["peak_day_date"], date(2025, 3, 1))
+        self.assertIn(True, stored["peak_guesses"].values())
+
+    def test_context_is_cached(self):
+        context = get_report_context(self.stats, self.metadata)
+
+        TikTokWatchHistoryStatistics.objects.update(report_context=None)
+        self.stats.report_context = None
+        self.assertEqual(get_report_context(self.stats), context)
+
+    def test_activity_images_are_not_stored(self):
+        store_report_context(self.stats, self.metadata)
+        self.stats.refresh_from_db()
+        self.assertNotIn("usage_img", self.stats.report_context)
+
+        context = get_report_context(self.stats)
+        svgs = get_activity_image_svgs(
+            self.stats.public_id,
+            self.stats.date_hour_activity_matrix,
+            color_set=self.stats.report_context["usage_img_color_set"],
+        )
+        self.assertEqual(context["usage_img"], svgs[ActivityImageVariant.ANIMATED])
+        self.assertEqual(
+            context["usage_img_highlighted_static"],
+            svgs[ActivityImageVariant.HIGHLIGHTED_STATIC],
+        )
+
+    def test_incomplete_context_is_not_stored(self):
+        context = store_report_context(self.stats)
+
+        self.stats.refresh_from_db()
+        self.assertIsNone(self.stats.report_context)
+        self.assertFalse(has_report_context(self.stats))
+
+        # The top video metadata is added to the cached context.
+        completed = get_report_context(self.stats, self.metadata)
+        self.assertEqual(
+            completed["top_video_thumbnail_url"], self.metadata["thumbnail"]
+        )
+        self.assertEqual(completed["peak_guesses"], context["peak_guesses"])
+        self.stats.refresh_from_db()
+        self.assertIsNotNone(self.stats.report_context)
+
+    def test_context_of_computed_statistics_is_stored(self):
+        # Freshly computed statistics hold numpy scalars.
+        self.stats.top_video_seen_count = np.int64(3)
+        store_report_context(self.stats, self.metadata)
+
+        self.stats.refresh_from_db()
+        self.assertEqual(self.stats.report_context["top_video_seen_count"], 3)
@@ -1,23 +1,28 @@
-import requests
+import httpx
 
+from shared.portability.http import async_http_client
 
-def get_tiktok_video_metadata(
-    video_id: str, session: requests.Session | None = None
-) -> dict:
-    """Get TikTok video metadata from official embed API."""
-    if session is None:
-        session = requests.Session()
 
-    url = (
+def get_tiktok_video_metadata_url(video_id: str) -> str:
+    return (
         f"https://www.tiktok.com/oembed?url=https://www.tiktok.com/@/video/{video_id}/"
     )
 
+
+def parse_tiktok_video_metadata(data: dict) -> dict:
+    thumbnail = data.get("thumbnail_url")
+    channel = data.get("author_name")
+    return {"thumbnail": thumbnail, "channel": channel}
+
+
+async def aget_tiktok_video_metadata(video_id: str) -> dict:
+    """Get TikTok video metadata from official embed API."""
+    url = get_tiktok_video_metadata_url(video_id)
+
     try:
-        response = session.get(url)
+        response = await async_http_client.get(url, endpoint="tiktok.oembed")
         response.raise_for_status()
         data = response.json()
-    except:  # noqa: E722
+    except (httpx.HTTPError, ValueError):
         data = {}
-    thumbnail = data.get("thumbnail_url")
-    channel = data.get("author_name")
-    return {"thumbnail": thumbnail, "channel": channel}
+    return parse_tiktok_video_metadata(data)
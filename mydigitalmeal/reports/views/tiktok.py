@@ -1,17 +1,17 @@
 import logging
-import random
 
+from asgiref.sync import sync_to_async
 from django.http import HttpResponse
 from django.urls import reverse, reverse_lazy
-from django.utils.safestring import mark_safe
 from django.views.generic import TemplateView
 
 from mydigitalmeal.profiles.mixins import LoginAndProfileRequiredMixin
-from mydigitalmeal.reports.plots.activity_image import generate_activity_image_svg
-from mydigitalmeal.reports.utils import get_tiktok_video_metadata
+from mydigitalmeal.reports.context import get_report_context, has_report_context
+from mydigitalmeal.reports.utils import aget_tiktok_video_metadata
 from mydigitalmeal.statistics.models import StatisticsRequest, StatisticsScope
 from mydigitalmeal.userflow.constants import URLShortcut
 from mydigitalmeal.userflow.sessions import AddUserflowSessionMixin
+from shared.views import AsyncDispatchMixin
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +26,16 @@ class NoReportView(LoginAndProfileRequiredMixin, TemplateView):
 
 
 class BaseStatisticsView(AddUserflowSessionMixin, TemplateView):
+    """Renders the statistics of the statistics request in the userflow session.
+
+    The handler is async, so that the oEmbed lookup of the top video does not
+    block a worker. Concrete views must list AsyncDispatchMixin first.
+    """
+
     template_name = "reports/tiktok/partials/_combined_statistics.html"
     session_invalid_redirect = URLShortcut.OVERVIEW
     statistics_request: StatisticsRequest | None = None
+    top_video_metadata: dict | None = None
 
     def validate_userflow_session(self, request, *args, **kwargs):
         """Redirect to entry view if no statistics request ID in session"""
@@ -43,7 +50,30 @@ class BaseStatisticsView(AddUserflowSessionMixin, TemplateView):
         response["HX-Redirect"] = reverse(url_name)
         return response
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
+        response = await sync_to_async(self.load_statistics_request)()
+        if response:
+            return response
+
+        if (
+            self.statistics_request.is_ready()
+            and self._stats.top_video_id
+            and not await sync_to_async(has_report_context)(self._stats)
+        ):
+            self.top_video_metadata = await aget_tiktok_video_metadata(
+                self._stats.top_video_id
+            )
+
+        context = await sync_to_async(self.get_context_data)(**kwargs)
+        return self.render_to_response(context)
+
+    def load_statistics_request(self) -> HttpResponse | None:
+        """Loads the statistics request and its statistics.
+
+        Returns:
+            HttpResponse | None: A redirect if the statistics are not available,
+                None otherwise.
+        """
         session = self.userflow_session.get()
         try:
             self.statistics_request = StatisticsRequest.objects.get(
@@ -78,7 +108,7 @@ class BaseStatisticsView(AddUserflowSessionMixin, TemplateView):
                 )
                 return self.htmx_redirect("mdm:userflow:reports:report_unavailable")
 
-        return super().get(request, *args, **kwargs)
+        return None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -87,28 +117,7 @@ class BaseStatisticsView(AddUserflowSessionMixin, TemplateView):
             # Waiting for statistics request to complete
             return context
 
-        context |= self._get_video_viewed_stats()
-        context |= self._get_daily_routine_stats()
-        context |= self._get_usage_session_scrolling()
-        context |= self._get_top_video()
-        context |= self._get_peak_day()
-        context |= self._get_usage_session_general()
-
-        # Check if none of the individual sections have data to show. Happens
-        # when the donated watch history has entries, but none of them fall
-        # within the INTERVAL scope's date range (default: last 30 days).
-        context["no_activity_in_report_period"] = not any(
-            context[flag]
-            for flag in (
-                "video_viewed_stats_available",
-                "daily_routine_available",
-                "usage_session_scrolling_available",
-                "top_video_available",
-                "peak_day_available",
-                "usage_session_general_available",
-            )
-        )
-
+        context |= get_report_context(self._stats, self.top_video_metadata)
         context["statistics_ready"] = True
 
         return context
@@ -120,161 +129,8 @@ class BaseStatisticsView(AddUserflowSessionMixin, TemplateView):
             .first()
         )
 
-    def not_all_stats_none(self, d: dict) -> bool:
-        return any(s is not None for s in d.values())
-
-    def _get_video_viewed_stats(self) -> dict:
-        stats = {
-            "videos_total": self._stats.total_videos,
-            "videos_per_day": self._stats.videos_per_day,
-        }
-        stats.update({"video_viewed_stats_available": self.not_all_stats_none(stats)})
-        return stats
-
-    def _get_daily_routine_stats(self) -> dict:
-        hour_start = self._stats.peak_hour
-        hour_start = 0 if hour_start == 24 else hour_start  # noqa: PLR2004
-        hour_end = hour_start + 1 if hour_start is not None else None
-
-        stats = {
-            "routine_start_hour": hour_start,
-            "routine_end_hour": hour_end,
-        }
-        stats.update({"daily_routine_available": self.not_all_stats_none(stats)})
-        return stats
-
-    def _get_usage_session_scrolling(self) -> dict:
-        stats = {
-            "scroll_threshold_pct": self._stats.scroll_threshold_pct,
-            "scroll_threshold_sec": self._stats.scroll_threshold_sec,
-        }
-        stats.update(
-            {"usage_session_scrolling_available": self.not_all_stats_none(stats)}
-        )
-        return stats
-
-    def _get_top_video(self) -> dict:
-        video_metadata = get_tiktok_video_metadata(self._stats.top_video_id)
-        # TODO: Fallback when video does not exist;
-        #  currently, this report part will just be skipped
-        stats = {
-            "top_video_thumbnail_url": video_metadata.get("thumbnail"),
-            "top_video_channel": video_metadata.get("channel"),
-            "top_video_seen_count": self._stats.top_video_seen_count,
-            "top_video_last_seen_date": self._stats.top_video_last_seen_date,
-        }
-
-        stats.update({"top_video_available": self.not_all_stats_none(stats)})
-        return stats
-
-    def _get_peak_day(self) -> dict:
-        def generate_guess_options(correct: int, n_options: int = 3) -> dict[int, bool]:
-            options = {
-                correct: True,
-            }
-
-            # Prepare options depending on correct value
-            if correct == 1:
-                options[0] = False
-                multiplier_min = 2
-                multiplier_max = 10
-
-            elif correct < 10:  # noqa: PLR2004
-                multiplier_min = 0.3
-                multiplier_max = 6
-
-            else:
-                multiplier_min = 0.5
-                multiplier_max = 1.5
-
-            # Generate options for larger correct number
-            base_value = correct if correct > 0 else 1
-            while (
-                len(options) < n_options and len(options) <= base_value * multiplier_max
-            ):
-                multiplier = random.uniform(multiplier_min, multiplier_max)  # noqa: S311
-                guess = round(base_value * multiplier)
-                if guess not in options and guess > 0:
-                    options[guess] = False
-
-            return dict(sorted(options.items(), key=lambda item: item[0]))
-
-        video_count = self._stats.peak_day_video_count
-        stats = {
-            "peak_day_date": self._stats.peak_day_date,
-            "peak_day_video_count": video_count,
-        }
-
-        stats_available = self.not_all_stats_none(stats)
-
-        if stats_available and video_count is not None:
-            peak_guesses = generate_guess_options(video_count)
-        else:
-            peak_guesses = None
-
-        stats.update(
-            {
-                "peak_day_available": self.not_all_stats_none(stats),
-                "peak_guesses": peak_guesses,
-            }
-        )
-        return stats
-
-    def _get_usage_session_general(self) -> dict:
-        usage_session_total_seconds = self._stats.avg_session_duration_seconds
-        if usage_session_total_seconds:
-            session_hours, remainder = divmod(usage_session_total_seconds, 3600)
-            session_minutes, session_seconds = divmod(remainder, 60)
-
-            session_minutes = int(session_minutes)
-            session_hours = int(session_hours)
-        else:
-            session_hours, session_minutes, session_seconds = None, None, None
-
-        stats: dict[any] = {
-            "usage_session_n_days": self._stats.total_days_with_activity,
-            "usage_session_seconds": session_seconds,
-            "usage_session_minutes": session_minutes,
-            "usage_session_hours": session_hours,
-            "usage_session_videos_mean": self._stats.avg_videos_per_session,
-        }
-
-        stats.update(
-            {"usage_session_general_available": self.not_all_stats_none(stats)}
-        )
-
-        activity_matrix = self._stats.date_hour_activity_matrix
-        if activity_matrix:
-            color_choice = random.choice(list(range(1, 7)))  # noqa: S311
-            usage_img_animated = generate_activity_image_svg(
-                activity_matrix, color_set=color_choice
-            )
-            usage_img_static = generate_activity_image_svg(
-                activity_matrix, animated=False, color_set=color_choice
-            )
-            usage_img_highlighted_animated = generate_activity_image_svg(
-                activity_matrix, highlight_days=True, color_set=color_choice
-            )
-            usage_img_highlighted_static = generate_activity_image_svg(
-                activity_matrix,
-                highlight_days=True,
-                animated=False,
-                color_set=color_choice,
-            )
-
-            stats.update(
-                {
-                    "usage_img": mark_safe(usage_img_animated),  # noqa: S308
-                    "usage_img_static": mark_safe(usage_img_static),  # noqa: S308
-                    "usage_img_highlighted": mark_safe(usage_img_highlighted_animated),  # noqa: S308
-                    "usage_img_highlighted_static": mark_safe(  # noqa: S308
-                        usage_img_highlighted_static
-                    ),
-                }
-            )
-
-        return stats
-
 
-class StatisticsView(LoginAndProfileRequiredMixin, BaseStatisticsView):
+class StatisticsView(
+    AsyncDispatchMixin, LoginAndProfileRequiredMixin, BaseStatisticsView
+):
     """Adds Login required to statistics view for standard My Digital Meal flow."""
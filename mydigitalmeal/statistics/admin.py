@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from mydigitalmeal.statistics.models.base import StatisticsRequest
+from mydigitalmeal.statistics.models.cohort import TikTokCohortStatistics
 from mydigitalmeal.statistics.models.tiktok import TikTokWatchHistoryStatistics
 
 
@@ -16,3 +17,9 @@ class StatisticsRequestAdmin(admin.ModelAdmin):
     list_display = ["public_id", "status", "profile", "requested_at", "updated_at"]
     readonly_fields = ["public_id", "requested_at"]
     list_filter = ["status", "requested_at"]
+
+
+@admin.register(TikTokCohortStatistics)
+class TikTokCohortStatisticsAdmin(admin.ModelAdmin):
+    list_display = ["project", "n_statistics", "date_updated"]
+    readonly_fields = ["n_statistics", "date_updated"]
@@ -0,0 +1,393 @@
+"""Streaming exports of statistics and participation data for researchers.
+
+Rows are read from the database in chunks of ``EXPORT_CHUNK_SIZE`` rows and
+written incrementally, so that memory usage does not depend on the number of
+exported rows. The chunks are read with keyset pagination (see
+`iter_chunks`): the MySQL backend has no server-side cursors, so
+``QuerySet.iterator()`` would load the whole result set into memory. The
+exports are available through the ``export_statistics`` management command
+and the staff-only ``StatisticsExportView``.
+"""
+
+import csv
+import datetime
+import io
+import itertools
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+from ddm.participation.models import Participant
+from django.db.models import QuerySet
+
+from mydigitalmeal.statistics.models import (
+    StatisticsRequest,
+    TikTokCohortStatistics,
+    TikTokWatchHistoryStatistics,
+)
+from mydigitalmeal.statistics.services.cohort_statistics import get_cohort_summary
+from mydigitalmeal.studies.constants import (
+    PARTICIPATION_TRAIL_DLUL,
+    PARTICIPATION_TRAIL_PAPI,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def iter_chunks(queryset: QuerySet) -> Iterator[list]:
+    """Yields the results of a queryset in chunks of EXPORT_CHUNK_SIZE rows.
+
+    Each chunk is read with a separate query for the rows following the last
+    pk of the previous chunk. The queryset must not be sliced or ordered; for
+    querysets of values_list(), the pk must be the first value.
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        if last_pk is not None:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:EXPORT_CHUNK_SIZE])
+        else:
+            chunk = list(queryset[:EXPORT_CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+        last = chunk[-1]
+        last_pk = last[0] if isinstance(last, tuple) else last.pk
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+EXPORT_CONTENT_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+@dataclass
+class ExportFilters:
+    """Filters applied to an export. Unset filters are ignored.
+
+    Attributes:
+        project: url_id of the DDM project.
+        date_from: First day to include (inclusive).
+        date_to: Last day to include (inclusive).
+        scope: StatisticsScope of the statistics (only applies to datasets
+            with a scope).
+    """
+
+    project: str | None = None
+    date_from: datetime.date | None = None
+    date_to: datetime.date | None = None
+    scope: str | None = None
+
+
+class ExportDataset:
+    """Base class of the exportable datasets.
+
+    Subclasses define the exported columns as (column name, type) tuples,
+    where type is one of "str", "int", "float", "bool", "date" and
+    "datetime". By default, a column is read from the model field (or
+    lookup) of the same name; differing lookups are defined in `lookups`.
+    """
+
+    name: str
+    columns: list[tuple[str, str]]
+    lookups: dict[str, str] = {}
+    project_lookup: str
+    date_lookup: str
+    scope_lookup: str | None = None
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+    @property
+    def column_types(self) -> list[str]:
+        return [column_type for _, column_type in self.columns]
+
+    def get_base_queryset(self) -> QuerySet:
+        raise NotImplementedError
+
+    def get_queryset(self, filters: ExportFilters) -> QuerySet:
+        queryset = self.get_base_queryset()
+        if filters.project:
+            queryset = queryset.filter(**{self.project_lookup: filters.project})
+        if filters.date_from:
+            queryset = queryset.filter(
+                **{f"{self.date_lookup}__date__gte": filters.date_from}
+            )
+        if filters.date_to:
+            queryset = queryset.filter(
+                **{f"{self.date_lookup}__date__lte": filters.date_to}
+            )
+        if filters.scope and self.scope_lookup:
+            queryset = queryset.filter(**{self.scope_lookup: filters.scope})
+        return queryset
+
+    def get_rows(self, filters: ExportFilters) -> Iterator[tuple]:
+        lookups = [self.lookups.get(name, name) for name in self.column_names]
+        queryset = self.get_queryset(filters).values_list("pk", *lookups)
+        for chunk in iter_chunks(queryset):
+            for _, *values in chunk:
+                yield tuple(values)
+
+
+class StatisticsDataset(ExportDataset):
+    name = "statistics"
+    columns = [
+        ("public_id", "str"),
+        ("project", "str"),
+        ("participant", "str"),
+        ("scope", "str"),
+        ("interval_start", "datetime"),
+        ("interval_end", "datetime"),
+        ("date_first_video", "datetime"),
+        ("date_last_video", "datetime"),
+        ("total_videos", "int"),
+        ("total_videos_unique", "int"),
+        ("videos_per_day", "float"),
+        ("total_days_with_activity", "int"),
+        ("scroll_threshold_pct", "float"),
+        ("scroll_threshold_sec", "float"),
+        ("peak_day_date", "date"),
+        ("peak_day_video_count", "int"),
+        ("peak_hour", "int"),
+        ("session_threshold_seconds", "int"),
+        ("avg_session_duration_seconds", "float"),
+        ("avg_videos_per_session", "float"),
+        ("avg_seconds_per_video", "float"),
+        ("top_video_id", "str"),
+        ("top_video_seen_count", "int"),
+        ("top_video_last_seen_date", "datetime"),
+        ("date_created", "datetime"),
+    ]
+    lookups = {
+        "project": "request__participant__project__url_id",
+        "participant": "request__participant__external_id",
+    }
+    project_lookup = "request__participant__project__url_id"
+    date_lookup = "date_created"
+    scope_lookup = "scope"
+
+    def get_base_queryset(self) -> QuerySet:
+        return TikTokWatchHistoryStatistics.objects.all()
+
+    def get_rows(self, filters: ExportFilters) -> Iterator[tuple]:
+        for public_id, *values in super().get_rows(filters):
+            yield (str(public_id), *values)
+
+
+class StatisticsRequestDataset(ExportDataset):
+    name = "statistics_requests"
+    # `public_id` is not exported: corrupted values in that column have been
+    # observed to raise on fetch (see mydigitalmeal.statistics.tasks).
+    columns = [
+        ("id", "int"),
+        ("project", "str"),
+        ("participant", "str"),
+        ("status", "str"),
+        ("status_detail", "str"),
+        ("requested_at", "datetime"),
+        ("updated_at", "datetime"),
+    ]
+    lookups = {
+        "project": "participant__project__url_id",
+        "participant": "participant__external_id",
+    }
+    project_lookup = "participant__project__url_id"
+    date_lookup = "requested_at"
+
+    def get_base_queryset(self) -> QuerySet:
+        return StatisticsRequest.objects.all()
+
+
+# Union of the steps of all participation trails, in order.
+PARTICIPATION_TRAIL_STEPS = sorted(PARTICIPATION_TRAIL_DLUL | PARTICIPATION_TRAIL_PAPI)
+
+
+class ParticipationTrailDataset(ExportDataset):
+    name = "participation_trails"
+    columns = [
+        ("participant", "str"),
+        ("project", "str"),
+        ("start_time", "datetime"),
+        ("end_time", "datetime"),
+        ("completed", "bool"),
+        ("method", "str"),
+        *((step, "str") for step in PARTICIPATION_TRAIL_STEPS),
+    ]
+    project_lookup = "project__url_id"
+    date_lookup = "start_time"
+
+    def get_base_queryset(self) -> QuerySet:
+        return Participant.objects.filter(extra_data__has_key="participation_trail")
+
+    def get_rows(self, filters: ExportFilters) -> Iterator[tuple]:
+        queryset = self.get_queryset(filters).values_list(
+            "pk",
+            "external_id",
+            "project__url_id",
+            "start_time",
+            "end_time",
+            "completed",
+            "extra_data",
+        )
+        for chunk in iter_chunks(queryset):
+            for _, *values, extra_data in chunk:
+                trail = extra_data.get("participation_trail") or {}
+                yield (
+                    *values,
+                    extra_data.get("method"),
+                    *(trail.get(step) for step in PARTICIPATION_TRAIL_STEPS),
+                )
+
+
+class CohortStatisticsDataset(ExportDataset):
+    """One row per cohort and statistics field (see get_cohort_summary())."""
+
+    name = "cohort_statistics"
+    columns = [
+        ("project", "str"),
+        ("n_statistics", "int"),
+        ("field", "str"),
+        ("n", "int"),
+        ("mean", "float"),
+        ("std", "float"),
+        ("median", "float"),
+        ("date_updated", "datetime"),
+    ]
+    project_lookup = "project__url_id"
+    date_lookup = "date_updated"
+
+    def get_base_queryset(self) -> QuerySet:
+        return TikTokCohortStatistics.objects.select_related("project")
+
+    def get_rows(self, filters: ExportFilters) -> Iterator[tuple]:
+        cohorts = itertools.chain.from_iterable(iter_chunks(self.get_queryset(filters)))
+        for cohort in cohorts:
+            for field in get_cohort_summary(cohort)["fields"]:
+                yield (
+                    cohort.project.url_id,
+                    cohort.n_statistics,
+                    field["name"],
+                    field["n"],
+                    field["mean"],
+                    field["std"],
+                    field["median"],
+                    cohort.date_updated,
+                )
+
+
+EXPORT_DATASETS = {
+    dataset.name: dataset
+    for dataset in [
+        StatisticsDataset(),
+        StatisticsRequestDataset(),
+        ParticipationTrailDataset(),
+        CohortStatisticsDataset(),
+    ]
+}
+
+
+class _Echo:
+    """File-like object returning what is written to it (for csv.writer)."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_csv(columns: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    """Yields the header and the rows as CSV lines."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only buffer that can be emptied while keeping track of the
+    position (required by the parquet writer to compute offsets).
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(
+    columns: list[str],
+    column_types: list[str],
+    rows: Iterable[tuple],
+    batch_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yields the rows as parquet file, written in row groups of batch_size."""
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    arrow_types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema(
+        [
+            (name, arrow_types[column_type])
+            for name, column_type in zip(columns, column_types, strict=True)
+        ]
+    )
+
+    buffer = _ChunkBuffer()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        rows = iter(rows)
+        while batch := list(itertools.islice(rows, batch_size)):
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*batch, strict=True), schema, strict=True)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def stream_export(
+    dataset_name: str,
+    export_format: ExportFormat,
+    filters: ExportFilters,
+) -> Iterator[Any]:
+    """Yields the chunks of an export of the given dataset.
+
+    Args:
+        dataset_name: One of EXPORT_DATASETS.
+        export_format: CSV (yields str) or PARQUET (yields bytes).
+        filters: The filters to apply.
+    """
+    dataset = EXPORT_DATASETS[dataset_name]
+    rows = dataset.get_rows(filters)
+    if export_format == ExportFormat.PARQUET:
+        return stream_parquet(dataset.column_names, dataset.column_types, rows)
+    return stream_csv(dataset.column_names, rows)
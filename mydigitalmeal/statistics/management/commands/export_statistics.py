@@ -0,0 +1,79 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mydigitalmeal.statistics.exports import (
+    EXPORT_DATASETS,
+    ExportFilters,
+    ExportFormat,
+    stream_export,
+)
+from mydigitalmeal.statistics.models import StatisticsScope
+
+
+def parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as e:
+        msg = f"Invalid date: {value} (expected YYYY-MM-DD)."
+        raise CommandError(msg) from e
+
+
+class Command(BaseCommand):
+    """Export statistics and participation data as CSV or Parquet.
+
+    The data is streamed to the output in chunks, so that exports of large
+    tables do not need to fit into memory.
+
+    Example:
+        python manage.py export_statistics statistics --project T3kwxKKQ
+            --scope INTERVAL --from 2025-01-01 --format parquet
+            --output statistics.parquet
+    """
+
+    help = "Export statistics and participation data as CSV or Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(EXPORT_DATASETS))
+        parser.add_argument(
+            "--format",
+            choices=[f.value for f in ExportFormat],
+            default=ExportFormat.CSV.value,
+        )
+        parser.add_argument("--project", help="url_id of the DDM project.")
+        parser.add_argument("--from", dest="date_from", type=parse_date)
+        parser.add_argument("--to", dest="date_to", type=parse_date)
+        parser.add_argument("--scope", choices=list(StatisticsScope.values))
+        parser.add_argument(
+            "--output",
+            help="Path of the output file. Defaults to stdout (CSV only).",
+        )
+
+    def handle(self, *args, **options):
+        export_format = ExportFormat(options["format"])
+        if export_format == ExportFormat.PARQUET and not options["output"]:
+            msg = "Parquet exports require --output."
+            raise CommandError(msg)
+
+        filters = ExportFilters(
+            project=options["project"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            scope=options["scope"],
+        )
+        chunks = stream_export(options["dataset"], export_format, filters)
+
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        mode = "wb" if export_format == ExportFormat.PARQUET else "w"
+        newline = None if export_format == ExportFormat.PARQUET else ""
+        with open(options["output"], mode, newline=newline) as f:  # noqa: PTH123
+            for chunk in chunks:
+                f.write(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}.")
+        )
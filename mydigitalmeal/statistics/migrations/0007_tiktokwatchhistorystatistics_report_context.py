@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-19 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mydigitalmeal_statistics', '0006_tiktokwatchhistorystatistics_date_hour_activity_matrix'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tiktokwatchhistorystatistics',
+            name='report_context',
+            field=models.JSONField(blank=True, help_text='Report context derived from these statistics (see mydigitalmeal.reports.context).', null=True),
+        ),
+    ]
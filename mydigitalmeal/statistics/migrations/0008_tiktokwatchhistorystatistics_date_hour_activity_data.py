@@ -0,0 +1,69 @@
+import struct
+import zlib
+
+import numpy as np
+from django.db import migrations, models
+
+# Frozen copy of the matrix encoding at the time of this migration (see
+# mydigitalmeal.statistics.utils.general.matrix), so that later changes to
+# the encoding do not change what this migration writes.
+MATRIX_HEADER = struct.Struct('<BII')
+MATRIX_FORMATS = {
+    1: np.dtype('<u2'),
+    2: np.dtype('<u4'),
+}
+
+
+def encode_matrix(matrix):
+    """Encode a count matrix as zlib-compressed uint16 values (format 1)."""
+    array = np.asarray(matrix, dtype=np.int64)
+    values = np.clip(array, 0, np.iinfo('<u2').max).astype('<u2')
+    header = MATRIX_HEADER.pack(1, *values.shape)
+    return header + zlib.compress(values.tobytes())
+
+
+def decode_matrix(data):
+    data = bytes(data)
+    matrix_format, rows, columns = MATRIX_HEADER.unpack_from(data)
+    values = zlib.decompress(data[MATRIX_HEADER.size:])
+    dtype = MATRIX_FORMATS[matrix_format]
+    return np.frombuffer(values, dtype=dtype).reshape(rows, columns)
+
+
+def encode_activity_matrices(apps, schema_editor):
+    """Convert the JSON activity matrices to the compact binary encoding."""
+    Statistics = apps.get_model('mydigitalmeal_statistics', 'TikTokWatchHistoryStatistics')
+    statistics = Statistics.objects.exclude(date_hour_activity_matrix__isnull=True)
+    for stats in statistics.only('pk', 'date_hour_activity_matrix').iterator(chunk_size=500):
+        if not stats.date_hour_activity_matrix:
+            continue
+        stats.date_hour_activity_data = encode_matrix(stats.date_hour_activity_matrix)
+        stats.save(update_fields=['date_hour_activity_data'])
+
+
+def decode_activity_matrices(apps, schema_editor):
+    Statistics = apps.get_model('mydigitalmeal_statistics', 'TikTokWatchHistoryStatistics')
+    statistics = Statistics.objects.exclude(date_hour_activity_data__isnull=True)
+    for stats in statistics.only('pk', 'date_hour_activity_data').iterator(chunk_size=500):
+        stats.date_hour_activity_matrix = decode_matrix(stats.date_hour_activity_data).tolist()
+        stats.save(update_fields=['date_hour_activity_matrix'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mydigitalmeal_statistics', '0007_tiktokwatchhistorystatistics_report_context'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tiktokwatchhistorystatistics',
+            name='date_hour_activity_data',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(encode_activity_matrices, decode_activity_matrices),
+        migrations.RemoveField(
+            model_name='tiktokwatchhistorystatistics',
+            name='date_hour_activity_matrix',
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.14 on 2026-10-19 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ddm_projects', '0007_alter_donationproject_custom_uploader_translations'),
+        ('mydigitalmeal_statistics', '0008_tiktokwatchhistorystatistics_date_hour_activity_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tiktokwatchhistorystatistics',
+            name='included_in_cohort',
+            field=models.BooleanField(default=False, help_text='Whether these statistics have been added to the cohort statistics of the study project.'),
+        ),
+        migrations.CreateModel(
+            name='TikTokCohortStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('n_statistics', models.PositiveIntegerField(default=0, help_text='Number of statistics rows included in the aggregates.')),
+                ('moments', models.JSONField(default=dict)),
+                ('sketches', models.JSONField(default=dict)),
+                ('histograms', models.JSONField(default=dict)),
+                ('activity_matrix_data', models.BinaryField(blank=True, null=True)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tiktok_cohort_statistics', to='ddm_projects.donationproject')),
+            ],
+            options={
+                'verbose_name': 'TikTok Cohort Statistics',
+                'verbose_name_plural': 'TikTok Cohort Statistics',
+            },
+        ),
+    ]
@@ -1,8 +1,10 @@
 from .base import StatisticsRequest, StatisticsScope
+from .cohort import TikTokCohortStatistics
 from .tiktok import TikTokWatchHistoryStatistics
 
 __all__ = [
     "StatisticsRequest",
     "StatisticsScope",
+    "TikTokCohortStatistics",
     "TikTokWatchHistoryStatistics",
 ]
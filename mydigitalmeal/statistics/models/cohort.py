@@ -0,0 +1,59 @@
+import numpy as np
+from django.db import models
+
+from mydigitalmeal.statistics.utils.general.matrix import decode_matrix, encode_matrix
+
+
+class TikTokCohortStatistics(models.Model):
+    """Running aggregates of the TikTok statistics of a study's participants.
+
+    Every INTERVAL statistics row of a participant of a registered study
+    project is folded into these aggregates once it has been computed (see
+    mydigitalmeal.statistics.services.cohort_statistics). The aggregates are
+    mergeable, so that reading them does not depend on the size of the cohort.
+    """
+
+    project = models.OneToOneField(
+        "ddm_projects.DonationProject",
+        on_delete=models.CASCADE,
+        related_name="tiktok_cohort_statistics",
+    )
+
+    n_statistics = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of statistics rows included in the aggregates.",
+    )
+
+    # Per field: {"n": int, "sum": float, "sum_sq": float}
+    moments = models.JSONField(default=dict)
+    # Per field: serialized QuantileSketch
+    sketches = models.JSONField(default=dict)
+    # Per field: list of counts per bin (see COHORT_HISTOGRAM_BINS)
+    histograms = models.JSONField(default=dict)
+
+    # Encoded with encode_matrix(); use activity_matrix to access.
+    activity_matrix_data = models.BinaryField(
+        null=True, blank=True
+    )  # shape (n days, 24), aligned at the last day of the interval
+
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "TikTok Cohort Statistics"
+        verbose_name_plural = "TikTok Cohort Statistics"
+
+    def __str__(self):
+        return f"TikTok cohort statistics of project {self.project_id}"
+
+    @property
+    def activity_matrix(self) -> np.ndarray | None:
+        """Summed number of videos watched per day (rows) and hour (columns)."""
+        if self.activity_matrix_data is None:
+            return None
+        return decode_matrix(self.activity_matrix_data)
+
+    @activity_matrix.setter
+    def activity_matrix(self, matrix: np.ndarray | None) -> None:
+        self.activity_matrix_data = (
+            None if matrix is None else encode_matrix(matrix, dtype="<u4")
+        )
@@ -1,7 +1,9 @@
+import numpy as np
 from django.core.validators import MaxValueValidator
 from django.db import models
 
 from mydigitalmeal.statistics.models.base import BaseModelStatistics, StatisticsScope
+from mydigitalmeal.statistics.utils.general.matrix import decode_matrix, encode_matrix
 
 
 class TikTokWatchHistoryStatistics(BaseModelStatistics):
@@ -106,15 +108,46 @@ class TikTokWatchHistoryStatistics(BaseModelStatistics):
     top_video_seen_count = models.PositiveIntegerField(null=True, blank=True)
     top_video_last_seen_date = models.DateTimeField(null=True, blank=True)
 
-    date_hour_activity_matrix = models.JSONField(
+    # Encoded with encode_matrix(); use date_hour_activity_matrix to access.
+    date_hour_activity_data = models.BinaryField(
         null=True, blank=True
-    )  # list[list[int]], shape (n dates, 24)
+    )  # shape (n dates, 24)
+
+    report_context = models.JSONField(
+        null=True,
+        blank=True,
+        help_text=(
+            "Report context derived from these statistics "
+            "(see mydigitalmeal.reports.context)."
+        ),
+    )
+
+    included_in_cohort = models.BooleanField(
+        default=False,
+        help_text=(
+            "Whether these statistics have been added to the cohort statistics "
+            "of the study project."
+        ),
+    )
 
     class Meta:
         verbose_name = "TikTok Watch History Statistics"
         verbose_name_plural = "TikTok Watch History Statistics"
         ordering = ["-date_created"]
 
+    @property
+    def date_hour_activity_matrix(self) -> np.ndarray | None:
+        """Number of videos watched per date (rows) and hour (columns)."""
+        if self.date_hour_activity_data is None:
+            return None
+        return decode_matrix(self.date_hour_activity_data)
+
+    @date_hour_activity_matrix.setter
+    def date_hour_activity_matrix(
+        self, matrix: np.ndarray | list[list[int]] | None
+    ) -> None:
+        self.date_hour_activity_data = None if matrix is None else encode_matrix(matrix)
+
     def __str__(self):
         return f"TikTok Watch History Statistics {self.public_id} ({self.scope})"
 
@@ -0,0 +1,209 @@
+import math
+from typing import Any
+
+import numpy as np
+
+from digital_meal.core.timing import timed_stage
+from mydigitalmeal.statistics.models import (
+    TikTokCohortStatistics,
+    TikTokWatchHistoryStatistics,
+)
+
+# Statistics fields aggregated across the participants of a study.
+COHORT_FIELDS = [
+    "total_videos",
+    "videos_per_day",
+    "total_days_with_activity",
+    "avg_session_duration_seconds",
+    "avg_videos_per_session",
+    "avg_seconds_per_video",
+    "peak_hour",
+]
+
+# Lower bin edges of the histograms; the last bin is open-ended.
+COHORT_HISTOGRAM_BINS = {
+    "videos_per_day": [0, 10, 25, 50, 100, 200, 400],
+    "avg_session_duration_seconds": [0, 60, 300, 600, 1200, 1800, 3600, 7200],
+    "peak_hour": list(range(24)),
+}
+
+
+class QuantileSketch:
+    """Mergeable sketch to estimate quantiles of non-negative values.
+
+    Values are counted in logarithmic buckets, so that every estimated
+    quantile lies within the given relative accuracy of the true value
+    (see Masson et al., "DDSketch", 2019). Sketches of different cohorts
+    can be merged by adding up their bucket counts.
+
+    Args:
+        relative_accuracy: Maximal relative error of the estimated quantiles.
+    """
+
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        if value < 0:
+            msg = f"QuantileSketch only supports non-negative values, got {value}."
+            raise ValueError(msg)
+
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value, self.gamma))
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            msg = "Cannot merge sketches with different relative accuracies."
+            raise ValueError(msg)
+
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        """Returns the estimated q-quantile or None if the sketch is empty."""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        cumulative = self.zero_count
+        if rank < cumulative:
+            return 0.0
+        for key in sorted(self.buckets):
+            cumulative += self.buckets[key]
+            if rank < cumulative:
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(key): count for key, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.buckets = {int(key): count for key, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        return sketch
+
+
+def get_histogram_bin(field: str, value: float) -> int:
+    edges = COHORT_HISTOGRAM_BINS[field]
+    return max(0, int(np.searchsorted(edges, value, side="right")) - 1)
+
+
+def add_activity_matrices(
+    matrix_a: np.ndarray | None, matrix_b: np.ndarray
+) -> np.ndarray:
+    """Sum up two date-hour activity matrices aligned at their last day."""
+    if matrix_a is None:
+        return matrix_b.astype(np.int64)
+
+    days = max(len(matrix_a), len(matrix_b))
+    total = np.zeros((days, 24), dtype=np.int64)
+    total[days - len(matrix_a) :] += matrix_a
+    total[days - len(matrix_b) :] += matrix_b
+    return total
+
+
+@timed_stage("cohort-update")
+def add_to_cohort_statistics(
+    cohort: TikTokCohortStatistics,
+    statistics: TikTokWatchHistoryStatistics,
+) -> None:
+    """Fold a statistics row into the running aggregates of a cohort.
+
+    Updates the cohort in place; the caller is responsible for saving it.
+    """
+    for field in COHORT_FIELDS:
+        value = getattr(statistics, field)
+        if value is None:
+            continue
+        value = float(value)
+
+        moments = cohort.moments.setdefault(field, {"n": 0, "sum": 0.0, "sum_sq": 0.0})
+        moments["n"] += 1
+        moments["sum"] += value
+        moments["sum_sq"] += value**2
+
+        sketch = (
+            QuantileSketch.from_dict(cohort.sketches[field])
+            if field in cohort.sketches
+            else QuantileSketch()
+        )
+        sketch.add(value)
+        cohort.sketches[field] = sketch.to_dict()
+
+        if field in COHORT_HISTOGRAM_BINS:
+            histogram = cohort.histograms.setdefault(
+                field, [0] * len(COHORT_HISTOGRAM_BINS[field])
+            )
+            histogram[get_histogram_bin(field, value)] += 1
+
+    activity_matrix = statistics.date_hour_activity_matrix
+    if activity_matrix is not None and activity_matrix.size:
+        cohort.activity_matrix = add_activity_matrices(
+            cohort.activity_matrix, activity_matrix
+        )
+
+    cohort.n_statistics += 1
+
+
+@timed_stage("cohort-summary")
+def get_cohort_summary(cohort: TikTokCohortStatistics) -> dict[str, Any]:
+    """Derive descriptive statistics from the running aggregates of a cohort.
+
+    Returns:
+        dict: Includes "fields" (n, mean, standard deviation and median per
+            field), "histograms" (list of (lower bin edge, count) per field)
+            and "hourly_activity" (summed videos per hour of the day).
+    """
+    fields = []
+    for field in COHORT_FIELDS:
+        moments = cohort.moments.get(field)
+        if not moments:
+            continue
+
+        n = moments["n"]
+        mean = moments["sum"] / n
+        std = None
+        if n > 1:
+            variance = (moments["sum_sq"] - n * mean**2) / (n - 1)
+            std = math.sqrt(max(variance, 0.0))
+        median = QuantileSketch.from_dict(cohort.sketches[field]).quantile(0.5)
+        fields.append(
+            {"name": field, "n": n, "mean": mean, "std": std, "median": median}
+        )
+
+    histograms = {
+        field: list(zip(COHORT_HISTOGRAM_BINS[field], counts, strict=True))
+        for field, counts in cohort.histograms.items()
+    }
+
+    activity_matrix = cohort.activity_matrix
+    hourly_activity = (
+        activity_matrix.sum(axis=0).tolist() if activity_matrix is not None else []
+    )
+
+    return {
+        "n_statistics": cohort.n_statistics,
+        "fields": fields,
+        "histograms": histograms,
+        "hourly_activity": hourly_activity,
+    }
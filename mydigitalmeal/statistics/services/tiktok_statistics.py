@@ -5,6 +5,7 @@ import pandas as pd
 from django.utils import timezone
 
 import mydigitalmeal.statistics.utils.general.data as data_utils
+from digital_meal.core.timing import timed_stage
 from mydigitalmeal.statistics.models.base import StatisticsScope
 from mydigitalmeal.statistics.utils.tiktok.data import load_tiktok_watch_history
 
@@ -85,6 +86,7 @@ class WatchHistoryStatisticsGenerator:
         self.data: pd.DataFrame = self._load_and_filter_data()
         self.stats: dict = {}
 
+    @timed_stage("load")
     def _load_and_filter_data(self) -> pd.DataFrame:
         """Load data and filter by interval if applicable."""
 
@@ -145,6 +147,7 @@ class WatchHistoryStatisticsGenerator:
         self.stats.update(stats)
         return stats
 
+    @timed_stage("video-counts")
     def compute_video_counts(self) -> dict[str, Any]:
         """Compute video counts. Returns values and updates self.stats.
 
@@ -173,6 +176,7 @@ class WatchHistoryStatisticsGenerator:
         self.stats.update(stats)
         return stats
 
+    @timed_stage("peak-activity")
     def compute_peak_activity(self) -> dict[str, Any]:
         """Compute peak activity stats. Returns values and updates self.stats.
 
@@ -192,6 +196,7 @@ class WatchHistoryStatisticsGenerator:
         self.stats.update(stats)
         return stats
 
+    @timed_stage("sessions")
     def compute_session_statistics(
         self,
         cache_interim_result: bool = True,  # noqa: FBT002
@@ -237,6 +242,7 @@ class WatchHistoryStatisticsGenerator:
         result = series.mean()
         return None if pd.isna(result) else result
 
+    @timed_stage("scrolling")
     def compute_scrolling_statistics(
         self,
         threshold_options: list | None = None,
@@ -287,6 +293,7 @@ class WatchHistoryStatisticsGenerator:
         self.stats.update(stats)
         return stats
 
+    @timed_stage("top-video")
     def get_top_video(self) -> dict[str, Any]:
         """Get most watched video. Returns values and updates self.stats.
 
@@ -331,6 +338,7 @@ class WatchHistoryStatisticsGenerator:
         self.stats.update(stats)
         return stats
 
+    @timed_stage("activity-matrix")
     def get_date_hour_activity_matrix(self) -> dict[str, Any]:
         """Get date hour matrix from given series.
 
@@ -347,7 +355,7 @@ class WatchHistoryStatisticsGenerator:
             min_date,
             max_date,
         )
-        activity_matrix = activity_df.to_numpy().tolist()
+        activity_matrix = activity_df.to_numpy()
 
         stats = {
             "date_hour_activity_matrix": activity_matrix,
@@ -3,18 +3,24 @@ import logging
 from celery import shared_task
 from celery.exceptions import MaxRetriesExceededError
 from ddm.datadonation.models import DataDonation
+from django.conf import settings
+from django.db import transaction
 
+from digital_meal.core.timing import collect_timings, timed_stage
 from mydigitalmeal.datadonation.utils import get_tiktok_wh_data
+from mydigitalmeal.reports.context import store_report_context
 from mydigitalmeal.statistics.models.base import StatisticsRequest, StatisticsScope
+from mydigitalmeal.statistics.models.cohort import TikTokCohortStatistics
 from mydigitalmeal.statistics.models.tiktok import TikTokWatchHistoryStatistics
-from mydigitalmeal.statistics.services.tiktok_statistics import (
-    WatchHistoryStatisticsGenerator,
+from mydigitalmeal.statistics.services.cohort_statistics import (
+    add_to_cohort_statistics,
 )
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, max_retries=3)
+@collect_timings("compute_tiktok_wh_statistics_from_donation")
 def compute_tiktok_wh_statistics_from_donation(
     self,
     statistics_scope: StatisticsScope = StatisticsScope.FULL,
@@ -48,10 +54,17 @@ def compute_tiktok_wh_statistics_from_donation(
         logger.error("StatisticsRequest %s not found, aborting.", statistics_request_id)
         return None
 
+    # Imported here, as it imports pandas (see preload_heavy_modules in
+    # config.celery_app); views dispatching this task do not need it.
+    from mydigitalmeal.statistics.services.tiktok_statistics import (  # noqa: PLC0415
+        WatchHistoryStatisticsGenerator,
+    )
+
     participant = statistics_request.participant
 
     try:
-        watch_history_data = get_tiktok_wh_data(participant, ddm_project_id)
+        with timed_stage("decrypt"):
+            watch_history_data = get_tiktok_wh_data(participant, ddm_project_id)
 
         if not watch_history_data:
             statistics_request.set_failed(status_detail="No data in watch history")
@@ -75,6 +88,25 @@ def compute_tiktok_wh_statistics_from_donation(
             **stats_dict,
         )
         stats.save()
+
+        if stats.scope == StatisticsScope.INTERVAL:
+            # The report is based on the interval statistics.
+            try:
+                store_report_context(stats)
+            except Exception:
+                logger.exception(
+                    "Failed to compute report context for statistics %s.",
+                    stats.public_id,
+                )
+
+            try:
+                update_cohort_statistics.delay(str(stats.public_id))
+            except Exception:
+                logger.exception(
+                    "Failed to schedule cohort statistics update for statistics %s.",
+                    stats.public_id,
+                )
+
         statistics_request.set_success()
 
         logger.info(
@@ -109,3 +141,49 @@ def compute_tiktok_wh_statistics_from_donation(
             if statistics_request:
                 statistics_request.set_failed()
             raise
+
+
+@shared_task(ignore_result=True)
+@collect_timings("update_cohort_statistics")
+def update_cohort_statistics(statistics_id: str) -> None:
+    """Add INTERVAL statistics to the cohort statistics of their study project.
+
+    Statistics of participants of projects that are not registered as study
+    projects are ignored. Every statistics row is only added once.
+
+    Args:
+        statistics_id: The public ID of the TikTokWatchHistoryStatistics.
+    """
+    stats = (
+        TikTokWatchHistoryStatistics.objects.select_related(
+            "request__participant__project"
+        )
+        .filter(public_id=statistics_id, scope=StatisticsScope.INTERVAL)
+        .first()
+    )
+    if not stats or not stats.request or not stats.request.participant:
+        logger.warning("No participant statistics %s found.", statistics_id)
+        return
+
+    project = stats.request.participant.project
+    if project.url_id not in settings.REGISTERED_STUDY_PROJECTS:
+        return
+
+    with transaction.atomic():
+        claimed = TikTokWatchHistoryStatistics.objects.filter(
+            pk=stats.pk, included_in_cohort=False
+        ).update(included_in_cohort=True)
+        if not claimed:
+            logger.info("Statistics %s already added to cohort.", statistics_id)
+            return
+
+        TikTokCohortStatistics.objects.get_or_create(project=project)
+        cohort = TikTokCohortStatistics.objects.select_for_update().get(project=project)
+        add_to_cohort_statistics(cohort, stats)
+        cohort.save()
+
+    logger.info(
+        "Added statistics %s to cohort statistics of project %s.",
+        statistics_id,
+        project.url_id,
+    )
@@ -0,0 +1,184 @@
+import csv
+import datetime
+import io
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject, ResearchProfile
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mydigitalmeal.statistics.exports import (
+    ExportFilters,
+    ExportFormat,
+    stream_export,
+)
+from mydigitalmeal.statistics.models import (
+    StatisticsRequest,
+    StatisticsScope,
+    TikTokWatchHistoryStatistics,
+)
+
+User = get_user_model()
+
+
+def read_csv(chunks) -> list[dict]:
+    return list(csv.DictReader(io.StringIO("".join(chunks))))
+
+
+class TestStatisticsExport(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(
+            email="projecttest@mail.com", username="projectuser", password="testpass"
+        )
+        self.project = DonationProject.objects.create(
+            owner=ResearchProfile.objects.create(user=owner),
+            slug="some-study",
+            url_id="T3kwxKKQ",
+        )
+        self.participant = Participant.objects.create(
+            project=self.project,
+            start_time=timezone.now(),
+            external_id="a" * 24,
+            extra_data={
+                "method": "port-api",
+                "participation_trail": {"a_enrolled": "2025-01-01T10:00:00+00:00"},
+            },
+        )
+        request = StatisticsRequest.objects.create(participant=self.participant)
+        for scope in [StatisticsScope.FULL, StatisticsScope.INTERVAL]:
+            TikTokWatchHistoryStatistics.objects.create(
+                request=request, scope=scope, total_videos=10, videos_per_day=2.5
+            )
+        TikTokWatchHistoryStatistics.objects.create(
+            scope=StatisticsScope.INTERVAL,
+            date_created=timezone.now() - datetime.timedelta(days=10),
+        )
+
+    def test_csv_export(self):
+        rows = read_csv(stream_export("statistics", ExportFormat.CSV, ExportFilters()))
+
+        self.assertEqual(len(rows), 3)
+        row = next(r for r in rows if r["scope"] == StatisticsScope.FULL)
+        self.assertEqual(row["project"], self.project.url_id)
+        self.assertEqual(row["participant"], self.participant.external_id)
+        self.assertEqual(row["videos_per_day"], "2.5")
+
+    def test_filters(self):
+        filters = ExportFilters(project=self.project.url_id, scope="INTERVAL")
+        rows = read_csv(stream_export("statistics", ExportFormat.CSV, filters))
+        self.assertEqual(len(rows), 1)
+
+        filters = ExportFilters(date_to=timezone.now().date() - datetime.timedelta(1))
+        rows = read_csv(stream_export("statistics", ExportFormat.CSV, filters))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["project"], "")
+
+    @patch("mydigitalmeal.statistics.exports.EXPORT_CHUNK_SIZE", 2)
+    def test_rows_are_read_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = read_csv(
+                stream_export("statistics", ExportFormat.CSV, ExportFilters())
+            )
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertIn("LIMIT 2", query["sql"])
+
+    def test_participation_trail_export(self):
+        chunks = stream_export(
+            "participation_trails", ExportFormat.CSV, ExportFilters()
+        )
+        rows = read_csv(chunks)
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["method"], "port-api")
+        self.assertEqual(rows[0]["a_enrolled"], "2025-01-01T10:00:00+00:00")
+        self.assertEqual(rows[0]["e_entered_debrief"], "")
+
+    def test_statistics_requests_export(self):
+        chunks = stream_export("statistics_requests", ExportFormat.CSV, ExportFilters())
+        rows = read_csv(chunks)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["status"], StatisticsRequest.States.PENDING)
+
+    def test_parquet_export(self):
+        chunks = stream_export("statistics", ExportFormat.PARQUET, ExportFilters())
+        table = pq.read_table(io.BytesIO(b"".join(chunks)))
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(
+            sorted(table.column("total_videos").to_pylist(), key=str), [10, 10, None]
+        )
+
+    def test_management_command(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "statistics.parquet"
+            call_command(
+                "export_statistics",
+                "statistics",
+                "--format=parquet",
+                "--scope=FULL",
+                f"--output={path}",
+                stdout=io.StringIO(),
+            )
+            self.assertEqual(pq.read_table(path).num_rows, 1)
+
+        stdout = io.StringIO()
+        call_command("export_statistics", "statistics_requests", stdout=stdout)
+        self.assertEqual(len(read_csv([stdout.getvalue()])), 1)
+
+    def test_export_view_requires_staff(self):
+        url = reverse(
+            "mdm:userflow:statistics:export", kwargs={"dataset": "statistics"}
+        )
+        user = User.objects.create_user(
+            email="user@mail.com", username="user", password="testpass"
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_view(self):
+        url = reverse(
+            "mdm:userflow:statistics:export", kwargs={"dataset": "statistics"}
+        )
+        staff_user = User.objects.create_user(
+            email="staff@mail.com", username="staff", password="testpass", is_staff=True
+        )
+        self.client.force_login(staff_user)
+
+        response = self.client.get(url, {"scope": "FULL"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(read_csv(c.decode() for c in response)), 1)
+
+        response = self.client.get(url, {"from": "not-a-date"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_export_view_streams_under_asgi(self):
+        url = reverse(
+            "mdm:userflow:statistics:export", kwargs={"dataset": "statistics"}
+        )
+        staff_user = await User.objects.acreate(
+            email="staff@mail.com", username="staff", is_staff=True
+        )
+        await self.async_client.aforce_login(staff_user)
+
+        response = await self.async_client.get(url)
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk.decode() async for chunk in response]
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(len(read_csv(chunks)), 3)
@@ -1,3 +1,4 @@
+import numpy as np
 from django.test import TestCase
 
 from mydigitalmeal.statistics.models import (
@@ -50,4 +51,16 @@ class TestStatisticsRequestModel(TestCase):
 
 
 class TestTikTokWatchHistoryStatisticsModel(TestCase):
-    pass
+    def test_date_hour_activity_matrix(self):
+        matrix = np.zeros((30, 24), dtype=np.int64)
+        matrix[2, 5] = 4
+        stats = TikTokWatchHistoryStatistics.objects.create(
+            scope=StatisticsScope.FULL, date_hour_activity_matrix=matrix
+        )
+        stats.refresh_from_db()
+
+        np.testing.assert_array_equal(stats.date_hour_activity_matrix, matrix)
+
+    def test_date_hour_activity_matrix_empty(self):
+        stats = TikTokWatchHistoryStatistics.objects.create(scope=StatisticsScope.FULL)
+        self.assertIsNone(stats.date_hour_activity_matrix)
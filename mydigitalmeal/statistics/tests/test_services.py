@@ -1,9 +1,19 @@
 import datetime
 
+import numpy as np
 import pandas as pd
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
+from mydigitalmeal.statistics.models import (
+    TikTokCohortStatistics,
+    TikTokWatchHistoryStatistics,
+)
 from mydigitalmeal.statistics.models.base import StatisticsScope
+from mydigitalmeal.statistics.services.cohort_statistics import (
+    QuantileSketch,
+    add_to_cohort_statistics,
+    get_cohort_summary,
+)
 from mydigitalmeal.statistics.services.tiktok_statistics import (
     WatchHistoryStatisticsGenerator,
 )
@@ -242,3 +252,72 @@ class TestWatchHistoryStatisticsGenerator(TestCase):
                     "scroll_threshold_sec": expected_sec,
                 }
                 self.assertEqual(result, expected)
+
+
+class TestQuantileSketch(SimpleTestCase):
+    def test_median_within_relative_accuracy(self):
+        values = np.random.default_rng(0).lognormal(3, 1, size=1000)
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        median = np.quantile(values, 0.5, method="lower")
+        self.assertAlmostEqual(sketch.quantile(0.5), median, delta=median * 0.01)
+
+    def test_merge(self):
+        sketch_a, sketch_b, sketch_all = (
+            QuantileSketch(),
+            QuantileSketch(),
+            QuantileSketch(),
+        )
+        for value in [0, 1, 2, 3]:
+            sketch_a.add(value)
+            sketch_all.add(value)
+        for value in [10, 20, 30]:
+            sketch_b.add(value)
+            sketch_all.add(value)
+
+        sketch_a.merge(sketch_b)
+
+        self.assertEqual(sketch_a.to_dict(), sketch_all.to_dict())
+        self.assertEqual(sketch_a.quantile(0), 0)
+
+    def test_serialization(self):
+        sketch = QuantileSketch()
+        sketch.add(5)
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+        self.assertEqual(restored.quantile(0.5), sketch.quantile(0.5))
+
+    def test_empty_sketch(self):
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+
+
+class TestCohortStatistics(SimpleTestCase):
+    def test_add_to_cohort_statistics(self):
+        cohort = TikTokCohortStatistics()
+        for videos_per_day, peak_hour, days in [(10, 20, 2), (20, 21, 3), (30, 20, 2)]:
+            matrix = np.zeros((days, 24), dtype=int)
+            matrix[-1, peak_hour] = videos_per_day
+            add_to_cohort_statistics(
+                cohort,
+                TikTokWatchHistoryStatistics(
+                    scope=StatisticsScope.INTERVAL,
+                    videos_per_day=videos_per_day,
+                    peak_hour=peak_hour,
+                    date_hour_activity_matrix=matrix,
+                ),
+            )
+
+        summary = get_cohort_summary(cohort)
+        fields = {field["name"]: field for field in summary["fields"]}
+
+        self.assertEqual(summary["n_statistics"], 3)
+        self.assertEqual(fields["videos_per_day"]["mean"], 20)
+        self.assertAlmostEqual(fields["videos_per_day"]["std"], 10)
+        self.assertAlmostEqual(fields["videos_per_day"]["median"], 20, delta=0.2)
+        self.assertNotIn("total_videos", fields)
+        self.assertEqual(summary["histograms"]["videos_per_day"][1], (10, 2))
+        self.assertEqual(summary["histograms"]["peak_hour"][20], (20, 2))
+        self.assertEqual(cohort.activity_matrix.shape, (3, 24))
+        self.assertEqual(cohort.activity_matrix[-1].sum(), 60)
+        self.assertEqual(summary["hourly_activity"][20], 40)
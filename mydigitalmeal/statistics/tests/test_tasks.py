@@ -1,10 +1,22 @@
 from unittest.mock import patch
 
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject, ResearchProfile
+from django.contrib.auth import get_user_model
 from django.db import connection
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
-from mydigitalmeal.statistics.models import StatisticsRequest, StatisticsScope
-from mydigitalmeal.statistics.tasks import compute_tiktok_wh_statistics_from_donation
+from mydigitalmeal.statistics.models import (
+    StatisticsRequest,
+    StatisticsScope,
+    TikTokCohortStatistics,
+    TikTokWatchHistoryStatistics,
+)
+from mydigitalmeal.statistics.tasks import (
+    compute_tiktok_wh_statistics_from_donation,
+    update_cohort_statistics,
+)
 
 
 def _corrupt_public_id(pk: int) -> None:
@@ -61,3 +73,38 @@ class TestComputeTiktokWhStatisticsFromDonation(TestCase):
         )
         self.assertEqual(updated.status, StatisticsRequest.States.FAILED)
         self.assertEqual(updated.status_detail, "No data in watch history")
+
+
+@override_settings(REGISTERED_STUDY_PROJECTS=["T3kwxKKQ"])
+class TestUpdateCohortStatistics(TestCase):
+    def setUp(self):
+        owner = get_user_model().objects.create_user(
+            email="projecttest@mail.com", username="projectuser", password="testpass"
+        )
+        self.project = DonationProject.objects.create(
+            owner=ResearchProfile.objects.create(user=owner),
+            slug="some-study",
+            url_id="T3kwxKKQ",
+        )
+        participant = Participant.objects.create(
+            project=self.project, start_time=timezone.now()
+        )
+        self.stats = TikTokWatchHistoryStatistics.objects.create(
+            request=StatisticsRequest.objects.create(participant=participant),
+            scope=StatisticsScope.INTERVAL,
+            videos_per_day=12.5,
+        )
+
+    def test_adds_statistics_once(self):
+        update_cohort_statistics(str(self.stats.public_id))
+        update_cohort_statistics(str(self.stats.public_id))
+
+        cohort = TikTokCohortStatistics.objects.get(project=self.project)
+        self.assertEqual(cohort.n_statistics, 1)
+        self.assertEqual(cohort.moments["videos_per_day"]["sum"], 12.5)
+
+    def test_ignores_unregistered_projects(self):
+        with override_settings(REGISTERED_STUDY_PROJECTS=[]):
+            update_cohort_statistics(str(self.stats.public_id))
+
+        self.assertFalse(TikTokCohortStatistics.objects.exists())
@@ -1,9 +1,11 @@
 import datetime
 
+import numpy as np
 import pandas as pd
 from django.test import TestCase
 
 import mydigitalmeal.statistics.utils.general.data as data_utils
+import mydigitalmeal.statistics.utils.general.matrix as matrix_utils
 import mydigitalmeal.statistics.utils.tiktok.data as tiktok_utils
 
 
@@ -154,6 +156,17 @@ class DataUtilsTests(TestCase):
         loc_date = datetime.date(2025, 10, 8)
         self.assertEqual(result.loc[loc_date, 2], 0)
 
+    def test_encode_matrix(self):
+        matrix = np.array([[0, 1, 2], [3, 70000, 0]])
+        result = matrix_utils.decode_matrix(matrix_utils.encode_matrix(matrix))
+
+        self.assertEqual(result.shape, (2, 3))
+        self.assertEqual(result.tolist(), [[0, 1, 2], [3, 65535, 0]])
+
+    def test_encode_matrix_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            matrix_utils.encode_matrix([1, 2, 3])
+
     def test_get_usage_sessions(self):
         """Test session identification with multiple sessions."""
         dates = pd.Series(
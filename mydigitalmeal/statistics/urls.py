@@ -0,0 +1,12 @@
+from django.urls import path
+
+from mydigitalmeal.statistics import views
+
+app_name = "statistics"
+urlpatterns = [
+    path(
+        "statistics/export/<slug:dataset>/",
+        views.StatisticsExportView.as_view(),
+        name="export",
+    ),
+]
@@ -0,0 +1,66 @@
+"""Compact binary encoding of count matrices.
+
+Kept separate from the pandas-based data utilities, as the statistics models
+use it and importing pandas would slow down the startup of every process.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+# Header of encoded matrices: format, number of rows, number of columns.
+MATRIX_HEADER = struct.Struct("<BII")
+# Value types of the matrix formats.
+MATRIX_FORMATS = {
+    1: np.dtype("<u2"),
+    2: np.dtype("<u4"),
+}
+
+
+def encode_matrix(
+    matrix: np.ndarray | list[list[int]],
+    dtype: np.dtype | str = "<u2",
+) -> bytes:
+    """Encode a 2-dimensional count matrix as compact binary.
+
+    The counts are stored as zlib-compressed unsigned integers (counts above
+    the maximum of the type are capped) following a header holding the
+    format and the shape of the matrix.
+
+    Args:
+        matrix: Array or nested list of non-negative integer counts.
+        dtype: Value type, one of MATRIX_FORMATS. uint16 by default; use
+            uint32 for matrices that sum up counts of many matrices.
+
+    Returns:
+        bytes: The encoded matrix.
+    """
+    array = np.asarray(matrix, dtype=np.int64)
+    if array.ndim != 2:  # noqa: PLR2004
+        msg = f"Expected a 2-dimensional matrix, got {array.ndim} dimensions."
+        raise ValueError(msg)
+    dtype = np.dtype(dtype)
+    formats = {value_type: code for code, value_type in MATRIX_FORMATS.items()}
+    if dtype not in formats:
+        msg = f"Unsupported matrix value type: {dtype}."
+        raise ValueError(msg)
+    values = np.clip(array, 0, np.iinfo(dtype).max).astype(dtype)
+    header = MATRIX_HEADER.pack(formats[dtype], *values.shape)
+    return header + zlib.compress(values.tobytes())
+
+
+def decode_matrix(data: bytes) -> np.ndarray:
+    """Decode a matrix encoded with encode_matrix().
+
+    Returns:
+        np.ndarray: The matrix as unsigned integer array.
+    """
+    data = bytes(data)  # Databases may return a memoryview
+    matrix_format, rows, columns = MATRIX_HEADER.unpack_from(data)
+    if matrix_format not in MATRIX_FORMATS:
+        msg = f"Unknown matrix format: {matrix_format}."
+        raise ValueError(msg)
+    values = zlib.decompress(data[MATRIX_HEADER.size :])
+    dtype = MATRIX_FORMATS[matrix_format]
+    return np.frombuffer(values, dtype=dtype).reshape(rows, columns)
@@ -0,0 +1,72 @@
+from datetime import date
+
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+
+from digital_meal.core.streaming import get_streaming_content
+from mydigitalmeal.statistics.exports import (
+    EXPORT_CONTENT_TYPES,
+    EXPORT_DATASETS,
+    ExportFilters,
+    ExportFormat,
+    stream_export,
+)
+from mydigitalmeal.statistics.models import StatisticsScope
+
+
+class StatisticsExportView(UserPassesTestMixin, View):
+    """Staff-only streaming export of statistics and participation data.
+
+    URL parameters:
+        format: "csv" (default) or "parquet".
+        project: url_id of the DDM project.
+        from: First day to include (YYYY-MM-DD).
+        to: Last day to include (YYYY-MM-DD).
+        scope: StatisticsScope of the statistics.
+    """
+
+    def test_func(self):
+        """Requesting user must pass this test to access view."""
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        dataset = self.kwargs.get("dataset")
+        if dataset not in EXPORT_DATASETS:
+            msg = "Unknown dataset."
+            raise Http404(msg)
+
+        try:
+            export_format = ExportFormat(request.GET.get("format", ExportFormat.CSV))
+            filters = self.get_filters()
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        response = StreamingHttpResponse(
+            get_streaming_content(
+                request, stream_export(dataset, export_format, filters)
+            ),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        filename = f"{dataset}_{timezone.now():%Y%m%d}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_filters(self) -> ExportFilters:
+        params = self.request.GET
+        scope = params.get("scope") or None
+        if scope is not None and scope not in StatisticsScope.values:
+            msg = f"Invalid scope: {scope}."
+            raise ValueError(msg)
+
+        return ExportFilters(
+            project=params.get("project") or None,
+            date_from=self.get_date("from"),
+            date_to=self.get_date("to"),
+            scope=scope,
+        )
+
+    def get_date(self, param: str) -> date | None:
+        value = self.request.GET.get(param)
+        return date.fromisoformat(value) if value else None
@@ -0,0 +1,24 @@
+import logging
+
+from mydigitalmeal.studies.trail import ParticipationTrailBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class ParticipationTrailMiddleware:
+    """Attaches a ParticipationTrailBuffer to the request and flushes it
+    once the response has been created.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.participation_trail = ParticipationTrailBuffer()
+        try:
+            return self.get_response(request)
+        finally:
+            try:
+                request.participation_trail.flush()
+            except Exception:
+                logger.exception("Could not write participation trail updates.")
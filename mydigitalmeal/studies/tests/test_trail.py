@@ -0,0 +1,106 @@
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject, ResearchProfile
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from mydigitalmeal.studies.middleware import ParticipationTrailMiddleware
+from mydigitalmeal.studies.trail import (
+    ParticipationTrailBuffer,
+    update_participant_extra_data,
+    update_participant_trail,
+)
+
+User = get_user_model()
+
+
+class TestParticipationTrailBuffer(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(
+            email="owner@mail.com", username="owner", password="testpass"
+        )
+        cls.project = DonationProject.objects.create(
+            owner=ResearchProfile.objects.create(user=owner),
+            slug="trail-study",
+            url_id="TrailStd",
+        )
+
+    def setUp(self):
+        self.participant = Participant.objects.create(
+            project=self.project,
+            start_time=timezone.now(),
+            extra_data={"participation_trail": {"a_enrolled": None}},
+        )
+
+    def test_changes_are_written_on_flush(self):
+        buffer = ParticipationTrailBuffer()
+        buffer.update(self.participant, method="port-api")
+        buffer.record(self.participant, "a_enrolled")
+        buffer.record(self.participant, "b1_entered_waiting_view")
+
+        self.participant.refresh_from_db()
+        self.assertIsNone(
+            self.participant.extra_data["participation_trail"]["a_enrolled"]
+        )
+
+        with self.assertNumQueries(4):  # savepoint, select, update, release
+            buffer.flush()
+
+        self.participant.refresh_from_db()
+        trail = self.participant.extra_data["participation_trail"]
+        self.assertEqual(self.participant.extra_data["method"], "port-api")
+        self.assertIsNotNone(trail["a_enrolled"])
+        self.assertIsNotNone(trail["b1_entered_waiting_view"])
+
+    def test_flush_merges_with_concurrent_changes(self):
+        buffer = ParticipationTrailBuffer()
+        buffer.record(self.participant, "c1_got_waiting_success")
+
+        stored = Participant.objects.get(pk=self.participant.pk)
+        stored.extra_data["participation_trail"]["b1_entered_waiting_view"] = "then"
+        stored.extra_data["participation_trail"]["c1_got_waiting_success"] = "then"
+        stored.save()
+
+        buffer.flush()
+
+        self.participant.refresh_from_db()
+        trail = self.participant.extra_data["participation_trail"]
+        self.assertEqual(trail["b1_entered_waiting_view"], "then")
+        self.assertEqual(trail["c1_got_waiting_success"], "then")
+
+    def test_existing_trail_event_is_not_recorded(self):
+        update_participant_trail(self.participant, "a_enrolled")
+        buffer = ParticipationTrailBuffer()
+
+        buffer.record(self.participant, "a_enrolled")
+
+        self.assertEqual(buffer.pending, {})
+        with self.assertNumQueries(0):
+            buffer.flush()
+
+    def test_updates_without_buffer_are_saved_immediately(self):
+        request = RequestFactory().get("/")
+
+        update_participant_extra_data(self.participant, request, method="dl-ul")
+        update_participant_trail(self.participant, "a_enrolled", request)
+
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.extra_data["method"], "dl-ul")
+        self.assertIsNotNone(
+            self.participant.extra_data["participation_trail"]["a_enrolled"]
+        )
+
+    def test_middleware_flushes_buffer(self):
+        def view(request):
+            update_participant_trail(self.participant, "a_enrolled", request)
+            update_participant_trail(self.participant, "e_entered_debrief", request)
+            return "response"
+
+        response = ParticipationTrailMiddleware(view)(RequestFactory().get("/"))
+
+        self.assertEqual(response, "response")
+        self.participant.refresh_from_db()
+        trail = self.participant.extra_data["participation_trail"]
+        self.assertIsNotNone(trail["a_enrolled"])
+        self.assertIsNotNone(trail["e_entered_debrief"])
@@ -17,8 +17,10 @@ from django.utils import timezone
 from mydigitalmeal.statistics.models import (
     StatisticsRequest,
     StatisticsScope,
+    TikTokCohortStatistics,
     TikTokWatchHistoryStatistics,
 )
+from mydigitalmeal.statistics.services.cohort_statistics import QuantileSketch
 from mydigitalmeal.studies import urls as studies_urls
 from mydigitalmeal.studies.constants import STUDIES_SESSION_KEY, StudiesURLShortcut
 from mydigitalmeal.studies.sessions import StudyParticipationSession
@@ -999,21 +1001,13 @@ class TestStudyStatisticsView(TestCase):
             videos_per_day=0.5,
         )
 
-        with patch(
-            "mydigitalmeal.reports.views.tiktok.get_tiktok_video_metadata",
-            return_value={},
-        ):
-            response = self.client.get(self.url)
+        response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, 200)
         self.assertNotIn("HX-Redirect", response.headers)
         self.assertTrue(response.context["statistics_ready"])
 
-    @patch(
-        "mydigitalmeal.reports.views.tiktok.get_tiktok_video_metadata",
-        return_value={},
-    )
-    def test_renders_no_activity_message_when_interval_has_no_data(self, _mock):  # noqa: PT019
+    def test_renders_no_activity_message_when_interval_has_no_data(self):
         """Regression test: a SUCCESS request whose INTERVAL row has no
         computed fields (``WatchHistoryStatisticsGenerator`` returns early
         when none of the donated watch history falls in the last 30 days)
@@ -1043,11 +1037,7 @@ class TestStudyStatisticsView(TestCase):
         self.assertFalse(response.context["usage_session_general_available"])
         self.assertContains(response, "keine TikTok-Aktivität gefunden")
 
-    @patch(
-        "mydigitalmeal.reports.views.tiktok.get_tiktok_video_metadata",
-        return_value={},
-    )
-    def test_no_activity_flag_false_when_interval_has_data(self, _mock):  # noqa: PT019
+    def test_no_activity_flag_false_when_interval_has_data(self):
         """Guards against the flag going stale/always-True: with real
         interval data present, the message must not show.
         """
@@ -1069,6 +1059,96 @@ class TestStudyStatisticsView(TestCase):
         self.assertTrue(response.context["video_viewed_stats_available"])
         self.assertNotContains(response, "keine TikTok-Aktivität gefunden")
 
+    @patch("mydigitalmeal.reports.views.tiktok.aget_tiktok_video_metadata")
+    def test_renders_top_video_metadata(self, mock_metadata):
+        mock_metadata.return_value = {
+            "thumbnail": "https://example.com/thumbnail.jpg",
+            "channel": "example_channel",
+        }
+        stats_request = StatisticsRequest.objects.create(
+            participant=self.participant,
+            status=StatisticsRequest.States.SUCCESS,
+        )
+        TikTokWatchHistoryStatistics.objects.create(
+            request=stats_request,
+            scope=StatisticsScope.INTERVAL,
+            total_videos=42,
+            videos_per_day=1.4,
+            top_video_id="123",
+            top_video_seen_count=3,
+            top_video_last_seen_date=timezone.now(),
+        )
+
+        response = self.client.get(self.url)
+
+        mock_metadata.assert_awaited_once_with("123")
+        self.assertContains(response, 'src="https://example.com/thumbnail.jpg"')
+        self.assertContains(
+            response, "Dieses Video von <strong>example_channel</strong>"
+        )
+
+
+@override_settings(REGISTERED_STUDY_PROJECTS=["T3kwxKKQ"])
+class TestStudyCohortStatisticsView(TestCase):
+    def setUp(self):
+        self.project = DonationProject.objects.create(
+            owner=_make_owner_profile(),
+            slug="some-study",
+            url_id="T3kwxKKQ",
+        )
+        self.url = reverse(
+            "mdm:userflow:studies:cohort_statistics",
+            kwargs={"project_id": self.project.url_id},
+        )
+        self.staff_user = User.objects.create_user(
+            email="staff@mail.com",
+            username="staffuser",
+            password="testpass",
+            is_staff=True,
+        )
+
+    def test_requires_staff_user(self):
+        user = User.objects.create_user(
+            email="user@mail.com", username="user", password="testpass"
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_unregistered_project_returns_404(self):
+        self.client.force_login(self.staff_user)
+
+        with override_settings(REGISTERED_STUDY_PROJECTS=["different-project"]):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_renders_without_statistics(self):
+        self.client.force_login(self.staff_user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("n_statistics", response.context)
+
+    def test_renders_cohort_statistics(self):
+        TikTokCohortStatistics.objects.create(
+            project=self.project,
+            n_statistics=1,
+            moments={"videos_per_day": {"n": 1, "sum": 12.0, "sum_sq": 144.0}},
+            sketches={"videos_per_day": QuantileSketch().to_dict()},
+            histograms={"videos_per_day": [0, 1, 0, 0, 0, 0, 0]},
+        )
+        self.client.force_login(self.staff_user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["n_statistics"], 1)
+        self.assertEqual(response.context["fields"][0]["mean"], 12.0)
+
 
 # ---- smoke tests ----------------------------------------------------------
 
@@ -1083,5 +1163,7 @@ class TestStudiesModuleSmoke(TestCase):
 
             if pattern.name in ["report", "tiktok_statistics"]:
                 reverse(name, kwargs={"participant_id": "test213"})
+            elif pattern.name == "cohort_statistics":
+                reverse(name, kwargs={"project_id": "T3kwxKKQ"})
             else:
                 reverse(name)
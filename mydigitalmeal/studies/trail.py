@@ -0,0 +1,138 @@
+"""Buffered updates of the participation trail and extra_data of DDM participants.
+
+Several steps of the study flow record trail events or other information on
+the participant's ``extra_data`` JSON column. Instead of saving the
+participant for every change, the changes of a request are collected in a
+`ParticipationTrailBuffer` and written in one update at the end of the
+request (see `mydigitalmeal.studies.middleware`). Without a buffer (e.g.,
+outside a request), changes are saved immediately.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from ddm.participation.models import Participant
+from django.db import transaction
+from django.http import HttpRequest
+from django.utils import timezone
+
+TRAIL_KEY = "participation_trail"
+
+
+@dataclass
+class PendingParticipantUpdate:
+    """Changes to the extra_data of one participant.
+
+    Attributes:
+        values: extra_data keys to set (overwrite existing values).
+        trail_events: Trail keys to set, unless already set on the participant.
+    """
+
+    values: dict[str, Any] = field(default_factory=dict)
+    trail_events: dict[str, str] = field(default_factory=dict)
+
+
+def apply_update(extra_data: dict, update: PendingParticipantUpdate) -> dict:
+    """Applies an update to an extra_data dictionary (in place)."""
+    extra_data.update(update.values)
+    if not update.trail_events:
+        return extra_data
+
+    trail = extra_data.get(TRAIL_KEY)
+    if not isinstance(trail, dict):
+        trail = extra_data[TRAIL_KEY] = {}
+    for key, timestamp in update.trail_events.items():
+        if trail.get(key) is None:
+            trail[key] = timestamp
+    return extra_data
+
+
+class ParticipationTrailBuffer:
+    """Collects the extra_data changes of the participants of one request."""
+
+    def __init__(self) -> None:
+        self.pending: dict[int, PendingParticipantUpdate] = {}
+
+    def _get_pending(self, participant: Participant) -> PendingParticipantUpdate:
+        return self.pending.setdefault(participant.pk, PendingParticipantUpdate())
+
+    def record(self, participant: Participant, key: str) -> None:
+        """Records a trail event unless the participant already has it."""
+        trail = participant.extra_data.get(TRAIL_KEY) or {}
+        if trail.get(key) is not None:
+            return
+
+        update = PendingParticipantUpdate(
+            trail_events={key: timezone.now().isoformat()}
+        )
+        apply_update(participant.extra_data, update)
+        self._get_pending(participant).trail_events.update(update.trail_events)
+
+    def update(self, participant: Participant, **values: Any) -> None:
+        """Sets extra_data keys of the participant."""
+        participant.extra_data.update(values)
+        self._get_pending(participant).values.update(values)
+
+    def flush(self) -> None:
+        """Writes the collected changes with one update per participant.
+
+        The stored extra_data is re-read under a row lock and merged with
+        the changes, so that concurrent requests (e.g., htmx polls) do not
+        overwrite each other's trail events.
+        """
+        if not self.pending:
+            return
+
+        with transaction.atomic():
+            stored = dict(
+                Participant.objects.select_for_update()
+                .filter(pk__in=self.pending)
+                .values_list("pk", "extra_data")
+            )
+            for pk, update in self.pending.items():
+                if pk not in stored:
+                    continue
+                extra_data = apply_update(stored[pk] or {}, update)
+                Participant.objects.filter(pk=pk).update(extra_data=extra_data)
+        self.pending = {}
+
+
+def get_trail_buffer(request: HttpRequest | None) -> ParticipationTrailBuffer | None:
+    return getattr(request, "participation_trail", None)
+
+
+def update_participant_trail(
+    participant: Participant, key: str, request: HttpRequest | None = None
+) -> None:
+    """Sets a trail event on the participant if it is not set yet.
+
+    Buffered if the request has a ParticipationTrailBuffer.
+    """
+    buffer = get_trail_buffer(request)
+    if buffer is not None:
+        buffer.record(participant, key)
+        return
+
+    if TRAIL_KEY not in participant.extra_data:
+        participant.extra_data[TRAIL_KEY] = {}
+
+    trail = participant.extra_data[TRAIL_KEY]
+    if key not in trail or trail[key] is None:
+        trail[key] = timezone.now().isoformat()
+        participant.save(update_fields=["extra_data"])
+
+
+def update_participant_extra_data(
+    participant: Participant, request: HttpRequest | None = None, **values: Any
+) -> None:
+    """Sets extra_data keys on the participant.
+
+    Buffered if the request has a ParticipationTrailBuffer.
+    """
+    buffer = get_trail_buffer(request)
+    if buffer is not None:
+        buffer.update(participant, **values)
+        return
+
+    participant.extra_data.update(values)
+    participant.save(update_fields=["extra_data"])
@@ -64,6 +64,11 @@ urlpatterns = [
         views.StudyStatisticsView.as_view(),
         name="tiktok_statistics",
     ),
+    path(
+        "study/cohort/<slug:project_id>/statistics/",
+        views.StudyCohortStatisticsView.as_view(),
+        name="cohort_statistics",
+    ),
     path(
         "study/register-got-reminder-info/",
         views.register_got_reminder_info,
@@ -14,8 +14,15 @@ from ddm.participation.views import (
 )
 from ddm.projects.models import DonationProject
 from django.conf import settings
+from django.contrib.auth.mixins import UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
-from django.http import Http404, HttpRequest, HttpResponseRedirect, JsonResponse
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+)
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils import timezone
@@ -25,7 +32,12 @@ from django.views.generic import TemplateView
 from mydigitalmeal.datadonation.constants import DonationMethod
 from mydigitalmeal.datadonation.views.ddm import BaseDonationViewDDM
 from mydigitalmeal.reports.views.tiktok import BaseStatisticsView
-from mydigitalmeal.statistics.models import StatisticsRequest, StatisticsScope
+from mydigitalmeal.statistics.models import (
+    StatisticsRequest,
+    StatisticsScope,
+    TikTokCohortStatistics,
+)
+from mydigitalmeal.statistics.services.cohort_statistics import get_cohort_summary
 from mydigitalmeal.studies.constants import (
     PARTICIPATION_TRAIL_DLUL,
     PARTICIPATION_TRAIL_PAPI,
@@ -36,6 +48,10 @@ from mydigitalmeal.studies.sessions import (
     StudyParticipationSession,
     StudyParticipationSessionManager,
 )
+from mydigitalmeal.studies.trail import (
+    update_participant_extra_data,
+    update_participant_trail,
+)
 from mydigitalmeal.userflow.constants import URLShortcut
 from mydigitalmeal.userflow.sessions import (
     AddUserflowSessionMixin,
@@ -43,6 +59,7 @@ from mydigitalmeal.userflow.sessions import (
 )
 from shared.portability import views as port_views
 from shared.portability.models import TikTokDataRequest
+from shared.views import AsyncDispatchMixin
 
 logger = logging.getLogger(__name__)
 
@@ -104,16 +121,6 @@ def get_participant_from_session(
     return participant
 
 
-def update_participant_trail(participant: Participant, key: str) -> None:
-    if "participation_trail" not in participant.extra_data:
-        participant.extra_data["participation_trail"] = {}
-
-    trail = participant.extra_data["participation_trail"]
-    if key not in trail or trail[key] is None:
-        trail[key] = timezone.now().isoformat()
-        participant.save(update_fields=["extra_data"])
-
-
 class StudyEnrollView(View):
     """Entry point for external survey-tool redirects into the study flow.
 
@@ -185,20 +192,19 @@ class StudyEnrollView(View):
         # Create participant
         create_participation_session(request, project)
         participant = get_participant_from_session(request, project)
-        participant.extra_data["url_param"] = url_params
-        participant.extra_data["method"] = method
-
         if method == DonationMethod.PORTABILITY.value:
-            participant.extra_data["participation_trail"] = (
-                PARTICIPATION_TRAIL_PAPI.copy()
-            )
+            participation_trail = PARTICIPATION_TRAIL_PAPI.copy()
         else:
-            participant.extra_data["participation_trail"] = (
-                PARTICIPATION_TRAIL_DLUL.copy()
-            )
+            participation_trail = PARTICIPATION_TRAIL_DLUL.copy()
 
-        update_participant_trail(participant, "a_enrolled")
-        participant.save()
+        update_participant_extra_data(
+            participant,
+            request,
+            url_param=url_params,
+            method=method,
+            participation_trail=participation_trail,
+        )
+        update_participant_trail(participant, "a_enrolled", request)
 
         if method == DonationMethod.PORTABILITY.value:
             return redirect(StudiesURLShortcut.DONATION_PORTABILITY)
@@ -280,7 +286,7 @@ class DownloadUploadView(RequireStudySessionMixin, BaseDonationViewDDM):
 
     def update_participant_information(self, request) -> None:
         """Add url parameters to participant information."""
-        update_participant_trail(self.participant, "b_entered_instructions")
+        update_participant_trail(self.participant, "b_entered_instructions", request)
 
     def initialize_statistics_request(self) -> StatisticsRequest:
         """Overwrite to create statistics request without user profile."""
@@ -345,7 +351,9 @@ class PortabilityWaitingView(
             ).first()
             if project:
                 participant = get_participant_from_session(self.request, project)
-                update_participant_trail(participant, "b1_entered_waiting_view")
+                update_participant_trail(
+                    participant, "b1_entered_waiting_view", self.request
+                )
 
         return context
 
@@ -429,7 +437,9 @@ class PortabilityAbortView(RequireStudySessionMixin, TemplateView):
             ).first()
             if project:
                 participant = get_participant_from_session(self.request, project)
-                update_participant_trail(participant, "b3_entered_abort_view")
+                update_participant_trail(
+                    participant, "b3_entered_abort_view", self.request
+                )
 
             url_parameters = study_session.url_parameters.copy()
             url_parameters.pop("method", None)
@@ -474,7 +484,9 @@ class PortabilityErrorView(RequireStudySessionMixin, TemplateView):
 
             if project:
                 participant = get_participant_from_session(self.request, project)
-                update_participant_trail(participant, "b2_entered_error_view")
+                update_participant_trail(
+                    participant, "b2_entered_error_view", self.request
+                )
 
         else:
             logger.warning("Study session missing in port-api availability check view.")
@@ -572,7 +584,9 @@ class CheckDownloadAvailabilityView(
                 show_reminder_msg = True
 
             if study_session and participant and show_reminder_msg:
-                update_participant_trail(participant, "c3_got_waiting_reminder_info")
+                update_participant_trail(
+                    participant, "c3_got_waiting_reminder_info", self.request
+                )
 
             context["show_reminder_msg"] = show_reminder_msg
 
@@ -583,11 +597,15 @@ class CheckDownloadAvailabilityView(
             )
 
             if participant:
-                update_participant_trail(participant, "c2_got_waiting_error")
+                update_participant_trail(
+                    participant, "c2_got_waiting_error", self.request
+                )
 
         if self.template_name == self.template_success:
             if participant:
-                update_participant_trail(participant, "c1_got_waiting_success")
+                update_participant_trail(
+                    participant, "c1_got_waiting_success", self.request
+                )
 
         return context
 
@@ -620,7 +638,7 @@ class PortabilityReviewView(
 
     def update_participant_information(self, request) -> None:
         """Add url parameters to participant information."""
-        update_participant_trail(self.participant, "d1_entered_upload")
+        update_participant_trail(self.participant, "d1_entered_upload", self.request)
 
 
 class StudyQuestionnaireView(RequireStudySessionMixin, QuestionnaireView):
@@ -686,7 +704,7 @@ class StudyDebriefingView(RequireStudySessionMixin, DebriefingView):
         # the participant in a half-completed state. Re-visits
         # to the debriefing page (refresh, back button) just re-mark.
         self._mark_study_flow_completed(request)
-        update_participant_trail(self.participant, "e_entered_debrief")
+        update_participant_trail(self.participant, "e_entered_debrief", self.request)
         return response
 
     @staticmethod
@@ -736,7 +754,7 @@ def register_got_reminder_info(request):
         participant.pk,
         project.url_id,
     )
-    update_participant_trail(participant, "c_got_reminder_info")
+    update_participant_trail(participant, "c_got_reminder_info", request)
     return JsonResponse({"status": "ok"})
 
 
@@ -816,7 +834,7 @@ class StudyReportView(TemplateView):
         return context
 
 
-class StudyStatisticsView(BaseStatisticsView):
+class StudyStatisticsView(AsyncDispatchMixin, BaseStatisticsView):
     """Separate studies statistics view to retrieve statistics based on participant.
 
     Access is gated on:
@@ -841,7 +859,7 @@ class StudyStatisticsView(BaseStatisticsView):
         """Overwrites session validation of regular MDM flow."""
         return
 
-    def get(self, request, *args, **kwargs):  # noqa: PLR0911
+    def load_statistics_request(self) -> HttpResponse | None:  # noqa: PLR0911
         """Overwrites parent method to retrieve statistics based on passed ID.
 
         A participant has two ``StatisticsRequest`` rows (interval + full,
@@ -902,7 +920,7 @@ class StudyStatisticsView(BaseStatisticsView):
                 self.statistics_request = next(
                     r for r in statistics_requests if not r.is_ready()
                 )
-                return self.render_to_response(self.get_context_data(**kwargs))
+                return None
 
             # Every request has reached a terminal state and still no
             # INTERVAL result appeared - genuinely unavailable (failed, or
@@ -936,5 +954,39 @@ class StudyStatisticsView(BaseStatisticsView):
                 )
                 return self.htmx_redirect(StudiesURLShortcut.REPORT_UNAVAILABLE)
 
-        context = self.get_context_data(**kwargs)
-        return self.render_to_response(context)
+        return None
+
+
+class StudyCohortStatisticsView(UserPassesTestMixin, TemplateView):
+    """Staff view showing the aggregated TikTok statistics of a study's cohort.
+
+    Reads the running aggregates maintained by
+    ``mydigitalmeal.statistics.tasks.update_cohort_statistics``, so the page
+    does not get slower as the cohort grows.
+    """
+
+    template_name = "studies/cohort_statistics.html"
+
+    def test_func(self):
+        """Requesting user must pass this test to access view."""
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        project_id = self.kwargs.get("project_id")
+        if project_id not in settings.REGISTERED_STUDY_PROJECTS:
+            msg = "Project not registered as a study project."
+            raise Http404(msg)
+
+        context["project_id"] = project_id
+        cohort = (
+            TikTokCohortStatistics.objects.filter(project__url_id=project_id)
+            .select_related("project")
+            .first()
+        )
+        if cohort is not None:
+            context["project"] = cohort.project
+            context["date_updated"] = cohort.date_updated
+            context |= get_cohort_summary(cohort)
+        return context
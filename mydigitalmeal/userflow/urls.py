@@ -56,4 +56,8 @@ urlpatterns = [
         "",
         include("mydigitalmeal.studies.urls", namespace="studies"),
     ),
+    path(
+        "",
+        include("mydigitalmeal.statistics.urls", namespace="statistics"),
+    ),
 ]
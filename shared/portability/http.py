@@ -0,0 +1,321 @@
+"""Shared client for all outbound HTTP calls to TikTok.
+
+Every thread keeps its own requests.Session, so connections (and TLS sessions)
+are pooled per host and reused across calls instead of being re-established for
+every request. Failed idempotent calls are retried with an exponential backoff
+by urllib3; non-idempotent calls are only retried if the connection could not be
+established (i.e., the request never reached the server).
+
+AsyncOutboundHTTPClient is the counterpart for async views: it keeps one
+httpx.AsyncClient per event loop and applies the same retry policy without
+blocking the loop while waiting.
+
+For every endpoint, the number of calls, the number of errors and the latency
+are recorded (see get_endpoint_metrics()).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) in seconds
+DOWNLOAD_TIMEOUT = (5, 30)
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+@dataclass
+class EndpointMetrics:
+    calls: int = 0
+    errors: int = 0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+
+    @property
+    def avg_duration(self) -> float:
+        return self.total_duration / self.calls if self.calls else 0.0
+
+
+_metrics: dict[str, EndpointMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def record_call(endpoint: str, duration: float, *, failed: bool) -> None:
+    with _metrics_lock:
+        metrics = _metrics.setdefault(endpoint, EndpointMetrics())
+        metrics.calls += 1
+        metrics.errors += int(failed)
+        metrics.total_duration += duration
+        metrics.max_duration = max(metrics.max_duration, duration)
+
+
+def get_endpoint_metrics() -> dict[str, EndpointMetrics]:
+    """Returns a snapshot of the metrics of all endpoints called by this process."""
+    with _metrics_lock:
+        return {
+            endpoint: EndpointMetrics(**vars(metrics))
+            for endpoint, metrics in _metrics.items()
+        }
+
+
+def reset_endpoint_metrics() -> None:
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class OutboundHTTPClient:
+    """Pooled, retrying HTTP client.
+
+    Args:
+        retries: Maximum number of retries per call.
+        backoff_factor: Backoff factor of the exponential backoff between
+            retries (0.5 -> 0.5s, 1s, 2s, ...).
+        pool_connections: Number of hosts for which a connection pool is kept.
+        pool_maxsize: Maximum number of connections kept per host.
+    """
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+    ):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+
+    def get_retry(self, *, idempotent: bool) -> Retry:
+        if idempotent:
+            return Retry(
+                total=self.retries,
+                backoff_factor=self.backoff_factor,
+                status_forcelist=self.RETRY_STATUS_CODES,
+                allowed_methods=None,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+        return Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False,
+        )
+
+    def get_session(self, *, idempotent: bool) -> requests.Session:
+        """Returns the session of the current thread for the given retry policy."""
+        attr = "idempotent_session" if idempotent else "session"
+        session = getattr(self._local, attr, None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.pool_maxsize,
+                max_retries=self.get_retry(idempotent=idempotent),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            setattr(self._local, attr, session)
+        return session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: str,
+        idempotent: bool | None = None,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        **kwargs,
+    ) -> requests.Response:
+        """Sends a request and records its latency under endpoint.
+
+        Args:
+            method: HTTP method.
+            url: URL to call.
+            endpoint: Name under which the metrics of the call are recorded.
+            idempotent: Whether the call may safely be retried. Defaults to
+                True for idempotent HTTP methods.
+            timeout: Connect and read timeout passed on to requests.
+            **kwargs: Passed on to requests.Session.request().
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails. Error
+                status codes do not raise (use response.raise_for_status()).
+
+        Returns:
+            requests.Response: The response. For streamed responses, the
+                recorded latency is the time until the headers were received.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        session = self.get_session(idempotent=idempotent)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            failed = response is None or response.status_code >= 400  # noqa: PLR2004
+            record_call(endpoint, duration, failed=failed)
+            logger.debug(
+                "%s %s took %.3fs",
+                method.upper(),
+                endpoint,
+                duration,
+                extra={
+                    "endpoint": endpoint,
+                    "duration": duration,
+                    "status_code": getattr(response, "status_code", None),
+                },
+            )
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+class AsyncOutboundHTTPClient:
+    """Pooled, retrying async HTTP client (see OutboundHTTPClient).
+
+    Args:
+        retries: Maximum number of retries per call.
+        backoff_factor: Backoff factor of the exponential backoff between
+            retries (0.5 -> 0.5s, 1s, 2s, ...).
+        max_connections: Maximum number of connections per event loop.
+        max_keepalive_connections: Maximum number of idle connections kept
+            alive per event loop.
+    """
+
+    RETRY_STATUS_CODES = OutboundHTTPClient.RETRY_STATUS_CODES
+    MAX_BACKOFF = 10  # seconds
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+    ):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Returns the client of the running event loop.
+
+        httpx clients are bound to the event loop they were first used in.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                # The transport only retries failed connection attempts.
+                transport = httpx.AsyncHTTPTransport(
+                    retries=self.retries, limits=self.limits
+                )
+                client = httpx.AsyncClient(transport=transport)
+                self._clients[loop] = client
+        return client
+
+    def get_backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.MAX_BACKOFF)
+        return min(self.backoff_factor * 2**attempt, self.MAX_BACKOFF)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: str,
+        idempotent: bool | None = None,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,  # noqa: ASYNC109
+        **kwargs,
+    ) -> httpx.Response:
+        """Sends a request and records its latency under endpoint.
+
+        Args:
+            method: HTTP method.
+            url: URL to call.
+            endpoint: Name under which the metrics of the call are recorded.
+            idempotent: Whether the call may safely be retried. Defaults to
+                True for idempotent HTTP methods.
+            timeout: Connect and read timeout (as for OutboundHTTPClient).
+            **kwargs: Passed on to httpx.AsyncClient.request().
+
+        Raises:
+            httpx.HTTPError: If the request fails. Error status codes do not
+                raise (use response.raise_for_status()).
+
+        Returns:
+            httpx.Response: The response.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+
+        client = self.get_client()
+        attempts = self.retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = await client.request(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError:
+                if attempt == attempts - 1:
+                    raise
+            finally:
+                duration = time.perf_counter() - start
+                failed = response is None or response.status_code >= 400  # noqa: PLR2004
+                record_call(endpoint, duration, failed=failed)
+
+            if response is not None and (
+                response.status_code not in self.RETRY_STATUS_CODES
+                or attempt == attempts - 1
+            ):
+                return response
+
+            logger.debug("Retrying %s %s (attempt %s)", method, endpoint, attempt + 1)
+            await asyncio.sleep(self.get_backoff(attempt, response))
+
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+http_client = OutboundHTTPClient()
+async_http_client = AsyncOutboundHTTPClient()
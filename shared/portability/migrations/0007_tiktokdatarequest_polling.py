@@ -0,0 +1,28 @@
+# Generated by Django 5.2.14 on 2026-10-19 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portability', '0006_oauthstatetoken_context'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tiktokdatarequest',
+            name='next_poll_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tiktokdatarequest',
+            name='poll_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tiktokdatarequest',
+            name='poll_failures',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -109,6 +109,11 @@ class TikTokDataRequest(models.Model):
     issued_at = models.DateTimeField(default=timezone.now)
 
     last_polled = models.DateTimeField(null=True)
+    next_poll_at = models.DateTimeField(null=True, db_index=True)
+    poll_attempts = models.PositiveIntegerField(default=0)
+    poll_failures = models.PositiveIntegerField(default=0)
+
+    MAX_POLL_FAILURES = 3
 
     class State(models.TextChoices):
         NOT_POLLED = "not polled", "not polled"
@@ -135,3 +140,6 @@ class TikTokDataRequest(models.Model):
             return False
 
         return True
+
+    def has_poll_error(self) -> bool:
+        return self.poll_failures >= self.MAX_POLL_FAILURES
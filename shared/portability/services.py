@@ -1,16 +1,30 @@
 import logging
-import time
-from datetime import timedelta
+import random
+from datetime import datetime, timedelta
+from typing import IO
 
+import httpx
 import requests
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Q, QuerySet
 from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from digital_meal.core.logging_utils import log_requests_exception
 from shared.portability.exceptions import TokenRefreshError
+from shared.portability.http import (
+    DOWNLOAD_TIMEOUT,
+    async_http_client,
+    http_client,
+)
 from shared.portability.models import TikTokAccessToken, TikTokDataRequest
+from shared.portability.state import (
+    DataRequestState,
+    delete_data_request_state,
+    set_data_request_state,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +74,9 @@ class TikTokAccessTokenService:
         headers = {"Accept": "application/x-www-form-urlencoded"}
 
         try:
-            response = requests.post(url, data=data, headers=headers, timeout=(5, 15))
+            response = http_client.post(
+                url, endpoint="tiktok.token.refresh", data=data, headers=headers
+            )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -144,22 +160,21 @@ class TikTokAccessTokenService:
             )
         return access_token
 
-    def exchange_code_for_token(
-        self, auth_code: str, attempt: int = 1, max_attempts: int = 3
-    ) -> dict:
-        """Exchanges the authorization code for an access token and stores it.
+    async def aexchange_code_for_token(self, auth_code: str) -> dict:
+        """Exchanges the authorization code for an access token.
+
+        Requests the access token corresponding to the authorization code
+        received from TikTok from the TikTok User Management API endpoint.
 
-        Loads the authorization code received from TikTok from the request
-        object and requests the corresponding access token from the TikTok User
-        Management API endpoint.
+        The authorization code can only be used once, so the exchange is only
+        retried if the connection to TikTok could not be established.
 
         Args:
             auth_code: Authorization code received from TikTok.
-            attempt: Number of attempts to exchange the authorization code.
-            max_attempts: Maximum number of attempts to exchange the authorization code.
 
         Raises:
-            requests.exceptions.RequestException: If exchange request fails.
+            httpx.HTTPError: If exchange request fails.
+            ValueError: If the response is not valid JSON.
 
         Returns:
             dict: The JSON response from the TikTok API endpoint.
@@ -175,37 +190,24 @@ class TikTokAccessTokenService:
         headers = {"Accept": "application/json"}
 
         try:
-            response = requests.post(url, data=data, headers=headers, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.Timeout as e:
-            log_requests_exception(
-                logger,
+            response = await async_http_client.post(
                 url,
-                e,
-                f"Request to exchange token timed out (attempt {attempt})",
-                level=logging.ERROR,
+                endpoint="tiktok.token.exchange",
+                data=data,
+                headers=headers,
+                timeout=(5, 30),
             )
-
-            if attempt < max_attempts:
-                time.sleep(3 * attempt)
-                return self.exchange_code_for_token(auth_code, attempt + 1)
-            else:
-                raise requests.exceptions.RequestException from e
-        except requests.exceptions.RequestException as e:
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
             log_requests_exception(
                 logger,
                 url,
                 e,
-                f"Failed to retrieve authentication token (attempt {attempt})",
+                "Failed to retrieve authentication token",
                 level=logging.ERROR,
             )
-
-            if attempt < max_attempts:
-                time.sleep(3 * attempt)
-                return self.exchange_code_for_token(auth_code, attempt + 1)
-            else:
-                raise
+            raise
 
 
 class TikTokPortabilityAPIClient:
@@ -245,8 +247,13 @@ class TikTokPortabilityAPIClient:
         params = {"fields": "request_id"}
         payload = {"data_format": "json", "category_selection_list": ["all_data"]}
         try:
-            response = requests.post(
-                url, headers=headers, params=params, json=payload, timeout=(5, 30)
+            response = http_client.post(
+                url,
+                endpoint="tiktok.portability.add",
+                headers=headers,
+                params=params,
+                json=payload,
+                timeout=(5, 30),
             )
             response.raise_for_status()
             request_result = response.json()
@@ -309,7 +316,14 @@ class TikTokPortabilityAPIClient:
             "request_id": request_id,
         }
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = http_client.post(
+                url,
+                endpoint="tiktok.portability.cancel",
+                idempotent=True,
+                headers=headers,
+                json=payload,
+                timeout=(5, 30),
+            )
             response.raise_for_status()
             request_result = response.json()
         except requests.exceptions.RequestException as e:
@@ -362,6 +376,7 @@ class TikTokPortabilityAPIClient:
         else:
             data_request.status = TikTokDataRequest.State.CANCELLED
             data_request.save()
+            delete_data_request_state(data_request.open_id)
 
         return request_result
 
@@ -447,8 +462,14 @@ class TikTokPortabilityAPIClient:
             "request_id": request_id,
         }
         try:
-            response = requests.post(
-                url, headers=headers, params=params, json=payload, timeout=30
+            response = http_client.post(
+                url,
+                endpoint="tiktok.portability.check",
+                idempotent=True,
+                headers=headers,
+                params=params,
+                json=payload,
+                timeout=(5, 30),
             )
             response.raise_for_status()
             poll_result = response.json()
@@ -581,12 +602,14 @@ class TikTokPortabilityAPIClient:
             "request_id": request_id,
         }
         try:
-            response = requests.post(
+            response = http_client.post(
                 self.data_download_url,
+                endpoint="tiktok.portability.download",
+                idempotent=True,
                 headers=headers,
                 json=payload,
                 stream=True,
-                timeout=(5, 15),
+                timeout=DOWNLOAD_TIMEOUT,
             )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
@@ -618,6 +641,8 @@ class TikTokPortabilityAPIClient:
                 data_request.download_attempted = True
                 data_request.downloaded_at = timezone.now()
                 data_request.save()
+                if succeeded:
+                    delete_data_request_state(data_request.open_id)
 
         streaming_response = StreamingHttpResponse(
             stream_with_cleanup(), content_type="application/zip"
@@ -629,3 +654,290 @@ class TikTokPortabilityAPIClient:
             streaming_response["Content-Length"] = response.headers["Content-Length"]
 
         return streaming_response
+
+    def download_requested_data(
+        self,
+        data_request: TikTokDataRequest,
+        file: IO[bytes],
+        chunk_size: int = 64 * 1024,
+    ) -> int:
+        """Downloads the requested data from TikTok's Portability API into file.
+
+        Used for server-side ingestion: the data is streamed into the given file
+        object (e.g., a SpooledTemporaryFile) instead of being passed on to the
+        participant's browser.
+
+        Args:
+            data_request: TikTokDataRequest object.
+            file: Writable binary file object.
+            chunk_size: Size of the chunks read from the response.
+
+        Returns:
+            int: Number of bytes written to file.
+
+        Raises:
+            requests.exceptions.RequestException: If the download fails.
+        """
+        request_id = data_request.request_id
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token.token}",
+        }
+        payload = {
+            "request_id": request_id,
+        }
+
+        n_bytes = 0
+        succeeded = False
+        try:
+            with http_client.post(
+                self.data_download_url,
+                endpoint="tiktok.portability.download",
+                idempotent=True,
+                headers=headers,
+                json=payload,
+                stream=True,
+                timeout=DOWNLOAD_TIMEOUT,
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        file.write(chunk)
+                        n_bytes += len(chunk)
+            succeeded = True
+        except requests.exceptions.RequestException as e:
+            log_requests_exception(
+                logger,
+                self.data_download_url,
+                e,
+                f"Download failed for request {request_id}",
+                logging.ERROR,
+            )
+            raise
+        finally:
+            data_request.download_succeeded = succeeded
+            data_request.download_attempted = True
+            data_request.downloaded_at = timezone.now()
+            data_request.save()
+            if succeeded:
+                delete_data_request_state(data_request.open_id)
+
+        logger.info(
+            "Downloaded %s bytes for request %s to server.", n_bytes, request_id
+        )
+        return n_bytes
+
+
+def get_portability_api_client_class() -> type[TikTokPortabilityAPIClient]:
+    """Returns the portability API client class configured in the settings.
+
+    Allows to replace the TikTok API with a local stub (e.g., in tests) by setting
+    TIKTOK_PORTABILITY_API_CLIENT to the dotted path of another client class.
+    """
+    return import_string(settings.TIKTOK_PORTABILITY_API_CLIENT)
+
+
+class TikTokDataRequestPoller:
+    """Issues TikTok data requests and keeps track of their status.
+
+    Polling happens in the background (see shared.portability.tasks) with a
+    per-request exponential backoff. The result of each poll is written to the
+    database and to the shared cache, from where the views read it.
+    """
+
+    BASE_INTERVAL = 15  # seconds
+    MAX_INTERVAL = 120  # seconds
+    JITTER = 0.2
+    LEASE = 60  # seconds a claimed request is hidden from other poll runs
+    POLL_WINDOW = timedelta(days=7)
+
+    def __init__(self, api_client_class: type[TikTokPortabilityAPIClient] = None):
+        if api_client_class is None:
+            api_client_class = get_portability_api_client_class()
+        self.api_client_class = api_client_class
+
+    @classmethod
+    def get_next_poll_delay(cls, attempts: int) -> timedelta:
+        """Exponential backoff with jitter for the given number of attempts.
+
+        The jitter spreads the polls of requests issued at the same time, so
+        that they do not hit the TikTok API in bursts.
+        """
+        delay = min(cls.BASE_INTERVAL * 2 ** min(attempts, 16), cls.MAX_INTERVAL)
+        delay *= random.uniform(1 - cls.JITTER, 1 + cls.JITTER)  # noqa: S311
+        return timedelta(seconds=delay)
+
+    @classmethod
+    def get_pollable_requests(cls) -> QuerySet[TikTokDataRequest]:
+        return TikTokDataRequest.objects.filter(
+            download_succeeded=False,
+            issued_at__gte=timezone.now() - cls.POLL_WINDOW,
+        ).exclude(
+            status__in=[
+                TikTokDataRequest.State.EXPIRED,
+                TikTokDataRequest.State.CANCELLED,
+            ]
+        )
+
+    @classmethod
+    def expire_if_outside_poll_window(
+        cls, data_request: TikTokDataRequest
+    ) -> TikTokDataRequest:
+        """Marks a request that is still awaited but no longer polled as expired.
+
+        Requests are only polled for POLL_WINDOW after they have been issued;
+        their status would otherwise stay pending for good.
+        """
+        awaited_states = [
+            TikTokDataRequest.State.NOT_POLLED,
+            TikTokDataRequest.State.PENDING,
+        ]
+        if (
+            data_request.status in awaited_states
+            and data_request.issued_at < timezone.now() - cls.POLL_WINDOW
+        ):
+            data_request.status = TikTokDataRequest.State.EXPIRED
+            data_request.next_poll_at = None
+            data_request.save(update_fields=["status", "next_poll_at"])
+        return data_request
+
+    @classmethod
+    def claim_due_requests(cls, limit: int = 100) -> list[int]:
+        """Returns the pks of requests that are due and pushes back their next poll.
+
+        Pushing back next_poll_at by LEASE seconds prevents a request from being
+        picked up again while its poll is still queued or running.
+        """
+        now = timezone.now()
+        due_pks = list(
+            cls.get_pollable_requests()
+            .filter(Q(next_poll_at__isnull=True) | Q(next_poll_at__lte=now))
+            .order_by("next_poll_at")
+            .values_list("pk", flat=True)[:limit]
+        )
+        if due_pks:
+            TikTokDataRequest.objects.filter(pk__in=due_pks).update(
+                next_poll_at=now + timedelta(seconds=cls.LEASE)
+            )
+        return due_pks
+
+    @staticmethod
+    def get_access_token(open_id: str) -> TikTokAccessToken:
+        """Returns a valid access token for open_id, refreshing it if necessary.
+
+        Raises:
+            TikTokAccessToken.DoesNotExist: If no token exists for open_id.
+            TokenRefreshError: If the token is expired and cannot be refreshed.
+        """
+        access_token = TikTokAccessToken.objects.get(open_id=open_id)
+        if access_token.is_expired():
+            access_token = TikTokAccessTokenService().refresh_token(access_token)
+        return access_token
+
+    def issue(self, open_id: str) -> TikTokDataRequest | None:
+        """Issues a new data request with TikTok for the given open_id.
+
+        Returns:
+            TikTokDataRequest | None: The created data request or None if the
+                request could not be issued (the failure is recorded in the
+                shared state).
+        """
+        try:
+            access_token = self.get_access_token(open_id)
+        except (TikTokAccessToken.DoesNotExist, TokenRefreshError) as e:
+            logger.warning("Cannot issue data request for %s: %s", open_id, e)
+            set_data_request_state(open_id, DataRequestState(failed=True))
+            return None
+
+        api_client = self.api_client_class(access_token)
+        response_data = api_client.make_data_request()
+        response_valid, _ = api_client.data_request_response_is_valid(response_data)
+        if not response_valid:
+            set_data_request_state(open_id, DataRequestState(failed=True))
+            return None
+
+        data_request = TikTokDataRequest.objects.create(
+            open_id=open_id,
+            request_id=response_data.get("data", {}).get("request_id"),
+            next_poll_at=timezone.now(),
+        )
+        set_data_request_state(
+            open_id, DataRequestState.from_data_request(data_request)
+        )
+        return data_request
+
+    def poll(self, data_request: TikTokDataRequest) -> TikTokDataRequest:
+        """Polls the status of data_request and stores the result.
+
+        Args:
+            data_request: The TikTokDataRequest to poll.
+
+        Returns:
+            TikTokDataRequest: The updated data request.
+        """
+        now = timezone.now()
+
+        try:
+            access_token = self.get_access_token(data_request.open_id)
+        except (TikTokAccessToken.DoesNotExist, TokenRefreshError) as e:
+            logger.warning(
+                "Cannot poll data request %s: %s", data_request.request_id, e
+            )
+            return self._register_failure(data_request, now)
+
+        api_client = self.api_client_class(access_token)
+        response = api_client.poll_data_request_status(data_request.request_id)
+        response_valid, _ = api_client.poll_data_request_status_response_is_valid(
+            response
+        )
+        if not response_valid:
+            return self._register_failure(data_request, now)
+
+        status = response.get("data").get("status")
+        if status == data_request.status:
+            data_request.poll_attempts += 1
+        else:
+            data_request.poll_attempts = 0
+
+        data_request.status = status
+        data_request.last_polled = now
+        data_request.poll_failures = 0
+        data_request.next_poll_at = self._get_next_poll_at(data_request, now)
+        data_request.save(
+            update_fields=[
+                "status",
+                "last_polled",
+                "poll_attempts",
+                "poll_failures",
+                "next_poll_at",
+            ]
+        )
+        self._update_state(data_request)
+        return data_request
+
+    def _register_failure(
+        self, data_request: TikTokDataRequest, now: datetime
+    ) -> TikTokDataRequest:
+        data_request.poll_failures += 1
+        data_request.poll_attempts += 1
+        data_request.next_poll_at = self._get_next_poll_at(data_request, now)
+        data_request.save(
+            update_fields=["poll_attempts", "poll_failures", "next_poll_at"]
+        )
+        self._update_state(data_request)
+        return data_request
+
+    def _get_next_poll_at(
+        self, data_request: TikTokDataRequest, now: datetime
+    ) -> datetime | None:
+        if not data_request.is_active():
+            return None
+        return now + self.get_next_poll_delay(data_request.poll_attempts)
+
+    @staticmethod
+    def _update_state(data_request: TikTokDataRequest) -> None:
+        # Note: Expired and cancelled states are kept in the cache as well so
+        # that the views can inform the user; they are consumed by the view.
+        set_data_request_state(
+            data_request.open_id, DataRequestState.from_data_request(data_request)
+        )
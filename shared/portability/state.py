@@ -0,0 +1,69 @@
+from dataclasses import asdict, dataclass
+
+from django.core.cache import cache
+
+from shared.portability.models import TikTokDataRequest
+
+DATA_REQUEST_STATE_KEY = "portability:tiktok:data-request:{open_id}"
+DATA_REQUEST_STATE_TIMEOUT = 60 * 60
+
+DATA_REQUEST_ISSUE_LOCK_KEY = "portability:tiktok:data-request-issue:{open_id}"
+DATA_REQUEST_ISSUE_LOCK_TIMEOUT = 60
+
+
+@dataclass
+class DataRequestState:
+    """Snapshot of a user's current TikTok data request as seen by the poller.
+
+    Shared through the cache so that all open tabs (and all web workers) read
+    the same state without calling the TikTok API themselves.
+    """
+
+    request_id: int | None = None
+    status: str | None = None
+    last_polled: str | None = None
+    failed: bool = False
+
+    @classmethod
+    def from_data_request(cls, data_request: TikTokDataRequest) -> "DataRequestState":
+        last_polled = data_request.last_polled
+        return cls(
+            request_id=data_request.request_id,
+            status=data_request.status,
+            last_polled=last_polled.isoformat() if last_polled else None,
+            failed=data_request.has_poll_error(),
+        )
+
+
+def get_data_request_state(open_id: str) -> DataRequestState | None:
+    state_data = cache.get(DATA_REQUEST_STATE_KEY.format(open_id=open_id))
+    return DataRequestState(**state_data) if state_data else None
+
+
+def set_data_request_state(open_id: str, state: DataRequestState) -> None:
+    cache.set(
+        DATA_REQUEST_STATE_KEY.format(open_id=open_id),
+        asdict(state),
+        timeout=DATA_REQUEST_STATE_TIMEOUT,
+    )
+
+
+def delete_data_request_state(open_id: str) -> None:
+    cache.delete(DATA_REQUEST_STATE_KEY.format(open_id=open_id))
+
+
+def acquire_data_request_issue_lock(open_id: str) -> bool:
+    """Returns True if the caller may issue a new data request for open_id.
+
+    Prevents several tabs polling at the same time from each issuing their own
+    data request with TikTok.
+    """
+    return cache.add(
+        DATA_REQUEST_ISSUE_LOCK_KEY.format(open_id=open_id),
+        True,  # noqa: FBT003
+        timeout=DATA_REQUEST_ISSUE_LOCK_TIMEOUT,
+    )
+
+
+def release_data_request_issue_lock(open_id: str) -> None:
+    cache.delete(DATA_REQUEST_ISSUE_LOCK_KEY.format(open_id=open_id))
@@ -0,0 +1,57 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+
+from shared.portability.models import TikTokDataRequest
+from shared.portability.services import TikTokDataRequestPoller
+from shared.portability.state import release_data_request_issue_lock
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def poll_due_data_requests(limit: int = 100) -> None:
+    """Dispatches a status poll for every active data request that is due.
+
+    Intended to be run periodically by celery beat (see CELERY_BEAT_SCHEDULE).
+
+    Args:
+        limit: Maximum number of data requests dispatched per run.
+    """
+    due_pks = TikTokDataRequestPoller.claim_due_requests(limit=limit)
+    for pk in due_pks:
+        poll_data_request.delay(pk)
+
+    if due_pks:
+        logger.debug("Dispatched status polls for %s data requests.", len(due_pks))
+
+
+@shared_task(ignore_result=True)
+def poll_data_request(data_request_pk: int) -> None:
+    """Polls the status of a single TikTok data request.
+
+    Args:
+        data_request_pk: The pk of the TikTokDataRequest to poll.
+    """
+    data_request = TikTokDataRequest.objects.filter(pk=data_request_pk).first()
+    if not data_request or not data_request.is_active():
+        return
+
+    TikTokDataRequestPoller().poll(data_request)
+
+
+@shared_task(ignore_result=True)
+def issue_data_request(open_id: str) -> None:
+    """Issues a new TikTok data request for open_id and polls it once.
+
+    Args:
+        open_id: The open ID of the TikTok user.
+    """
+    data_request = TikTokDataRequestPoller().issue(open_id)
+    if not data_request:
+        # Allow the next availability check to try again.
+        release_data_request_issue_lock(open_id)
+        return
+
+    transaction.on_commit(lambda: poll_data_request.delay(data_request.pk))
@@ -0,0 +1,113 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.test import SimpleTestCase
+
+from shared.portability.http import (
+    AsyncOutboundHTTPClient,
+    OutboundHTTPClient,
+    get_endpoint_metrics,
+    reset_endpoint_metrics,
+)
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Responds with 503 to the first request and with 200 afterwards."""
+
+    calls = 0
+
+    def _respond(self):
+        type(self).calls += 1
+        status = 503 if type(self).calls == 1 else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def do_GET(self):  # noqa: N802
+        self._respond()
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._respond()
+
+    def log_message(self, *args):
+        pass
+
+
+class FlakyServerMixin:
+    def setUp(self):
+        FlakyHandler.calls = 0
+        reset_endpoint_metrics()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestOutboundHTTPClient(FlakyServerMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = OutboundHTTPClient(backoff_factor=0)
+
+    def test_idempotent_call_is_retried(self):
+        response = self.client.get(self.url, endpoint="test")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlakyHandler.calls, 2)
+
+    def test_non_idempotent_call_is_not_retried(self):
+        response = self.client.post(self.url, endpoint="test", json={})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(FlakyHandler.calls, 1)
+
+    def test_post_marked_idempotent_is_retried(self):
+        response = self.client.post(self.url, endpoint="test", idempotent=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlakyHandler.calls, 2)
+
+    def test_session_is_reused(self):
+        session = self.client.get_session(idempotent=True)
+        self.assertIs(session, self.client.get_session(idempotent=True))
+        self.assertIsNot(session, self.client.get_session(idempotent=False))
+
+    def test_metrics_are_recorded(self):
+        self.client.post(self.url, endpoint="test")
+        self.client.post(self.url, endpoint="test")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.get("http://127.0.0.1:1/", endpoint="unreachable")
+
+        metrics = get_endpoint_metrics()
+        self.assertEqual(metrics["test"].calls, 2)
+        self.assertEqual(metrics["test"].errors, 1)
+        self.assertGreater(metrics["test"].avg_duration, 0)
+        self.assertEqual(metrics["unreachable"].errors, 1)
+
+
+class TestAsyncOutboundHTTPClient(FlakyServerMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = AsyncOutboundHTTPClient(backoff_factor=0)
+
+    async def test_idempotent_call_is_retried(self):
+        response = await self.client.get(self.url, endpoint="test")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FlakyHandler.calls, 2)
+        self.assertEqual(get_endpoint_metrics()["test"].calls, 2)
+
+    async def test_non_idempotent_call_is_not_retried(self):
+        response = await self.client.post(self.url, endpoint="test", json={})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(FlakyHandler.calls, 1)
+
+    async def test_client_is_reused_within_event_loop(self):
+        self.assertIs(self.client.get_client(), self.client.get_client())
@@ -1,7 +1,7 @@
 from datetime import timedelta
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
-import requests
+import httpx
 from django.http import StreamingHttpResponse
 from django.test import TestCase
 from django.utils import timezone
@@ -181,10 +181,10 @@ class TestTikTokAccessTokenService(TestCase):
         self.assertEqual(token.scope, "new_scope")
         self.assertEqual(TikTokAccessToken.objects.filter(open_id="test_id").count(), 1)
 
-    # ===== exchange_code_for_token() Tests =====
+    # ===== aexchange_code_for_token() Tests =====
 
-    @patch("shared.portability.services.requests.post")
-    def test_exchange_code_for_token_success(self, mock_post):
+    @patch("shared.portability.services.async_http_client.post")
+    async def test_exchange_code_for_token_success(self, mock_post):
         """Test successful code exchange"""
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -198,41 +198,24 @@ class TestTikTokAccessTokenService(TestCase):
         }
         mock_post.return_value = mock_response
 
-        result = self.service.exchange_code_for_token("test_auth_code")
+        result = await self.service.aexchange_code_for_token("test_auth_code")
 
         self.assertEqual(result["access_token"], "exchanged_token")
         self.assertEqual(result["open_id"], "user_789")
         mock_post.assert_called_once()
 
-    @patch("shared.portability.services.requests.post")
-    @patch("shared.portability.services.time.sleep")
-    def test_exchange_code_for_token_retries_on_timeout(self, mock_sleep, mock_post):
-        """Test retry logic on timeout"""
-        mock_response = Mock()
-        mock_response.json.return_value = {"access_token": "token"}
-
-        # First call times out, second succeeds
-        mock_post.side_effect = [Timeout(), mock_response]
-        result = self.service.exchange_code_for_token("auth_code_123")
-
-        self.assertEqual(mock_post.call_count, 2)
-        mock_sleep.assert_called_once_with(3)
-        self.assertIsNotNone(result)
-
-    @patch("shared.portability.services.requests.post")
-    @patch("shared.portability.services.time.sleep")
-    def test_exchange_code_for_token_gives_up_after_max_attempts(
-        self, mock_sleep, mock_post
+    @patch("shared.portability.services.async_http_client.get_client")
+    async def test_exchange_code_for_token_is_not_retried_on_timeout(
+        self, mock_get_client
     ):
-        """Test stops retrying after max attempts"""
-        mock_post.side_effect = Timeout()
+        """Test the single-use authorization code is not sent twice"""
+        mock_request = AsyncMock(side_effect=httpx.ReadTimeout("timeout"))
+        mock_get_client.return_value.request = mock_request
 
-        with self.assertRaises(requests.exceptions.RequestException):
-            self.service.exchange_code_for_token("auth_code_123")
+        with self.assertRaises(httpx.HTTPError):
+            await self.service.aexchange_code_for_token("auth_code_123")
 
-        # Should try 3 times (initial + 2 retries)
-        self.assertEqual(mock_post.call_count, 3)
-        self.assertEqual(mock_sleep.call_count, 2)
+        mock_request.assert_called_once()
 
 
 class TestTikTokPortabilityAPIClient(TestCase):
@@ -256,7 +239,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
 
     # ===== make_data_request() Tests =====
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_make_data_request_success(self, mock_post):
         """Test successful data request creation"""
         mock_response = Mock()
@@ -334,7 +317,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
 
     # ===== poll_data_request_status() Tests =====
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_poll_status_success(self, mock_post):
         """Test successful status polling"""
         mock_response = Mock()
@@ -354,7 +337,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
         self.assertEqual(result["data"]["status"], "downloading")
         self.assertEqual(result["data"]["request_id"], 12345)
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_poll_status_timeout(self, mock_post):
         """Test returns error dict on timeout"""
         mock_post.side_effect = Timeout()
@@ -436,7 +419,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
 
     # ===== stream_download_requested_data() Tests =====
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_stream_download_returns_streaming_response(self, mock_post):
         """Test returns StreamingHttpResponse"""
         mock_response = Mock()
@@ -448,7 +431,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
 
         self.assertIsInstance(result, StreamingHttpResponse)
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_stream_download_updates_db_on_success(self, mock_post):
         """Test updates TikTokDataRequest on successful download"""
         mock_response = Mock()
@@ -465,7 +448,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
         self.assertTrue(self.test_data_request.download_attempted)
         self.assertIsNotNone(self.test_data_request.downloaded_at)
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_stream_download_marks_failure_on_error(self, mock_post):
         """Test marks download as failed when error occurs during streaming"""
 
@@ -488,7 +471,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
 
     # ===== cancel_data_request() Tests =====
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_cancel_data_request_success(self, mock_post):
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -509,7 +492,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
             self.test_data_request.status, TikTokDataRequest.State.CANCELLED
         )
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_cancel_data_request_handles_nonexistent_request(self, mock_post):
         """Test handles case when data request doesn't exist in database"""
         mock_response = Mock()
@@ -524,7 +507,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
         result = self.api_client.cancel_data_request(99999)
         self.assertEqual(result["error"]["code"], "ok")
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_cancel_data_request_handles_http_error(self, mock_post):
         """Test returns error dict when HTTP error occurs"""
         mock_post.side_effect = HTTPError("500 Server Error")
@@ -534,7 +517,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
         self.assertIn("error", result)
         self.assertIn("Failed to cancel data request", result["error"])
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_cancel_data_request_handles_timeout(self, mock_post):
         """Test returns error dict on timeout"""
         mock_post.side_effect = Timeout()
@@ -543,7 +526,7 @@ class TestTikTokPortabilityAPIClient(TestCase):
 
         self.assertIn("error", result)
 
-    @patch("shared.portability.services.requests.post")
+    @patch("shared.portability.services.http_client.post")
     def test_cancel_data_request_does_not_update_db_on_api_failure(self, mock_post):
         """Test database status is NOT updated when API call fails"""
         mock_post.side_effect = HTTPError("500 Server Error")
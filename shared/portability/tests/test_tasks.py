@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from shared.portability.models import TikTokAccessToken, TikTokDataRequest
+from shared.portability.services import TikTokDataRequestPoller
+from shared.portability.state import get_data_request_state
+from shared.portability.tasks import poll_data_request, poll_due_data_requests
+from shared.portability.tests.utils import StubPortabilityAPIClient
+
+
+@override_settings(
+    TIKTOK_PORTABILITY_API_CLIENT=(
+        "shared.portability.tests.utils.StubPortabilityAPIClient"
+    )
+)
+class TestDataRequestPolling(TestCase):
+    def setUp(self):
+        cache.clear()
+        StubPortabilityAPIClient.reset()
+
+        self.open_id = "test-open-id"
+        TikTokAccessToken.objects.create(
+            open_id=self.open_id,
+            token="test-token",
+            token_expiration_date=timezone.now() + timedelta(hours=1),
+            refresh_token="refresh_token",
+            refresh_token_expiration_date=timezone.now() + timedelta(hours=1),
+            token_type="bearer",
+        )
+        self.data_request = TikTokDataRequest.objects.create(
+            open_id=self.open_id,
+            request_id=StubPortabilityAPIClient.request_id,
+        )
+
+    def test_poll_updates_db_and_cache(self):
+        poll_data_request(self.data_request.pk)
+        self.data_request.refresh_from_db()
+
+        self.assertEqual(self.data_request.status, TikTokDataRequest.State.PENDING)
+        self.assertIsNotNone(self.data_request.last_polled)
+        self.assertGreater(self.data_request.next_poll_at, timezone.now())
+
+        state = get_data_request_state(self.open_id)
+        self.assertEqual(state.status, TikTokDataRequest.State.PENDING)
+        self.assertEqual(state.request_id, self.data_request.request_id)
+
+    def test_poll_backs_off_while_status_is_unchanged(self):
+        poll_data_request(self.data_request.pk)
+        poll_data_request(self.data_request.pk)
+        poll_data_request(self.data_request.pk)
+        self.data_request.refresh_from_db()
+        self.assertEqual(self.data_request.poll_attempts, 2)
+
+        StubPortabilityAPIClient.status = "downloading"
+        poll_data_request(self.data_request.pk)
+        self.data_request.refresh_from_db()
+        self.assertEqual(self.data_request.poll_attempts, 0)
+
+    def test_next_poll_delay_is_capped_and_jittered(self):
+        poller = TikTokDataRequestPoller
+        max_delay = poller.MAX_INTERVAL * (1 + poller.JITTER)
+        min_delay = poller.BASE_INTERVAL * (1 - poller.JITTER)
+
+        for attempts in [0, 1, 5, 100]:
+            delay = poller.get_next_poll_delay(attempts).total_seconds()
+            self.assertLessEqual(delay, max_delay)
+            self.assertGreaterEqual(delay, min_delay)
+
+    def test_poll_failures_are_counted(self):
+        StubPortabilityAPIClient.fail_poll = True
+        for _ in range(TikTokDataRequest.MAX_POLL_FAILURES):
+            poll_data_request(self.data_request.pk)
+
+        self.data_request.refresh_from_db()
+        self.assertTrue(self.data_request.has_poll_error())
+        self.assertTrue(get_data_request_state(self.open_id).failed)
+
+        StubPortabilityAPIClient.fail_poll = False
+        poll_data_request(self.data_request.pk)
+        self.data_request.refresh_from_db()
+        self.assertFalse(self.data_request.has_poll_error())
+
+    def test_terminal_status_stops_polling(self):
+        StubPortabilityAPIClient.status = "expired"
+        poll_data_request(self.data_request.pk)
+        self.data_request.refresh_from_db()
+
+        self.assertIsNone(self.data_request.next_poll_at)
+        self.assertEqual(TikTokDataRequestPoller.claim_due_requests(), [])
+
+    def test_poll_due_data_requests_only_polls_due_requests(self):
+        TikTokDataRequest.objects.create(
+            open_id="other-open-id",
+            request_id=42,
+            next_poll_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        poll_due_data_requests()
+
+        self.assertEqual(StubPortabilityAPIClient.calls, ["poll_data_request_status"])
+        self.data_request.refresh_from_db()
+        self.assertEqual(self.data_request.status, TikTokDataRequest.State.PENDING)
+
+    def test_claimed_requests_are_not_claimed_twice(self):
+        self.assertEqual(
+            TikTokDataRequestPoller.claim_due_requests(), [self.data_request.pk]
+        )
+        self.assertEqual(TikTokDataRequestPoller.claim_due_requests(), [])
@@ -3,6 +3,7 @@ from unittest.mock import patch
 from urllib.parse import parse_qs, urlparse
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.http import HttpResponse
 from django.test import TestCase, override_settings
@@ -16,7 +17,16 @@ from shared.portability.models import (
     TikTokDataRequest,
 )
 from shared.portability.sessions import PortabilitySessionManager
-from shared.portability.tests.utils import get_request_with_session
+from shared.portability.state import (
+    DataRequestState,
+    get_data_request_state,
+    set_data_request_state,
+)
+from shared.portability.tasks import poll_data_request
+from shared.portability.tests.utils import (
+    StubPortabilityAPIClient,
+    get_request_with_session,
+)
 from shared.portability.views import (
     TikTokAuthView,
     TikTokCallbackView,
@@ -192,7 +202,7 @@ class TestTikTokCallbackView(TestCase):
         self.assertEqual(response.status_code, 200)
 
     @patch(
-        "shared.portability.services.TikTokAccessTokenService.exchange_code_for_token"
+        "shared.portability.services.TikTokAccessTokenService.aexchange_code_for_token"
     )
     def test_full_flow_happy_case(self, mock_token_exchange):
         mock_token_exchange.return_value = {
@@ -306,9 +316,17 @@ class TestTikTokAwaitDownloadView(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+@override_settings(
+    TIKTOK_PORTABILITY_API_CLIENT=(
+        "shared.portability.tests.utils.StubPortabilityAPIClient"
+    )
+)
 class TestTikTokCheckDownloadAvailabilityView(TestCase):
     def setUp(self):
-        self.request_id = 1234567890
+        cache.clear()
+        StubPortabilityAPIClient.reset()
+
+        self.request_id = StubPortabilityAPIClient.request_id
         self.open_id = "test-open-id"
         self.access_token = TikTokAccessToken.objects.create(
             open_id=self.open_id,
@@ -328,98 +346,107 @@ class TestTikTokCheckDownloadAvailabilityView(TestCase):
         self.view.request = self.request
         self.view.port_session = port_manager
 
-        self.mock_poll_data = {
-            "data": {
-                "apply_time": 1703186989,
-                "category_selection_list": [],
-                "collect_time": None,
-                "request_id": self.request_id,
-                "status": "",
-            },
-            "error": {"code": "ok", "message": "", "log_id": "123"},
-        }
-
-    def create_data_request_in_db(self):
+    def create_data_request_in_db(self, **kwargs):
         return TikTokDataRequest.objects.create(
             request_id=self.request_id,
             open_id=self.open_id,
+            **kwargs,
         )
 
-    @patch(
-        "shared.portability.services.TikTokPortabilityAPIClient.poll_data_request_status"
-    )
-    @patch("shared.portability.services.TikTokPortabilityAPIClient.make_data_request")
-    def test_download_await_view_creates_data_request_if_none_exists(
-        self,
-        mock_request_response,
-        mock_poll_response,
-    ):
-        mock_request_response.return_value = {
-            "data": {"request_id": self.request_id},
-            "error": {"code": "ok", "message": "", "log_id": "456"},
-        }
-
-        mock_data = self.mock_poll_data.copy()
-        mock_data["data"]["status"] = "pending"
-        mock_poll_response.return_value = mock_data
-
+    def test_download_await_view_creates_data_request_if_none_exists(self):
         self.assertEqual(
             TikTokDataRequest.objects.filter(request_id=self.request_id).count(), 0
         )
 
-        _ = self.view.get_context_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            _ = self.view.get_context_data()
 
         self.assertEqual(
             TikTokDataRequest.objects.filter(request_id=self.request_id).count(), 1
         )
         self.assertEqual(self.view.template_name, self.view.template_pending)
 
-    @patch(
-        "shared.portability.services.TikTokPortabilityAPIClient.poll_data_request_status"
-    )
-    def test_download_await_view_with_request_status_pending(self, mock_poll_response):
-        mock_data = self.mock_poll_data.copy()
-        mock_data["data"]["status"] = "pending"
-        mock_poll_response.return_value = mock_data
+    def test_data_request_is_issued_only_once_across_tabs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _ = self.view.get_context_data()
+            _ = self.view.get_context_data()
 
-        data_request = self.create_data_request_in_db()
+        self.assertEqual(StubPortabilityAPIClient.calls.count("make_data_request"), 1)
+
+    def test_failed_data_request_shows_error_and_allows_retry(self):
+        StubPortabilityAPIClient.fail_data_request = True
         _ = self.view.get_context_data()
-        data_request.refresh_from_db()
+        self.assertEqual(self.view.template_name, self.view.template_error)
 
+        StubPortabilityAPIClient.fail_data_request = False
+        with self.captureOnCommitCallbacks(execute=True):
+            _ = self.view.get_context_data()
         self.assertEqual(self.view.template_name, self.view.template_pending)
-        self.assertEqual(data_request.status, "pending")
+        self.assertTrue(
+            TikTokDataRequest.objects.filter(request_id=self.request_id).exists()
+        )
 
-    @patch(
-        "shared.portability.services.TikTokPortabilityAPIClient.poll_data_request_status"
-    )
-    def test_download_await_view_with_request_status_downloading(
-        self, mock_poll_response
-    ):
-        mock_data = self.mock_poll_data.copy()
-        mock_data["data"]["status"] = "downloading"
-        mock_poll_response.return_value = mock_data
+    def test_view_does_not_call_tiktok_api_for_existing_request(self):
+        self.create_data_request_in_db(status=TikTokDataRequest.State.PENDING)
+        _ = self.view.get_context_data()
 
+        self.assertEqual(StubPortabilityAPIClient.calls, [])
+        self.assertEqual(self.view.template_name, self.view.template_pending)
+
+    def test_download_await_view_with_request_status_downloading(self):
+        self.create_data_request_in_db(
+            status=TikTokDataRequest.State.READY, last_polled=timezone.now()
+        )
+        context = self.view.get_context_data()
+
+        self.assertEqual(self.view.template_name, self.view.template_success)
+        self.assertIn("poll_datetime", context)
+
+    def test_download_await_view_with_request_status_expired(self):
         data_request = self.create_data_request_in_db()
+        data_request.status = TikTokDataRequest.State.EXPIRED
+        set_data_request_state(
+            self.open_id, DataRequestState.from_data_request(data_request)
+        )
+
         _ = self.view.get_context_data()
+
+        self.assertEqual(self.view.template_name, self.view.template_expired)
+        self.assertIsNone(get_data_request_state(self.open_id))
+
+    def test_request_outside_poll_window_is_expired(self):
+        data_request = self.create_data_request_in_db(
+            status=TikTokDataRequest.State.PENDING,
+            issued_at=timezone.now() - timedelta(days=8),
+        )
+        _ = self.view.get_context_data()
+
+        self.assertEqual(self.view.template_name, self.view.template_expired)
+        self.assertIsNone(get_data_request_state(self.open_id))
         data_request.refresh_from_db()
+        self.assertEqual(data_request.status, TikTokDataRequest.State.EXPIRED)
 
-        self.assertEqual(self.view.template_name, self.view.template_success)
-        self.assertEqual(data_request.status, "downloading")
+        # A new data request is issued on the next visit.
+        self.assertIsNone(self.view.get_data_request_state(self.open_id))
 
-    @patch(
-        "shared.portability.services.TikTokPortabilityAPIClient.poll_data_request_status"
-    )
-    def test_download_await_view_with_request_status_expired(self, mock_poll_response):
-        mock_data = self.mock_poll_data.copy()
-        mock_data["data"]["status"] = "expired"
-        mock_poll_response.return_value = mock_data
+    def test_download_await_view_with_poll_errors(self):
+        self.create_data_request_in_db(
+            poll_failures=TikTokDataRequest.MAX_POLL_FAILURES
+        )
+        _ = self.view.get_context_data()
+
+        self.assertEqual(self.view.template_name, self.view.template_error)
 
+    def test_view_reads_state_written_by_poller(self):
         data_request = self.create_data_request_in_db()
         _ = self.view.get_context_data()
-        data_request.refresh_from_db()
+        self.assertEqual(self.view.template_name, self.view.template_pending)
 
-        self.assertEqual(self.view.template_name, self.view.template_expired)
-        self.assertEqual(data_request.status, "expired")
+        StubPortabilityAPIClient.status = "downloading"
+        poll_data_request(data_request.pk)
+
+        _ = self.view.get_context_data()
+        self.assertEqual(self.view.template_name, self.view.template_success)
 
 
 class TestTikTokDisconnectView(TestCase):
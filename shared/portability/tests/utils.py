@@ -1,7 +1,11 @@
+import requests
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.core.handlers.wsgi import WSGIRequest
 from django.test import RequestFactory
 
+from shared.portability.services import TikTokPortabilityAPIClient
+from shared.portability.views import TikTokDataDownloadMockView
+
 
 def get_request_with_session(path: str = "/") -> WSGIRequest:
     factory = RequestFactory()
@@ -13,3 +17,59 @@ def get_request_with_session(path: str = "/") -> WSGIRequest:
     request.session.save()
 
     return request
+
+
+class StubPortabilityAPIClient(TikTokPortabilityAPIClient):
+    """Local stand-in for the TikTok Portability API.
+
+    Usage: override TIKTOK_PORTABILITY_API_CLIENT with
+    "shared.portability.tests.utils.StubPortabilityAPIClient" and set the
+    class attributes to the desired TikTok responses.
+    """
+
+    request_id = 1234567890
+    status = "pending"
+    fail_data_request = False
+    fail_poll = False
+    fail_download = False
+    calls: list[str] = []
+
+    @classmethod
+    def reset(cls):
+        cls.status = "pending"
+        cls.fail_data_request = False
+        cls.fail_poll = False
+        cls.fail_download = False
+        cls.calls = []
+
+    def make_data_request(self) -> dict:
+        self.calls.append("make_data_request")
+        if self.fail_data_request:
+            return {"error": "Failed to make data request"}
+        return {
+            "data": {"request_id": self.request_id},
+            "error": {"code": "ok", "message": "", "log_id": "456"},
+        }
+
+    def poll_data_request_status(self, request_id: int) -> dict:
+        self.calls.append("poll_data_request_status")
+        if self.fail_poll:
+            return {"error": "Failed to poll data request status"}
+        return {
+            "data": {"request_id": request_id, "status": self.status},
+            "error": {"code": "ok", "message": "", "log_id": "123"},
+        }
+
+    def download_requested_data(self, data_request, file, chunk_size=64 * 1024):
+        """Writes the package of TikTokDataDownloadMockView to file."""
+        self.calls.append("download_requested_data")
+        if self.fail_download:
+            raise requests.exceptions.ConnectionError("Download failed")
+
+        content = TikTokDataDownloadMockView()._create_mock_zip().getvalue()
+        file.write(content)
+
+        data_request.download_attempted = True
+        data_request.download_succeeded = True
+        data_request.save()
+        return len(content)
@@ -1,11 +1,12 @@
 import io
 import json
 import logging
-import time
 import zipfile
+from datetime import datetime
 from urllib.parse import urlencode
 
-import requests
+import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import ValidationError
@@ -18,13 +19,13 @@ from django.http import (
     StreamingHttpResponse,
 )
 from django.shortcuts import redirect, render
-from django.utils import timezone
 from django.views import View
 from django.views.generic import TemplateView
 
 from digital_meal.core.logging_utils import log_security_event
 from shared.portability.constants import PortabilityContexts
 from shared.portability.exceptions import TokenRefreshError
+from shared.portability.http import async_http_client
 from shared.portability.models import (
     OAuthStateToken,
     TikTokAccessToken,
@@ -32,14 +33,24 @@ from shared.portability.models import (
 )
 from shared.portability.services import (
     TikTokAccessTokenService,
+    TikTokDataRequestPoller,
     TikTokPortabilityAPIClient,
 )
 from shared.portability.sessions import (
     PortabilitySessionManager,
     PortabilitySessionMixin,
 )
+from shared.portability.state import (
+    DataRequestState,
+    acquire_data_request_issue_lock,
+    delete_data_request_state,
+    get_data_request_state,
+    set_data_request_state,
+)
+from shared.portability.tasks import issue_data_request
 from shared.portability.utils import get_request_context
 from shared.routing.urls import absolute_reverse
+from shared.views import AsyncDispatchMixin
 
 logger = logging.getLogger(__name__)
 
@@ -292,7 +303,9 @@ class TikTokAuthView(PortabilitySessionMixin, TemplateView):
         return context
 
 
-class TikTokCallbackView(ManageAccessTokenMixin, PortabilitySessionMixin, View):
+class TikTokCallbackView(
+    AsyncDispatchMixin, ManageAccessTokenMixin, PortabilitySessionMixin, View
+):
     """Handles the callback from TikTok after authentication.
 
     Validates the received data and retrieves the access token from TikTok.
@@ -403,7 +416,7 @@ class TikTokCallbackView(ManageAccessTokenMixin, PortabilitySessionMixin, View):
 
         self.port_session.delete_token()
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         """Exchanges the authorization code for an access token and stores it.
 
         Flow:
@@ -414,6 +427,9 @@ class TikTokCallbackView(ManageAccessTokenMixin, PortabilitySessionMixin, View):
         5. Store token reference in session
         6. Redirect to data download awaiting page
 
+        The exchange is awaited without blocking a worker; database and session
+        access are run in a thread.
+
         Args:
             request: The HTTP request object.
             *args: Additional positional arguments.
@@ -428,9 +444,9 @@ class TikTokCallbackView(ManageAccessTokenMixin, PortabilitySessionMixin, View):
         # Get access token information from TikTok.
         try:
             auth_code = self.request.GET.get("code")
-            token_data = token_service.exchange_code_for_token(auth_code)
-        except requests.exceptions.RequestException:
-            return redirect_to_auth_view(request)
+            token_data = await token_service.aexchange_code_for_token(auth_code)
+        except (httpx.HTTPError, ValueError):
+            return await sync_to_async(redirect_to_auth_view)(request)
 
         if not token_service.check_token_data_is_valid(token_data):
             try:
@@ -438,7 +454,7 @@ class TikTokCallbackView(ManageAccessTokenMixin, PortabilitySessionMixin, View):
             except AttributeError:
                 token_info = token_data
             logger.error("Received invalid token data from TikTok: %s", token_info)
-            return redirect_to_auth_view(request)
+            return await sync_to_async(redirect_to_auth_view)(request)
 
         # Check if token for user already exists and if yes, delete existing one.
         open_id = token_data.get("open_id")
@@ -446,13 +462,17 @@ class TikTokCallbackView(ManageAccessTokenMixin, PortabilitySessionMixin, View):
             logger.error(
                 "Received token data without open_id; token_data: %s", token_data
             )
-            return redirect_to_auth_view(request)
+            return await sync_to_async(redirect_to_auth_view)(request)
 
-        token_service.update_or_create_access_token(token_data)
+        return await sync_to_async(self.store_access_token)(token_data)
+
+    def store_access_token(self, token_data: dict) -> HttpResponse:
+        """Stores the access token and the user's open ID in the session."""
+        TikTokAccessTokenService.update_or_create_access_token(token_data)
 
         # Regenerate session ID to prevent session hijacking
-        request.session.cycle_key()
-        self.port_session.update(tiktok_open_id=open_id)
+        self.request.session.cycle_key()
+        self.port_session.update(tiktok_open_id=token_data["open_id"])
 
         return self.redirect_success()
 
@@ -515,25 +535,18 @@ class TikTokCheckDownloadAvailabilityView(
         self.access_token.refresh_from_db()
         return super().session_dispatch(request, *args, **kwargs)
 
-    def get_context_data(self, **kwargs):
-        """Checks data download availability and prepares appropriate template.
-
-        Flow:
-        1. Check if a data request already exists for this user
-        2. If not, initiate a new data request via TikTok API
-        3. Poll the status of the data request
-        4. Select appropriate template based on status (pending/success/error)
+    def get_data_request_state(self, open_id: str) -> DataRequestState | None:
+        """Returns the state of the user's current data request.
 
-        Returns:
-            dict: Context dictionary containing status information and any
-                error messages. The template_name is set based on the status.
+        The state is written by the background poller (see
+        shared.portability.tasks). Falls back to the database if the state is
+        not (or no longer) cached; requests the poller has given up on are
+        marked as expired.
         """
-        context = super().get_context_data(**kwargs)
-
-        api_client = TikTokPortabilityAPIClient(self.access_token)
+        state = get_data_request_state(open_id)
+        if state:
+            return state
 
-        # Check if data request has already been issued.
-        open_id = self.port_session.get_tiktok_open_id()
         data_request = (
             TikTokDataRequest.objects.filter(
                 open_id=open_id,
@@ -547,56 +560,74 @@ class TikTokCheckDownloadAvailabilityView(
             )
             .first()
         )
+        if not data_request:
+            return None
 
-        if not data_request or not data_request.is_active():
-            # Make initial data request.
-            response_data = api_client.make_data_request()
-            response_valid, msg = api_client.data_request_response_is_valid(
-                response_data
-            )
-            if not response_valid:
-                self.template_name = self.template_error
-                return context
+        data_request = TikTokDataRequestPoller.expire_if_outside_poll_window(
+            data_request
+        )
+        state = DataRequestState.from_data_request(data_request)
+        set_data_request_state(open_id, state)
+        return state
 
-            data_request = TikTokDataRequest.objects.create(
-                open_id=open_id,
-                request_id=response_data.get("data", {}).get("request_id"),
-            )
+    def get_context_data(self, **kwargs):
+        """Checks data download availability and prepares appropriate template.
 
-        # Poll download status
-        request_id = data_request.request_id
-        request_status_response = api_client.poll_data_request_status(request_id)
-        status_request_valid, msg = (
-            api_client.poll_data_request_status_response_is_valid(
-                request_status_response
-            )
-        )
+        Only reads the locally stored state of the data request - TikTok's API
+        is polled in the background by shared.portability.tasks.
 
-        if not status_request_valid:
-            self.template_name = self.template_error
+        Flow:
+        1. Check if a data request already exists for this user
+        2. If not, enqueue a new data request (once, regardless of how many
+           tabs are polling)
+        3. Select appropriate template based on the stored status
+           (pending/success/expired/error)
+
+        Returns:
+            dict: Context dictionary containing status information. The
+                template_name is set based on the status.
+        """
+        context = super().get_context_data(**kwargs)
+
+        open_id = self.port_session.get_tiktok_open_id()
+        state = self.get_data_request_state(open_id)
+
+        if state is None and acquire_data_request_issue_lock(open_id):
+            issue_data_request.delay(open_id)
+            # Note: Is only set at this point if tasks are executed eagerly.
+            state = get_data_request_state(open_id)
+
+        if state is None:
+            self.template_name = self.template_pending
             return context
 
-        # Handle response and update data request object
-        request_status_data = request_status_response.get("data")
-        request_status = request_status_data.get("status")
-        data_request.status = request_status
-        data_request.last_polled = timezone.now()
-        data_request.save()
+        if state.failed:
+            if state.request_id is None:
+                # Issuing the request failed; allow a new attempt on next visit.
+                delete_data_request_state(open_id)
+            self.template_name = self.template_error
+            return context
 
         # Use the matching template.
-        if request_status == TikTokDataRequest.State.PENDING:
+        if state.status in [
+            TikTokDataRequest.State.NOT_POLLED,
+            TikTokDataRequest.State.PENDING,
+        ]:
             self.template_name = self.template_pending
-        elif request_status == TikTokDataRequest.State.READY:
+        elif state.status == TikTokDataRequest.State.READY:
             self.template_name = self.template_success
-        elif request_status in [
+        elif state.status in [
             TikTokDataRequest.State.EXPIRED,
             TikTokDataRequest.State.CANCELLED,
         ]:
+            # A new data request is issued on the next visit.
+            delete_data_request_state(open_id)
             self.template_name = self.template_expired
         else:
             self.template_name = self.template_error
 
-        context["poll_datetime"] = timezone.now()
+        if state.last_polled:
+            context["poll_datetime"] = datetime.fromisoformat(state.last_polled)
 
         return context
 
@@ -729,6 +760,7 @@ class TikTokDataDownloadMockView(
 
 
 class TikTokDataReviewView(
+    AsyncDispatchMixin,
     AuthenticationRequiredMixin,
     ActiveAccessTokenRequiredMixin,
     PortabilitySessionMixin,
@@ -738,13 +770,18 @@ class TikTokDataReviewView(
 
     template_name = "portability/tiktok_data_review.html"
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    async def get(self, request, *args, **kwargs):
+        context = await sync_to_async(self.get_context_data)(**kwargs)
+        context |= await self.get_user_info_context()
+        return self.render_to_response(context)
+
+    async def get_user_info_context(self) -> dict:
+        context = {}
         user_info_retrieved = False
 
         try:
-            response = self.get_user_info_from_tiktok()
-        except requests.exceptions.RequestException:
+            response = await self.aget_user_info_from_tiktok()
+        except (httpx.HTTPError, ValueError):
             context["error"] = "request_exception"
             response = None
 
@@ -787,14 +824,12 @@ class TikTokDataReviewView(
 
         return pretty_dict
 
-    def get_user_info_from_tiktok(self, attempt: int = 1) -> dict | None:
+    async def aget_user_info_from_tiktok(self) -> dict | None:
         """Retrieves the user information from the TikTok User Info API.
 
-        Args:
-            attempt: Number of attempts to get user info.
-
         Raises:
-            RequestException: If the request fails.
+            httpx.HTTPError: If the request fails (after retries).
+            ValueError: If the response is not valid JSON.
 
         Returns:
             dict | None: The JSON response from the TikTok API endpoint.
@@ -805,15 +840,14 @@ class TikTokDataReviewView(
         params = {"fields": ",".join(fields)}
         headers = {"Authorization": f"Bearer {self.access_token.token}"}
 
-        max_tries = 3
         try:
-            response = requests.get(
-                url, headers=headers, params=params, timeout=(5, 15)
+            response = await async_http_client.get(
+                url, endpoint="tiktok.user.info", headers=headers, params=params
             )
             response.raise_for_status()
             return response.json()
 
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             # TODO: Handle specific errors.
             # Possible errors: {"error":{"code":"scope_not_authorized",
             # "message":"The user did not authorize the scope required
@@ -822,12 +856,7 @@ class TikTokDataReviewView(
             # F9AB7B4D"}
 
             logger.error("Failed to retrieve user info: %s", e)
-
-            if attempt < max_tries:
-                time.sleep(3 * attempt)
-                return self.get_user_info_from_tiktok(attempt + 1)
-            else:
-                raise
+            raise
 
 
 class TikTokDisconnectView(AuthenticationRequiredMixin, PortabilitySessionMixin, View):
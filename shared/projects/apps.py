@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SharedProjectsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "shared.projects"
+    label = "shared_projects"
+    verbose_name = "Digital Meal DDM Projects"
+
+    def ready(self):
+        from shared.projects import signals  # noqa: F401, PLC0415
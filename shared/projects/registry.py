@@ -0,0 +1,141 @@
+"""Per-process registry of DDM projects and their decryptors.
+
+Setting up a ``Decryption`` derives an RSA key from the project secret, which
+is expensive. Reports and statistics tasks used to look up the project and
+set up a new decryptor for every request. The registry keeps both in memory
+per worker process, keyed by project id:
+
+- Entries expire after ``PROJECT_REGISTRY_TTL`` seconds.
+- At most ``PROJECT_REGISTRY_MAX_SIZE`` projects are kept (least recently
+  used entries are evicted first).
+- Entries are invalidated when a DonationProject is saved or deleted (see
+  ``shared.projects.signals``). Other processes are not notified, so changes
+  made elsewhere become visible after the TTL at the latest.
+
+Registered projects are shared between requests and must be treated as
+read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ddm.encryption.models import Decryption
+from ddm.projects.models import DonationProject
+
+PROJECT_REGISTRY_TTL = 600
+PROJECT_REGISTRY_MAX_SIZE = 32
+
+
+@dataclass(frozen=True)
+class RegisteredProject:
+    project: DonationProject
+    decryptor: Decryption
+    expires_at: float
+
+
+class ProjectRegistry:
+    """Thread-safe LRU cache of projects and decryptors with a TTL.
+
+    Args:
+        ttl: Seconds after which an entry is reloaded from the database.
+        max_size: Maximal number of projects kept in the registry.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PROJECT_REGISTRY_TTL,
+        max_size: int = PROJECT_REGISTRY_MAX_SIZE,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, RegisteredProject] = OrderedDict()
+        self._url_ids: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, *, pk: int | None = None, url_id: str | None = None
+    ) -> RegisteredProject:
+        """Returns the registered entry of a project.
+
+        Loads the project and sets up its decryptor if it is not registered
+        yet or if its entry has expired.
+
+        Raises:
+            DonationProject.DoesNotExist: If the project does not exist.
+        """
+        if pk is None and url_id is None:
+            msg = "Either pk or url_id must be provided."
+            raise ValueError(msg)
+
+        with self._lock:
+            if pk is None:
+                pk = self._url_ids.get(url_id)
+            entry = self._get_valid(pk) if pk is not None else None
+        if entry is not None:
+            return entry
+
+        # Set up the decryptor outside the lock so that concurrent lookups of
+        # other projects are not blocked.
+        lookup = {"pk": pk} if pk is not None else {"url_id": url_id}
+        project = DonationProject.objects.get(**lookup)
+        entry = RegisteredProject(
+            project=project,
+            decryptor=Decryption(project.secret, project.get_salt()),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            self._add(entry)
+        return entry
+
+    def _get_valid(self, pk: int) -> RegisteredProject | None:
+        entry = self._entries.get(pk)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(pk)
+            return None
+        self._entries.move_to_end(pk)
+        return entry
+
+    def _add(self, entry: RegisteredProject) -> None:
+        project = entry.project
+        self._remove(project.pk)
+        self._entries[project.pk] = entry
+        self._url_ids[project.url_id] = project.pk
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, pk: int) -> None:
+        entry = self._entries.pop(pk, None)
+        if entry is not None:
+            self._url_ids.pop(entry.project.url_id, None)
+
+    def invalidate(self, pk: int) -> None:
+        """Removes a project from the registry."""
+        with self._lock:
+            self._remove(pk)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._url_ids.clear()
+
+
+project_registry = ProjectRegistry()
+
+
+def get_registered_project(
+    *, pk: int | None = None, url_id: str | None = None
+) -> DonationProject:
+    """Returns a project by pk or url_id from the registry."""
+    return project_registry.get(pk=pk, url_id=url_id).project
+
+
+def get_project_decryptor(project: DonationProject) -> Decryption:
+    """Returns the registered decryptor of a project."""
+    return project_registry.get(pk=project.pk).decryptor
@@ -0,0 +1,12 @@
+from ddm.projects.models import DonationProject
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.projects.registry import project_registry
+
+
+@receiver(post_save, sender=DonationProject)
+@receiver(post_delete, sender=DonationProject)
+def invalidate_registered_project(sender, instance, **kwargs):
+    """Drop the cached project and decryptor after it has been changed."""
+    project_registry.invalidate(instance.pk)
@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from ddm.encryption.models import Decryption
+from ddm.projects.models import DonationProject, ResearchProfile
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from shared.projects.registry import (
+    ProjectRegistry,
+    get_project_decryptor,
+    get_registered_project,
+    project_registry,
+)
+
+User = get_user_model()
+
+
+class ProjectRegistryTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            email="owner@mail.com", username="owner", password="testpass"
+        )
+        self.owner = ResearchProfile.objects.create(user=user)
+        self.project = DonationProject.objects.create(
+            owner=self.owner, slug="project-a", url_id="projecta"
+        )
+        self.registry = ProjectRegistry(ttl=60, max_size=2)
+
+        decryption_patcher = patch(
+            "shared.projects.registry.Decryption", wraps=Decryption
+        )
+        self.decryption = decryption_patcher.start()
+        self.addCleanup(decryption_patcher.stop)
+
+    def create_project(self, url_id: str) -> DonationProject:
+        return DonationProject.objects.create(
+            owner=self.owner, slug=url_id, url_id=url_id
+        )
+
+    def test_decryptor_is_set_up_once(self):
+        entry = self.registry.get(url_id=self.project.url_id)
+
+        with self.assertNumQueries(0):
+            self.assertIs(self.registry.get(pk=self.project.pk), entry)
+            self.assertIs(self.registry.get(url_id=self.project.url_id), entry)
+        self.assertEqual(self.decryption.call_count, 1)
+        self.assertEqual(entry.project, self.project)
+
+    def test_unknown_project(self):
+        with self.assertRaises(DonationProject.DoesNotExist):
+            self.registry.get(url_id="unknown")
+
+    def test_lru_eviction(self):
+        project_b = self.create_project("projectb")
+        project_c = self.create_project("projectc")
+
+        self.registry.get(pk=self.project.pk)
+        self.registry.get(pk=project_b.pk)
+        self.registry.get(pk=self.project.pk)
+        self.registry.get(pk=project_c.pk)
+
+        self.assertEqual(len(self.registry), 2)
+        self.registry.get(pk=self.project.pk)
+        self.assertEqual(self.decryption.call_count, 3)
+        self.registry.get(pk=project_b.pk)
+        self.assertEqual(self.decryption.call_count, 4)
+
+    def test_ttl_expiry(self):
+        with patch("shared.projects.registry.time.monotonic", return_value=100):
+            self.registry.get(pk=self.project.pk)
+            self.registry.get(pk=self.project.pk)
+        self.assertEqual(self.decryption.call_count, 1)
+
+        with patch("shared.projects.registry.time.monotonic", return_value=161):
+            self.registry.get(pk=self.project.pk)
+        self.assertEqual(self.decryption.call_count, 2)
+
+    def test_invalidated_on_save(self):
+        project = get_registered_project(url_id=self.project.url_id)
+        self.assertIs(get_registered_project(pk=self.project.pk), project)
+
+        self.project.name = "Renamed"
+        self.project.save()
+
+        self.assertEqual(get_registered_project(pk=self.project.pk).name, "Renamed")
+        self.assertEqual(self.decryption.call_count, 2)
+
+    def test_invalidated_on_delete(self):
+        get_project_decryptor(self.project)
+        pk = self.project.pk
+        self.project.delete()
+
+        with self.assertRaises(DonationProject.DoesNotExist):
+            project_registry.get(pk=pk)
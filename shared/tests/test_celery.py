@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from config.celery_app import (
+    PRELOADED_MODULES,
+    app,
+    apply_queue_profile,
+    preload_heavy_modules,
+)
+
+
+class TaskRoutingTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        app.loader.import_default_modules()
+
+    def test_all_tasks_are_routed(self):
+        task_names = {name for name in app.tasks if not name.startswith("celery.")}
+        self.assertEqual(task_names, set(settings.CELERY_TASK_ROUTES))
+
+    def test_routes_and_time_limits(self):
+        name = (
+            "mydigitalmeal.statistics.tasks.compute_tiktok_wh_statistics_from_donation"
+        )
+        profile = settings.CELERY_QUEUE_PROFILES["statistics"]
+
+        route = app.amqp.router.route({}, name)
+        self.assertEqual(
+            route["queue"].name, f"{settings.CELERY_TASK_DEFAULT_QUEUE}.statistics"
+        )
+        self.assertEqual(route["priority"], profile["priority"])
+
+        task = app.tasks[name]
+        self.assertEqual(task.time_limit, profile["time_limit"])
+        self.assertEqual(task.soft_time_limit, profile["soft_time_limit"])
+
+    def test_queues_have_distinct_routing_keys(self):
+        queues = list(app.amqp.queues.values())
+        self.assertEqual(len(queues), len(settings.CELERY_QUEUE_PROFILES) + 1)
+        self.assertEqual(len({queue.routing_key for queue in queues}), len(queues))
+
+
+class WorkerBootstrapTests(SimpleTestCase):
+    def get_worker(self, queue_names):
+        queues = SimpleNamespace(consume_from=dict.fromkeys(queue_names))
+        return SimpleNamespace(
+            app=SimpleNamespace(amqp=SimpleNamespace(queues=queues)),
+            concurrency=16,
+            prefetch_multiplier=4,
+            max_tasks_per_child=None,
+        )
+
+    def test_profile_of_single_queue_is_applied(self):
+        profile = settings.CELERY_QUEUE_PROFILES["statistics"]
+        worker = self.get_worker([f"{settings.CELERY_TASK_DEFAULT_QUEUE}.statistics"])
+        apply_queue_profile(worker)
+        self.assertEqual(worker.concurrency, profile["concurrency"])
+        self.assertEqual(worker.prefetch_multiplier, profile["prefetch_multiplier"])
+        self.assertEqual(worker.max_tasks_per_child, profile["max_tasks_per_child"])
+
+    def test_workers_of_several_or_unknown_queues_are_unchanged(self):
+        default_queue = settings.CELERY_TASK_DEFAULT_QUEUE
+        for queue_names in [
+            [f"{default_queue}.statistics", f"{default_queue}.reports"],
+            [default_queue],
+            ["statistics"],
+        ]:
+            with self.subTest(queue_names=queue_names):
+                worker = self.get_worker(queue_names)
+                apply_queue_profile(worker)
+                self.assertEqual(worker.concurrency, 16)
+                self.assertEqual(worker.prefetch_multiplier, 4)
+
+    def preload(self, queue_names) -> tuple[list[str], bool]:
+        """Returns the modules preloaded by a worker and if it loaded spaCy."""
+        default_queue = settings.CELERY_TASK_DEFAULT_QUEUE
+        worker = self.get_worker([f"{default_queue}.{name}" for name in queue_names])
+        with (
+            patch("digital_meal.reports.utils.shared.data.get_nlp_de") as get_nlp_de,
+            patch("config.celery_app.importlib.import_module") as import_module,
+        ):
+            preload_heavy_modules(worker)
+        imported = [call.args[0] for call in import_module.call_args_list]
+        return imported, get_nlp_de.called
+
+    def test_heavy_modules_are_preloaded(self):
+        self.assertEqual(
+            self.preload(["statistics"]), (PRELOADED_MODULES["statistics"], False)
+        )
+        self.assertEqual(
+            self.preload(["reports"]), (PRELOADED_MODULES["reports"], True)
+        )
+
+    def test_workers_of_other_queues_preload_nothing(self):
+        self.assertEqual(self.preload(["portability"]), ([], False))
+        self.assertEqual(self.preload(["housekeeping"]), ([], False))
+
+    def test_workers_of_several_queues_preload_each_module_once(self):
+        imported, spacy_loaded = self.preload(list(settings.CELERY_QUEUE_PROFILES))
+        self.assertEqual(len(imported), len(set(imported)))
+        self.assertEqual(
+            set(imported),
+            {*PRELOADED_MODULES["statistics"], *PRELOADED_MODULES["reports"]},
+        )
+        self.assertTrue(spacy_loaded)
@@ -0,0 +1,95 @@
+"""Import-time budget of the URLconf.
+
+Every web worker, management command and test run imports the URLconf on
+startup. The URLconf is imported in a fresh interpreter with `-X importtime`
+and must neither import the heavy report and statistics dependencies (they
+are imported where they are used) nor exceed IMPORT_TIME_BUDGET. On failure,
+the slowest imports are listed in the report.
+"""
+
+import json
+import re
+import subprocess
+import sys
+from typing import NamedTuple
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+URLCONF_MODULE = "config.urls.main_conf"
+
+# Cumulative import time of the URLconf (after django.setup()) in seconds.
+IMPORT_TIME_BUDGET = 1.5
+
+HEAVY_MODULES = ["bokeh", "matplotlib", "pandas", "spacy", "wordcloud"]
+
+IMPORT_SCRIPT = f"""
+import json, sys
+import django
+django.setup()
+import {URLCONF_MODULE}
+print(json.dumps(sorted(set({HEAVY_MODULES!r}) & set(sys.modules))))
+"""
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """Parses the `-X importtime` output of an interpreter (in import order)."""
+    import_times = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            import_times.append(
+                ImportTime(
+                    module=match[3],
+                    self_us=int(match[1]),
+                    cumulative_us=int(match[2]),
+                )
+            )
+    return import_times
+
+
+def format_report(import_times: list[ImportTime], n: int = 15) -> str:
+    """Returns the n slowest imports by cumulative time as text table."""
+    slowest = sorted(import_times, key=lambda i: i.cumulative_us, reverse=True)[:n]
+    lines = [f"{'cumulative (ms)':>16} {'self (ms)':>10}  module"]
+    lines += [
+        f"{i.cumulative_us / 1000:>16.1f} {i.self_us / 1000:>10.1f}  {i.module}"
+        for i in slowest
+    ]
+    return "\n".join(lines)
+
+
+class URLConfImportTimeTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            text=True,
+        )
+        cls.imported_heavy_modules = json.loads(result.stdout.splitlines()[-1])
+        cls.import_times = parse_import_times(result.stderr)
+
+    def test_heavy_modules_are_not_imported(self):
+        self.assertEqual(
+            self.imported_heavy_modules, [], format_report(self.import_times)
+        )
+
+    def test_import_time_budget(self):
+        urlconf = next(i for i in self.import_times if i.module == URLCONF_MODULE)
+        self.assertLessEqual(
+            urlconf.cumulative_us / 1_000_000,
+            IMPORT_TIME_BUDGET,
+            format_report(self.import_times),
+        )
@@ -0,0 +1,426 @@
+"""Query and latency budgets of the hot views.
+
+Every endpoint listed in BUDGETS is requested once against a realistic
+fixture (several classrooms with hundreds of participants, donations and
+questionnaire responses) and must stay within its maximal number of database
+queries and its wall-clock ceiling. A view that starts issuing queries per
+participant or per row (N+1) therefore fails here instead of in production.
+
+Query budgets are exact upper bounds measured on this fixture and must be
+adjusted deliberately (in BUDGETS only) when a view legitimately changes.
+Wall-clock ceilings are generous, so that they only catch regressions by
+orders of magnitude and not noise of the test machine.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from unittest.mock import patch
+
+from ddm.datadonation.models import DataDonation, DonationBlueprint, FileUploader
+from ddm.encryption.models import Encryption
+from ddm.logging.models import ExceptionLogEntry, ExceptionRaisers
+from ddm.participation.models import Participant
+from ddm.projects.models import DonationProject, ResearchProfile
+from ddm.questionnaire.models import QuestionnaireResponse, SingleChoiceQuestion
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import digital_meal.reports.utils.tiktok.example_data as tiktok_data
+from digital_meal.tool.models import BaseModule, Classroom, Teacher
+from mydigitalmeal.profiles.models import MDMProfile
+from mydigitalmeal.reports.context import get_report_context
+from mydigitalmeal.statistics.models import (
+    StatisticsRequest,
+    StatisticsScope,
+    TikTokWatchHistoryStatistics,
+)
+from mydigitalmeal.statistics.tasks import compute_tiktok_wh_statistics_from_donation
+from mydigitalmeal.userflow.constants import USERFLOW_SESSION_KEY
+from shared.portability.models import TikTokAccessToken, TikTokDataRequest
+from shared.portability.sessions import PortabilitySessionManager
+from shared.projects.registry import project_registry
+
+User = get_user_model()
+
+
+class Budget(NamedTuple):
+    queries: int
+    seconds: float
+
+
+BUDGETS = {
+    # digital_meal
+    "tiktok_class_report_sections": Budget(queries=12, seconds=20.0),
+    "tiktok_individual_report_sections": Budget(queries=11, seconds=10.0),
+    "class_detail": Budget(queries=12, seconds=1.0),
+    "classroom_admin_changelist": Budget(queries=10, seconds=1.0),
+    "dashboard_classroom_overview": Budget(queries=14, seconds=1.0),
+    "dashboard_teacher_overview": Budget(queries=9, seconds=1.0),
+    "dashboard_participation_overview": Budget(queries=16, seconds=5.0),
+    "dashboard_exception_overview": Budget(queries=10, seconds=1.0),
+    # mydigitalmeal
+    "mdm_tiktok_statistics": Budget(queries=8, seconds=1.0),
+    "study_tiktok_statistics": Budget(queries=9, seconds=1.0),
+    # shared
+    "tiktok_check_download_availability": Budget(queries=7, seconds=1.0),
+}
+
+N_CLASSROOMS = 4
+N_PARTICIPANTS_PER_CLASSROOM = 40
+N_HISTORIES = 4  # Distinct synthetic histories shared by the participants.
+HISTORY_DAYS = 3
+
+
+@override_settings(
+    TIKTOK_PORTABILITY_API_CLIENT="shared.portability.tests.utils.StubPortabilityAPIClient"
+)
+class TestQueryBudgets(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher_creds = {
+            "username": "teacher",
+            "password": "123",
+            "email": "teacher@mail.com",
+        }
+        cls.teacher = User.objects.create_user(**cls.teacher_creds)
+        MDMProfile.objects.create(user=cls.teacher)
+        Teacher.objects.create(user=cls.teacher, name="Teacher", first_name="Some")
+        cls.staff_creds = {
+            "username": "staff",
+            "password": "123",
+            "email": "staff@mail.com",
+        }
+        User.objects.create_superuser(**cls.staff_creds)
+
+        cls.project = DonationProject.objects.create(
+            name="budget-project",
+            slug="budget-project",
+            active=True,
+            owner=ResearchProfile.objects.create(user=cls.teacher),
+        )
+        uploader = FileUploader.objects.create(
+            project=cls.project, name="uploader", upload_type="zip file"
+        )
+        cls.wh_blueprint = DonationBlueprint.objects.create(
+            project=cls.project,
+            name=settings.MDM_DDM_TIKTOK_WH_BP_NAME,
+            exp_file_format="json",
+            file_uploader=uploader,
+        )
+        cls.sh_blueprint = DonationBlueprint.objects.create(
+            project=cls.project,
+            name="Durchgeführte Suchen",
+            exp_file_format="json",
+            file_uploader=uploader,
+        )
+        consent_question = SingleChoiceQuestion.objects.create(
+            project=cls.project,
+            name="DD Consent Question",
+            variable_name="usage_dd_consent",
+        )
+
+        module = BaseModule.objects.create(
+            name="tiktok-module",
+            active=True,
+            ddm_path="https://127.0.0.1:8000/",
+            ddm_project_id=cls.project.url_id,
+            report_prefix="tiktok",
+        )
+        cls.classrooms = [
+            Classroom.objects.create(
+                owner=cls.teacher,
+                name=f"class {i}",
+                base_module=module,
+                school_level="primary",
+                school_year=10,
+                subject="languages",
+                instruction_format="regular",
+            )
+            for i in range(N_CLASSROOMS)
+        ]
+
+        cls.create_participations(consent_question)
+        cls.create_study_participation()
+        cls.create_portability_state()
+
+    @classmethod
+    def create_participations(cls, consent_question):
+        """Creates participants with donations and responses in all classrooms.
+
+        Payloads are encrypted once and shared between participants, because
+        encryption (not the queries) would otherwise dominate the setup.
+        """
+        encryptor = Encryption(
+            cls.project.secret_key, cls.project.get_salt(), cls.project.public_key
+        )
+        now = timezone.now()
+        latest_date = now.replace(tzinfo=None)  # Histories hold naive timestamps.
+        watch_histories = [
+            encryptor.encrypt(
+                tiktok_data.generate_synthetic_watch_history(
+                    latest_date, HISTORY_DAYS, seed=seed
+                )["data"]
+            )
+            for seed in range(N_HISTORIES)
+        ]
+        search_histories = [
+            encryptor.encrypt(
+                tiktok_data.generate_synthetic_search_history(
+                    latest_date, HISTORY_DAYS, seed=seed
+                )["data"]
+            )
+            for seed in range(N_HISTORIES)
+        ]
+        consent_key = consent_question.get_response_keys()[0]
+        responses = [
+            encryptor.encrypt({consent_key: 1}),
+            encryptor.encrypt({consent_key: 0}),
+        ]
+
+        # bulk_create() does not set external ids (see Participant.save()) and
+        # does not return primary keys on all backends.
+        Participant.objects.bulk_create(
+            Participant(
+                project=cls.project,
+                external_id=f"{i:02d}{j:022d}",
+                extra_data={"url_param": {"class": classroom.url_id}},
+                start_time=now,
+                end_time=now,
+                completed=True,
+            )
+            for i, classroom in enumerate(cls.classrooms)
+            for j in range(N_PARTICIPANTS_PER_CLASSROOM)
+        )
+        participants = list(
+            Participant.objects.filter(project=cls.project).order_by("external_id")
+        )
+        cls.participant = participants[0]
+
+        donations = []
+        for i, participant in enumerate(participants):
+            for blueprint, payloads in [
+                (cls.wh_blueprint, watch_histories),
+                (cls.sh_blueprint, search_histories),
+            ]:
+                donations.append(
+                    DataDonation(
+                        project=cls.project,
+                        participant=participant,
+                        blueprint=blueprint,
+                        consent=True,
+                        status="success",
+                        data=payloads[i % N_HISTORIES],
+                    )
+                )
+        DataDonation.objects.bulk_create(donations)
+        QuestionnaireResponse.objects.bulk_create(
+            QuestionnaireResponse(
+                project=cls.project,
+                participant=participant,
+                data=responses[i % 2],
+            )
+            for i, participant in enumerate(participants)
+        )
+        ExceptionLogEntry.objects.bulk_create(
+            ExceptionLogEntry(
+                project=cls.project,
+                participant=participant,
+                blueprint=cls.wh_blueprint,
+                exception_type="PARSING_ERROR",
+                message="Parsing error.",
+                raised_by=ExceptionRaisers.CLIENT,
+            )
+            for participant in participants[::10]
+        )
+
+    @classmethod
+    def create_study_participation(cls):
+        """Computes the statistics of a study participant's watch history."""
+        history = tiktok_data.generate_synthetic_watch_history(
+            timezone.now().replace(tzinfo=None), HISTORY_DAYS, seed=0
+        )["data"]
+        cls.study_participant = Participant.objects.create(
+            project=cls.project, start_time=timezone.now()
+        )
+        DataDonation.objects.create(
+            project=cls.project,
+            participant=cls.study_participant,
+            blueprint=cls.wh_blueprint,
+            consent=True,
+            status="success",
+            # Keys and date format as in TikTok's own export.
+            data=[
+                {
+                    "Date": datetime.fromisoformat(entry["(D|d)ate"]).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
+                    "Link": entry["(L|l)ink"],
+                }
+                for entry in history
+            ],
+        )
+        cls.statistics_request = StatisticsRequest.objects.create(
+            participant=cls.study_participant
+        )
+        with override_settings(REGISTERED_STUDY_PROJECTS=[cls.project.url_id]):
+            compute_tiktok_wh_statistics_from_donation(
+                statistics_scope=StatisticsScope.INTERVAL,
+                statistics_request_id=cls.statistics_request.pk,
+                ddm_project_id=cls.project.pk,
+            )
+        # The first report view adds the top video metadata to the context.
+        get_report_context(
+            TikTokWatchHistoryStatistics.objects.get(
+                request=cls.statistics_request, scope=StatisticsScope.INTERVAL
+            ),
+            top_video_metadata={"thumbnail": "https://example.com/t.jpg"},
+        )
+
+    @classmethod
+    def create_portability_state(cls):
+        cls.open_id = "budget-open-id"
+        TikTokAccessToken.objects.create(
+            open_id=cls.open_id,
+            token="token",
+            token_expiration_date=timezone.now() + timedelta(hours=1),
+            refresh_token="refresh_token",
+            refresh_token_expiration_date=timezone.now() + timedelta(hours=1),
+            token_type="bearer",
+        )
+        TikTokDataRequest.objects.create(
+            request_id=1,
+            open_id=cls.open_id,
+            status=TikTokDataRequest.State.PENDING,
+        )
+
+    def setUp(self):
+        # Measure cold caches, so that the query counts are deterministic.
+        cache.clear()
+        project_registry.clear()
+
+        # The oEmbed lookups of TikTok videos are external requests.
+        patcher = patch(
+            "digital_meal.reports.views.tiktok.get_video_metadata",
+            return_value={"thumbnail": None, "channel": None},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertWithinBudget(self, name, url, **extra):  # noqa: N802
+        """Requests the url and checks it against BUDGETS[name]."""
+        budget = BUDGETS[name]
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.get(url, **extra)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            duration = time.perf_counter() - started
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(queries),
+            budget.queries,
+            f"{name} issued {len(queries)} queries (budget: {budget.queries}):\n"
+            + "\n".join(q["sql"] for q in queries.captured_queries),
+        )
+        self.assertLessEqual(
+            duration,
+            budget.seconds,
+            f"{name} took {duration:.2f}s (budget: {budget.seconds}s)",
+        )
+        return response
+
+    def test_class_report_sections(self):
+        self.client.login(**self.teacher_creds)
+        self.assertWithinBudget(
+            "tiktok_class_report_sections",
+            reverse(
+                "tiktok_class_report_sections",
+                kwargs={"url_id": self.classrooms[0].url_id},
+            ),
+            HTTP_HX_REQUEST="true",
+        )
+
+    def test_individual_report_sections(self):
+        self.assertWithinBudget(
+            "tiktok_individual_report_sections",
+            reverse(
+                "tiktok_individual_report_sections",
+                kwargs={
+                    "url_id": self.classrooms[0].url_id,
+                    "participant_id": self.participant.external_id,
+                },
+            ),
+            HTTP_HX_REQUEST="true",
+        )
+
+    def test_class_detail(self):
+        self.client.login(**self.teacher_creds)
+        self.assertWithinBudget(
+            "class_detail",
+            reverse("class_detail", kwargs={"url_id": self.classrooms[0].url_id}),
+        )
+
+    def test_classroom_admin_changelist(self):
+        self.client.login(**self.staff_creds)
+        self.assertWithinBudget(
+            "classroom_admin_changelist", reverse("admin:tool_classroom_changelist")
+        )
+
+    def test_dashboard_partials(self):
+        self.client.login(**self.staff_creds)
+        for name in [
+            "dashboard_classroom_overview",
+            "dashboard_teacher_overview",
+            "dashboard_participation_overview",
+            "dashboard_exception_overview",
+        ]:
+            with self.subTest(name=name):
+                cache.clear()
+                self.assertWithinBudget(name, reverse(name), HTTP_HX_REQUEST="true")
+
+    def test_mdm_statistics(self):
+        self.client.login(**self.teacher_creds)
+        session = self.client.session
+        session[USERFLOW_SESSION_KEY] = {
+            "statistics_requested": True,
+            "request_id": str(self.statistics_request.public_id),
+        }
+        session.save()
+
+        response = self.assertWithinBudget(
+            "mdm_tiktok_statistics",
+            reverse("mdm:userflow:reports:tiktok_statistics"),
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertTrue(response.context["statistics_ready"])
+
+    def test_study_statistics(self):
+        with override_settings(REGISTERED_STUDY_PROJECTS=[self.project.url_id]):
+            response = self.assertWithinBudget(
+                "study_tiktok_statistics",
+                reverse(
+                    "mdm:userflow:studies:tiktok_statistics",
+                    kwargs={"participant_id": self.study_participant.external_id},
+                ),
+                HTTP_HX_REQUEST="true",
+            )
+        self.assertTrue(response.context["statistics_ready"])
+
+    def test_check_download_availability(self):
+        session = self.client.session
+        PortabilitySessionManager(session).update(tiktok_open_id=self.open_id)
+        session.save()
+
+        self.assertWithinBudget(
+            "tiktok_check_download_availability",
+            reverse("tiktok_check_download_availability"),
+            HTTP_HX_REQUEST="true",
+        )
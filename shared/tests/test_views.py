@@ -1,7 +1,12 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
 from django.test import RequestFactory, TestCase, override_settings
+from django.views import View
 
 from shared.routing.constants import MDMRoutingModes
 from shared.views import (
+    AsyncDispatchMixin,
     custom_400,
     custom_403,
     custom_404,
@@ -9,6 +14,8 @@ from shared.views import (
     get_template_prefix,
 )
 
+User = get_user_model()
+
 
 @override_settings(
     ALLOWED_HOSTS=["my.dm.com", "dm.com"],
@@ -112,3 +119,46 @@ class ErrorViewsUrlPrefixRoutingTests(TestCase):
     def test_mdm_main_custom_500_view(self):
         response_500 = custom_500(self.mdm_request)
         self.assertEqual(response_500.status_code, 500)
+
+
+class AsyncDispatchMixinTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_async_handler_is_awaited_after_sync_dispatch(self):
+        class SyncDispatchMixin:
+            def dispatch(self, request, *args, **kwargs):
+                # Runs in a thread, so database access is allowed.
+                request.n_users = User.objects.count()
+                return super().dispatch(request, *args, **kwargs)
+
+        class AsyncTestView(AsyncDispatchMixin, SyncDispatchMixin, View):
+            async def get(self, request, *args, **kwargs):
+                return HttpResponse(str(request.n_users))
+
+        view = AsyncTestView.as_view()
+        self.assertTrue(iscoroutinefunction(view))
+
+        response = async_to_sync(view)(self.factory.get("/"))
+        self.assertEqual(response.content, b"0")
+
+    def test_sync_handler_is_dispatched_as_usual(self):
+        class SyncTestView(AsyncDispatchMixin, View):
+            def get(self, request, *args, **kwargs):
+                return HttpResponse("sync")
+
+        view = SyncTestView.as_view()
+        self.assertFalse(iscoroutinefunction(view))
+        self.assertEqual(view(self.factory.get("/")).content, b"sync")
+
+    def test_short_circuit_response_is_returned(self):
+        class ForbiddenMixin:
+            def dispatch(self, request, *args, **kwargs):
+                return HttpResponse(status=403)
+
+        class AsyncTestView(AsyncDispatchMixin, ForbiddenMixin, View):
+            async def get(self, request, *args, **kwargs):
+                return HttpResponse()
+
+        response = async_to_sync(AsyncTestView.as_view())(self.factory.get("/"))
+        self.assertEqual(response.status_code, 403)
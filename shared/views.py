@@ -1,3 +1,6 @@
+import inspect
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 
 from shared.routing.constants import MDMRoutingContext
@@ -29,3 +32,29 @@ def custom_404(request, exception):
 def custom_500(request):
     template_prefix = get_template_prefix(request)
     return render(request, f"{template_prefix}/500.html", status=500)
+
+
+class AsyncDispatchMixin:
+    """Allows async handlers in views with a synchronous dispatch chain.
+
+    Mixins in this project validate requests in dispatch() (authentication,
+    session state, access tokens), which accesses the session and the database.
+    For views with async handlers, this chain runs in a thread (sync_to_async)
+    and the handler it returns is awaited on the event loop afterwards, so that
+    waiting for external services does not block a worker.
+
+    Views whose handlers are synchronous are dispatched as usual.
+
+    Must be listed first in the view's inheritance chain.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.view_is_async:
+            return super().dispatch(request, *args, **kwargs)
+        return self._async_dispatch(request, *args, **kwargs)
+
+    async def _async_dispatch(self, request, *args, **kwargs):
+        response = await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        if inspect.isawaitable(response):
+            response = await response
+        return response